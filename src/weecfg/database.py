@@ -242,6 +242,10 @@ class WindSpeedRecalculation(DatabaseFix):
             # advance to the next tranche
             day += self.trans_days
 
+        # any saved aggregates may have been calculated from the old maximums
+        if not self.dry_run:
+            self.dbm.invalidate_snapshots()
+
         # we have finished, give the user some final information on progress,
         # mainly so the total tallies with the log
         self._progress(n_days, last_start)
@@ -55,8 +55,9 @@ def main():
     subparsers = parser.add_subparsers(dest='subcommand',
                                        title="Available subcommands")
 
-    # Import the "cmd" module for each subcommand, then add its individual subparser.
-    for subcommand in SUBCOMMANDS:
+    # Import the "cmd" module for each subcommand that is needed, then add its individual
+    # subparser.
+    for subcommand in _needed_subcommands(sys.argv[1:]):
         module = importlib.import_module(f'weectllib.{subcommand}_cmd')
         module.add_subparser(subparsers)
 
@@ -80,6 +81,22 @@ def main():
         raise TypeError(f"Unexpected dispatch function signature: {sig}")
 
 
+def _needed_subcommands(args):
+    """Return the subcommands that have to be loaded to parse a command line. Importing the
+    modules of a subcommand can be expensive, so only the one being invoked is loaded."""
+    for arg in args:
+        if arg in ('-v', '--version'):
+            return []
+        if not arg.startswith('-'):
+            # This is the subcommand.
+            if arg in SUBCOMMANDS:
+                return [arg]
+            break
+    # Either there is no subcommand, or it is unknown. All of them are needed for the help
+    # message.
+    return SUBCOMMANDS
+
+
 if __name__ == "__main__":
     # Start up the program
     main()
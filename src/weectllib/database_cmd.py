@@ -7,9 +7,7 @@
 import argparse
 
 import weecfg
-import weecfg.database
 import weectllib
-import weectllib.database_actions
 from weeutil.weeutil import bcolors
 
 create_usage = f"""{bcolors.BOLD}weectl database create
@@ -314,7 +312,7 @@ def add_subparser(subparsers):
 # ------------------ Shims for calling database action functions ---------------- #
 def create_database(config_dict, namespace):
     """Create the WeeWX database"""
-
+    import weectllib.database_actions
     weectllib.database_actions.create_database(config_dict,
                                                db_binding=namespace.binding,
                                                dry_run=namespace.dry_run,
@@ -323,6 +321,7 @@ def create_database(config_dict, namespace):
 
 def drop_daily(config_dict, namespace):
     """Drop the daily summary from a WeeWX database"""
+    import weectllib.database_actions
     weectllib.database_actions.drop_daily(config_dict,
                                           db_binding=namespace.binding,
                                           dry_run=namespace.dry_run,
@@ -331,6 +330,7 @@ def drop_daily(config_dict, namespace):
 
 def rebuild_daily(config_dict, namespace):
     """Rebuild the daily summary in a WeeWX database"""
+    import weectllib.database_actions
     weectllib.database_actions.rebuild_daily(config_dict,
                                              date=namespace.date,
                                              from_date=namespace.from_date,
@@ -343,6 +343,7 @@ def rebuild_daily(config_dict, namespace):
 
 def add_column(config_dict, namespace):
     """Add a column to a WeeWX database"""
+    import weectllib.database_actions
     column_type = namespace.column_type.upper()
     if column_type == 'INT':
         column_type = "INTEGER"
@@ -356,6 +357,7 @@ def add_column(config_dict, namespace):
 
 def rename_column(config_dict, namespace):
     """Rename a column in a WeeWX database."""
+    import weectllib.database_actions
     weectllib.database_actions.rename_column(config_dict,
                                              from_name=namespace.from_name,
                                              to_name=namespace.to_name,
@@ -366,6 +368,7 @@ def rename_column(config_dict, namespace):
 
 def drop_columns(config_dict, namespace):
     """Drop (remove) one or more columns in a WeeWX database."""
+    import weectllib.database_actions
     weectllib.database_actions.drop_columns(config_dict,
                                             column_names=namespace.column_names,
                                             db_binding=namespace.binding,
@@ -375,6 +378,7 @@ def drop_columns(config_dict, namespace):
 
 def reconfigure_database(config_dict, namespace):
     """Replicate a database, using current configuration settings."""
+    import weectllib.database_actions
     weectllib.database_actions.reconfigure_database(config_dict,
                                                     db_binding=namespace.binding,
                                                     dry_run=namespace.dry_run,
@@ -383,6 +387,7 @@ def reconfigure_database(config_dict, namespace):
 
 def transfer_database(config_dict, namespace):
     """Copy a database to a new database."""
+    import weectllib.database_actions
     weectllib.database_actions.transfer_database(config_dict,
                                                  dest_binding=namespace.dest_binding,
                                                  db_binding=namespace.binding,
@@ -392,6 +397,7 @@ def transfer_database(config_dict, namespace):
 
 def calc_missing(config_dict, namespace):
     """Calculate derived variables in a database."""
+    import weectllib.database_actions
     weectllib.database_actions.calc_missing(config_dict,
                                             date=namespace.date,
                                             from_date=namespace.from_date,
@@ -404,11 +410,13 @@ def calc_missing(config_dict, namespace):
 
 def check(config_dict, namespace):
     """Check the integrity of a WeeWX database."""
+    import weectllib.database_actions
     weectllib.database_actions.check(config_dict,
                                      namespace.binding)
 
 
 def update_database(config_dict, namespace):
+    import weectllib.database_actions
     weectllib.database_actions.update_database(config_dict,
                                                db_binding=namespace.binding,
                                                dry_run=namespace.dry_run,
@@ -417,6 +425,7 @@ def update_database(config_dict, namespace):
 
 def reweight_daily(config_dict, namespace):
     """Recalculate the weights in a WeeWX database."""
+    import weectllib.database_actions
     weectllib.database_actions.reweight_daily(config_dict,
                                               date=namespace.date,
                                               from_date=namespace.from_date,
@@ -19,7 +19,7 @@ import weewx
 import weewx.manager
 import weewx.units
 import weewx.xtypes
-from weeutil.weeutil import timestamp_to_string, TimeSpan, bcolors
+from weeutil.weeutil import timestamp_to_string, to_float, TimeSpan, bcolors
 
 # keys/setting names to obfuscate in weewx.conf, key value will be obfuscated
 # if the key starts any element in the list. Can add additional string elements
@@ -65,6 +65,41 @@ def debug(config_dict, output=None):
         generate_debug_conf(config_dict['config_path'], config_dict, fd)
 
 
+def sql_stats(config_dict, reports=None, top=10, output=None):
+    """Run reports with SQL profiling turned on, then show the statistics of the SQL statements
+    each report ran.
+
+    Args:
+        config_dict (dict): Configuration dictionary.
+        reports (list[str]|None): The reports to run. Default is all enabled reports.
+        top (int): How many statements to show for each report, the slowest ones first.
+        output (str|None): Path to where the output will be put. Default is stdout.
+    """
+    import weedb.profile
+    import weectllib.report_actions
+
+    weedb.profile.enable(to_float(config_dict.get('slow_query_time')))
+    report_engine = weectllib.report_actions.run_reports(config_dict, reports=reports)
+
+    if output:
+        sink = open(output, 'wt')
+    else:
+        sink = contextlib.nullcontext(sys.stdout)
+
+    with sink as fd:
+        total_stats = weedb.profile.Stats()
+        for report, stats in report_engine.sql_stats.items():
+            total_stats.merge(stats)
+            print(f"\nReport '{report}': %d SQL queries in %.3f seconds, returning %d rows"
+                  % stats.totals(), file=fd)
+            for line in stats.format(limit=top):
+                print(f"  {line}", file=fd)
+        print("\nAll reports: %d SQL queries in %.3f seconds, returning %d rows"
+              % total_stats.totals(), file=fd)
+        for line in total_stats.format(limit=top):
+            print(f"  {line}", file=fd)
+
+
 def generate_sys_info(fd):
     """Generate general information about the system
 
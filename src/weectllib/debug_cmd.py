@@ -6,13 +6,16 @@
 """Generate weewx debug info"""
 
 import weecfg
-import weecfg.extension
-import weectllib.debug_actions
+import weectllib
 from weeutil.weeutil import bcolors
 
 debug_usage = f"""{bcolors.BOLD}weectl debug
             [--config=FILENAME]
             [--output=FILENAME]{bcolors.ENDC}
+       {bcolors.BOLD}weectl debug --sql-stats
+            [--config=FILENAME]
+            [--output=FILENAME]
+            [--reports NAME [NAME ...]] [--top=N]{bcolors.ENDC}
 """
 
 debug_description = """
@@ -21,6 +24,10 @@ debugging. The debug output consists of two parts, the first part containing
 a snapshot of relevant system/weewx information and the second part a parsed and
 obfuscated copy of weewx.conf. This output can be redirected to a file and posted
 when seeking assistance via forums or email.
+
+With option --sql-stats, the reports are run instead, with SQL profiling turned on.
+The statistics of the SQL statements each report ran are then shown, the statements
+that took the most time first.
 """
 
 debug_epilog = """
@@ -46,9 +53,31 @@ def add_subparser(subparsers):
                               metavar="FILENAME",
                               help="Redirect output to FILENAME. Default is "
                                    "standard output.")
+    debug_parser.add_argument('--sql-stats',
+                              action='store_true',
+                              help="Run the reports, and show the statistics of the SQL "
+                                   "statements they ran.")
+    debug_parser.add_argument('--reports',
+                              nargs='+',
+                              metavar='NAME',
+                              help="With --sql-stats, run only these reports. Default is to run "
+                                   "all enabled reports.")
+    debug_parser.add_argument('--top',
+                              type=int,
+                              default=10,
+                              metavar='N',
+                              help="With --sql-stats, show the N statements of each report that "
+                                   "took the most time. Default is 10.")
     debug_parser.set_defaults(func=weectllib.dispatch)
     debug_parser.set_defaults(action_func=debug)
 
 
 def debug(config_dict, namespace):
-    weectllib.debug_actions.debug(config_dict, output=namespace.output)
+    import weectllib.debug_actions
+    if namespace.sql_stats:
+        weectllib.debug_actions.sql_stats(config_dict,
+                                          reports=namespace.reports,
+                                          top=namespace.top,
+                                          output=namespace.output)
+    else:
+        weectllib.debug_actions.debug(config_dict, output=namespace.output)
@@ -5,7 +5,6 @@
 #
 """Install and remove extensions."""
 import weecfg
-import weecfg.extension
 import weectllib
 from weeutil.printer import Printer
 from weeutil.weeutil import bcolors
@@ -122,6 +121,7 @@ def uninstall_extension(config_dict, namespace):
 
 
 def _get_extension_engine(config_dict, dry_run=False, verbosity=1):
+    import weecfg.extension
     ext = weecfg.extension.ExtensionEngine(config_path=config_dict['config_path'],
                                            config_dict=config_dict,
                                            dry_run=dry_run,
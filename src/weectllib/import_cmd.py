@@ -6,8 +6,7 @@
 """Import observation data"""
 
 import weecfg
-import weecfg.extension
-import weectllib.import_actions
+import weectllib
 from weeutil.weeutil import bcolors
 
 import_usage = f"""{bcolors.BOLD}weectl import --help
@@ -83,6 +82,7 @@ def add_subparser(subparsers):
 
 
 def import_func(config_dict, namespace):
+    import weectllib.import_actions
     weectllib.import_actions.obs_import(config_dict,
                                         namespace.import_config_path,
                                         dry_run=namespace.dry_run,
@@ -51,6 +51,7 @@ def run_reports(config_dict,
                 epoch=None,
                 report_date=None, report_time=None,
                 reports=None):
+    """Run reports, then return the instance of StdReportEngine that ran them."""
     if reports:
         print(f"The following reports will be run: {', '.join(reports)}")
     else:
@@ -109,6 +110,7 @@ def run_reports(config_dict,
     engine.shutDown()
 
     print("Done.")
+    return t
 
 
 def get_epoch_time(d_tt, t_tt):
@@ -9,7 +9,6 @@ import time
 
 import weecfg
 import weectllib
-import weectllib.report_actions
 from weeutil.weeutil import bcolors
 
 report_list_usage = f"""{bcolors.BOLD}weectl report list
@@ -78,10 +77,12 @@ def add_subparser(subparsers):
 
 
 def list_reports(config_dict, _):
+    import weectllib.report_actions
     weectllib.report_actions.list_reports(config_dict)
 
 
 def run_reports(config_dict, namespace):
+    import weectllib.report_actions
     # Presence of --date requires --time and v.v.
     if namespace.date and not namespace.time or namespace.time and not namespace.date:
         sys.exit("Must specify both --date and --time.")
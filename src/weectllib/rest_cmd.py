@@ -7,7 +7,6 @@
 
 import weecfg
 import weectllib
-import weectllib.rest_actions
 from weeutil.weeutil import bcolors
 
 rest_list_usage = f"""{bcolors.BOLD}weectl rest list
@@ -70,8 +69,10 @@ def add_subparser(subparsers):
 
 
 def list_rest(config_dict, _):
+    import weectllib.rest_actions
     weectllib.rest_actions.list_rest(config_dict)
 
 
 def run_rest(config_dict, namespace):
+    import weectllib.rest_actions
     weectllib.rest_actions.run_rest(config_dict, services=namespace.services)
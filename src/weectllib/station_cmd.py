@@ -8,7 +8,6 @@ import sys
 
 import weecfg
 import weectllib
-import weectllib.station_actions
 import weewx
 from weeutil.weeutil import bcolors
 
@@ -298,6 +297,7 @@ def add_subparser(subparsers):
 
 def create_station(namespace):
     """Map 'namespace' to a call to station_create()"""
+    import weectllib.station_actions
     try:
         _config_dict = weectllib.station_actions.station_create(
             weewx_root=namespace.weewx_root,
@@ -324,6 +324,7 @@ def create_station(namespace):
 
 def reconfigure_station(config_dict, namespace):
     """Map namespace to a call to station_reconfigure()"""
+    import weectllib.station_actions
     try:
         weectllib.station_actions.station_reconfigure(config_dict=config_dict,
                                                       driver=namespace.driver,
@@ -347,6 +348,7 @@ def reconfigure_station(config_dict, namespace):
 
 
 def upgrade_station(config_dict, namespace):
+    import weectllib.station_actions
     weectllib.station_actions.station_upgrade(config_dict=config_dict,
                                               dist_config_path=namespace.dist_config,
                                               examples_root=namespace.examples_root,
@@ -357,4 +359,5 @@ def upgrade_station(config_dict, namespace):
                                               dry_run=namespace.dry_run)
 
 def list_drivers(_config_dict, _namespace):
+    import weectllib.station_actions
     weectllib.station_actions.station_list_drivers()
\ No newline at end of file
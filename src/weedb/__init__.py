@@ -18,6 +18,8 @@ Weedb generally follows the MySQL exception model. Specifically:
 
 import importlib
 
+from weedb import profile
+
 
 # The exceptions that the weedb package can raise:
 class DatabaseError(Exception):
@@ -96,13 +98,15 @@ def create(db_dict):
 
 def connect(db_dict):
     """Return a connection to a database. If the database does not
-    exist, an exception of type weedb.NoDatabaseError will be raised."""
+    exist, an exception of type weedb.NoDatabaseError will be raised.
+    If SQL profiling is on, the connection is wrapped, so that what runs
+    through it gets profiled. See module weedb.profile."""
     driver_mod = importlib.import_module(db_dict['driver'])
     # See note above
     if hasattr(db_dict, "dict"):
-        return driver_mod.connect(**db_dict.dict())
+        return profile.wrap(driver_mod.connect(**db_dict.dict()))
     else:
-        return driver_mod.connect(**db_dict)
+        return profile.wrap(driver_mod.connect(**db_dict))
 
 
 def drop(db_dict):
@@ -130,6 +134,15 @@ class Connection:
         """Returns an appropriate database cursor."""
         raise NotImplementedError
 
+    def stream_cursor(self):
+        """Returns a cursor suitable for walking through a large result set. Rows are fetched
+        from the server as they are needed, rather than all at once. Databases that always work
+        this way can just return an ordinary cursor.
+
+        A streaming cursor may use its own connection to the server, in which case it does not
+        see any uncommitted changes made through this connection."""
+        return self.cursor()
+
     def execute(self, sql_string, sql_tuple=()):
         """Execute a sql statement. This version does not return a cursor,
         so it can only be used for statements that do not return a result set."""
@@ -169,6 +182,11 @@ class Connection:
         """
         raise NotImplementedError
 
+    def schema_version(self):
+        """Return a value that changes whenever the schema of the database changes, or None if
+        the database offers no cheap way of telling."""
+        return None
+
     @property
     def has_math(self):
         """Returns True if the database supports math functions such as cos() and sin().
@@ -205,6 +223,17 @@ class Cursor:
     def execute(self, sql_string, sql_tuple=()):
         raise NotImplementedError
 
+    def fetchmany(self, size=1):
+        """Fetch up to 'size' rows of the result set. Returns an empty list when there are no
+        more rows."""
+        rows = []
+        while len(rows) < size:
+            row = self.fetchone()
+            if row is None:
+                break
+            rows.append(row)
+        return rows
+
     def create_table(self, table_name, table_schema):
         """Create a table with the given name and columns.
         table_name (str): The name of the table to be created.
@@ -0,0 +1,617 @@
+#
+#    Copyright (c) 2026 Tom Keffer <tkeffer@gmail.com>
+#
+#    See the file LICENSE.txt for your full rights.
+#
+"""Time-partitioned, compressed column files.
+
+A column store keeps the contents of an archive table as one file per observation type per month:
+
+    <root>/2024-05/dateTime.col
+    <root>/2024-05/outTemp.col
+    <root>/2024-05/barometer.col
+    ...
+
+Months are calendar months in UTC. All the files in a month directory hold the same number of
+values, in the same (time) order, so the n'th value of every file belongs to the n'th timestamp
+in file 'dateTime.col'.
+
+Each file is a sequence of blocks. Every block starts with a header, holding the kind of block,
+the number of values, and the length of the compressed data that follows. The data is compressed
+with zlib. There are four kinds of block:
+
+    'q' Integers only, such as 'dateTime'. The bytes of an array.array of typecode 'q',
+        shuffled by significance.
+    'n' Integers and NULLs. As for 'q', with NULL stored as 0, followed by a bitmap marking the
+        NULLs. They come back as a list, holding ints and None.
+    'd' Numbers that include floating point. The bytes of an array.array of typecode 'd',
+        shuffled by significance, with NULL stored as NaN.
+    'j' Anything else that JSON can hold, such as strings. The values as a JSON list.
+
+A column of a month comes back as an array.array if it is all 'q', or all 'd' blocks, and as a
+list otherwise.
+
+New records are appended as new blocks. Once a file accumulates too many blocks, the month is
+rewritten with a single block per file. If the files of a month do not agree with each other
+(for example, because of a crash halfway through an append), the month is reported as damaged,
+and it is up to the owner of the store to rewrite it from the original data.
+
+More than one process may use the same store, for example weewxd, along with 'weectl import'.
+Whoever holds the lock of the store, which is both a thread lock and a lock on the file '.lock' in
+the store directory, has the store to itself. Whatever is known about a month is checked against
+the month's 'dateTime.col' file every time it is used, so changes made by other processes are seen
+right away.
+
+The owner of a store may decide that some months are held only by the store, and no longer by
+its original data. The start of the first month that is not is kept in the file 'offloaded'.
+"""
+
+import array
+import bisect
+import calendar
+import json
+import logging
+import os
+import os.path
+import shutil
+import struct
+import threading
+import time
+import zlib
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows. The store can then only be shared between threads.
+    fcntl = None
+
+log = logging.getLogger(__name__)
+
+# Header of a block: typecode, number of values, length of the compressed data
+_BLOCK_HEADER = struct.Struct('<cII')
+
+# Blocks in a file before the month gets compacted
+MAX_BLOCKS = 64
+
+
+class DamagedMonthError(Exception):
+    """The files of a month are inconsistent with each other."""
+
+
+class StoreLock:
+    """A reentrant lock that keeps other threads, and other processes, out of a store.
+
+    The lock on the file is taken only by the outermost acquire() of the owning thread, and
+    dropped by its matching release().
+    """
+
+    def __init__(self, root):
+        self.path = os.path.join(root, '.lock')
+        self._rlock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+
+    def acquire(self):
+        self._rlock.acquire()
+        if self._depth == 0:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                if fcntl is not None:
+                    fcntl.flock(self._fd, fcntl.LOCK_EX)
+            except OSError:
+                if self._fd is not None:
+                    os.close(self._fd)
+                    self._fd = None
+                self._rlock.release()
+                raise
+        self._depth += 1
+        return True
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            # Closing the file drops the lock
+            os.close(self._fd)
+            self._fd = None
+        self._rlock.release()
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, etyp, einst, etb):
+        self.release()
+
+
+def month_of(timestamp):
+    """Return the key of the month holding a timestamp, such as '2024-05'."""
+    tt = time.gmtime(timestamp)
+    return '%04d-%02d' % (tt.tm_year, tt.tm_mon)
+
+
+def month_span(month):
+    """Return the start and stop of a month, in epoch time. The start is inclusive, the stop
+    exclusive."""
+    year, mon = int(month[:4]), int(month[5:7])
+    start = calendar.timegm((year, mon, 1, 0, 0, 0, 0, 0, 0))
+    year, mon = (year + 1, 1) if mon == 12 else (year, mon + 1)
+    stop = calendar.timegm((year, mon, 1, 0, 0, 0, 0, 0, 0))
+    return start, stop
+
+
+def gen_months(startstamp, stopstamp):
+    """Yield the keys of all months that overlap the interval [startstamp, stopstamp]."""
+    month = month_of(startstamp)
+    while True:
+        yield month
+        _, stop = month_span(month)
+        if stop > stopstamp:
+            break
+        month = month_of(stop)
+
+
+class ColumnStore:
+    """A directory of time-partitioned column files.
+
+    Use get_shared() to get the store for a directory, so all managers in a process use the same
+    instance, and so the same lock.
+    """
+
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, root):
+        self.root = root
+        self.lock = StoreLock(root)
+        # Cache of (count, last timestamp, column names, signature of 'dateTime.col') for each
+        # month
+        self._info = {}
+        # Set by the owner, once it has made sure the store matches its data.
+        self.synced = False
+        # Cache of (start of the first month not offloaded, signature of file 'offloaded')
+        self._offloaded = None
+
+    @classmethod
+    def get_shared(cls, root):
+        """Return the store for a directory, creating the instance if necessary."""
+        root = os.path.abspath(root)
+        with cls._shared_lock:
+            if root not in cls._shared:
+                cls._shared[root] = cls(root)
+            return cls._shared[root]
+
+    def months(self):
+        """Return a sorted list of the months in the store."""
+        try:
+            names = os.listdir(self.root)
+        except FileNotFoundError:
+            return []
+        return sorted(name for name in names
+                      if len(name) == 7 and name[4] == '-' and name[:4].isdigit())
+
+    def info(self, month):
+        """Return a summary of a month. If the month has been changed by another process since
+        it was last looked at, it is read again.
+
+        Returns:
+            tuple|None: A 3-way tuple (number of records, last timestamp, set of column names), or
+                None if the month is not in the store.
+
+        Raises:
+            DamagedMonthError: If the files of the month do not agree with each other.
+        """
+        with self.lock:
+            signature = self._signature(month)
+            if month in self._info and self._info[month][3] != signature:
+                del self._info[month]
+            if month not in self._info:
+                month_dir = os.path.join(self.root, month)
+                if not os.path.isdir(month_dir):
+                    return None
+                columns = {name[:-4] for name in os.listdir(month_dir) if name.endswith('.col')}
+                if 'dateTime' not in columns:
+                    raise DamagedMonthError("Month %s has no timestamps" % month)
+                counts = {_read_count(os.path.join(month_dir, name + '.col')) for name in columns}
+                if len(counts) != 1:
+                    raise DamagedMonthError("Columns in month %s have different lengths"
+                                            % month)
+                timestamps = self._read_column(month, 'dateTime')
+                last = timestamps[-1] if timestamps else None
+                self._info[month] = (counts.pop(), last, columns, signature)
+            return self._info[month][:3]
+
+    def _signature(self, month):
+        """Return something that changes whenever the timestamps of a month get written. These
+        are always written last."""
+        try:
+            st = os.stat(os.path.join(self.root, month, 'dateTime.col'))
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_size, st.st_mtime_ns
+
+    def write_month(self, month, keys, rows):
+        """Replace the contents of a month.
+
+        Args:
+            month (str): The month, such as '2024-05'.
+            keys (list[str]): The column names. Must include 'dateTime'.
+            rows (list[tuple]): The rows, in time order. Each row holds values in the order
+                given by keys.
+
+        Raises:
+            TypeError: If a value is of a type the store cannot hold.
+        """
+        columns = list(zip(*rows)) if rows else [()] * len(keys)
+        with self.lock:
+            month_dir = os.path.join(self.root, month)
+            tmp_dir = month_dir + '.tmp'
+            old_dir = month_dir + '.old'
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            shutil.rmtree(old_dir, ignore_errors=True)
+            os.makedirs(tmp_dir)
+            for key, column in zip(keys, columns):
+                with open(os.path.join(tmp_dir, key + '.col'), 'wb') as fd:
+                    fd.write(_encode_block(column))
+            # Swap in the new directory
+            if os.path.isdir(month_dir):
+                os.rename(month_dir, old_dir)
+            os.rename(tmp_dir, month_dir)
+            shutil.rmtree(old_dir, ignore_errors=True)
+            self._info[month] = (len(rows), rows[-1][keys.index('dateTime')] if rows else None,
+                                 set(keys), self._signature(month))
+
+    def append(self, month, keys, rows):
+        """Append rows to a month. The rows must all be later than the last row in the month, and
+        the keys must be the same as the columns of the month.
+
+        Args:
+            month (str): The month, such as '2024-05'.
+            keys (list[str]): The column names. Must include 'dateTime'.
+            rows (list[tuple]): The rows to be appended, in time order.
+
+        Raises:
+            TypeError: If a value is of a type the store cannot hold.
+        """
+        if not rows:
+            return
+        with self.lock:
+            info = self.info(month)
+            if info is None:
+                self.write_month(month, keys, rows)
+                return
+            count, last, columns = info
+            month_dir = os.path.join(self.root, month)
+            if _read_blocks(os.path.join(month_dir, 'dateTime.col')) >= MAX_BLOCKS:
+                # Time to compact the month
+                self.write_month(month, keys, self.read_rows(month, keys) + list(rows))
+                return
+            # Write the timestamps last. If something goes wrong partway through, the columns will
+            # disagree, and the month will be rebuilt.
+            self._info.pop(month, None)
+            i_dt = keys.index('dateTime')
+            for i, key in sorted(enumerate(keys), key=lambda x: x[1] == 'dateTime'):
+                with open(os.path.join(month_dir, key + '.col'), 'ab') as fd:
+                    fd.write(_encode_block([row[i] for row in rows]))
+            self._info[month] = (count + len(rows), rows[-1][i_dt], columns,
+                                 self._signature(month))
+
+    def read_rows(self, month, keys):
+        """Return the rows of a month, in time order. Each row is a tuple, holding values in the
+        order given by keys, with None for NULL. A column the month does not have is all NULL.
+
+        Raises:
+            DamagedMonthError: If the files of the month do not agree with each other.
+        """
+        with self.lock:
+            info = self.info(month)
+            if info is None:
+                return []
+            nan = float('nan')
+            columns = []
+            for key in keys:
+                if key not in info[2]:
+                    columns.append([None] * info[0])
+                    continue
+                column = self._read_column(month, key)
+                if not isinstance(column, list) and column.typecode == 'd':
+                    column = [None if v != v else v for v in column]
+                columns.append(column)
+            return list(zip(*columns))
+
+    def add_column(self, key, months=None):
+        """Add a column of NULLs to months that do not have it.
+
+        Args:
+            key (str): The name of the column.
+            months (list[str]|None): The months to change. If None, all of them.
+        """
+        with self.lock:
+            for month in months if months is not None else self.months():
+                info = self.info(month)
+                if info is None or key in info[2]:
+                    continue
+                with open(os.path.join(self.root, month, key + '.col'), 'wb') as fd:
+                    fd.write(_encode_block([None] * info[0]))
+                self._touch_month(month)
+
+    def rename_column(self, old_key, new_key):
+        """Rename a column in every month that has it."""
+        with self.lock:
+            for month in self.months():
+                path = os.path.join(self.root, month, old_key + '.col')
+                if os.path.exists(path):
+                    os.replace(path, os.path.join(self.root, month, new_key + '.col'))
+                    self._touch_month(month)
+
+    def drop_column(self, key):
+        """Remove a column from every month that has it."""
+        with self.lock:
+            for month in self.months():
+                path = os.path.join(self.root, month, key + '.col')
+                if os.path.exists(path):
+                    os.remove(path)
+                    self._touch_month(month)
+
+    def _touch_month(self, month):
+        """Give the timestamps of a month a new signature, so every instance of the store reads
+        the month again."""
+        path = os.path.join(self.root, month, 'dateTime.col')
+        shutil.copyfile(path, path + '.tmp')
+        os.replace(path + '.tmp', path)
+        self._info.pop(month, None)
+
+    def offloaded_until(self):
+        """Return the start of the first month that has not been offloaded, in epoch time.
+        Months that start earlier are held only by the store. Zero if there are none."""
+        path = os.path.join(self.root, 'offloaded')
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return 0
+        signature = (st.st_ino, st.st_size, st.st_mtime_ns)
+        if self._offloaded is None or self._offloaded[1] != signature:
+            with open(path) as fd:
+                self._offloaded = (int(fd.read()), signature)
+        return self._offloaded[0]
+
+    def set_offloaded_until(self, timestamp):
+        """Record that months that start before a time are held only by the store. Call with the
+        lock held."""
+        path = os.path.join(self.root, 'offloaded')
+        with open(path + '.tmp', 'w') as fd:
+            fd.write('%d\n' % timestamp)
+        os.replace(path + '.tmp', path)
+
+    def remove_month(self, month):
+        """Remove a month from the store."""
+        with self.lock:
+            shutil.rmtree(os.path.join(self.root, month), ignore_errors=True)
+            self._info.pop(month, None)
+
+    def clear(self):
+        """Remove everything from the store."""
+        with self.lock:
+            for month in self.months():
+                self.remove_month(month)
+            self._info = {}
+            self.synced = False
+
+    def begin_update(self):
+        """Note in the store that the owner is about to change its data, and then the store.
+        Call with the lock held."""
+        with open(os.path.join(self.root, '.updating'), 'w'):
+            pass
+
+    def end_update(self):
+        """Note that the store has been brought up to date with the data of the owner."""
+        try:
+            os.remove(os.path.join(self.root, '.updating'))
+        except FileNotFoundError:
+            pass
+
+    def update_interrupted(self):
+        """Return True if an update was started, but never finished, perhaps because the
+        process doing it died. The store may then be behind the data of the owner. Call with
+        the lock held."""
+        return os.path.exists(os.path.join(self.root, '.updating'))
+
+    def read(self, keys, startstamp=None, stopstamp=None, include_start=False):
+        """Generator function that yields the columns of the store within an interval, a month
+        at a time.
+
+        Args:
+            keys (list[str]): The columns to read.
+            startstamp (float|None): Start of the interval. Exclusive, unless include_start is
+                True. If None, start with the first month.
+            stopstamp (float|None): Inclusive end of the interval. If None, end with the last
+                month.
+            include_start (bool): True to include a record at startstamp.
+
+        The lock is not held between months, so a slow consumer does not hold up writers.
+
+        Yields:
+            dict: Keys are the column names. Values are arrays of typecode 'q' for integers, or
+                'd' for other numbers, with NULL as NaN. Columns that hold NULL integers, or
+                values that are not numbers, are lists.
+
+        Raises:
+            DamagedMonthError: If the files of a month do not agree with each other.
+            KeyError: If a month does not have one of the requested columns.
+        """
+        months = self.months()
+        if startstamp is not None:
+            first = month_of(startstamp)
+            months = [m for m in months if m >= first]
+        if stopstamp is not None:
+            last = month_of(stopstamp)
+            months = [m for m in months if m <= last]
+
+        for month in months:
+            with self.lock:
+                info = self.info(month)
+                if info is None:
+                    continue
+                missing = [key for key in keys if key not in info[2]]
+                if missing:
+                    raise KeyError(missing[0])
+                timestamps = self._read_column(month, 'dateTime')
+                lo = 0
+                if startstamp is not None:
+                    lo = bisect.bisect_left(timestamps, startstamp) if include_start \
+                        else bisect.bisect_right(timestamps, startstamp)
+                hi = len(timestamps)
+                if stopstamp is not None:
+                    hi = bisect.bisect_right(timestamps, stopstamp)
+                if lo >= hi:
+                    continue
+                columns = {key: (timestamps if key == 'dateTime'
+                                 else self._read_column(month, key))[lo:hi] for key in keys}
+            yield columns
+
+    def _read_column(self, month, key):
+        """Read a whole column of a month."""
+        path = os.path.join(self.root, month, key + '.col')
+        blocks = []
+        with open(path, 'rb') as fd:
+            while True:
+                header = fd.read(_BLOCK_HEADER.size)
+                if not header:
+                    break
+                if len(header) < _BLOCK_HEADER.size:
+                    raise DamagedMonthError("Truncated block in %s" % path)
+                typecode, count, length = _BLOCK_HEADER.unpack(header)
+                data = fd.read(length)
+                if len(data) < length:
+                    raise DamagedMonthError("Truncated block in %s" % path)
+                blocks.append(_decode_block(typecode.decode('ascii'), count, data))
+        if not blocks:
+            return array.array('q')
+        if len(blocks) == 1:
+            return blocks[0]
+        return _join_blocks(blocks)
+
+
+def _reset_after_fork():
+    """A forked process inherits the locks of the shared stores as they were at the moment of the
+    fork, perhaps held by a thread that does not exist in the child. Give the child fresh locks,
+    and have it read the state of the months from disk again."""
+    ColumnStore._shared_lock = threading.Lock()
+    for store in ColumnStore._shared.values():
+        if store.lock._fd is not None:
+            # Shared with the parent. Closing it does not drop the parent's lock.
+            os.close(store.lock._fd)
+        store.lock = StoreLock(store.root)
+        store._info = {}
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _join_blocks(blocks):
+    """Join the blocks of a column. Where integer and floating point blocks meet, the integers are
+    promoted to floating point. If any block is a list, so is the result."""
+    if not any(isinstance(block, list) for block in blocks):
+        typecode = 'q' if all(block.typecode == 'q' for block in blocks) else 'd'
+        result = array.array(typecode)
+        for block in blocks:
+            result.extend(block if block.typecode == typecode else array.array(typecode, block))
+        return result
+    result = []
+    for block in blocks:
+        if isinstance(block, list):
+            result.extend(block)
+        elif block.typecode == 'd':
+            result.extend(None if v != v else v for v in block)
+        else:
+            result.extend(block)
+    return result
+
+
+def _encode_block(values):
+    """Encode a sequence of values as a block.
+
+    Raises:
+        TypeError: If a value is not None, a number, or something else JSON can hold.
+    """
+    kinds = {type(v) for v in values}
+    data = None
+    try:
+        if kinds <= {int}:
+            typecode = 'q'
+            data = _shuffle(array.array('q', values))
+        elif kinds <= {int, type(None)}:
+            typecode = 'n'
+            nulls = bytearray((len(values) + 7) // 8)
+            for i, v in enumerate(values):
+                if v is None:
+                    nulls[i >> 3] |= 1 << (i & 7)
+            data = _shuffle(array.array('q', (0 if v is None else v for v in values))) \
+                + bytes(nulls)
+        elif kinds <= {int, float, type(None)}:
+            typecode = 'd'
+            nan = float('nan')
+            data = _shuffle(array.array('d', (nan if v is None else v for v in values)))
+    except OverflowError:
+        # Integers too big for 64 bits
+        data = None
+    if data is None:
+        typecode = 'j'
+        data = json.dumps(list(values), separators=(',', ':')).encode('utf-8')
+    data = zlib.compress(data)
+    return _BLOCK_HEADER.pack(typecode.encode('ascii'), len(values), len(data)) + data
+
+
+def _decode_block(typecode, count, data):
+    """Decode a block back into an array, or a list."""
+    raw = zlib.decompress(data)
+    if typecode == 'j':
+        return json.loads(raw.decode('utf-8'))
+    arr = _unshuffle('d' if typecode == 'd' else 'q', count, raw)
+    if typecode == 'n':
+        nulls = raw[count * arr.itemsize:]
+        return [None if nulls[i >> 3] & (1 << (i & 7)) else v for i, v in enumerate(arr)]
+    return arr
+
+
+def _shuffle(arr):
+    """Return the bytes of an array, grouped by their significance. This makes the data much more
+    compressible."""
+    raw = arr.tobytes()
+    return b''.join(raw[i::arr.itemsize] for i in range(arr.itemsize))
+
+
+def _unshuffle(typecode, count, shuffled):
+    """Rebuild an array of count values from the start of some shuffled bytes."""
+    arr = array.array(typecode)
+    size = arr.itemsize
+    raw = bytearray(count * size)
+    for i in range(size):
+        raw[i::size] = shuffled[i * count:(i + 1) * count]
+    arr.frombytes(bytes(raw))
+    return arr
+
+
+def _read_headers(path):
+    """Yield the header of each block of a file."""
+    with open(path, 'rb') as fd:
+        while True:
+            header = fd.read(_BLOCK_HEADER.size)
+            if len(header) < _BLOCK_HEADER.size:
+                if header:
+                    raise DamagedMonthError("Truncated block in %s" % path)
+                break
+            typecode, count, length = _BLOCK_HEADER.unpack(header)
+            yield typecode, count, length
+            fd.seek(length, os.SEEK_CUR)
+
+
+def _read_count(path):
+    """Return the number of values in a file."""
+    return sum(count for _, count, _ in _read_headers(path))
+
+
+def _read_blocks(path):
+    """Return the number of blocks in a file."""
+    return sum(1 for _ in _read_headers(path))
+
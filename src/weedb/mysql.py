@@ -130,8 +130,10 @@ class Connection(weedb.Connection):
             kwargs (dict):   Any extra arguments you may wish to pass on to MySQL
               connect statement. See the file MySQLdb/connections.py for a list (optional).
         """
-        connection = MySQLdb.connect(host=host, port=int(port), user=user, password=password,
-                                     database=database_name, **kwargs)
+        # Save the arguments, so streaming cursors can open their own connection.
+        self.connect_args = dict(host=host, port=int(port), user=user, password=password,
+                                 database=database_name, **kwargs)
+        connection = MySQLdb.connect(**self.connect_args)
 
         weedb.Connection.__init__(self, connection, database_name, 'mysql')
 
@@ -148,6 +150,11 @@ class Connection(weedb.Connection):
         # obliged to include a wrapper around it:
         return Cursor(self)
 
+    def stream_cursor(self):
+        """Return a cursor that streams its result set from the server, rather than holding it
+        all in client memory."""
+        return StreamCursor(self)
+
     @guard
     def tables(self):
         """Returns a list of tables in the database."""
@@ -210,6 +217,20 @@ class Connection(weedb.Connection):
             # or None, if the variable does not exist.
             return row
 
+    @guard
+    def schema_version(self):
+        """Return a digest of the tables and columns in the database, which changes whenever the
+        schema changes.
+
+        The timestamps in information_schema.TABLES cannot be used for this. UPDATE_TIME changes
+        with every write, and CREATE_TIME is not changed by every ALTER TABLE."""
+        with self.connection.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*), SUM(CRC32(CONCAT_WS(',', TABLE_NAME, COLUMN_NAME, "
+                           "ORDINAL_POSITION, COLUMN_TYPE))) FROM information_schema.COLUMNS "
+                           "WHERE TABLE_SCHEMA = %s;", (self.database_name,))
+            row = cursor.fetchone()
+        return tuple(int(value or 0) for value in row)
+
     group_defs = {
         'day': "GROUP BY TRUNCATE((TO_DAYS(FROM_UNIXTIME(dateTime)) "
                "- TO_DAYS(FROM_UNIXTIME(%(sod)s)))/ %(agg_days)s, 0) ",
@@ -280,6 +301,12 @@ class Cursor(weedb.Cursor):
         # filter below
         return _massage(self.cursor.fetchone())
 
+    @guard
+    def fetchmany(self, size=None):
+        if size is None:
+            size = self.cursor.arraysize
+        return [_massage(row) for row in self.cursor.fetchmany(size)]
+
     def drop_columns(self, table, column_names):
         """Drop the set of 'column_names' from table 'table'.
 
@@ -317,6 +344,36 @@ class Cursor(weedb.Cursor):
         self.close()
 
 
+class StreamCursor(Cursor):
+    """A cursor that reads its result set from the server as it goes, using an unbuffered
+    MySQL cursor (SSCursor).
+
+    While an unbuffered result set is being read, its connection cannot be used for anything
+    else. So, each streaming cursor opens its own connection to the server, and closes it when
+    the cursor is closed. Because the connection is different, the cursor sees only data that
+    have been committed."""
+
+    @guard
+    def __init__(self, connection):
+        self.stream_connection = MySQLdb.connect(**connection.connect_args)
+        self.stream_connection.query("SET TRANSACTION ISOLATION LEVEL READ COMMITTED")
+        self.stream_connection.autocommit(True)
+        self.cursor = self.stream_connection.cursor(MySQLdb.cursors.SSCursor)
+
+    def close(self):
+        # Close the connection first. Closing an unbuffered cursor reads, then discards, whatever
+        # is left of the result set.
+        try:
+            self.stream_connection.close()
+            del self.stream_connection
+        except (AttributeError, MySQLDatabaseError, MySQLInterfaceError):
+            pass
+        try:
+            del self.cursor
+        except AttributeError:
+            pass
+
+
 #
 # This is a utility function for converting a result set that might contain
 # longs or decimal.Decimals (which MySQLdb uses) to something containing just ints.
@@ -0,0 +1,307 @@
+#
+#    Copyright (c) 2026 Tom Keffer <tkeffer@gmail.com>
+#
+#    See the file LICENSE.txt for your full rights.
+#
+"""Optional profiling of the SQL statements run through weedb.
+
+Profiling is off by default. Once enable() has been called, every connection returned by
+weedb.connect() is wrapped, so that the statements run through it, or through its cursors, are
+timed. Statements are grouped by their normalized text, that is, with literals replaced by '?' and
+whitespace collapsed, so that the same query run for different times counts as one statement. For
+each statement, the number of calls, the total and the maximum time, and the number of rows
+returned are kept. The time of a call includes the time spent fetching its rows.
+
+A call that takes longer than the slow query time is logged as a warning, together with its
+actual text and arguments.
+
+Besides the overall statistics, function collect() can be used to gather the statistics of what a
+thread runs during a block of code, such as a single report.
+"""
+
+import contextlib
+import functools
+import logging
+import re
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+# The statistics of everything run since profiling was enabled. None if profiling is off.
+_stats = None
+# Calls that take longer than this many seconds get logged. None to not log any.
+_slow_query_time = None
+# Holds the collectors of each thread
+_local = threading.local()
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"(?<![\w.])\d+(?:\.\d*)?(?:[eE][-+]?\d+)?\b")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=1024)
+def normalize(sql_string):
+    """Return the normalized text of a SQL statement.
+
+    Example:
+        >>> normalize("SELECT  outTemp FROM archive\\n WHERE dateTime > 1700000000 AND x='a';")
+        'SELECT outTemp FROM archive WHERE dateTime > ? AND x=?'
+        >>> normalize("SELECT * FROM archive WHERE dateTime IN (%s, %s, %s)")
+        'SELECT * FROM archive WHERE dateTime IN (?, ...)'
+    """
+    sql_string = _STRING_RE.sub('?', sql_string)
+    sql_string = _NUMBER_RE.sub('?', sql_string)
+    sql_string = sql_string.replace('%s', '?')
+    sql_string = _IN_LIST_RE.sub('(?, ...)', sql_string)
+    return _SPACE_RE.sub(' ', sql_string).strip().rstrip(';').rstrip()
+
+
+class Stats:
+    """Statistics of SQL statements, keyed by their normalized text. Safe to use from more than
+    one thread."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # Key is the normalized statement, value is a list [count, total, max, rows]
+        self.statements = {}
+
+    def add(self, key, elapsed, rows):
+        """Record a call to a statement."""
+        with self.lock:
+            entry = self.statements.get(key)
+            if entry is None:
+                self.statements[key] = [1, elapsed, elapsed, rows]
+            else:
+                entry[0] += 1
+                entry[1] += elapsed
+                if elapsed > entry[2]:
+                    entry[2] = elapsed
+                entry[3] += rows
+
+    def merge(self, other):
+        """Add in the statistics of another instance of Stats."""
+        for key, (count, total, max_time, rows) in other.statements.copy().items():
+            with self.lock:
+                entry = self.statements.setdefault(key, [0, 0.0, 0.0, 0])
+                entry[0] += count
+                entry[1] += total
+                entry[2] = max(entry[2], max_time)
+                entry[3] += rows
+
+    def reset(self):
+        with self.lock:
+            self.statements.clear()
+
+    def snapshot(self):
+        """Return the statistics as a list of dictionaries, with keys 'sql', 'count', 'total',
+        'max', and 'rows'. The statements that took the most time in total come first."""
+        with self.lock:
+            items = [(key, list(entry)) for key, entry in self.statements.items()]
+        return sorted(({'sql': key, 'count': count, 'total': total, 'max': max_time,
+                        'rows': rows} for key, (count, total, max_time, rows) in items),
+                      key=lambda s: s['total'], reverse=True)
+
+    def totals(self):
+        """Return a 3-way tuple with the number of calls, their total time, and the number of
+        rows they returned."""
+        with self.lock:
+            entries = list(self.statements.values())
+        return (sum(e[0] for e in entries), sum(e[1] for e in entries),
+                sum(e[3] for e in entries))
+
+    def format(self, limit=None, width=None):
+        """Return the statistics as a list of lines of text, suitable for printing.
+
+        Args:
+            limit (int|None): Include only this many statements, the slowest ones first.
+                Default is to include them all.
+            width (int|None): Truncate statements to this many characters. Default is not to
+                truncate them.
+        """
+        lines = ["%7s %10s %9s %9s  %s" % ('Calls', 'Total (s)', 'Max (s)', 'Rows', 'Statement')]
+        for s in self.snapshot()[:limit]:
+            sql = s['sql']
+            if width and len(sql) > width:
+                sql = sql[:width - 3] + '...'
+            lines.append("%7d %10.3f %9.3f %9d  %s"
+                         % (s['count'], s['total'], s['max'], s['rows'], sql))
+        return lines
+
+
+def enable(slow_query_time=None):
+    """Turn on profiling. Connections made from now on are profiled. If profiling is already on,
+    the statistics gathered so far are kept.
+
+    Args:
+        slow_query_time (float|None): Log calls that take longer than this many seconds. Default
+            is to not log any.
+    """
+    global _stats, _slow_query_time
+    if _stats is None:
+        _stats = Stats()
+    _slow_query_time = slow_query_time or None
+
+
+def disable():
+    """Turn off profiling, and throw away the statistics. Connections that are already
+    profiled stay that way."""
+    global _stats, _slow_query_time
+    _stats = None
+    _slow_query_time = None
+
+
+def is_enabled():
+    return _stats is not None
+
+
+def get_stats():
+    """Return the statistics of everything run since profiling was enabled, or None if
+    profiling is off."""
+    return _stats
+
+
+@contextlib.contextmanager
+def collect():
+    """Context manager that gathers the statistics of what the current thread runs within the
+    block.
+
+    Example:
+        with weedb.profile.collect() as stats:
+            run_some_report()
+        print('\\n'.join(stats.format()))
+    """
+    stats = Stats()
+    collectors = _local.__dict__.setdefault('collectors', [])
+    collectors.append(stats)
+    try:
+        yield stats
+    finally:
+        collectors.remove(stats)
+
+
+def record(sql_string, sql_tuple, elapsed, rows):
+    """Record a call to a statement."""
+    stats = _stats
+    if stats is None:
+        return
+    key = normalize(sql_string)
+    stats.add(key, elapsed, rows)
+    for collector in getattr(_local, 'collectors', ()):
+        collector.add(key, elapsed, rows)
+    if _slow_query_time is not None and elapsed >= _slow_query_time:
+        log.warning("Slow query took %.3f seconds, and returned %d rows: %s; %s",
+                    elapsed, rows, _SPACE_RE.sub(' ', sql_string).strip(), sql_tuple)
+
+
+def wrap(connection):
+    """If profiling is on, wrap a connection, so that what runs through it gets profiled.
+    Otherwise, return the connection unchanged."""
+    if _stats is None:
+        return connection
+    return ProfiledConnection(connection)
+
+
+class ProfiledConnection:
+    """Wraps an instance of weedb.Connection, and times the statements run through it, or
+    through its cursors. Everything else is passed on to the wrapped connection."""
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def cursor(self):
+        return ProfiledCursor(self._connection.cursor())
+
+    def stream_cursor(self):
+        return ProfiledCursor(self._connection.stream_cursor())
+
+    def execute(self, sql_string, sql_tuple=()):
+        t0 = time.perf_counter()
+        try:
+            return self._connection.execute(sql_string, sql_tuple)
+        finally:
+            record(sql_string, sql_tuple, time.perf_counter() - t0, 0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, etyp, einst, etb):
+        return self._connection.__exit__(etyp, einst, etb)
+
+
+class ProfiledCursor:
+    """Wraps a weedb cursor. A call lasts from execute() until all its rows have been fetched,
+    the cursor is used for another statement, or the cursor is closed. Only the time spent in the
+    cursor counts."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        # The call in progress: [sql_string, sql_tuple, elapsed, rows]
+        self._call = None
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def _done(self):
+        if self._call is not None:
+            record(*self._call)
+            self._call = None
+
+    def _fetched(self, t0, rows, finished):
+        if self._call is not None:
+            self._call[2] += time.perf_counter() - t0
+            self._call[3] += rows
+            if finished:
+                self._done()
+
+    def execute(self, sql_string, sql_tuple=()):
+        self._done()
+        self._call = [sql_string, sql_tuple, 0.0, 0]
+        t0 = time.perf_counter()
+        try:
+            self._cursor.execute(sql_string, sql_tuple)
+        except Exception:
+            self._fetched(t0, 0, True)
+            raise
+        self._fetched(t0, 0, False)
+        return self
+
+    def fetchone(self):
+        t0 = time.perf_counter()
+        row = self._cursor.fetchone()
+        self._fetched(t0, 0 if row is None else 1, row is None)
+        return row
+
+    def fetchmany(self, size=1):
+        t0 = time.perf_counter()
+        rows = self._cursor.fetchmany(size)
+        self._fetched(t0, len(rows), len(rows) < size)
+        return rows
+
+    def fetchall(self):
+        t0 = time.perf_counter()
+        rows = self._cursor.fetchall()
+        self._fetched(t0, len(rows), True)
+        return rows
+
+    def __iter__(self):
+        while True:
+            row = self.fetchone()
+            if row is None:
+                return
+            yield row
+
+    def close(self):
+        self._done()
+        self._cursor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, etyp, einst, etb):
+        self._done()
+        return self._cursor.__exit__(etyp, einst, etb)
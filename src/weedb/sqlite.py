@@ -124,6 +124,8 @@ class Connection(weedb.Connection):
               Optional. Default is 5.
             isolation_level(str): The type of isolation level to use. One of None,
               DEFERRED, IMMEDIATE, or EXCLUSIVE. Default is None (autocommit mode).
+            check_same_thread(bool): False to allow the connection to be used by threads other
+              than the one that opened it, one at a time. Default is True.
 
         Raises:
             NoDatabaseError: If the database file does not exist.
@@ -135,8 +137,10 @@ class Connection(weedb.Connection):
                                         % self.file_path)
         timeout = to_int(argv.get('timeout', 5))
         isolation_level = argv.get('isolation_level')
+        check_same_thread = to_bool(argv.get('check_same_thread', True))
         connection = sqlite3.connect(self.file_path, timeout=timeout,
-                                     isolation_level=isolation_level)
+                                     isolation_level=isolation_level,
+                                     check_same_thread=check_same_thread)
 
         if pragmas:
             for pragma in pragmas:
@@ -201,6 +205,11 @@ class Connection(weedb.Connection):
         finally:
             cursor.close()
 
+    @guard
+    def schema_version(self):
+        """Return the sqlite schema cookie, which changes every time the schema changes."""
+        return self.connection.execute("PRAGMA schema_version;").fetchone()[0]
+
     @property
     def has_math(self):
         global has_math
@@ -0,0 +1,199 @@
+#
+#    Copyright (c) 2026 Tom Keffer <tkeffer@gmail.com>
+#
+#    See the file LICENSE.txt for your full rights.
+#
+"""Test the column store."""
+
+import math
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+import weedb.colstore
+from weedb.colstore import ColumnStore, DamagedMonthError
+
+# 1-May-2024 00:00 UTC
+start_ts = 1714521600
+keys = ['dateTime', 'usUnits', 'outTemp']
+
+
+def gen_rows(start, n, interval=300):
+    """Generate n rows, starting one interval after start"""
+    for i in range(1, n + 1):
+        ts = start + i * interval
+        yield ts, 1, None if i % 10 == 0 else 60.0 + i / 100.0
+
+
+class TestColumnStore:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.store = ColumnStore(str(tmp_path / 'archive'))
+
+    def test_months(self):
+        assert weedb.colstore.month_of(start_ts) == '2024-05'
+        assert weedb.colstore.month_of(start_ts - 1) == '2024-04'
+        assert weedb.colstore.month_span('2024-12') == (1733011200, 1735689600)
+        assert list(weedb.colstore.gen_months(start_ts - 1, start_ts + 31 * 86400)) \
+               == ['2024-04', '2024-05', '2024-06']
+
+    def test_write_read(self):
+        rows = list(gen_rows(start_ts, 100))
+        self.store.write_month('2024-05', keys, rows)
+        assert self.store.months() == ['2024-05']
+        assert self.store.info('2024-05') == (100, rows[-1][0], set(keys))
+
+        columns = list(self.store.read(['dateTime', 'outTemp']))
+        assert len(columns) == 1
+        assert columns[0]['dateTime'].typecode == 'q'
+        assert columns[0]['dateTime'].tolist() == [row[0] for row in rows]
+        assert columns[0]['outTemp'][0] == rows[0][2]
+        # NULLs are held as NaN
+        assert math.isnan(columns[0]['outTemp'][9])
+
+        # Bounds are exclusive on the left, inclusive on the right, unless asked otherwise
+        columns = next(self.store.read(['dateTime'], rows[10][0], rows[20][0]))
+        assert columns['dateTime'].tolist() == [row[0] for row in rows[11:21]]
+        columns = next(self.store.read(['dateTime'], rows[10][0], rows[20][0],
+                                       include_start=True))
+        assert columns['dateTime'].tolist() == [row[0] for row in rows[10:21]]
+
+    def test_append(self):
+        rows = list(gen_rows(start_ts, 200))
+        self.store.write_month('2024-05', keys, rows[:50])
+        # Append one at a time, enough to trigger compaction
+        for row in rows[50:]:
+            self.store.append('2024-05', keys, [row])
+        assert self.store.info('2024-05')[:2] == (200, rows[-1][0])
+        columns = next(self.store.read(keys))
+        assert columns['dateTime'].tolist() == [row[0] for row in rows]
+
+        # A fresh instance should see the same thing on disk
+        store = ColumnStore(self.store.root)
+        assert store.info('2024-05') == (200, rows[-1][0], set(keys))
+
+    def test_types(self):
+        """Integers with NULLs should stay integers, and values that are not numbers should be
+        kept as they are"""
+        rows = [(start_ts + 300, 1, None, 'abc', 2 ** 70),
+                (start_ts + 600, 1, 5, None, 1),
+                (start_ts + 900, 1, 6, 'def', 2)]
+        type_keys = ['dateTime', 'usUnits', 'strikes', 'station', 'big']
+        self.store.write_month('2024-05', type_keys, rows[:2])
+        self.store.append('2024-05', type_keys, rows[2:])
+        columns = next(self.store.read(type_keys))
+        assert columns['strikes'] == [None, 5, 6]
+        assert all(type(v) is int for v in columns['strikes'][1:])
+        assert columns['station'] == ['abc', None, 'def']
+        assert columns['big'] == [2 ** 70, 1, 2]
+        assert self.store.read_rows('2024-05', type_keys) == rows
+        # Anything else cannot be stored
+        with pytest.raises(TypeError):
+            self.store.append('2024-05', type_keys, [(start_ts + 1200, 1, 7, b'xyz', 3)])
+
+    def test_mixed_blocks(self):
+        """Blocks of different kinds in one file should be read as one column"""
+        self.store.write_month('2024-05', keys, [(start_ts + 300, 1, 1)])
+        self.store.append('2024-05', keys, [(start_ts + 600, 1, 2.5)])
+        column = next(self.store.read(['outTemp']))['outTemp']
+        assert column.typecode == 'd' and column.tolist() == [1.0, 2.5]
+        self.store.append('2024-05', keys, [(start_ts + 900, 1, None)])
+        assert self.store.info('2024-05')[0] == 3
+        assert next(self.store.read(['outTemp']))['outTemp'] == [1.0, 2.5, None]
+
+    def test_change_columns(self):
+        """Columns can be added, renamed, and dropped, and other instances should see it"""
+        self.store.write_month('2024-05', keys, list(gen_rows(start_ts, 10)))
+        self.store.write_month('2024-06', keys, list(gen_rows(start_ts + 31 * 86400, 10)))
+        other = ColumnStore(self.store.root)
+        assert other.info('2024-05')[2] == set(keys)
+        self.store.add_column('barometer')
+        assert other.info('2024-05')[2] == set(keys + ['barometer'])
+        assert next(other.read(['barometer']))['barometer'] == [None] * 10
+        self.store.rename_column('outTemp', 'extraTemp1')
+        columns = next(other.read(['extraTemp1']))
+        assert columns['extraTemp1'][0] == 60.01
+        self.store.drop_column('barometer')
+        assert other.info('2024-06')[2] == {'dateTime', 'usUnits', 'extraTemp1'}
+
+    def test_offloaded(self):
+        assert self.store.offloaded_until() == 0
+        os.makedirs(self.store.root)
+        self.store.set_offloaded_until(start_ts)
+        assert ColumnStore(self.store.root).offloaded_until() == start_ts
+
+    def test_missing_column(self):
+        self.store.write_month('2024-05', keys, list(gen_rows(start_ts, 10)))
+        with pytest.raises(KeyError):
+            list(self.store.read(['dateTime', 'barometer']))
+
+    def test_damaged(self):
+        self.store.write_month('2024-05', keys, list(gen_rows(start_ts, 10)))
+        # Simulate a crash partway through an append
+        with open(os.path.join(self.store.root, '2024-05', 'outTemp.col'), 'ab') as fd:
+            fd.write(weedb.colstore._encode_block([1.0]))
+        store = ColumnStore(self.store.root)
+        with pytest.raises(DamagedMonthError):
+            store.info('2024-05')
+
+    def test_remove(self):
+        self.store.write_month('2024-05', keys, list(gen_rows(start_ts, 10)))
+        self.store.remove_month('2024-05')
+        assert self.store.months() == []
+        assert self.store.info('2024-05') is None
+
+    def test_read_releases_lock(self):
+        """A generator that is not finished should not keep writers out"""
+        self.store.write_month('2024-05', keys, list(gen_rows(start_ts, 10)))
+        self.store.write_month('2024-06', keys, list(gen_rows(start_ts + 31 * 86400, 10)))
+        gen = self.store.read(['dateTime'])
+        next(gen)
+        acquired = []
+
+        def write():
+            if self.store.lock._rlock.acquire(timeout=5):
+                self.store.lock._rlock.release()
+                acquired.append(True)
+
+        t = threading.Thread(target=write)
+        t.start()
+        t.join()
+        assert acquired == [True]
+        assert len(list(gen)) == 1
+
+    def test_other_writer(self):
+        """Changes made through another instance, such as one in another process, should be
+        seen"""
+        rows = list(gen_rows(start_ts, 20))
+        self.store.write_month('2024-05', keys, rows[:10])
+        assert self.store.info('2024-05')[:2] == (10, rows[9][0])
+        other = ColumnStore(self.store.root)
+        other.append('2024-05', keys, rows[10:])
+        assert self.store.info('2024-05')[:2] == (20, rows[-1][0])
+        other.write_month('2024-05', keys, rows[:5])
+        assert self.store.info('2024-05')[:2] == (5, rows[4][0])
+
+    @pytest.mark.skipif(weedb.colstore.fcntl is None, reason="Needs fcntl")
+    def test_process_lock(self):
+        """Another process holding the lock should keep us out"""
+        os.makedirs(self.store.root)
+        code = ("import sys, time, weedb.colstore\n"
+                "with weedb.colstore.StoreLock(sys.argv[1]):\n"
+                "    print('locked', flush=True)\n"
+                "    time.sleep(0.5)\n")
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        child = subprocess.Popen([sys.executable, '-c', code, self.store.root],
+                                 stdout=subprocess.PIPE, env=env)
+        try:
+            assert child.stdout.readline() == b'locked\n'
+            t0 = time.time()
+            with self.store.lock:
+                assert time.time() - t0 > 0.2
+        finally:
+            child.wait(10)
+            child.stdout.close()
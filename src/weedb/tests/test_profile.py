@@ -0,0 +1,109 @@
+#
+#    Copyright (c) 2026 Tom Keffer <tkeffer@gmail.com>
+#
+#    See the file LICENSE.txt for your full rights.
+#
+"""Test the profiling of SQL statements."""
+
+import logging
+
+import pytest
+
+import weedb
+import weedb.profile
+
+db_dict = {'database_name': ':memory:', 'driver': 'weedb.sqlite'}
+
+
+@pytest.fixture
+def profile():
+    weedb.profile.enable()
+    yield weedb.profile
+    weedb.profile.disable()
+
+
+@pytest.fixture
+def connection(profile):
+    with weedb.connect(db_dict) as connect:
+        connect.execute("CREATE TABLE test1 (dateTime INTEGER NOT NULL PRIMARY KEY, x REAL);")
+        for ts in range(10):
+            connect.execute("INSERT INTO test1 (dateTime, x) VALUES (%d, %f);" % (ts, ts * 1.5))
+        yield connect
+
+
+def stats_of(stats):
+    return {s['sql']: (s['count'], s['rows']) for s in stats.snapshot()}
+
+
+def test_normalize():
+    assert weedb.profile.normalize("SELECT  x FROM test1\n WHERE dateTime > 1700000000 "
+                                   "AND descript = 'it''s' AND y < -2.5e3;") \
+           == "SELECT x FROM test1 WHERE dateTime > ? AND descript = ? AND y < -?"
+    assert weedb.profile.normalize("SELECT * FROM archive_day_rain24 WHERE dateTime IN (?,?, ?)") \
+           == "SELECT * FROM archive_day_rain24 WHERE dateTime IN (?, ...)"
+    assert weedb.profile.normalize("SELECT * FROM archive WHERE dateTime=%s") \
+           == "SELECT * FROM archive WHERE dateTime=?"
+
+
+def test_disabled():
+    with weedb.connect(db_dict) as connect:
+        assert isinstance(connect, weedb.Connection)
+    assert weedb.profile.get_stats() is None
+
+
+def test_profile(connection):
+    # Every way of fetching rows
+    with connection.cursor() as cursor:
+        for ts in range(3):
+            cursor.execute("SELECT x FROM test1 WHERE dateTime >= ?", (ts,))
+            assert len(cursor.fetchall()) == 10 - ts
+        cursor.execute("SELECT dateTime FROM test1 WHERE dateTime < 5")
+        assert len(list(cursor)) == 5
+        cursor.execute("SELECT dateTime FROM test1 WHERE dateTime < 7")
+        assert len(cursor.fetchmany(4)) == 4
+        assert len(cursor.fetchmany(4)) == 3
+        cursor.execute("SELECT MAX(x) FROM test1")
+        assert cursor.fetchone() == (13.5,)
+    # A statement that fails still counts
+    with pytest.raises(weedb.OperationalError):
+        with weedb.Transaction(connection) as cursor:
+            cursor.execute("SELECT y FROM test1")
+
+    stats = stats_of(weedb.profile.get_stats())
+    assert stats["INSERT INTO test1 (dateTime, x) VALUES (?, ...)"] == (10, 0)
+    assert stats["SELECT x FROM test1 WHERE dateTime >= ?"] == (3, 27)
+    assert stats["SELECT dateTime FROM test1 WHERE dateTime < ?"] == (2, 12)
+    assert stats["SELECT MAX(x) FROM test1"] == (1, 1)
+    assert stats["SELECT y FROM test1"] == (1, 0)
+    calls, total, rows = weedb.profile.get_stats().totals()
+    assert (calls, rows) == (18, 40)
+    assert total > 0
+
+
+def test_collect(connection):
+    with weedb.profile.collect() as outer:
+        connection.execute("DELETE FROM test1 WHERE dateTime = 1")
+        with weedb.profile.collect() as inner:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT COUNT(*) FROM test1").fetchone()
+    connection.execute("DELETE FROM test1 WHERE dateTime = 2")
+    assert stats_of(inner) == {"SELECT COUNT(*) FROM test1": (1, 1)}
+    assert stats_of(outer) == {"DELETE FROM test1 WHERE dateTime = ?": (1, 0),
+                               "SELECT COUNT(*) FROM test1": (1, 1)}
+    assert stats_of(weedb.profile.get_stats())["DELETE FROM test1 WHERE dateTime = ?"] == (2, 0)
+
+    total = weedb.profile.Stats()
+    total.merge(inner)
+    total.merge(outer)
+    assert stats_of(total)["SELECT COUNT(*) FROM test1"] == (2, 2)
+    lines = total.format(limit=1, width=20)
+    assert len(lines) == 2
+    assert lines[1].endswith("...")
+
+
+def test_slow_query(connection, caplog):
+    weedb.profile.enable(slow_query_time=1.0e-9)
+    with caplog.at_level(logging.WARNING, logger='weedb.profile'):
+        connection.execute("DELETE FROM test1 WHERE dateTime = ?", (3,))
+    assert "Slow query" in caplog.text
+    assert "DELETE FROM test1 WHERE dateTime = ?; (3,)" in caplog.text
@@ -100,6 +100,21 @@ class Common:
                 with pytest.raises(weedb.IntegrityError):
                     _cursor.execute("INSERT INTO test1 (dateTime, min, mintime) VALUES (0, 10, 0)")
 
+    def test_schema_version(self):
+        self.populate_db()
+        with weedb.connect(self.db_dict) as _connect:
+            version = _connect.schema_version()
+            assert version is not None
+            _connect.execute("INSERT INTO test2 (dateTime, min) VALUES (1, 2.0)")
+            assert _connect.schema_version() == version
+        with weedb.connect(self.db_dict) as _connect:
+            assert _connect.schema_version() == version
+            _connect.execute("ALTER TABLE test2 ADD COLUMN extra REAL")
+            assert _connect.schema_version() != version
+            version = _connect.schema_version()
+            _connect.execute("DROP TABLE test1")
+            assert _connect.schema_version() != version
+
     def test_bad_table(self):
         self.populate_db()
         with weedb.connect(self.db_dict) as _connect:
@@ -136,6 +151,20 @@ class Common:
                 assert _row is not None
                 assert _row[0] is None
 
+    def test_stream(self):
+        self.populate_db()
+        with weedb.connect(self.db_dict) as _connect:
+            with _connect.stream_cursor() as _cursor:
+                _cursor.execute("SELECT dateTime, min FROM test1 ORDER BY dateTime")
+                _rows = _cursor.fetchmany(15)
+                assert [_row[0] for _row in _rows] == list(range(15))
+                # The connection can still be used while the result set is being read
+                _row = _connect.cursor().execute("SELECT MAX(min) FROM test1").fetchone()
+                assert _row[0] == 190
+                _rows = _cursor.fetchmany(15)
+                assert [_row[0] for _row in _rows] == list(range(15, 20))
+                assert _cursor.fetchmany(15) == []
+
     def test_bad_select(self):
         self.populate_db()
         with weedb.connect(self.db_dict) as _connect:
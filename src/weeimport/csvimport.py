@@ -231,41 +231,42 @@ class CSVSource(weeimport.Source):
         if os.path.isfile(self.source):
             # It exists.  The source file may use some encoding, if we can't
             # decode it raise a WeeImportDecodeError.
-            try:
-                with io.open(self.source, mode='r', encoding=self.source_encoding) as f:
-                    _raw_data = f.readlines()
-            except UnicodeDecodeError as e:
-                # not a utf-8 based encoding, so raise a WeeImportDecodeError
-                raise weeimport.WeeImportDecodeError(e)
+            self.check_decode(self.source)
         else:
             # if it doesn't we can't go on so raise it
             raise weeimport.WeeImportIOError("CSV source file '%s' could " \
                                              "not be found." % self.source)
 
-        # just in case the data has been sourced from the web we will remove
-        # any HTML tags and blank lines that may exist
-        _clean_data = []
-        for _row in _raw_data:
-            # check for and remove any null bytes
-            clean_row = _row
-            if "\x00" in _row:
-                clean_row = clean_row.replace("\x00", "")
-                _msg = "One or more null bytes found in and removed " \
-                       "from file '%s'" % self.source
-                print(_msg)
-                log.info(_msg)
-            # get rid of any HTML tags
-            _line = ''.join(CSVSource._tags.split(clean_row))
-            if _line != "\n":
-                # save anything that is not a blank line
-                _clean_data.append(_line)
-
-        # create a dictionary CSV reader, using the first line as the set of keys
-        _csv_reader = csv.DictReader(_clean_data, delimiter=self.delimiter)
+        # create a dictionary CSV reader, using the first line as the set of
+        # keys. The file is read a line at a time as the reader is iterated.
+        _csv_reader = csv.DictReader(self.gen_clean_lines(), delimiter=self.delimiter)
 
         # return our CSV dict reader
         return _csv_reader
 
+    def gen_clean_lines(self):
+        """Generator yielding the lines of the source file.
+
+        Just in case the data has been sourced from the web we will remove any
+        HTML tags and blank lines that may exist.
+        """
+
+        with io.open(self.source, mode='r', encoding=self.source_encoding) as f:
+            for _row in f:
+                # check for and remove any null bytes
+                clean_row = _row
+                if "\x00" in _row:
+                    clean_row = clean_row.replace("\x00", "")
+                    _msg = "One or more null bytes found in and removed " \
+                           "from file '%s'" % self.source
+                    print(_msg)
+                    log.info(_msg)
+                # get rid of any HTML tags
+                _line = ''.join(CSVSource._tags.split(clean_row))
+                if _line != "\n":
+                    # pass on anything that is not a blank line
+                    yield _line
+
     @staticmethod
     def period_generator():
         """Generator function to control CSV import processing loop.
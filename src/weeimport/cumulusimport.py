@@ -278,40 +278,12 @@ class CumulusSource(weeimport.Source):
         if os.path.isfile(period):
             # It exists.  The source file may use some encoding, if we can't
             # decode it raise a WeeImportDecodeError.
-            try:
-                with io.open(period, mode='r', encoding=self.source_encoding) as f:
-                    _raw_data = f.readlines()
-            except UnicodeDecodeError as e:
-                # not a utf-8 based encoding, so raise a WeeImportDecodeError
-                raise weeimport.WeeImportDecodeError(e)
+            self.check_decode(period)
         else:
             # If it doesn't we can't go on so raise it
             raise weeimport.WeeImportIOError(
                 "Cumulus monthly log file '%s' could not be found." % period)
 
-        # Our raw data needs a bit of cleaning up before we can parse/map it.
-        _clean_data = []
-        for _row in _raw_data:
-            # check for and remove any null bytes
-            clean_row = _row
-            if "\x00" in _row:
-                clean_row = clean_row.replace("\x00", "")
-                _msg = "One or more null bytes found in and removed " \
-                       "from monthly log file '%s'" % (period, )
-                print(_msg)
-                log.info(_msg)
-            # make sure we have full stops as decimal points
-            _line = clean_row.replace(self.decimal_sep, '.')
-            # ignore any blank lines
-            if _line != "\n":
-                # Cumulus has separate date and time fields as the first 2
-                # fields of a row. It is easier to combine them now into a
-                # single date-time field that we can parse later when we map the
-                # raw data.
-                _datetime_line = _line.replace(self.delimiter, ' ', 1)
-                # Save what's left
-                _clean_data.append(_datetime_line)
-
         # if we haven't confirmed our source for the WeeWX rain field we need
         # to do so now
         if self.rain_source_confirmed is None:
@@ -320,18 +292,52 @@ class CumulusSource(weeimport.Source):
             # which field to use by looking at the mapped Cumulus data. If we
             # look at our DictReader we have no way to reset it, so we create
             # a one off DictReader to use instead.
-            _rain_reader = csv.DictReader(_clean_data, fieldnames=self._field_list,
+            _rain_reader = csv.DictReader(self.gen_clean_lines(period),
+                                          fieldnames=self._field_list,
                                           delimiter=self.delimiter)
             # now that we know what Cumulus fields are available we can set our
             # rain source appropriately
             self.set_rain_source(_rain_reader)
 
-        # Now create a dictionary CSV reader
-        _reader = csv.DictReader(_clean_data, fieldnames=self._field_list,
+        # Now create a dictionary CSV reader. The log file is read a line at a
+        # time as the reader is iterated.
+        _reader = csv.DictReader(self.gen_clean_lines(period), fieldnames=self._field_list,
                                  delimiter=self.delimiter)
         # Return our dict reader
         return _reader
 
+    def gen_clean_lines(self, period):
+        """Generator yielding the cleaned up lines of a Cumulus monthly log.
+
+        Input parameters:
+
+            period: the file name, including path, of the Cumulus monthly log
+                    file from which raw obs data will be read.
+        """
+
+        # Our raw data needs a bit of cleaning up before we can parse/map it.
+        with io.open(period, mode='r', encoding=self.source_encoding) as f:
+            for _row in f:
+                # check for and remove any null bytes
+                clean_row = _row
+                if "\x00" in _row:
+                    clean_row = clean_row.replace("\x00", "")
+                    _msg = "One or more null bytes found in and removed " \
+                           "from monthly log file '%s'" % (period, )
+                    print(_msg)
+                    log.info(_msg)
+                # make sure we have full stops as decimal points
+                _line = clean_row.replace(self.decimal_sep, '.')
+                # ignore any blank lines
+                if _line != "\n":
+                    # Cumulus has separate date and time fields as the first 2
+                    # fields of a row. It is easier to combine them now into a
+                    # single date-time field that we can parse later when we
+                    # map the raw data.
+                    _datetime_line = _line.replace(self.delimiter, ' ', 1)
+                    # pass on what's left
+                    yield _datetime_line
+
     def period_generator(self):
         """Generator function yielding a sequence of monthly log file names.
 
@@ -0,0 +1,232 @@
+#
+#    Copyright (c) 2009-2026 Tom Keffer <tkeffer@gmail.com> and Gary Roderick
+#
+#    See the file LICENSE.txt for your full rights.
+#
+"""Test mapping and saving imported records, using a CSV import."""
+import os
+
+import configobj
+import pytest
+
+import weeimport.csvimport
+import weeimport.weeimport
+import weewx.manager
+
+# Timestamp of the first record. Records are five minutes apart.
+START_TS = 1700000100
+
+
+def make_config_dict(root):
+    """Return a WeeWX config dict using a sqlite database in directory root."""
+    return configobj.ConfigObj({
+        'WEEWX_ROOT': root,
+        'StdConvert': {'target_unit': 'METRICWX'},
+        'StdArchive': {'archive_interval': '300', 'data_binding': 'wx_binding'},
+        'DataBindings': {
+            'wx_binding': {
+                'database': 'archive_sqlite',
+                'table_name': 'archive',
+                'manager': 'weewx.manager.DaySummaryManager',
+                'schema': 'schemas.wview_small.schema',
+            },
+        },
+        'Databases': {
+            'archive_sqlite': {'database_name': 'weewx.sdb', 'database_type': 'SQLite'},
+        },
+        'DatabaseTypes': {
+            'SQLite': {'driver': 'weedb.sqlite', 'SQLITE_ROOT': root},
+        },
+    })
+
+
+def write_csv(path, rows):
+    """Write rows of (timestamp, temperature, cumulative rain) to a CSV file."""
+    with open(path, 'w') as f:
+        f.write("ts,temp,rain\n")
+        for row in rows:
+            f.write("%s,%s,%s\n" % row)
+
+
+@pytest.fixture
+def make_source(tmp_path):
+    """Return a function that creates a CSVSource for a file of rows."""
+
+    def _make_source(rows, dry_run=False, no_prompt=True, **options):
+        path = os.path.join(str(tmp_path), 'data.csv')
+        write_csv(path, rows)
+        csv_config_dict = configobj.ConfigObj({
+            'file': path,
+            'interval': 'derive',
+            'qc': 'False',
+            'calc_missing': 'False',
+            'FieldMap': {
+                'dateTime': {'source_field': 'ts', 'unit': 'unix_epoch'},
+                'outTemp': {'source_field': 'temp', 'unit': 'degree_C'},
+                'rain': {'source_field': 'rain', 'unit': 'mm', 'is_cumulative': 'True'},
+            },
+        })
+        csv_config_dict.update(options)
+        return weeimport.csvimport.CSVSource(None,
+                                             make_config_dict(str(tmp_path)),
+                                             'import.conf',
+                                             csv_config_dict,
+                                             dry_run=dry_run,
+                                             update=False,
+                                             verbose=False,
+                                             no_prompt=no_prompt,
+                                             suppress_warning=True,
+                                             date=None,
+                                             from_datetime=None,
+                                             to_datetime=None)
+
+    return _make_source
+
+
+def regular_rows(n, step=300):
+    """Return n rows, step seconds apart, with rain accumulating 0.2 mm per row."""
+    return [(START_TS + i * step, 10.0 + i, round(5.0 + 0.2 * i, 1)) for i in range(n)]
+
+
+def archived_records(source):
+    with weewx.manager.open_manager_with_config(source.config_dict, 'wx_binding') as dbm:
+        return list(dbm.genBatchRecords())
+
+
+class TestGenMappedRecords:
+
+    def test_first_interval(self, make_source):
+        """The first record takes its derived interval from the second."""
+        source = make_source(regular_rows(3))
+        records = list(source.gen_mapped_records(source.get_raw_data(1), weewx.METRICWX))
+        assert [rec['dateTime'] for rec in records] == [START_TS, START_TS + 300,
+                                                        START_TS + 600]
+        assert [rec['interval'] for rec in records] == [5, 5, 5]
+        # the first cumulative value has nothing to be compared with
+        assert [rec['rain'] for rec in records] == pytest.approx([0.0, 0.2, 0.2])
+
+    def test_single_record(self, make_source):
+        """A period with only one record still yields it."""
+        source = make_source(regular_rows(1))
+        records = list(source.gen_mapped_records(source.get_raw_data(1), weewx.METRICWX))
+        assert len(records) == 1
+        assert records[0]['dateTime'] == START_TS
+        assert records[0]['interval'] is None
+        assert records[0]['outTemp'] == 10.0
+
+    def test_interval_prompt(self, make_source, monkeypatch):
+        """The user is asked once, at the first differing interval."""
+        rows = regular_rows(3) + [(START_TS + 1200, 20.0, 6.0), (START_TS + 1500, 21.0, 6.2)]
+        source = make_source(rows, no_prompt=False)
+        answers = []
+
+        def _input(prompt):
+            answers.append(prompt)
+            return 'y'
+
+        monkeypatch.setattr('builtins.input', _input)
+        records = source.gen_mapped_records(source.get_raw_data(1), weewx.METRICWX)
+        # nothing is asked while the records have the same interval
+        for _ in range(3):
+            next(records)
+        assert answers == []
+        rec = next(records)
+        assert rec['interval'] == 10
+        assert len(answers) == 1
+        # the rest of the records are mapped without asking again
+        assert len(list(records)) == 1
+        assert len(answers) == 1
+
+    def test_interval_prompt_declined(self, make_source, monkeypatch):
+        rows = regular_rows(3) + [(START_TS + 1200, 20.0, 6.0)]
+        source = make_source(rows, no_prompt=False)
+        monkeypatch.setattr('builtins.input', lambda _: 'n')
+        with pytest.raises(SystemExit):
+            list(source.gen_mapped_records(source.get_raw_data(1), weewx.METRICWX))
+
+    def test_check(self, make_source):
+        """Checking the records leaves the state used for mapping alone."""
+        source = make_source(regular_rows(3))
+        assert source.check_raw_data(source.get_raw_data(1)) == 3
+        assert source.last_values == {}
+        assert source.earliest_ts is None
+        assert source.latest_ts is None
+
+    def test_check_error(self, make_source):
+        rows = regular_rows(3) + [('not a time', 20.0, 6.0)]
+        source = make_source(rows)
+        with pytest.raises(ValueError):
+            source.check_raw_data(source.get_raw_data(1))
+
+
+class TestTimestampSet:
+
+    def test_add(self):
+        ts_set = weeimport.weeimport.TimestampSet()
+        assert len(ts_set) == 0
+        assert START_TS not in ts_set
+        ts_set.add(START_TS)
+        ts_set.add(START_TS + 1)
+        ts_set.add(START_TS)
+        assert len(ts_set) == 2
+        assert START_TS in ts_set
+        assert START_TS + 1 in ts_set
+        assert START_TS - 1 not in ts_set
+
+    def test_days(self):
+        ts_set = weeimport.weeimport.TimestampSet()
+        # the last second of one day and the first second of the next
+        day_ts = (START_TS // 86400 + 1) * 86400
+        for ts in (day_ts - 1, day_ts, day_ts + 86400 * 10, 1700000100.7):
+            ts_set.add(ts)
+        assert len(ts_set) == 4
+        assert len(ts_set.days) == 3
+        assert day_ts - 1 in ts_set
+        assert day_ts in ts_set
+        assert day_ts + 86400 * 10 in ts_set
+        assert 1700000100 in ts_set
+        assert day_ts + 86400 not in ts_set
+
+
+class TestRun:
+
+    def test_dry_run(self, make_source):
+        source = make_source(regular_rows(10), dry_run=True, tranche='3')
+        source.run()
+        assert source.total_rec_proc == 10
+        assert source.total_unique_rec == 10
+        assert archived_records(source) == []
+
+    def test_run(self, make_source, monkeypatch):
+        """A real run saves what a dry run reports, and reads the file once."""
+        dry_source = make_source(regular_rows(10), dry_run=True, tranche='3')
+        dry_source.run()
+
+        decoded = []
+        check_decode = weeimport.weeimport.check_decode
+
+        def _check_decode(path, encoding):
+            decoded.append(path)
+            check_decode(path, encoding)
+
+        monkeypatch.setattr(weeimport.weeimport, 'check_decode', _check_decode)
+        source = make_source(regular_rows(10), tranche='3')
+        source.run()
+        assert len(decoded) == 1
+        assert source.total_rec_proc == dry_source.total_rec_proc
+        assert source.total_unique_rec == dry_source.total_unique_rec
+        records = archived_records(source)
+        assert [rec['dateTime'] for rec in records] == [row[0] for row in regular_rows(10)]
+        assert [rec['outTemp'] for rec in records] == [row[1] for row in regular_rows(10)]
+        # checking the period first must not upset the cumulative values
+        assert [rec['rain'] for rec in records] == pytest.approx([0.0] + [0.2] * 9)
+        assert source.earliest_ts == START_TS
+        assert source.latest_ts == START_TS + 9 * 300
+
+    def test_run_bad_data(self, make_source):
+        """A bad record stops the import before anything is saved."""
+        rows = regular_rows(10) + [('not a time', 20.0, 6.0)]
+        source = make_source(rows, tranche='3')
+        with pytest.raises(ValueError):
+            source.run()
+        assert archived_records(source) == []
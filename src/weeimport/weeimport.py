@@ -10,6 +10,8 @@ into WeeWX.
 
 # Python imports
 import datetime
+import io
+import itertools
 import logging
 import numbers
 import re
@@ -288,6 +290,8 @@ class Source:
         self.duplicates = set()
         # duplicates seen over the current period
         self.period_duplicates = set()
+        # source files that are known to decode, so each is checked once only
+        self.decoded_files = set()
 
     @staticmethod
     def source_factory(config_path, config_dict, import_config_path, **kwargs):
@@ -407,16 +411,34 @@ class Source:
                     print(_msg)
                 log.info(_msg)
 
-                # map the raw data to a WeeWX archive compatible dictionary
+                # fields the user has been warned about, so they are warned
+                # once only
+                _warned = []
+                # Records are mapped as they are saved, so the period never
+                # needs to be held in memory. Unless this is a dry run, first
+                # check the whole period without saving anything, so that bad
+                # source data, or the user declining to proceed with multiple
+                # interval values, stops the import before any of the period
+                # is saved.
+                if not self.dry_run:
+                    _msg = 'Checking raw import data for period %d ...' % self.period_no
+                    if self.verbose:
+                        print(_msg)
+                    log.info(_msg)
+                    self.check_raw_data(_raw_data, _warned)
+                    # the raw data may be an iterator, in which case it is
+                    # now exhausted, so get it again
+                    if iter(_raw_data) is _raw_data:
+                        _raw_data = self.get_raw_data(period)
+
+                # map the raw data to WeeWX archive compatible dictionaries.
                 _msg = 'Mapping raw import data for period %d ...' % self.period_no
                 if self.verbose:
                     print(_msg)
                 log.info(_msg)
-                _mapped_data = self.map_raw_data(_raw_data, self.archive_unit_sys)
-                _msg = 'Raw import data mapped successfully for period %d.' % self.period_no
-                if self.verbose:
-                    print(_msg)
-                log.info(_msg)
+                _mapped_data = self.gen_mapped_records(_raw_data,
+                                                       self.archive_unit_sys,
+                                                       _warned)
 
                 # save the mapped data to archive
                 # first advise the user and log, but only if it's not a dry run
@@ -713,17 +735,78 @@ class Source:
                       provided. Omission will result in US customary (weewx.US)
                       being used.
 
-        Returns a list of dicts of WeeWX compatible archive records.
+        Returns a list of dicts of WeeWX compatible archive records, or None if
+        there were no records.
+        """
+
+        _records = list(self.gen_mapped_records(data, unit_sys))
+        return _records if _records else None
+
+    def check_raw_data(self, data, warned=None):
+        """Check that raw data can be mapped, without keeping the result.
+
+        Every row is parsed as it would be by gen_mapped_records(), so any
+        error in the source data is raised, and the user is asked whether to
+        proceed if the records have more than one interval value. Cumulative
+        values are not processed and no units are converted, so the state used
+        when the records are mapped for saving is left untouched.
+
+        Input parameters:
+
+            data: iterable that yields the data records to be checked.
+
+            warned: list of the source fields the user has already been warned
+                    about. Omission will result in a new list being used.
+
+        Returns the number of records checked.
+        """
+
+        _nrecs = 0
+        for _rec in self.gen_mapped_records(data, warned=warned, check=True):
+            _nrecs += 1
+        return _nrecs
+
+    def gen_mapped_records(self, data, unit_sys=weewx.US, warned=None, check=False):
+        """Generator that maps raw data to WeeWX archive record compatible
+        dictionaries.
+
+        As map_raw_data(), except records are yielded one at a time as they
+        are mapped, so a period of raw data need never be held in memory. Only
+        the first record is held back; if interval is being derived, it is not
+        known until the second record has been seen.
+
+        Input parameters:
+
+            data: iterable that yields the data records to be processed.
+
+            unit_sys: WeeWX unit system in which the generated records will be
+                      provided. Omission will result in US customary (weewx.US)
+                      being used.
+
+            warned: list of the source fields the user has already been warned
+                    about. Omission will result in a new list being used.
+
+            check: if True, the records are only being checked. Cumulative
+                   fields are not processed, no units are converted, the
+                   earliest and latest timestamps are not updated and
+                   discarded records are not reported, as all of this is
+                   done when the records are mapped again to be saved.
+
+        Yields dicts of WeeWX compatible archive records.
         """
 
-        # initialise our list of mapped records
-        _records = []
+        # number of records mapped
+        _nrecs = 0
+        # the first record, held until we have its interval
+        _first_rec = None
+        # have we seen a record with a different interval to the first
+        _diff_interval = False
         # initialise some rain variables
         _last_ts = None
         _last_rain = None
         # list of fields we have given the user a warning over, prevents us
         # giving multiple warnings for the same field.
-        _warned = []
+        _warned = [] if warned is None else warned
         # step through each row in our data
         for _row in data:
             _rec = {}
@@ -769,10 +852,11 @@ class Source:
                     # save the dateTime
                     _rec['dateTime'] = _rec_dateTime
                     # update earliest and latest record timestamps
-                    if self.earliest_ts is None or _rec_dateTime < self.earliest_ts:
-                        self.earliest_ts = _rec_dateTime
-                    if self.latest_ts is None or _rec_dateTime > self.earliest_ts:
-                        self.latest_ts = _rec_dateTime
+                    if not check:
+                        if self.earliest_ts is None or _rec_dateTime < self.earliest_ts:
+                            self.earliest_ts = _rec_dateTime
+                        if self.latest_ts is None or _rec_dateTime > self.earliest_ts:
+                            self.latest_ts = _rec_dateTime
                 else:
                     # it is not so skip to the next record
                     continue
@@ -838,9 +922,10 @@ class Source:
                     # this record is out of date-time order. We cannot use this
                     # record so skip it, advise the user (via console and log)
                     # and move to the next record.
-                    _msg = "Record discarded: %s" % e
-                    print(_msg)
-                    log.info(_msg)
+                    if not check:
+                        _msg = "Record discarded: %s" % e
+                        print(_msg)
+                        log.info(_msg)
                     continue
             # now step through the rest of the fields in our map and process
             # the fields that don't require special processing
@@ -937,6 +1022,12 @@ class Source:
                                                                 timestamp_to_string(_rec['dateTime']))
                                     raise ValueError(_msg)
 
+                            # when checking, the value has been parsed and
+                            # that is all that is needed
+                            if check:
+                                _rec[_field] = _value
+                                continue
+
                             # some fields need some special processing
 
                             # data from cumulative fields needs special processing,
@@ -1027,85 +1118,101 @@ class Source:
                 # all we need do is set 'usUnits', any bulk conversion will be
                 # taken care of by saveToArchive()
                 _rec['usUnits'] = unit_sys
-            # If interval is being derived from record timestamps our first
-            # record will have an interval of None. In this case we wait until
-            # we have the second record, and then we use the interval between
-            # records 1 and 2 as the interval for record 1.
-            if len(_records) == 1 and _records[0]['interval'] is None:
-                _records[0]['interval'] = _rec['interval']
             _last_ts = _rec['dateTime']
-            # this record is done, add it to our list of records to return
-            _records.append(_rec)
-        # If we have more than 1 unique value for interval in our records it
-        # could be a sign of missing data and impact the integrity of our data,
-        # so do the check and see if the user wants to continue
-        if len(_records) > 0:
-            # if we have any records to return do the unique interval check
-            # before we return the records
-            _start_interval = _records[0]['interval']
-            _diff_interval = False
-            for _rec in _records:
-                if _rec['interval'] != _start_interval:
-                    _diff_interval = True
-                    break
-            if _diff_interval and self.interval_ans != 'y':
-                # we had more than one unique value for interval, warn the user
-                _msg = "Warning: Records to be imported contain multiple " \
-                       "different 'interval' values."
-                print(_msg)
-                log.info(_msg)
-                print("         This may mean the imported data is missing "
-                      "some records and it may lead")
-                print("         to data integrity issues. If the raw data has "
-                      "a known, fixed interval")
-                print("         value setting the relevant 'interval' setting "
-                      "in wee_import config to")
-                print("         this value may give a better result.")
-                while self.interval_ans not in ['y', 'n']:
-                    if self.no_prompt:
-                        self.interval_ans = 'y'
-                    else:
-                        self.interval_ans = input('Are you sure you want to proceed (y/n)? ')
-                if self.interval_ans == 'n':
-                    # the user chose to abort, but we may have already
-                    # processed some records. So log it then raise a SystemExit()
-                    if self.dry_run:
-                        print("Dry run import aborted by user. %d records were processed." % self.total_rec_proc)
+            _nrecs += 1
+            if _nrecs == 1:
+                # If interval is being derived from record timestamps our first
+                # record will have an interval of None. In this case we wait
+                # until we have the second record, and then we use the
+                # interval between records 1 and 2 as the interval for
+                # record 1.
+                _first_rec = _rec
+                continue
+            if _nrecs == 2:
+                if _first_rec['interval'] is None:
+                    _first_rec['interval'] = _rec['interval']
+                yield _first_rec
+            # If we have more than 1 unique value for interval in our records
+            # it could be a sign of missing data and impact the integrity of
+            # our data, so check and see if the user wants to continue. Only
+            # the first difference matters.
+            if _rec['interval'] != _first_rec['interval'] and not _diff_interval:
+                _diff_interval = True
+                self.confirm_intervals()
+            # this record is done, pass it on
+            yield _rec
+        if _nrecs == 1:
+            # there was only the one record, which we are still holding
+            yield _first_rec
+        # only log this, the console has a progress line that is still in use
+        log.info("Mapped %d records." % _nrecs)
+
+    def confirm_intervals(self):
+        """Warn the user that the records contain multiple different interval
+        values and confirm that they want to proceed.
+
+        Raises SystemExit if the user chooses not to proceed.
+        """
+
+        if self.interval_ans == 'y':
+            # the user has already agreed to proceed
+            return
+        # we had more than one unique value for interval, warn the user
+        _msg = "Warning: Records to be imported contain multiple " \
+               "different 'interval' values."
+        print(_msg)
+        log.info(_msg)
+        print("         This may mean the imported data is missing "
+              "some records and it may lead")
+        print("         to data integrity issues. If the raw data has "
+              "a known, fixed interval")
+        print("         value setting the relevant 'interval' setting "
+              "in wee_import config to")
+        print("         this value may give a better result.")
+        while self.interval_ans not in ['y', 'n']:
+            if self.no_prompt:
+                self.interval_ans = 'y'
+            else:
+                self.interval_ans = input('Are you sure you want to proceed (y/n)? ')
+        if self.interval_ans == 'n':
+            # the user chose to abort, but we may have already
+            # processed some records. So log it then raise a SystemExit()
+            if self.dry_run:
+                print("Dry run import aborted by user. %d records were processed." % self.total_rec_proc)
+            else:
+                if self.total_rec_proc > 0:
+                    if self.update:
+                        print("Some existing database records may have been updated "
+                              "with imported data.")
+                        print("As the import was aborted before completion refer to "
+                              "the weectl log file to")
+                        print("confirm which records were imported.")
                     else:
-                        if self.total_rec_proc > 0:
-                            if self.update:
-                                print("Some existing database records may have been updated "
-                                      "with imported data.")
-                                print("As the import was aborted before completion refer to "
-                                      "the weectl log file to")
-                                print("confirm which records were imported.")
-                            else:
-                                print("Those records with a timestamp already in the "
-                                      "archive will not have been")
-                                print("imported. As the import was aborted before completion "
-                                      "refer to the WeeWX log")
-                                print("file to confirm which records were imported.")
-                            raise SystemExit('Exiting.')
-                        else:
-                            print("Import aborted by user. No records saved to archive.")
-                        _msg = "User chose to abort import. %d records were processed. " \
-                               "Exiting." % self.total_rec_proc
-                        log.info(_msg)
-                    raise SystemExit('Exiting. Nothing done.')
-            _msg = "Mapped %d records." % len(_records)
-            if self.verbose:
-                print(_msg)
-            log.info(_msg)
-            # the user wants to continue, or we have only one unique value for
-            # interval so return the records
-            return _records
-        else:
-            _msg = "Mapped 0 records."
-            if self.verbose:
-                print(_msg)
-            log.info(_msg)
-            # we have no records to return so return None
-            return None
+                        print("Those records with a timestamp already in the "
+                              "archive will not have been")
+                        print("imported. As the import was aborted before completion "
+                              "refer to the WeeWX log")
+                        print("file to confirm which records were imported.")
+                    raise SystemExit('Exiting.')
+                else:
+                    print("Import aborted by user. No records saved to archive.")
+                _msg = "User chose to abort import. %d records were processed. " \
+                       "Exiting." % self.total_rec_proc
+                log.info(_msg)
+            raise SystemExit('Exiting. Nothing done.')
+
+    def check_decode(self, path):
+        """Check that a source file can be decoded, once only.
+
+        A period may be read twice, once to check it and once to save it, so
+        files that are known to decode are not read again.
+
+        Raises a WeeImportDecodeError if the file cannot be decoded.
+        """
+
+        if path not in self.decoded_files:
+            check_decode(path, self.source_encoding)
+            self.decoded_files.add(path)
 
     def get_interval(self, last_ts, current_ts):
         """Determine an interval value for a record.
@@ -1229,7 +1336,9 @@ class Source:
 
         Supports saving one or more records to archive. Each collection of
         records is processed and saved to archive in transactions of
-        self.tranche records at a time.
+        self.tranche records at a time. Records are taken from the iterable
+        one tranche at a time, so a generator can be used to avoid holding all
+        the records in memory.
 
         if the import config file qc option was set quality checks on the
         imported record are performed using the WeeWX StdQC configuration from
@@ -1250,12 +1359,16 @@ class Source:
                      (in dict form) to be written to archive
         """
 
-        # do we have any records?
-        if records and len(records) > 0:
+        # do we have any records? If we have been given a generator the only
+        # way to tell is to try and get the first record.
+        _records = iter(records or ())
+        _first_rec = next(_records, None)
+        if _first_rec is not None:
             # if this is the first period then give a little summary about what
-            # records we have
+            # records we have, but we can only count them if we have been
+            # given them all at once
             # TODO. Check that a single period shows correct and consistent console output
-            if self.first_period and self.last_period:
+            if self.first_period and self.last_period and hasattr(records, '__len__'):
                 # there is only 1 period, so we can count them
                 print("%s records identified for import." % len(records))
             # we do, confirm the user actually wants to save them
@@ -1273,9 +1386,9 @@ class Source:
                 _tranche = []
                 # initialise a set for use in our dry run, this lets us
                 # give some better stats on records imported
-                unique_set = set()
+                unique_set = TimestampSet()
                 # step through each record in this period
-                for _rec in records:
+                for _rec in itertools.chain((_first_rec,), _records):
                     # convert our record
                     _conv_rec = to_std_system(_rec, self.archive_unit_sys)
                     # perform any required QC checks
@@ -1286,41 +1399,16 @@ class Source:
                     # if we have a full tranche then save to archive and reset
                     # the tranche
                     if len(_tranche) >= self.tranche:
-                        # add the record only if it is not a dry run
-                        if not self.dry_run:
-                            # add the record only if it is not a dry run
-                            archive.addRecord(_tranche, update=self.update)
-                        # add our the dateTime for each record in our tranche
-                        # to the dry run set
-                        for _trec in _tranche:
-                            unique_set.add(_trec['dateTime'])
-                        # tell the user what we have done
-                        _msg = "Unique records processed: %d; "\
-                               "Last timestamp: %s\r" % (nrecs,
-                                                         timestamp_to_string(_rec['dateTime']))
-                        print(_msg, end='', file=sys.stdout)
-                        sys.stdout.flush()
+                        self.save_tranche(archive, _tranche, unique_set, nrecs)
                         _tranche = []
                 # we have processed all records but do we have any records left
                 # in the tranche?
                 if len(_tranche) > 0:
                     # we do so process them
-                    if not self.dry_run:
-                        # add the record only if it is not a dry run
-                        archive.addRecord(_tranche, update=self.update)
-                    # add our the dateTime for each record in our tranche to
-                    # the dry run set
-                    for _trec in _tranche:
-                        unique_set.add(_trec['dateTime'])
-                    # tell the user what we have done
-                    _msg = "Unique records processed: %d; "\
-                           "Last timestamp: %s\r" % (nrecs,
-                                                     timestamp_to_string(_rec['dateTime']))
-                    print(_msg, end='', file=sys.stdout)
+                    self.save_tranche(archive, _tranche, unique_set, nrecs)
                 print()
                 sys.stdout.flush()
                 # update our counts
-                self.total_rec_proc += nrecs
                 self.total_unique_rec += len(unique_set)
                 # mention any duplicates we encountered
                 num_duplicates = len(self.period_duplicates)
@@ -1362,11 +1450,100 @@ class Source:
                 _msg = 'Period %d - no records identified for import.' % self.period_no
             print(_msg)
 
+    def save_tranche(self, archive, tranche, unique_set, nrecs):
+        """Save a tranche of records to the WeeWX archive.
+
+        Input parameters:
+
+            archive: database manager object for the WeeWX archive.
+
+            tranche: list of WeeWX compatible archive records to be saved.
+
+            unique_set: TimestampSet holding the timestamps of the records
+                        saved so far in this period.
+
+            nrecs: number of records processed so far in this period,
+                   including this tranche.
+        """
+
+        if not self.dry_run:
+            # add the records only if it is not a dry run
+            archive.addRecord(tranche, update=self.update)
+        # add our the dateTime for each record in our tranche to the dry run
+        # set
+        for _trec in tranche:
+            unique_set.add(_trec['dateTime'])
+        # update our count now, so it is right should the import be aborted
+        self.total_rec_proc += len(tranche)
+        # tell the user what we have done
+        _msg = "Unique records processed: %d; "\
+               "Last timestamp: %s\r" % (nrecs,
+                                         timestamp_to_string(tranche[-1]['dateTime']))
+        print(_msg, end='', file=sys.stdout)
+        sys.stdout.flush()
+
+
+# ============================================================================
+#                             class TimestampSet
+# ============================================================================
+
+class TimestampSet:
+    """A set of integer timestamps that takes a fixed amount of memory per
+    day, no matter how many timestamps there are.
+
+    An import can hold many millions of records, too many to keep their
+    timestamps in a Python set. Instead, each day that has been seen gets a
+    bitmap with one bit per second of the day.
+    """
+
+    def __init__(self):
+        self.days = {}
+        self.count = 0
+
+    def add(self, ts):
+        """Add timestamp ts to the set."""
+
+        day, second = divmod(int(ts), 86400)
+        try:
+            bitmap = self.days[day]
+        except KeyError:
+            bitmap = self.days[day] = bytearray(86400 // 8)
+        byte, bit = divmod(second, 8)
+        if not bitmap[byte] & (1 << bit):
+            bitmap[byte] |= 1 << bit
+            self.count += 1
+
+    def __contains__(self, ts):
+        day, second = divmod(int(ts), 86400)
+        bitmap = self.days.get(day)
+        return bitmap is not None and bool(bitmap[second // 8] & (1 << second % 8))
+
+    def __len__(self):
+        return self.count
+
 
 # ============================================================================
 #                             Utility functions
 # ============================================================================
 
+def check_decode(path, encoding):
+    """Check that a file can be decoded, without holding it in memory.
+
+    Sources that read their file a line at a time as it is imported call this
+    first, so that a file that cannot be decoded is skipped before any of it
+    has been imported.
+
+    Raises a WeeImportDecodeError if the file cannot be decoded.
+    """
+
+    try:
+        with io.open(path, mode='r', encoding=encoding) as f:
+            while f.read(1 << 20):
+                pass
+    except UnicodeDecodeError as e:
+        raise WeeImportDecodeError(e)
+
+
 def get_binding(config_dict):
     """Get the binding for the WeeWX database."""
 
@@ -162,6 +162,21 @@ class GeneralPlot:
         """
         self.yscale = yscale
 
+    def getPixelGrid(self):
+        """Return the pixel columns of the image, in the scaled units of the x-axis.
+
+        The x scaling must have been set with explicit minimum and maximum values.
+
+        Returns a 3-way tuple (x0, dx, ncolumns). Column i covers x0 + i*dx <= x < x0 + (i+1)*dx.
+        """
+        # This must match the scaling done by ScaledDraw
+        left = self.lmargin + self.padding
+        right = self.image_width - self.rmargin - self.padding
+        xscale = float(right - left) / float(self.xscale[1] - self.xscale[0])
+        xoffset = int(right - self.xscale[1] * xscale + 0.5)
+        # Include every column of the image, in case a line strays outside the plot area
+        return (-xoffset - 0.5) / xscale, 1.0 / xscale, self.image_width + 1
+
     def addLine(self, line):
         """Add a line to be plotted.
         
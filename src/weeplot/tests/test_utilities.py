@@ -128,6 +128,55 @@ def test_xy_seq_line():
                 [(5.1, 50), (6, 60), (7, 70),
                  (8, 80), (9, 90)]])
 
+def test_minmax_downsample():
+    """Test function minmax_downsample()"""
+
+    # Short lines are returned as is
+    x = [0, 1, 2, 3]
+    y = [0, None, 20, 30]
+    assert minmax_downsample(x, y, 10) == (x, y)
+
+    # A sawtooth. Every bucket should keep its extremes, and its end points.
+    x = list(range(100))
+    y = [i % 10 for i in x]
+    x_out, y_out = minmax_downsample(x, y, 10)
+    assert len(x_out) == 20
+    assert min(y_out) == 0 and max(y_out) == 9
+    assert x_out[0] == 0 and x_out[-1] == 99
+    assert x_out == sorted(x_out)
+
+    # Breaks in the line survive, marked by a single null
+    y[50:60] = [None] * 10
+    x_out, y_out = minmax_downsample(x, y, 10)
+    assert y_out.count(None) == 1
+    x_out, y_out = minmax_downsample(x, [i % 10 for i in x], 10, maxdx=0.5)
+    assert y_out.count(None) == 99
+
+
+def test_lttb_downsample():
+    """Test function lttb_downsample()"""
+
+    # Short lines are returned as is
+    x = [0, 1, 2, 3]
+    y = [0, None, 20, 30]
+    assert lttb_downsample(x, y, 10) == (x, y)
+
+    # A single spike should survive
+    x = list(range(1000))
+    y = [0.0] * 1000
+    y[500] = 100.0
+    x_out, y_out = lttb_downsample(x, y, 50)
+    assert len(x_out) == 50
+    assert x_out[0] == 0 and x_out[-1] == 999
+    assert 100.0 in y_out
+
+    # Breaks in the line survive, marked by a single null
+    y[200:300] = [None] * 100
+    x_out, y_out = lttb_downsample(x, y, 50)
+    assert y_out.count(None) == 1
+    assert 100.0 in y_out
+
+
 def test_pickLabelFormat():
     """Test function pickLabelFormat"""
 
@@ -534,6 +534,146 @@ def xy_seq_line(x, y, maxdx=None):
         yield line
 
 
+def minmax_downsample(x, y, buckets, x_range=None, maxdx=None):
+    """Reduce the number of points in a line, while keeping its shape.
+
+    The x range is divided into equal buckets. Within each bucket, only the first and last
+    points, and the points with the smallest and largest y, are kept. If each bucket is no wider
+    than a pixel, a line drawn through the remaining points looks the same as one drawn through
+    all of them. Breaks in the line, either a null in y or a gap in x greater than maxdx, are
+    kept as well. Each break is marked by a single null.
+
+    x: sequence of x coordinates, in increasing order. All values must be non-null.
+
+    y: sequence of y coordinates, possibly with some embedded nulls.
+
+    buckets: the number of buckets.
+
+    x_range: a 2-way tuple with the range of x to be divided into buckets. Default is the range
+    of the data.
+
+    maxdx: gaps in x larger than this break the line.
+
+    returns: a 2-way tuple with the reduced x and y lists.
+
+    Example
+    >>> x = list(range(20))
+    >>> y = [0, 5, 1, 2, 3, 9, 4, 3, 8, 1, None, 1, 2, 3, 4, 5, 6, 7, 8, 9]
+    >>> x_out, y_out = minmax_downsample(x, y, 2)
+    >>> print(x_out)
+    [0, 5, 9, 11, 11, 19]
+    >>> print(y_out)
+    [0, 9, 1, None, 1, 9]
+    """
+    if len(x) <= 4 * buckets:
+        return list(x), list(y)
+    x_min, x_max = x_range if x_range else (x[0], x[-1])
+    width = (x_max - x_min) / buckets or 1
+
+    x_out = []
+    y_out = []
+    for segment in xy_seq_line(x, y, maxdx):
+        if x_out:
+            # Mark the break
+            x_out.append(segment[0][0])
+            y_out.append(None)
+        i = 0
+        while i < len(segment):
+            # Find the end of the bucket that this point falls in
+            bucket = _bucket_of(segment[i][0], x_min, width, buckets)
+            j = i + 1
+            while j < len(segment) \
+                    and _bucket_of(segment[j][0], x_min, width, buckets) == bucket:
+                j += 1
+            keep = {i, j - 1,
+                    min(range(i, j), key=lambda k: segment[k][1]),
+                    max(range(i, j), key=lambda k: segment[k][1])}
+            for k in sorted(keep):
+                x_out.append(segment[k][0])
+                y_out.append(segment[k][1])
+            i = j
+    return x_out, y_out
+
+
+def lttb_downsample(x, y, threshold, x_range=None, maxdx=None):
+    """Reduce the number of points in a line, using the Largest-Triangle-Three-Buckets algorithm.
+
+    Each piece of the line is divided into buckets with the same number of points. From each
+    bucket, the point that forms the largest triangle with the point chosen from the bucket
+    before it, and the average of the bucket after it, is kept. The first and last points are
+    always kept. Breaks in the line, either a null in y or a gap in x greater than maxdx, are
+    kept as well. Each break is marked by a single null.
+
+    x: sequence of x coordinates, in increasing order. All values must be non-null.
+
+    y: sequence of y coordinates, possibly with some embedded nulls.
+
+    threshold: about how many points to keep over the whole x range. They are shared out
+    among the pieces of the line by their length in x.
+
+    x_range: a 2-way tuple with the x range. Default is the range of the data.
+
+    maxdx: gaps in x larger than this break the line.
+
+    returns: a 2-way tuple with the reduced x and y lists.
+
+    Example
+    >>> x = list(range(10))
+    >>> y = [0, 1, 0, 1, 9, 1, 0, 1, 0, 0]
+    >>> x_out, y_out = lttb_downsample(x, y, 4)
+    >>> print(x_out)
+    [0, 4, 5, 9]
+    >>> print(y_out)
+    [0, 9, 1, 0]
+    """
+    if len(x) <= threshold:
+        return list(x), list(y)
+    x_min, x_max = x_range if x_range else (x[0], x[-1])
+    span = (x_max - x_min) or 1
+
+    x_out = []
+    y_out = []
+    for segment in xy_seq_line(x, y, maxdx):
+        if x_out:
+            # Mark the break
+            x_out.append(segment[0][0])
+            y_out.append(None)
+        n = max(int(round(threshold * (segment[-1][0] - segment[0][0]) / span)), 3)
+        for xy in _lttb(segment, n):
+            x_out.append(xy[0])
+            y_out.append(xy[1])
+    return x_out, y_out
+
+
+def _lttb(points, n):
+    """Pick n of a list of (x, y) points, using Largest-Triangle-Three-Buckets."""
+    if len(points) <= n:
+        return points
+    # The first and last points are kept. The rest are divided into n - 2 buckets.
+    every = (len(points) - 2) / (n - 2)
+    kept = [points[0]]
+    a = 0
+    for i in range(n - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        # The average of the next bucket. For the last bucket, it is the last point.
+        next_bucket = points[end:min(int((i + 2) * every) + 1, len(points))] or points[-1:]
+        avg_x = sum(xy[0] for xy in next_bucket) / len(next_bucket)
+        avg_y = sum(xy[1] for xy in next_bucket) / len(next_bucket)
+        ax, ay = points[a]
+        a = max(range(start, end),
+                key=lambda k: abs((ax - avg_x) * (points[k][1] - ay)
+                                  - (ax - points[k][0]) * (avg_y - ay)))
+        kept.append(points[a])
+    kept.append(points[-1])
+    return kept
+
+
+def _bucket_of(x, x_min, width, buckets):
+    """Return the bucket that x falls in. The last point goes in the last bucket."""
+    return min(int((x - x_min) // width), buckets - 1)
+
+
 def pickLabelFormat(increment):
     """Pick an appropriate label format for the given increment.
     
@@ -94,6 +94,50 @@ def accumulateLeaves(d, max_level=99):
     return cum_dict
 
 
+class LeafCache:
+    """Memoizes accumulateLeaves(), for the sections of a ConfigObj that is not being modified.
+
+    Sections deep in a ConfigObj, such as the lines of a plot, share most of their accumulated
+    options with their parents. The options of each parent are accumulated only once, then
+    reused.
+
+    Example:
+    >>> c = configobj.ConfigObj({"color":"blue", "size":10, "dayimage":{"color":"red", "position":{"x":20, "y":30}}})
+    >>> leaves = LeafCache()
+    >>> leaves.accumulate(c["dayimage"]) == {"color":"red", "size": 10}
+    True
+    >>> leaves.accumulate(c["dayimage"]["position"]) == {'color': 'red', 'size': 10, 'y': 30, 'x': 20}
+    True
+    """
+
+    def __init__(self):
+        # Key is the id of a section. Value is a 2-way tuple (section, accumulated options). The
+        # section is held, so its id cannot be reused.
+        self.leaves = {}
+
+    def accumulate(self, d):
+        """Like accumulateLeaves(), but returns a plain dictionary.
+
+        d: instance of a configobj.Section
+
+        Returns: a new dictionary with all the accumulated scalars
+        """
+        return dict(self._accumulate(d))
+
+    def _accumulate(self, d):
+        try:
+            return self.leaves[id(d)][1]
+        except KeyError:
+            pass
+        if d.parent is d:
+            cum_dict = {}
+        else:
+            cum_dict = dict(self._accumulate(d.parent))
+        cum_dict.update((k, d[k]) for k in d.scalars)
+        self.leaves[id(d)] = (d, cum_dict)
+        return cum_dict
+
+
 def merge_config(self_config, indict):
     """Merge and patch a config file"""
 
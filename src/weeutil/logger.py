@@ -3,17 +3,28 @@
 #
 #    See the file LICENSE.txt for your full rights.
 #
-"""WeeWX logging facility"""
+"""WeeWX logging facility
 
-import logging.config
+If option 'queued' in [Logging] is true, the logging handlers do their work in a thread of their
+own. The thread that logs a message only puts it in a queue, and never waits. If the queue is
+full, the message is dropped, and a count is kept. The logging thread reports how many messages
+have been dropped, once it catches up.
+"""
+
+import atexit
+import logging
+import logging.handlers
 import os.path
+import queue
 import sys
+import threading
 from io import StringIO
 
 import configobj
 
 import weeutil.config
 import weewx
+from weeutil.weeutil import to_bool, to_int
 
 # The logging defaults. Note that two kinds of placeholders are used:
 #
@@ -85,14 +96,21 @@ else:
     facility = 'user'
 
 
+# The process name used by the last call to setup()
+log_label = None
+
+
 def setup(process_name, config_dict=None):
     """Set up the weewx logging facility"""
+    # This is slow to import, and not needed until now
+    import logging.config
 
-    global address, facility
+    global address, facility, log_label
 
     # Create a ConfigObj from the default string. No interpolation (it interferes with the
     # interpolation directives embedded in the string).
     log_config = configobj.ConfigObj(StringIO(LOGGING_STR), interpolation=False, encoding='utf-8')
+    log_label = process_name
 
     # Turn off interpolation in the incoming dictionary. First save the old
     # value, then restore later. However, the incoming dictionary may be a simple
@@ -118,6 +136,10 @@ def setup(process_name, config_dict=None):
     if weewx_root:
         log_root = os.path.join(weewx_root, log_root)
 
+    # Get (and remove) the options for queued logging. Python logging does not use them either.
+    queued = to_bool(log_config['Logging'].pop('queued', False))
+    queue_size = to_int(log_config['Logging'].pop('queue_size', 1000))
+
     # Adjust the logging level in accordance to whether the 'debug' flag is on
     log_level = 'DEBUG' if weewx.debug else 'INFO'
 
@@ -151,14 +173,142 @@ def setup(process_name, config_dict=None):
     # Extract just the part used by Python's logging facility
     log_dict = log_config.dict().get('Logging', {})
 
+    # Any logging thread from a previous setup must finish with the old handlers first.
+    shutdown()
+
     # Finally! The dictionary is ready. Set the defaults.
     logging.config.dictConfig(log_dict)
 
+    if queued:
+        _start_queue(queue_size)
+
     # Restore the old interpolation value
     if old_interpolation is not None:
         config_dict.interpolation = old_interpolation
 
 
+def shutdown():
+    """Stop the logging thread, if any, once it has dealt with everything in the queue.
+    Afterwards, the handlers do their work in the thread that logs the message."""
+    global _log_queue
+    if _log_queue is not None:
+        _log_queue.stop()
+        _log_queue = None
+
+
+_log_queue = None
+atexit.register(shutdown)
+
+
+def _start_queue(max_size):
+    global _log_queue
+    _log_queue = LogQueue(max_size)
+    _log_queue.start()
+
+
+class LogQueue:
+    """Moves the work of the logging handlers to a thread of their own.
+
+    Each logger with handlers gets a single QueueHandler instead. It puts each record in the
+    queue, along with the original handlers of the logger. The logging thread then hands the
+    record to them.
+    """
+
+    def __init__(self, max_size=1000):
+        self.max_size = max_size
+        self.queue = queue.Queue(max_size)
+        # How many records have been dropped since the last report
+        self.dropped = 0
+        self.lock = threading.Lock()
+        # List of 2-way tuples (logger, original handlers)
+        self.saved = []
+        self.thread = None
+        self.pid = None
+
+    def start(self):
+        loggers = [logging.getLogger()] + [logger for logger
+                                           in list(logging.Logger.manager.loggerDict.values())
+                                           if isinstance(logger, logging.Logger)]
+        for logger in loggers:
+            if logger.handlers:
+                self.saved.append((logger, logger.handlers))
+                logger.handlers = [_QueueHandler(self, logger.handlers)]
+        self._start_thread()
+
+    def stop(self):
+        """Stop the thread, after it has emptied the queue, then put back the original
+        handlers."""
+        if self.pid == os.getpid() and self.thread.is_alive():
+            try:
+                self.queue.put(None, timeout=5.0)
+            except queue.Full:
+                pass
+            self.thread.join(10.0)
+        for logger, handlers in self.saved:
+            logger.handlers = handlers
+            for handler in handlers:
+                handler.flush()
+        self.saved = []
+
+    def put(self, record, handlers):
+        """Put a record in the queue. Never blocks."""
+        if self.pid != os.getpid():
+            # The process has forked, which does not carry over the thread. Start a new one, and
+            # leave the records of the parent to the parent.
+            with self.lock:
+                if self.pid != os.getpid():
+                    self.queue = queue.Queue(self.max_size)
+                    self._start_thread()
+        try:
+            self.queue.put_nowait((record, handlers))
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+
+    def _start_thread(self):
+        self.pid = os.getpid()
+        self.thread = threading.Thread(target=self._run, name='Logging', daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            record, handlers = item
+            _handle(record, handlers)
+            if self.dropped:
+                self._report_dropped()
+        if self.dropped:
+            self._report_dropped()
+
+    def _report_dropped(self):
+        with self.lock:
+            dropped, self.dropped = self.dropped, 0
+        if self.saved and self.saved[0][0] is logging.root:
+            record = logging.getLogger(__name__).makeRecord(
+                __name__, logging.WARNING, __file__, 0,
+                "Logging queue full. Dropped %d messages", (dropped,), None)
+            _handle(record, self.saved[0][1])
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Puts records in a LogQueue, along with the handlers they are meant for."""
+
+    def __init__(self, log_queue, handlers):
+        super().__init__(log_queue)
+        self.handlers = handlers
+
+    def enqueue(self, record):
+        self.queue.put(record, self.handlers)
+
+
+def _handle(record, handlers):
+    for handler in handlers:
+        if record.levelno >= handler.level:
+            handler.handle(record)
+
+
 def log_traceback(log_fn, prefix=''):
     """Log the stack traceback into a logger.
 
@@ -88,3 +88,25 @@ class TestConfig:
         bio.seek(0)
         out_str = bio.read().decode('utf-8')
         assert out_str == TestConfig.test_dict_str
+
+
+def test_leaf_cache():
+    c = weeutil.config.config_from_str("""
+    color = blue
+    size = 10
+    [day]
+        color = red
+        [[temp]]
+            x = 20
+        [[wind]]
+            size = 12
+    """)
+    leaves = weeutil.config.LeafCache()
+    for section in (c['day'], c['day']['temp'], c['day']['wind']):
+        assert leaves.accumulate(section) == weeutil.config.accumulateLeaves(section)
+    # The parent was accumulated only once
+    assert len(leaves.leaves) == 4
+    # Each caller gets its own copy
+    options = leaves.accumulate(c['day']['temp'])
+    options['x'] = 30
+    assert leaves.accumulate(c['day']['temp'])['x'] == '20'
@@ -0,0 +1,89 @@
+#
+#    Copyright (c) 2026 Tom Keffer <tkeffer@gmail.com>
+#
+#    See the file LICENSE.txt for your full rights.
+#
+"""Test module weeutil.logger"""
+import logging
+import threading
+
+import configobj
+import pytest
+
+import weeutil.logger
+
+log = logging.getLogger(__name__)
+
+
+class RecordingHandler(logging.Handler):
+    """Remembers each message, and the thread that handled it. Waits for 'go' before
+    handling anything."""
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+        self.threads = set()
+        self.go = threading.Event()
+
+    def emit(self, record):
+        self.go.wait(5)
+        self.messages.append(record.getMessage())
+        self.threads.add(threading.current_thread().name)
+
+
+# The handler under test. Function get_handler() hands it to dictConfig().
+current_handler = None
+
+
+def get_handler():
+    return current_handler
+
+
+@pytest.fixture
+def handler():
+    global current_handler
+    handler = current_handler = RecordingHandler()
+    yield handler
+    weeutil.logger.shutdown()
+    weeutil.logger.setup('weetest_logger')
+
+
+def setup_queued(queue_size):
+    config_dict = configobj.ConfigObj({'Logging': {
+        'queued': True,
+        'queue_size': queue_size,
+        'root': {'level': 'INFO', 'handlers': ['test']},
+        'handlers': {'test': {'()': __name__ + '.get_handler'}}}})
+    weeutil.logger.setup('weetest_logger', config_dict)
+
+
+def test_queued(handler):
+    setup_queued(100)
+    for i in range(10):
+        log.info("Message %d", i)
+    # Nothing has been handled yet, but the logging thread did not hold anybody up
+    assert not handler.messages
+    handler.go.set()
+    # The queue is flushed on shutdown
+    weeutil.logger.shutdown()
+    assert handler.messages == ["Message %d" % i for i in range(10)]
+    assert handler.threads == {'Logging'}
+    # Afterwards, logging carries on in the calling thread
+    log.info("After")
+    assert handler.messages[-1] == "After"
+    assert threading.current_thread().name in handler.threads
+
+
+def test_dropped(handler):
+    setup_queued(5)
+    for i in range(20):
+        log.info("Message %d", i)
+    handler.go.set()
+    weeutil.logger.shutdown()
+    # Five fit in the queue, plus one more, if the logging thread had already taken the first.
+    # The rest were dropped, and counted.
+    reports = [m for m in handler.messages if m.startswith('Logging queue full')]
+    messages = [m for m in handler.messages if m not in reports]
+    assert len(messages) in (5, 6)
+    assert messages == ["Message %d" % i for i in range(len(messages))]
+    assert reports == ["Logging queue full. Dropped %d messages" % (20 - len(messages))]
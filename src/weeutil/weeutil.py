@@ -13,6 +13,7 @@
 import calendar
 import cmath
 import datetime
+import functools
 import importlib
 import math
 import os
@@ -21,12 +22,6 @@ import shutil
 import time
 from collections import ChainMap
 
-# importlib.resources is 3.7 or later, importlib_resources is the backport
-try:
-    import importlib.resources as importlib_resources
-except:
-    import importlib_resources
-
 # For backwards compatibility:
 from weeutil.config import accumulateLeaves, search_up
 
@@ -1247,21 +1242,13 @@ def getDayNightTransitions(start_ts, end_ts, lat, lon):
         2022-07-23 20:45:03 PDT (1658634303)
         2022-07-24 05:45:04 PDT (1658666704)
     """
-    from weeutil import Sun
-
     start_ts = int(start_ts)
     end_ts = int(end_ts)
 
     first = None
     values = []
     for t in range(start_ts - 3600 * 24, end_ts + 3600 * 24 + 1, 3600 * 24):
-        x = startOfDayUTC(t)
-        x_tt = time.gmtime(x)
-        y, m, d = x_tt[:3]
-        (sunrise_utc, sunset_utc) = Sun.sunRiseSet(y, m, d, lon, lat)
-        daystart_ts = calendar.timegm((y, m, d, 0, 0, 0, 0, 0, -1))
-        sunrise_ts = int(daystart_ts + sunrise_utc * 3600.0 + 0.5)
-        sunset_ts = int(daystart_ts + sunset_utc * 3600.0 + 0.5)
+        sunrise_ts, sunset_ts = _sun_rise_set_ts(startOfDayUTC(t), lat, lon)
 
         if start_ts < sunrise_ts < end_ts:
             values.append(sunrise_ts)
@@ -1274,6 +1261,20 @@ def getDayNightTransitions(start_ts, end_ts, lat, lon):
     return first, values
 
 
+@functools.lru_cache(maxsize=4096)
+def _sun_rise_set_ts(daystart_ts, lat, lon):
+    """Return the sunrise and sunset of the day starting at daystart_ts (UTC) as timestamps.
+    Plots of long timespans ask for the same days over and over, so the results are cached."""
+    from weeutil import Sun
+
+    y, m, d = time.gmtime(daystart_ts)[:3]
+    (sunrise_utc, sunset_utc) = Sun.sunRiseSet(y, m, d, lon, lat)
+    daystart_ts = calendar.timegm((y, m, d, 0, 0, 0, 0, 0, -1))
+    sunrise_ts = int(daystart_ts + sunrise_utc * 3600.0 + 0.5)
+    sunset_ts = int(daystart_ts + sunset_utc * 3600.0 + 0.5)
+    return sunrise_ts, sunset_ts
+
+
 def timestamp_to_string(ts, format_str="%Y-%m-%d %H:%M:%S %Z"):
     """Return a string formatted from the timestamp
 
@@ -1906,9 +1907,21 @@ def version_compare(v1, v2):
     return 0
 
 
+def _importlib_resources():
+    """Return the module importlib.resources. It is slow to import, and seldom needed, so it is
+    imported only when first used."""
+    # importlib.resources is 3.7 or later, importlib_resources is the backport
+    try:
+        import importlib.resources as importlib_resources
+    except ImportError:
+        import importlib_resources
+    return importlib_resources
+
+
 def get_resource_path(package, resource):
     """Return a path to a resource within a package. The resource can be a directory or a file."""
     import sys
+    importlib_resources = _importlib_resources()
 
     if sys.version_info.major == 3 and sys.version_info.minor < 9:
         # For earlier Python versions, use the deprecated function path()
@@ -1921,6 +1934,7 @@ def get_resource_path(package, resource):
 def get_resource_fd(package, resource):
     """Return a file descriptor to a resource within a package."""
     import sys
+    importlib_resources = _importlib_resources()
 
     if sys.version_info.major == 3 and sys.version_info.minor < 9:
         # For earlier Python versions, use the deprecated function open_text
@@ -9,7 +9,10 @@ This module can optionally use PyEphem, which offers high quality
 astronomical calculations. See http://rhodesmill.org/pyephem. """
 
 import copy
+import json
+import logging
 import math
+import os
 import sys
 import time
 
@@ -23,9 +26,100 @@ try:
 except ImportError:
     import weeutil.Sun
 
+log = logging.getLogger(__name__)
+
 # A list of almanacs. Each entry should be a subclass of AlmanacType.
 almanacs = []
 
+
+class EventCache:
+    """Remembers almanac results, so they need to be calculated only once.
+
+    Events that happen once a day, such as sunrise, are kept in 'daily'. They are keyed by the
+    heavenly body, the event, the start of the day in Dublin Julian Days, then everything about
+    the observer that can change the result. They can be saved to a file, and loaded again the
+    next time around.
+
+    Other results, such as the next full moon, are kept in 'timed', keyed by the time they were
+    calculated for. They are only held in memory.
+    """
+
+    def __init__(self, max_entries=10000, keep_days=7):
+        self.daily = {}
+        self.timed = {}
+        self.max_entries = max_entries
+        self.keep_days = keep_days
+        self.path = None
+        self.dirty = False
+
+    def get_daily(self, key, func):
+        """Return the daily event with the given key, calling func() to calculate it if it
+        is not known yet."""
+        try:
+            return self.daily[key]
+        except KeyError:
+            pass
+        val = self.daily[key] = func()
+        self.dirty = True
+        self._trim(self.daily)
+        return val
+
+    def get_timed(self, key, func):
+        """Return the result with the given key, calling func() to calculate it if it is not
+        known yet."""
+        try:
+            return self.timed[key]
+        except KeyError:
+            pass
+        val = self.timed[key] = func()
+        self._trim(self.timed)
+        return val
+
+    def _trim(self, events):
+        # Dictionaries remember insertion order, so the first entry is the oldest.
+        while len(events) > self.max_entries:
+            del events[next(iter(events))]
+
+    def load(self, path):
+        """Load daily events saved earlier in the file at path, then save to it from now on."""
+        if path == self.path:
+            return
+        self.path = path
+        try:
+            with open(path) as fd:
+                entries = json.load(fd)
+            for key, val in entries:
+                self.daily.setdefault(tuple(key), val)
+        except FileNotFoundError:
+            pass
+        except (OSError, TypeError, ValueError) as e:
+            log.info("Unable to load almanac events from %s: %s", path, e)
+
+    def save(self):
+        """Save the daily events of the last 'keep_days' days, if there are new ones."""
+        if not self.path or not self.dirty:
+            return
+        cutoff_djd = timestamp_to_djd(time.time()) - self.keep_days
+        entries = [[list(key), val] for key, val in self.daily.items() if key[2] >= cutoff_djd]
+        tmp_path = self.path + '.tmp'
+        try:
+            with open(tmp_path, 'w') as fd:
+                json.dump(entries, fd)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            log.info("Unable to save almanac events to %s: %s", self.path, e)
+        else:
+            self.dirty = False
+
+    def clear(self):
+        self.daily.clear()
+        self.timed.clear()
+        self.dirty = False
+
+
+# Almanac results, shared by all almanacs
+event_cache = EventCache()
+
 # NB: Have Almanac inherit from 'object'. However, this will cause
 # an 'autocall' bug in Cheetah versions before 2.1.
 class Almanac:
@@ -370,8 +464,8 @@ class PyEphemAlmanacType(AlmanacType):
         elif attr=='moon_fullness':
             return int(almanac_obj.moon.moon_fullness + 0.5)
         elif attr in ('moon_phase','moon_index'):
-            djd1 = ephem.previous_new_moon(time_djd)
-            djd2 = ephem.next_new_moon(time_djd)
+            djd1 = _get_global_event('previous_new_moon', time_djd)
+            djd2 = _get_global_event('next_new_moon', time_djd)
             position = (time_djd-djd1)/(djd2-djd1)
             moon_index = int((position * 8) + 0.5) & 7
             if attr=='moon_index': return moon_index
@@ -386,9 +480,7 @@ class PyEphemAlmanacType(AlmanacType):
                       'previous_first_quarter_moon', 'next_first_quarter_moon',
                       'previous_full_moon', 'next_full_moon',
                       'previous_last_quarter_moon', 'next_last_quarter_moon'}:
-            # This is how you call a function on an instance when all you have
-            # is the function's name as a string
-            djd = getattr(ephem, attr)(time_djd)
+            djd = _get_global_event(attr, time_djd)
             return weewx.units.ValueHelper(ValueTuple(djd, "dublin_jd", "group_time"),
                                            context="ephem_year",
                                            formatter=almanac_obj.formatter,
@@ -500,6 +592,14 @@ class AlmanacBinder:
     @property
     def visible(self):
         """Calculate how long the body has been visible today"""
+        visible = event_cache.get_daily(self._event_key('visible'), self._calc_visible)
+
+        return weewx.units.ValueHelper(ValueTuple(visible, "second", "group_deltatime"),
+                                       context="day",
+                                       formatter=self.almanac.formatter,
+                                       converter=self.almanac.converter)
+
+    def _calc_visible(self):
         ephem_body = _get_ephem_body(self.heavenly_body)
         observer = _get_observer(self.almanac, self.sod_djd)
         try:
@@ -511,11 +611,13 @@ class AlmanacBinder:
             visible = 0
         else:
             visible = (time_setting_djd - time_rising_djd) * weewx.units.SECS_PER_DAY
+        return visible
 
-        return weewx.units.ValueHelper(ValueTuple(visible, "second", "group_deltatime"),
-                                       context="day",
-                                       formatter=self.almanac.formatter,
-                                       converter=self.almanac.converter)
+    def _event_key(self, event):
+        """The key of a daily event of my heavenly body in the event cache"""
+        return (self.heavenly_body, event, self.sod_djd,
+                self.almanac.lat, self.almanac.lon, self.almanac.altitude, self.almanac.horizon,
+                self.almanac.temperature, self.almanac.pressure, bool(self.use_center))
 
     def visible_change(self, days_ago=1):
         """Change in visibility of the heavenly body compared to 'days_ago'."""
@@ -548,32 +650,24 @@ class AlmanacBinder:
         if attr.startswith('__') or attr in ['mro', 'im_func', 'func_code']:
             raise AttributeError(attr)
 
-        # Many of these functions have the unfortunate side effect of changing the state of the
-        # body being examined. So, create a temporary body and then throw it away
-        ephem_body = _get_ephem_body(self.heavenly_body)
-
         if attr in ['rise', 'set', 'transit']:
             # These verbs refer to the time the event occurs anytime in the day, which
-            # is not necessarily the *next* sunrise.
-            attr = fn_map[attr]
-            # These functions require the time at the start of day
-            observer = _get_observer(self.almanac, self.sod_djd)
-            # Call the function. Be prepared to catch an exception if the body is always up.
-            try:
-                if attr in ['next_rising', 'next_setting']:
-                    time_djd = getattr(observer, attr)(ephem_body, use_center=self.use_center)
-                else:
-                    time_djd = getattr(observer, attr)(ephem_body)
-            except (ephem.AlwaysUpError, ephem.NeverUpError):
-                time_djd = None
+            # is not necessarily the *next* sunrise. They only depend on the day, so
+            # they need be calculated only once.
+            time_djd = event_cache.get_daily(self._event_key(attr),
+                                             lambda: self._calc_event(fn_map[attr]))
             return weewx.units.ValueHelper(ValueTuple(time_djd, "dublin_jd", "group_time"),
                                            context="ephem_day",
                                            formatter=self.almanac.formatter,
                                            converter=self.almanac.converter)
 
-        elif attr in {'next_rising', 'next_setting', 'next_transit', 'next_antitransit',
-                      'previous_rising', 'previous_setting', 'previous_transit',
-                      'previous_antitransit'}:
+        # Many of these functions have the unfortunate side effect of changing the state of the
+        # body being examined. So, create a temporary body and then throw it away
+        ephem_body = _get_ephem_body(self.heavenly_body)
+
+        if attr in {'next_rising', 'next_setting', 'next_transit', 'next_antitransit',
+                    'previous_rising', 'previous_setting', 'previous_transit',
+                    'previous_antitransit'}:
             # These functions require the time of the observation
             time_djd = timestamp_to_djd(self.almanac.time_ts)
             observer = _get_observer(self.almanac, time_djd)
@@ -632,6 +726,32 @@ class AlmanacBinder:
                 return getattr(ephem_body, attr)
 
 
+    def _calc_event(self, fn_name):
+        """Calculate the time of an event of the day, such as 'next_rising', measured from the
+        start of the day."""
+        ephem_body = _get_ephem_body(self.heavenly_body)
+        # These functions require the time at the start of day
+        observer = _get_observer(self.almanac, self.sod_djd)
+        # Call the function. Be prepared to catch an exception if the body is always up.
+        try:
+            if fn_name in ['next_rising', 'next_setting']:
+                time_djd = getattr(observer, fn_name)(ephem_body, use_center=self.use_center)
+            else:
+                time_djd = getattr(observer, fn_name)(ephem_body)
+        except (ephem.AlwaysUpError, ephem.NeverUpError):
+            return None
+        return float(time_djd)
+
+
+def _get_global_event(fn_name, time_djd):
+    """Return the time of an event that does not depend on the observer, such as the next full
+    moon, using the ephem function with name fn_name."""
+    # This is how you call a function on an instance when all you have
+    # is the function's name as a string
+    return event_cache.get_timed((fn_name, time_djd),
+                                 lambda: float(getattr(ephem, fn_name)(time_djd)))
+
+
 def _get_observer(almanac_obj, time_ts):
     # Build an ephem Observer object
     observer = ephem.Observer()
@@ -75,7 +75,7 @@ import weewx.reportengine
 import weewx.station
 import weewx.tags
 import weewx.units
-from weeutil.config import search_up, accumulateLeaves, deep_copy
+from weeutil.config import search_up, deep_copy, LeafCache
 from weeutil.weeutil import getFileName, to_bool, to_int, timestamp_to_string
 
 log = logging.getLogger(__name__)
@@ -127,6 +127,9 @@ class CheetahGenerator(weewx.reportengine.ReportGenerator):
                    'SummaryByMonth': "%Y-%m",
                    'SummaryByYear' : "%Y"}
 
+    # How many timespans to hold search list extensions for
+    max_cached_timespans = 8
+
     def __init__(self, config_dict, skin_dict, *args, **kwargs):
         """Initialize an instance of CheetahGenerator"""
         # Initialize my superclass
@@ -138,6 +141,10 @@ class CheetahGenerator(weewx.reportengine.ReportGenerator):
 
         # This dictionary will hold the formatted dates of all generated files
         self.outputted_dict = {k: [] for k in CheetahGenerator.generator_dict}
+        # Options accumulated from each section of the skin dictionary
+        self.leaf_cache = LeafCache()
+        # Search list extensions that can be shared between templates
+        self.extension_cache = {}
 
     def run(self):
         """Main entry point for file generation using Cheetah Templates."""
@@ -198,6 +205,7 @@ class CheetahGenerator(weewx.reportengine.ReportGenerator):
     def teardown(self):
         """Delete any extension objects we created to prevent back references
         from slowing garbage collection"""
+        self.extension_cache.clear()
         while self.search_list_objs:
             self.search_list_objs[-1].finalize()
             del self.search_list_objs[-1]
@@ -231,7 +239,7 @@ class CheetahGenerator(weewx.reportengine.ReportGenerator):
         if 'template' not in section:
             return ngen
 
-        report_dict = accumulateLeaves(section)
+        report_dict = self.leaf_cache.accumulate(section)
 
         generate_once = to_bool(report_dict.get('generate_once', False))
         if generate_once and not self.first_run:
@@ -402,10 +410,35 @@ class CheetahGenerator(weewx.reportengine.ReportGenerator):
 
         # Then add the V3.X style search list extensions
         for obj in self.search_list_objs:
-            search_list += obj.get_extension_list(timespan, db_lookup)
+            search_list += self._get_extension_list(obj, timespan, db_lookup, default_binding)
 
         return search_list
 
+    def _get_extension_list(self, obj, timespan, db_lookup, default_binding):
+        """Get the extension list of a search list object, reusing an earlier one if the object
+        allows it."""
+        reuse = getattr(obj, 'reuse', None)
+        if reuse == 'report':
+            key = id(obj)
+        elif reuse == 'timespan':
+            key = (id(obj), timespan.start, timespan.stop, default_binding)
+        else:
+            return obj.get_extension_list(timespan, db_lookup)
+
+        try:
+            return self.extension_cache[key]
+        except KeyError:
+            pass
+        extension_list = obj.get_extension_list(timespan, db_lookup)
+        if reuse == 'timespan':
+            # Templates are generated one timespan at a time, so there is little point in
+            # holding on to many timespans. Forget the oldest.
+            timespan_keys = [k for k in self.extension_cache if isinstance(k, tuple)]
+            if len(timespan_keys) >= CheetahGenerator.max_cached_timespans:
+                del self.extension_cache[timespan_keys[0]]
+        self.extension_cache[key] = extension_list
+        return extension_list
+
     def _prepGen(self, report_dict):
         """Get the template, destination directory, encoding, and default
         binding."""
@@ -447,6 +480,13 @@ class CheetahGenerator(weewx.reportengine.ReportGenerator):
 class SearchList:
     """Abstract base class used for search list extensions."""
 
+    # Whether the generator can reuse what get_extension_list() returns:
+    #   None:       No. It is called for every template and timespan.
+    #   'timespan': It depends only on the timespan and the default data binding. It is called
+    #               once for each, and shared by all the templates that use them.
+    #   'report':   It does not depend on either. It is called only once per report.
+    reuse = None
+
     def __init__(self, generator):
         """Create an instance of SearchList.
 
@@ -475,6 +515,8 @@ class SearchList:
 class Almanac(SearchList):
     """Class that implements the '$almanac' tag."""
 
+    reuse = 'report'
+
     def __init__(self, generator):
         SearchList.__init__(self, generator)
 
@@ -528,10 +570,21 @@ class Almanac(SearchList):
                                              formatter=generator.formatter,
                                              converter=generator.converter)
 
+        # Daily events, such as sunrise, can be kept in a file between runs
+        cache_file = generator.config_dict.get('StdReport', {}).get('almanac_cache')
+        if cache_file:
+            weewx.almanac.event_cache.load(os.path.join(generator.config_dict['WEEWX_ROOT'],
+                                                        cache_file))
+
+    def finalize(self):
+        weewx.almanac.event_cache.save()
+
 
 class Station(SearchList):
     """Class that implements the $station tag."""
 
+    reuse = 'report'
+
     def __init__(self, generator):
         SearchList.__init__(self, generator)
         self.station = weewx.station.Station(generator.stn_info,
@@ -543,6 +596,8 @@ class Station(SearchList):
 class Current(SearchList):
     """Class that implements the $current tag"""
 
+    reuse = 'timespan'
+
     def get_extension_list(self, timespan, db_lookup):
         record_binder = weewx.tags.RecordBinder(db_lookup, timespan.stop,
                                                 self.generator.formatter, self.generator.converter,
@@ -554,6 +609,8 @@ class Stats(SearchList):
     """Class that implements the time-based statistical tags, such
     as $day.outTemp.max"""
 
+    reuse = 'timespan'
+
     def get_extension_list(self, timespan, db_lookup):
         try:
             trend_dict = self.generator.skin_dict['Units']['Trend']
@@ -579,6 +636,8 @@ class Stats(SearchList):
 class UnitInfo(SearchList):
     """Class that implements the $unit and $obs tags."""
 
+    reuse = 'report'
+
     def __init__(self, generator):
         SearchList.__init__(self, generator)
         # This implements the $unit tag:
@@ -600,6 +659,8 @@ class Extras(SearchList):
     """Class for exposing the [Extras] section in the skin config dictionary
     as tag $Extras."""
 
+    reuse = 'report'
+
     def __init__(self, generator):
         SearchList.__init__(self, generator)
         # If the user has supplied an '[Extras]' section in the skin
@@ -611,6 +672,8 @@ class Extras(SearchList):
 class JSONHelpers(SearchList):
     """Helper functions for formatting JSON"""
 
+    reuse = 'report'
+
     @staticmethod
     def jsonize(arg):
         """
@@ -668,6 +731,8 @@ class JSONHelpers(SearchList):
 class Gettext(SearchList):
     """Values provided by $gettext() are found in the [Texts] section of the localization file."""
 
+    reuse = 'report'
+
     def gettext(self, key):
         try:
             v = self.generator.skin_dict['Texts'].get(key, key)
@@ -689,6 +754,8 @@ class Gettext(SearchList):
 class PlotInfo(SearchList):
     """Return information about plots, based on what's in the [ImageGenerator] section."""
 
+    reuse = 'report'
+
     def getobs(self, plot_name):
         """
         Given a plot name, return the set of observations in that plot.
@@ -729,6 +796,8 @@ class DisplayOptions(SearchList):
     """Class for exposing the [DisplayOptions] section in the skin config
     dictionary as tag $DisplayOptions."""
 
+    reuse = 'report'
+
     def __init__(self, generator):
         SearchList.__init__(self, generator)
         self.DisplayOptions = dict(generator.skin_dict.get('DisplayOptions', {}))
@@ -737,6 +806,8 @@ class DisplayOptions(SearchList):
 class SkinInfo(SearchList):
     """Class for exposing information about the skin."""
 
+    reuse = 'report'
+
     def __init__(self, generator):
         SearchList.__init__(self, generator)
         for k in ['HTML_ROOT', 'REPORT_NAME', 'skin',
@@ -420,6 +420,7 @@ class AcuRiteDriver(weewx.drivers.AbstractDevice):
     _R1_INTERVAL = 18    # 5-in-1 sensor updates every 18 seconds
     _R2_INTERVAL = 60    # console sensor updates every 60 seconds
     _R3_INTERVAL = 12*60 # historical records updated every 12 minutes
+    _READ_SLACK = 3      # read reports due this close together at once
 
     def __init__(self, **stn_dict):
         log.info('driver version is %s' % DRIVER_VERSION)
@@ -440,8 +441,11 @@ class AcuRiteDriver(weewx.drivers.AbstractDevice):
         self.last_r3 = None
         self.r3_fail_count = 0
         self.r3_max_fail = 3
-        self.r1_next_read = 0
-        self.r2_next_read = 0
+        intervals = {'R1': self._R1_INTERVAL, 'R2': self._R2_INTERVAL}
+        if self.enable_r3:
+            intervals['R3'] = self._R3_INTERVAL
+        self.scheduler = ReadScheduler(intervals, self._READ_SLACK)
+        self.station = None
         global DEBUG_RAW
         DEBUG_RAW = int(stn_dict.get('debug_raw', 0))
 
@@ -455,25 +459,32 @@ class AcuRiteDriver(weewx.drivers.AbstractDevice):
         while ntries < self.max_tries:
             ntries += 1
             try:
-                packet = {'dateTime': int(time.time() + 0.5),
+                now = time.time()
+                packet = {'dateTime': int(now + 0.5),
                           'usUnits': weewx.METRIC}
                 raw1 = raw2 = None
-                with Station() as station:
-                    if time.time() >= self.r1_next_read:
-                        raw1 = station.read_R1()
-                        self.r1_next_read = time.time() + self._R1_INTERVAL
-                        if DEBUG_RAW > 0 and raw1:
-                            log.debug("R1: %s" % _fmt_bytes(raw1))
-                    if time.time() >= self.r2_next_read:
-                        raw2 = station.read_R2()
-                        self.r2_next_read = time.time() + self._R2_INTERVAL
-                        if DEBUG_RAW > 0 and raw2:
-                            log.debug("R2: %s" % _fmt_bytes(raw2))
-                    if self.enable_r3:
-                        raw3 = self.read_R3_block(station)
-                        if DEBUG_RAW > 0 and raw3:
-                            for row in raw3:
-                                log.debug("R3: %s" % _fmt_bytes(row))
+                station = self._get_station()
+                due = self.scheduler.due(now)
+                if 'R1' in due:
+                    raw1 = station.read_R1()
+                    self.scheduler.mark('R1', now)
+                    if DEBUG_RAW > 0 and raw1:
+                        log.debug("R1: %s" % _fmt_bytes(raw1))
+                if 'R2' in due:
+                    raw2 = station.read_R2()
+                    self.scheduler.mark('R2', now)
+                    if DEBUG_RAW > 0 and raw2:
+                        log.debug("R2: %s" % _fmt_bytes(raw2))
+                if 'R3' in due:
+                    raw3 = self.read_R3_block(station)
+                    # whether or not the read worked, do not try R3 again
+                    # until its interval has passed.  the handle stays open:
+                    # if the failed read left the console unresponsive, the
+                    # next R1 or R2 read fails and the handle is replaced then.
+                    self.scheduler.mark('R3', now)
+                    if DEBUG_RAW > 0:
+                        for row in raw3:
+                            log.debug("R3: %s" % _fmt_bytes(row))
                 if raw1:
                     packet.update(Station.decode_R1(raw1))
                 if raw2:
@@ -484,20 +495,36 @@ class AcuRiteDriver(weewx.drivers.AbstractDevice):
                 self._augment_packet(packet)
                 ntries = 0
                 yield packet
-                next_read = min(self.r1_next_read, self.r2_next_read)
-                delay = max(int(next_read - time.time() + 1),
+                delay = max(int(self.scheduler.next_read() - time.time() + 1),
                             self.polling_interval)
                 log.debug("next read in %s seconds" % delay)
                 time.sleep(delay)
             except (usb.USBError, weewx.WeeWxIOError) as e:
                 log.error("Failed attempt %d of %d to get LOOP data: %s" %
                           (ntries, self.max_tries, e))
+                # the handle is suspect.  release it, then find and claim the
+                # device again on the next attempt.
+                self.closePort()
                 time.sleep(self.retry_wait)
         else:
             msg = "Max retries (%d) exceeded for LOOP data" % self.max_tries
             log.error(msg)
             raise weewx.RetriesExceeded(msg)
 
+    def closePort(self):
+        if self.station is not None:
+            self.station.close()
+            self.station = None
+
+    def _get_station(self):
+        # the device stays open across reads.  it is found and claimed only
+        # when there is no handle, i.e., at startup or after a failure.
+        if self.station is None:
+            station = Station()
+            station.open()
+            self.station = station
+        return self.station
+
     def _augment_packet(self, packet):
         # calculate the rain delta from the total
         if 'rain_total' in packet:
@@ -527,9 +554,9 @@ class AcuRiteDriver(weewx.drivers.AbstractDevice):
             packet['rxCheckPercent'] = 100 * packet['rssi'] / Station.MAX_RSSI
 
     def read_R3_block(self, station):
-        # attempt to read R3 every 12 minutes.  if the read fails multiple
-        # times, make a single log message about enabling usb mode 3 then do
-        # not try it again.
+        # attempt to read R3 when the scheduler says it is due, every 12
+        # minutes.  if the read fails multiple times, make a single log
+        # message about enabling usb mode 3 then do not try it again.
         #
         # when the station is not in mode 3, attempts to read R3 leave
         # it in an uncommunicative state.  doing a reset, close, then open
@@ -538,22 +565,57 @@ class AcuRiteDriver(weewx.drivers.AbstractDevice):
         r3 = []
         if self.r3_fail_count >= self.r3_max_fail:
             return r3
-        if (self.last_r3 is None or
-            time.time() - self.last_r3 > self._R3_INTERVAL):
-            try:
-                x = station.read_x()
-                for i in range(17):
-                    r3.append(station.read_R3())
-                self.last_r3 = time.time()
-            except usb.USBError as e:
-                self.r3_fail_count += 1
-                log.debug("R3: read failed %d of %d: %s" %
-                          (self.r3_fail_count, self.r3_max_fail, e))
-                if self.r3_fail_count >= self.r3_max_fail:
-                    log.info("R3: put station in USB mode 3 to enable R3 data")
+        try:
+            x = station.read_x()
+            for i in range(17):
+                r3.append(station.read_R3())
+            self.last_r3 = time.time()
+        except usb.USBError as e:
+            r3 = []
+            self.r3_fail_count += 1
+            log.debug("R3: read failed %d of %d: %s" %
+                      (self.r3_fail_count, self.r3_max_fail, e))
+            if self.r3_fail_count >= self.r3_max_fail:
+                log.info("R3: put station in USB mode 3 to enable R3 data")
+                self.scheduler.remove('R3')
         return r3
 
 
+class ReadScheduler:
+    """Keep track of when each report is next due.
+
+    The console refreshes R1 every 18 seconds, R2 every 60 seconds, and R3
+    every 12 minutes.  Reading a report more often than that just returns the
+    same data.  Reports that come due within 'slack' seconds of each other are
+    read together, so that the driver wakes up once for all of them instead of
+    once for each.
+    """
+
+    def __init__(self, intervals, slack=0):
+        self.intervals = dict(intervals)
+        self.slack = slack
+        self.next_reads = dict((name, 0) for name in self.intervals)
+
+    def due(self, now):
+        """Return the names of the reports that should be read at time now."""
+        return sorted(name for name in self.next_reads
+                      if self.next_reads[name] <= now + self.slack)
+
+    def mark(self, name, now):
+        """Record that a report was read at time now.  A report that is no
+        longer scheduled stays that way."""
+        if name in self.next_reads:
+            self.next_reads[name] = now + self.intervals[name]
+
+    def remove(self, name):
+        """Stop scheduling a report."""
+        self.next_reads.pop(name, None)
+
+    def next_read(self):
+        """Return the time the next report comes due."""
+        return min(self.next_reads.values())
+
+
 class Station:
     # these identify the weather station on the USB
     VENDOR_ID = 0x24c0
@@ -0,0 +1,187 @@
+#
+#    Copyright (c) 2026 Tom Keffer <tkeffer@gmail.com>
+#
+#    See the file LICENSE.txt for your full rights.
+#
+"""Test the AcuRite driver against a fake USB backend"""
+import types
+import unittest
+from unittest.mock import patch
+
+import weewx.drivers.acurite
+from weewx.drivers.acurite import ReadScheduler
+
+
+class FakeUSBError(Exception):
+    """Stands in for usb.USBError"""
+
+
+# Canned reports, taken from the message maps in the driver documentation
+R1 = [0x01, 0xc0, 0x5c, 0x78, 0x00, 0x08, 0x1f, 0x53, 0x03, 0xff]
+R2 = [0x02, 0x00, 0x00, 0x80, 0x00, 0x00, 0x00, 0x04, 0x00, 0x10, 0x00, 0x00, 0x00,
+      0x09, 0x60, 0x01, 0x01, 0x01, 0x01, 0x00, 0x00, 0x08, 0x00, 0x80, 0x00]
+
+
+class FakeHandle:
+    """A handle to an open device. Counts the reports read from it."""
+
+    def __init__(self, fail_on=None, fail_r3=False):
+        self.reads = {1: 0, 2: 0, 3: 0}
+        self.released = False
+        # Raise an error on this R1 read (counting from 1)
+        self.fail_on = fail_on
+        # Raise an error on every R3 read, like a console that is not in USB mode 3
+        self.fail_r3 = fail_r3
+
+    def controlMsg(self, requestType, request, buffer, value, index, timeout):
+        report = value & 0xff
+        self.reads[report] += 1
+        if report == 1 and self.reads[1] == self.fail_on:
+            raise FakeUSBError("fake I/O error")
+        if report == 3 and self.fail_r3:
+            raise FakeUSBError("fake R3 error")
+        return {1: R1, 2: R2}[report]
+
+    def claimInterface(self, interface):
+        pass
+
+    def releaseInterface(self):
+        self.released = True
+
+    def detachKernelDriver(self, interface):
+        pass
+
+    def setConfiguration(self, configuration):
+        pass
+
+    def setAltInterface(self, interface):
+        pass
+
+
+class FakeDevice:
+    idVendor = weewx.drivers.acurite.Station.VENDOR_ID
+    idProduct = weewx.drivers.acurite.Station.PRODUCT_ID
+    filename = '002'
+    configurations = [None]
+
+    def __init__(self, handles):
+        self.handles = handles
+        self.opened = []
+
+    def open(self):
+        handle = self.handles[len(self.opened)]
+        self.opened.append(handle)
+        return handle
+
+
+class FakeUSB:
+    """Builds a replacement for the usb module, holding a single AcuRite console"""
+
+    def __init__(self, *handles):
+        self.device = FakeDevice(handles)
+        self.scans = 0
+        self.module = types.SimpleNamespace(USBError=FakeUSBError,
+                                            RECIP_INTERFACE=0x01,
+                                            TYPE_CLASS=0x20,
+                                            ENDPOINT_IN=0x80,
+                                            busses=self.busses)
+
+    def busses(self):
+        self.scans += 1
+        return [types.SimpleNamespace(dirname='001', devices=[self.device])]
+
+
+class FakeClock:
+    """Time that only advances when somebody sleeps"""
+
+    def __init__(self):
+        self.now = 1700000000.0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def get_packets(fake_usb, npackets, **stn_dict):
+    """Run the driver against the fake backend, returning the first npackets packets."""
+    clock = FakeClock()
+    with patch('weewx.drivers.acurite.usb', fake_usb.module), \
+            patch('weewx.drivers.acurite.time', clock):
+        driver = weewx.drivers.acurite.AcuRiteDriver(use_constants=False, **stn_dict)
+        packets = []
+        for packet in driver.genLoopPackets():
+            packets.append(packet)
+            if len(packets) >= npackets:
+                break
+        driver.closePort()
+    return packets
+
+
+class AcuRiteTest(unittest.TestCase):
+
+    def test_scheduler(self):
+        scheduler = ReadScheduler({'R1': 18, 'R2': 60}, slack=3)
+        self.assertEqual(scheduler.due(0), ['R1', 'R2'])
+        scheduler.mark('R1', 0)
+        scheduler.mark('R2', 0)
+        self.assertEqual(scheduler.due(10), [])
+        self.assertEqual(scheduler.next_read(), 18)
+        self.assertEqual(scheduler.due(16), ['R1'])
+        # R2 is close enough to be read along with R1
+        self.assertEqual(scheduler.due(57), ['R1', 'R2'])
+        scheduler.remove('R2')
+        self.assertEqual(scheduler.due(100), ['R1'])
+        # A report that has been removed is not scheduled again
+        scheduler.mark('R2', 100)
+        self.assertEqual(scheduler.due(1000), ['R1'])
+
+    def test_persistent_handle(self):
+        handle = FakeHandle()
+        fake_usb = FakeUSB(handle)
+        packets = get_packets(fake_usb, 4)
+
+        self.assertEqual(len(packets), 4)
+        # The bus is scanned, and the device opened, only once
+        self.assertEqual(fake_usb.scans, 1)
+        self.assertEqual(fake_usb.device.opened, [handle])
+        # R1 is read for every packet, R2 only at its own cadence. The last R2 read is
+        # coalesced with an R1 read.
+        self.assertEqual(handle.reads, {1: 4, 2: 2, 3: 0})
+        self.assertIn('outTemp', packets[0])
+        self.assertIn('pressure', packets[0])
+        self.assertNotIn('pressure', packets[1])
+        self.assertIn('pressure', packets[3])
+        self.assertTrue(handle.released)
+
+    def test_recover(self):
+        # The first handle fails on its second R1 read
+        bad_handle = FakeHandle(fail_on=2)
+        good_handle = FakeHandle()
+        fake_usb = FakeUSB(bad_handle, good_handle)
+        packets = get_packets(fake_usb, 3)
+
+        self.assertEqual(len(packets), 3)
+        # The failed handle was released, then the device was found and opened again
+        self.assertTrue(bad_handle.released)
+        self.assertEqual(fake_usb.scans, 2)
+        self.assertEqual(fake_usb.device.opened, [bad_handle, good_handle])
+        self.assertEqual(good_handle.reads, {1: 1, 2: 1, 3: 0})
+
+    def test_r3_backoff(self):
+        handle = FakeHandle(fail_r3=True)
+        fake_usb = FakeUSB(handle)
+        # Enough packets to span four R3 intervals
+        packets = get_packets(fake_usb, 200, enable_r3=1)
+
+        self.assertEqual(len(packets), 200)
+        # A failed R3 read does not close the device
+        self.assertEqual(fake_usb.scans, 1)
+        self.assertEqual(fake_usb.device.opened, [handle])
+        # R3 is tried once per interval, then given up after three failures
+        self.assertEqual(handle.reads[3], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
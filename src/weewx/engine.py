@@ -7,6 +7,7 @@
 """Main engine for the weewx weather system."""
 
 # Python imports
+import collections
 import gc
 import logging
 import math
@@ -16,6 +17,8 @@ import threading
 import time
 
 # weewx imports:
+import weedb
+import weedb.profile
 import weeutil.config
 import weeutil.logger
 import weeutil.weeutil
@@ -24,7 +27,7 @@ import weewx.manager
 import weewx.qc
 import weewx.station
 import weewx.units
-from weeutil.weeutil import to_bool, to_int, to_sorted_string
+from weeutil.weeutil import to_bool, to_float, to_int, to_sorted_string
 from weewx import all_service_groups
 
 log = logging.getLogger(__name__)
@@ -67,6 +70,16 @@ class StdEngine:
         # Whether to log events. This can be very verbose.
         self.log_events = to_bool(config_dict.get('log_events', False))
 
+        # If greater than zero, LOOP packets are read from the driver in a separate thread, and
+        # queued up to this many deep, while the services work on them.
+        self.loop_queue_size = to_int(config_dict.get('loop_queue_size', 0))
+        self.loop_reader = None
+
+        # Optionally, profile the SQL statements run by the services and the reports. This has to
+        # be turned on before any database connections get made.
+        if to_bool(config_dict.get('sql_profile', False)):
+            weedb.profile.enable(to_float(config_dict.get('slow_query_time')))
+
         # The callback dictionary:
         self.callbacks = dict()
 
@@ -79,6 +92,9 @@ class StdEngine:
         # Set up the device driver:
         self.setupStation(config_dict)
 
+        if self.loop_queue_size > 0:
+            self.loop_reader = LoopReader(self.console, self.loop_queue_size)
+
         # Set up information about the station
         self.stn_info = weewx.station.StationInfo(self.console, **config_dict['Station'])
 
@@ -201,18 +217,25 @@ class StdEngine:
                     # generate LOOP packets until some service breaks it by
                     # throwing an exception (usually when an archive period
                     # has passed).
-                    for packet in self.console.genLoopPackets():
+                    for packet, read_ts in self._gen_loop_packets():
                         # Package the packet as an event, then dispatch it.
-                        self.dispatchEvent(weewx.Event(weewx.NEW_LOOP_PACKET, packet=packet))
+                        self.dispatchEvent(weewx.Event(weewx.NEW_LOOP_PACKET, packet=packet,
+                                                       read_ts=read_ts))
 
                         # Allow services to break the loop by throwing
                         # an exception:
-                        self.dispatchEvent(weewx.Event(weewx.CHECK_LOOP, packet=packet))
+                        self.dispatchEvent(weewx.Event(weewx.CHECK_LOOP, packet=packet,
+                                                       read_ts=read_ts))
 
                     log.critical("Internal error. Packet loop has exited.")
 
                 except BreakLoop:
 
+                    # The console must be left alone by the reader thread while the services
+                    # interact with it.
+                    if self.loop_reader:
+                        self.loop_reader.stop()
+
                     # Send out an event saying the packet LOOP is done:
                     self.dispatchEvent(weewx.Event(weewx.POST_LOOP))
 
@@ -221,6 +244,16 @@ class StdEngine:
             log.info("Main loop exiting. Shutting engine down.")
             self.shutDown()
 
+    def _gen_loop_packets(self):
+        """Generate tuples (packet, read_ts), where read_ts is when the packet was read from the
+        driver. If there is a reader thread, the packets come from its queue."""
+        if self.loop_reader:
+            self.loop_reader.start()
+            yield from self.loop_reader.genLoopPackets()
+        else:
+            for packet in self.console.genLoopPackets():
+                yield packet, time.time()
+
     def bind(self, event_type, callback):
         """Binds an event to a callback function."""
 
@@ -254,6 +287,12 @@ class StdEngine:
             # Delete the actual service
             del self.service_obj[-1]
 
+        try:
+            if self.loop_reader:
+                self.loop_reader.stop()
+        except:
+            pass
+
         try:
             # Close the console:
             self.console.closePort()
@@ -295,6 +334,114 @@ class DummyEngine(StdEngine):
         self.console = DummyEngine.DummyConsole(config_dict)
 
 
+# ==============================================================================
+#                    Class LoopReader
+# ==============================================================================
+
+class LoopReader:
+    """Reads LOOP packets from a driver in a separate thread, and queues them up for the main
+    loop of the engine. A slow service then cannot hold up the driver.
+
+    The queue is bounded. If it fills up, the oldest packet is thrown away, and counted. Packets
+    still in the queue when the reader is stopped are yielded the next time around. An exception
+    raised by the driver is raised again in the thread that is consuming the packets, after any
+    packets read before it.
+    """
+
+    # When stopping the reader, how often to log that the driver has yet to return a packet.
+    stop_timeout = 60
+
+    def __init__(self, console, max_size):
+        self.console = console
+        self.max_size = max_size
+        # Holds tuples (packet, read_ts)
+        self.packets = collections.deque()
+        self.ready = threading.Condition()
+        self.stopping = threading.Event()
+        self.thread = None
+        self.finished = False
+        self.error = None
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.npackets = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self.latency_sum = 0.0
+        self.max_latency = 0.0
+
+    def start(self):
+        """Start reading packets in a new thread."""
+        self.stopping.clear()
+        self.finished = False
+        self.error = None
+        self.thread = threading.Thread(target=self._read, name='LoopReader', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop reading packets. This waits for the driver to return the packet it is
+        working on, however long that takes. Some drivers take a minute or more to return a
+        packet. That is not an error, and the console cannot be used until it has."""
+        if self.thread is None:
+            return
+        self.stopping.set()
+        start_ts = time.time()
+        self.thread.join(self.stop_timeout)
+        while self.thread.is_alive():
+            log.warning("LOOP reader: still waiting for the driver to return a packet "
+                        "after %.0f seconds", time.time() - start_ts)
+            self.thread.join(self.stop_timeout)
+        self.thread = None
+        self._log_stats()
+
+    def _read(self):
+        """Runs in the reader thread."""
+        generator = self.console.genLoopPackets()
+        try:
+            for packet in generator:
+                with self.ready:
+                    if len(self.packets) >= self.max_size:
+                        self.packets.popleft()
+                        self.dropped += 1
+                    self.packets.append((packet, time.time()))
+                    self.max_depth = max(self.max_depth, len(self.packets))
+                    self.ready.notify()
+                if self.stopping.is_set():
+                    break
+        except Exception as e:
+            self.error = e
+        finally:
+            generator.close()
+            with self.ready:
+                self.finished = True
+                self.ready.notify()
+
+    def genLoopPackets(self):
+        """Generate tuples (packet, read_ts) from the queue, until the reader stops."""
+        while True:
+            with self.ready:
+                while not self.packets and not self.finished:
+                    self.ready.wait()
+                if not self.packets:
+                    break
+                packet, read_ts = self.packets.popleft()
+            latency = time.time() - read_ts
+            self.npackets += 1
+            self.latency_sum += latency
+            self.max_latency = max(self.max_latency, latency)
+            yield packet, read_ts
+        if self.error is not None:
+            raise self.error
+
+    def _log_stats(self):
+        if self.npackets:
+            log_fn = log.warning if self.dropped else log.debug
+            log_fn("LOOP reader: %d packets, %d dropped; queue depth max %d; "
+                   "latency avg %.3f max %.3f seconds", self.npackets, self.dropped,
+                   self.max_depth, self.latency_sum / self.npackets, self.max_latency)
+        self._reset_stats()
+
+
 # ==============================================================================
 #                    Class StdService
 # ==============================================================================
@@ -526,6 +673,7 @@ class StdArchive(StdService):
         self.data_binding = archive_dict.get('data_binding', 'wx_binding')
         self.record_generation = archive_dict.get('record_generation', 'hardware').lower()
         self.no_catchup = to_bool(archive_dict.get('no_catchup', False))
+        self.catchup_batch_size = to_int(archive_dict.get('catchup_batch_size', 0))
         self.archive_delay = to_int(archive_dict.get('archive_delay', 15))
         software_interval = to_int(archive_dict.get('archive_interval', 300))
         self.loop_hilo = to_bool(archive_dict.get('loop_hilo', True))
@@ -700,6 +848,19 @@ class StdArchive(StdService):
             self.old_accumulator.augmentRecord(event.record)
 
         dbmanager = self.engine.db_binder.get_manager(self.data_binding)
+
+        # Records from a batched catch-up are written in groups. The manager writes out what it
+        # is holding back as soon as anything queries the database, such as a service
+        # calculating ET for the next record, so that nobody misses them.
+        if getattr(event, 'catchup', False):
+            dbmanager.defer_records(event.record,
+                                    log_success=self.log_success,
+                                    log_failure=self.log_failure)
+            if len(dbmanager.deferred_records) >= self.catchup_batch_size:
+                dbmanager.flush_deferred()
+            return
+
+        # Anything left over from a catch-up goes in first. addRecord() takes care of that.
         dbmanager.addRecord(event.record,
                             accumulator=self.old_accumulator,
                             log_success=self.log_success,
@@ -709,12 +870,21 @@ class StdArchive(StdService):
         """Pull any unarchived records off the console and archive them.
         
         If the hardware does not support hardware archives, an exception of
-        type NotImplementedError will be thrown."""
+        type NotImplementedError will be thrown.
+
+        If option catchup_batch_size is greater than one, all but the last record are dispatched
+        with the event attribute 'catchup' set to True. They are written to the database in
+        groups of up to that size, and uploaders ignore them. A group is cut short whenever a
+        service queries the database. The last record is dispatched as usual, after the rest are
+        in the database."""
 
         dbmanager = self.engine.db_binder.get_manager(self.data_binding)
         # Find out when the database was last updated.
         lastgood_ts = dbmanager.lastGoodStamp()
 
+        batched = self.catchup_batch_size > 1
+        # When batching, each record is held back until we know whether it is the last one.
+        held_record = None
         try:
             # Now ask the console for any new records since then. Not all
             # consoles support this feature. Note that for some consoles,
@@ -725,14 +895,31 @@ class StdArchive(StdService):
             for record in generator(lastgood_ts):
                 ts = record.get('dateTime')
                 if ts and ts < time.time() + self.archive_delay:
-                    self.engine.dispatchEvent(weewx.Event(weewx.NEW_ARCHIVE_RECORD,
-                                                          record=record,
-                                                          origin='hardware'))
+                    if not batched:
+                        self.engine.dispatchEvent(weewx.Event(weewx.NEW_ARCHIVE_RECORD,
+                                                              record=record,
+                                                              origin='hardware'))
+                        continue
+                    if held_record is not None:
+                        self.engine.dispatchEvent(weewx.Event(weewx.NEW_ARCHIVE_RECORD,
+                                                              record=held_record,
+                                                              origin='hardware',
+                                                              catchup=True))
+                    held_record = record
                 else:
                     log.warning("Ignore historical record: %s" % record)
         except weewx.HardwareError as e:
             log.error("Internal error detected. Catchup abandoned")
             log.error("**** %s" % e)
+        finally:
+            # Write whatever has been collected, even if the catch-up failed. If an exception is
+            # on its way up, any record still held back will be picked up by the next catch-up.
+            dbmanager.flush_deferred()
+
+        if held_record is not None:
+            self.engine.dispatchEvent(weewx.Event(weewx.NEW_ARCHIVE_RECORD,
+                                                  record=held_record,
+                                                  origin='hardware'))
 
     def _software_catchup(self):
         # Extract a record out of the old accumulator. 
@@ -754,6 +941,101 @@ class StdArchive(StdService):
         return new_accumulator
 
 
+# ==============================================================================
+#                    Class StdLoopArchive
+# ==============================================================================
+
+class StdLoopArchive(StdService):
+    """Service that saves LOOP packets in a database of their own.
+
+    Packets are held in memory, and written out every write_interval seconds, in a single
+    transaction. Only the types in the schema of the database are kept. Packets older than
+    max_age seconds are purged from the database, but the daily summaries built from them are
+    kept.
+    """
+
+    def __init__(self, engine, config_dict):
+        super().__init__(engine, config_dict)
+
+        loop_dict = config_dict.get('StdLoopArchive', {})
+        self.data_binding = loop_dict.get('data_binding', 'loop_binding')
+        self.write_interval = to_int(loop_dict.get('write_interval', 60))
+        self.max_age = to_int(loop_dict.get('max_age', 2592000))
+        self.max_interval = to_int(loop_dict.get('max_interval', 60))
+        self.purge_interval = to_int(loop_dict.get('purge_interval', 3600))
+        self.log_success = to_bool(weeutil.config.search_up(loop_dict, 'log_success', True))
+        self.log_failure = to_bool(weeutil.config.search_up(loop_dict, 'log_failure', True))
+
+        # In case the binding is missing from the configuration file
+        self.engine.db_binder.set_binding_defaults(self.data_binding, {
+            'database': 'loop_sqlite',
+            'table_name': 'loop',
+            'manager': 'weewx.manager.DaySummaryManager',
+            'schema': 'weewx.schemas.loop.schema'})
+
+        # Packets waiting to be written
+        self.packets = []
+        # The types that can be saved
+        self.sqlkeys = None
+        # Timestamp of the last packet accepted
+        self.last_ts = None
+        # Time of the last purge
+        self.last_purge_ts = None
+
+        self.bind(weewx.STARTUP, self.startup)
+        self.bind(weewx.NEW_LOOP_PACKET, self.new_loop_packet)
+
+    def startup(self, _event):
+        # This will create the database if it doesn't exist:
+        dbmanager = self.engine.db_binder.get_manager(self.data_binding, initialize=True)
+        log.info("LOOP packets will be saved using binding '%s' to database '%s'",
+                 self.data_binding, dbmanager.database_name)
+        self.sqlkeys = set(dbmanager.sqlkeys)
+        self.last_ts = dbmanager.last_timestamp
+
+    def new_loop_packet(self, event):
+        """Trim the packet down to the types that can be saved, then queue it up."""
+        if self.sqlkeys is None or event.packet.get('dateTime') is None:
+            return
+        timestamp = int(event.packet['dateTime'])
+        # Some stations emit more than one packet a second. Keep only the first.
+        if self.last_ts is not None and timestamp <= self.last_ts:
+            return
+        gap = timestamp - self.last_ts if self.last_ts is not None else self.max_interval
+        record = {obs_type: event.packet[obs_type] for obs_type in event.packet
+                  if obs_type in self.sqlkeys}
+        record['dateTime'] = timestamp
+        record['interval'] = min(gap, self.max_interval) / 60.0
+        self.packets.append(record)
+        self.last_ts = timestamp
+
+        if timestamp - self.packets[0]['dateTime'] >= self.write_interval:
+            self._flush(timestamp)
+
+    def _flush(self, now):
+        """Write out the held packets, then purge the old ones if it is time."""
+        if not self.packets:
+            return
+        records, self.packets = self.packets, []
+        dbmanager = self.engine.db_binder.get_manager(self.data_binding)
+        dbmanager.addRecord(records, log_success=False, log_failure=self.log_failure)
+        log.debug("Saved %d LOOP packets", len(records))
+
+        if self.max_age and (self.last_purge_ts is None
+                             or now - self.last_purge_ts >= self.purge_interval):
+            N = dbmanager.purge_records(now - self.max_age)
+            self.last_purge_ts = now
+            if N and self.log_success:
+                log.info("Purged %d LOOP packets older than %s", N,
+                         weeutil.weeutil.timestamp_to_string(now - self.max_age))
+
+    def shutDown(self):
+        try:
+            self._flush(self.last_ts)
+        except weedb.DatabaseError as e:
+            log.error("Unable to save LOOP packets: %s", e)
+
+
 # ==============================================================================
 #                    Class StdTimeSynch
 # ==============================================================================
@@ -900,3 +1182,5 @@ class StdReport(StdService):
                 log.debug("StdReport thread has been terminated")
         self.thread = None
         self.launch_time = None
+        # Close the database connections held for the reports.
+        weewx.manager.manager_pool.close()
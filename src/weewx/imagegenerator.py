@@ -6,9 +6,13 @@
 """Generate images for up to an effective date.
 Should probably be refactored into smaller functions."""
 
+import array
 import datetime
+import json
 import logging
+import multiprocessing
 import os.path
+import sys
 import time
 
 import weeplot.genplot
@@ -18,7 +22,7 @@ import weeutil.weeutil
 import weewx.reportengine
 import weewx.units
 import weewx.xtypes
-from weeutil.config import search_up, accumulateLeaves
+from weeutil.config import search_up, deep_copy, LeafCache
 from weeutil.weeutil import to_bool, to_int, to_float, TimeSpan
 from weewx.units import ValueTuple
 
@@ -32,6 +36,10 @@ log = logging.getLogger(__name__)
 class ImageGenerator(weewx.reportengine.ReportGenerator):
     """Class for managing the image generator."""
 
+    # The extension of the files generated, and what they are called in the log
+    extension = 'png'
+    product = 'images'
+
     def run(self):
         self.setup()
         self.gen_images(self.gen_ts)
@@ -47,6 +55,8 @@ class ImageGenerator(weewx.reportengine.ReportGenerator):
         self.image_dict = self.skin_dict['ImageGenerator']
         self.formatter = weewx.units.Formatter.fromSkinDict(self.skin_dict)
         self.converter = weewx.units.Converter.fromSkinDict(self.skin_dict)
+        # Options accumulated from each section of image_dict
+        self.leaf_cache = LeafCache()
         # ensure that the skin_dir is in the image_dict
         self.image_dict['skin_dir'] = os.path.join(
             self.config_dict['WEEWX_ROOT'],
@@ -65,11 +75,42 @@ class ImageGenerator(weewx.reportengine.ReportGenerator):
                 record in the database.]
         """
         t1 = time.time()
-        ngen = 0
 
         # determine how much logging is desired
         log_success = to_bool(search_up(self.image_dict, 'log_success', True))
 
+        tasks = list(self.gen_tasks(gen_ts))
+
+        # Rendering can optionally be spread over several processes
+        workers = min(to_int(self.image_dict.get('workers', 0)) or 0, len(tasks))
+
+        if workers > 1:
+            ngen = self.render_in_workers(tasks, workers)
+        else:
+            ngen = sum(self.render_plot(*task) for task in tasks)
+
+        t2 = time.time()
+
+        if log_success:
+            if workers > 1:
+                log.info("Generated %d %s for report %s in %.2f seconds using %d workers",
+                         ngen, self.product, self.skin_dict['REPORT_NAME'], t2 - t1, workers)
+            else:
+                log.info("Generated %d %s for report %s in %.2f seconds",
+                         ngen, self.product,
+                         self.skin_dict['REPORT_NAME'], t2 - t1)
+
+    def gen_tasks(self, gen_ts):
+        """Generator function that yields the plots that need to be generated.
+
+        Args:
+            gen_ts (int|None): The time around which plots are to be generated, or None to use
+                the time of the last record in the database.
+
+        Yields:
+            tuple: A 4-way tuple (timespan, plotname, plotgen_ts, img_file), suitable for passing
+                on to render_plot().
+        """
         # Loop over each time span class (day, week, month, etc.):
         for timespan in self.image_dict.sections:
 
@@ -77,7 +118,7 @@ class ImageGenerator(weewx.reportengine.ReportGenerator):
             for plotname in self.image_dict[timespan].sections:
 
                 # Accumulate all options from parent nodes:
-                plot_options = accumulateLeaves(self.image_dict[timespan][plotname])
+                plot_options = self.leaf_cache.accumulate(self.image_dict[timespan][plotname])
 
                 plotgen_ts = gen_ts
                 if not plotgen_ts:
@@ -90,42 +131,86 @@ class ImageGenerator(weewx.reportengine.ReportGenerator):
                 image_root = os.path.join(self.config_dict['WEEWX_ROOT'],
                                           plot_options['HTML_ROOT'])
                 # Get the path that the image is going to be saved to:
-                img_file = os.path.join(image_root, '%s.png' % plotname)
+                img_file = os.path.join(image_root, '%s.%s' % (plotname, self.extension))
 
                 # Check whether this plot needs to be done at all:
                 if _skip_this_plot(plotgen_ts, plot_options, img_file):
                     continue
 
-                # Generate the plot.
-                plot = self.gen_plot(plotgen_ts,
-                                     plot_options,
-                                     self.image_dict[timespan][plotname])
-
-                # 'plot' will be None if skip_if_empty was truthy, and the plot contains no data
-                if plot:
-                    # We have a valid plot. Render it onto an image
-                    image = plot.render()
-
-                    # Create the subdirectory that the image is to be put in. Wrap in a try block
-                    # in case it already exists.
-                    try:
-                        os.makedirs(os.path.dirname(img_file))
-                    except OSError:
-                        pass
-
-                    try:
-                        # Now save the image
-                        image.save(img_file)
-                        ngen += 1
-                    except IOError as e:
-                        log.error("Unable to save to file '%s' %s:", img_file, e)
+                yield timespan, plotname, plotgen_ts, img_file
 
-        t2 = time.time()
+    def render_plot(self, timespan, plotname, plotgen_ts, img_file):
+        """Generate a plot, render it, then save it.
 
-        if log_success:
-            log.info("Generated %d images for report %s in %.2f seconds",
-                     ngen,
-                     self.skin_dict['REPORT_NAME'], t2 - t1)
+        Returns:
+            bool: True if an image was saved.
+        """
+        plot_options = self.leaf_cache.accumulate(self.image_dict[timespan][plotname])
+
+        # Generate the plot.
+        plot = self.gen_plot(plotgen_ts,
+                             plot_options,
+                             self.image_dict[timespan][plotname])
+
+        # 'plot' will be None if skip_if_empty was truthy, and the plot contains no data
+        if not plot:
+            return False
+
+        # We have a valid plot. Render it onto an image
+        image = plot.render()
+
+        # Create the subdirectory that the image is to be put in. Wrap in a try block
+        # in case it already exists.
+        try:
+            os.makedirs(os.path.dirname(img_file))
+        except OSError:
+            pass
+
+        # Save the image under a temporary name, then move it into place, so a web server
+        # never sees a partially written file.
+        tmp_file = '%s.%d.tmp' % (img_file, os.getpid())
+        try:
+            image.save(tmp_file, format='PNG')
+            os.replace(tmp_file, img_file)
+        except IOError as e:
+            log.error("Unable to save to file '%s' %s:", img_file, e)
+            try:
+                os.remove(tmp_file)
+            except OSError:
+                pass
+            return False
+        return True
+
+    def render_in_workers(self, tasks, workers):
+        """Render plots in a pool of worker processes. Each worker has its own connections to
+        the databases.
+
+        Args:
+            tasks (list[tuple]): The plots to render, as yielded by gen_tasks().
+            workers (int): How many processes to use.
+
+        Returns:
+            int: The number of files saved.
+        """
+        # The workers are started afresh, rather than forked. Forking a process that is running
+        # other threads, such as weewxd, can leave a lock held in the child by a thread that
+        # does not exist there. Because nothing is inherited, each worker sets up logging and
+        # the xtypes system for itself.
+        context = multiprocessing.get_context('spawn')
+        pool = context.Pool(workers, _init_worker,
+                            (type(self), self.config_dict, self.skin_dict, self.gen_ts,
+                             self.first_run, self.stn_info, self.record,
+                             weeutil.logger.log_label))
+        try:
+            ngen = sum(pool.imap_unordered(_render_in_worker, tasks))
+        except BaseException:
+            pool.terminate()
+            raise
+        else:
+            pool.close()
+        finally:
+            pool.join()
+        return ngen
 
     def gen_plot(self, plotgen_ts, plot_options, plot_dict):
         """Generate a single plot image.
@@ -147,26 +232,14 @@ class ImageGenerator(weewx.reportengine.ReportGenerator):
         # Create a new instance of a time plot and start adding to it
         plot = weeplot.genplot.TimePlot(plot_options)
 
-        time_length = weeutil.weeutil.nominal_spans(plot_options.get('time_length', 86400))
-        # Calculate a suitable min, max time for the requested time.
-        minstamp, maxstamp, timeinc = weeplot.utilities.scaletime(plotgen_ts - time_length,
-                                                                  plotgen_ts)
-        x_domain = weeutil.weeutil.TimeSpan(minstamp, maxstamp)
-
-        # Override the x interval if the user has given an explicit interval:
-        timeinc_user = to_int(weeutil.weeutil.nominal_spans(plot_options.get('x_interval')))
-        if timeinc_user is not None:
-            timeinc = timeinc_user
+        x_domain, timeinc = get_x_domain(plotgen_ts, plot_options)
         plot.setXScaling((x_domain.start, x_domain.stop, timeinc))
 
         # Set the y-scaling, using any user-supplied hints:
         yscale = plot_options.get('yscale', ['None', 'None', 'None'])
         plot.setYScaling(weeutil.weeutil.convertToFloat(yscale))
 
-        # Get a suitable bottom label:
-        bottom_label_format = plot_options.get('bottom_label_format', '%m/%d/%y %H:%M')
-        bottom_label = time.strftime(bottom_label_format, time.localtime(plotgen_ts))
-        plot.setBottomLabel(bottom_label)
+        plot.setBottomLabel(get_bottom_label(plotgen_ts, plot_options))
 
         # Set day/night display
         plot.setLocation(self.stn_info.latitude_f, self.stn_info.longitude_f)
@@ -178,18 +251,47 @@ class ImageGenerator(weewx.reportengine.ReportGenerator):
                          weeplot.utilities.tobgr(plot_options.get('daynight_edge_color',
                                                                   '0xefefef')))
 
+        have_data, lines = self.gen_lines(plotgen_ts, plot_options, plot_dict, x_domain,
+                                          plot.getPixelGrid())
+
+        for line_name, line, unit_label in lines:
+            # NB: all unit labels will get overwritten except the last.
+            plot.setUnitLabel(unit_label)
+            plot.addLine(line)
+
+        # Return the constructed plot if it has any non-null data, otherwise return None
+        return plot if have_data else None
+
+    def gen_lines(self, plotgen_ts, plot_options, plot_dict, x_domain, pixel_grid=None):
+        """Fetch the data for each line in a plot.
+
+        Args:
+            plotgen_ts (float): A timestamp for which the plot will be valid.
+            plot_options (dict): A dictionary of plot options.
+            plot_dict (configobj.Section): The section holding the plot. Each subsection is a line.
+            x_domain (TimeSpan): The time domain of the plot.
+            pixel_grid (tuple|None): The pixel columns of the plot, as returned by
+                weeplot.genplot.GeneralPlot.getPixelGrid(). Used to thin out long lines. If None,
+                it is estimated from the image width.
+
+        Returns:
+            tuple: A 2-way tuple. The first element is True if any line has non-null data. The
+                second is a list of 3-way tuples (line_name, line, unit_label), where line is an
+                instance of weeplot.genplot.PlotLine, with data converted to the requested units.
+        """
         # Calculate the domain over which we should check for non-null data. It will be
         # 'None' if we are not to do the check at all.
         check_domain = _get_check_domain(plot_options.get('skip_if_empty', False), x_domain)
 
         # Set to True if we have _any_ data for the plot
         have_data = False
+        lines = []
 
         # Loop over each line to be added to the plot.
         for line_name in plot_dict.sections:
 
             # Accumulate options from parent nodes.
-            line_options = accumulateLeaves(plot_dict[line_name])
+            line_options = self.leaf_cache.accumulate(plot_dict[line_name])
 
             # See what observation type to use for this line. By default, use the section
             # name.
@@ -266,12 +368,11 @@ class ImageGenerator(weewx.reportengine.ReportGenerator):
                 # No override. Convert to whatever the unit group specified.
                 new_data_vec_t = self.converter.convert(data_vec_t)
 
-            # Add a unit label. NB: all will get overwritten except the last. Get the label
-            # from the configuration dictionary.
+            # Get a unit label from the configuration dictionary.
             unit_label = line_options.get(
                 'y_label', self.formatter.get_label_string(new_data_vec_t[1]))
             # Strip off any leading and trailing whitespace so it's easy to center
-            plot.setUnitLabel(unit_label.strip())
+            unit_label = unit_label.strip()
 
             # See if a line label has been explicitly requested:
             label = line_options.get('label')
@@ -320,23 +421,323 @@ class ImageGenerator(weewx.reportengine.ReportGenerator):
             marker_type = line_options.get('marker_type')
             marker_size = to_int(line_options.get('marker_size', 8))
 
-            # Add the line to the emerging plot:
-            plot.addLine(weeplot.genplot.PlotLine(
-                stop_vec_t[0], new_data_vec_t[0],
-                label=label,
-                color=color,
-                fill_color=fill_color,
-                width=width,
-                plot_type=plot_type,
-                line_type=line_type,
-                marker_type=marker_type,
-                marker_size=marker_size,
-                bar_width=interval_vec,
-                vector_rotate=vector_rotate,
-                line_gap_fraction=line_gap_fraction))
+            x_vec, y_vec = stop_vec_t[0], new_data_vec_t[0]
+            if plot_type == 'line':
+                # Long lines can be thinned out before they are drawn
+                x_vec, y_vec, line_gap_fraction = _downsample(line_options, x_vec, y_vec,
+                                                              x_domain, line_gap_fraction,
+                                                              pixel_grid)
+
+            lines.append((line_name,
+                          weeplot.genplot.PlotLine(
+                              x_vec, y_vec,
+                              label=label,
+                              color=color,
+                              fill_color=fill_color,
+                              width=width,
+                              plot_type=plot_type,
+                              line_type=line_type,
+                              marker_type=marker_type,
+                              marker_size=marker_size,
+                              bar_width=interval_vec,
+                              vector_rotate=vector_rotate,
+                              line_gap_fraction=line_gap_fraction),
+                          unit_label))
+
+        return have_data, lines
 
-        # Return the constructed plot if it has any non-null data, otherwise return None
-        return plot if have_data else None
+
+# =============================================================================
+#                    Class ChartDataGenerator
+# =============================================================================
+
+class ChartDataGenerator(ImageGenerator):
+    """Class for writing the data behind each plot in [ImageGenerator] to a file, so it can be
+    drawn by a chart library in a browser, rather than as an image.
+
+    For each plot, a JSON file is written. It holds the scaling, labels, and line options of the
+    plot, and the data of each line. Long lines are thinned out, keeping the minimum and maximum
+    of each slice of time, so they look the same when drawn at the width of the plot. If
+    option chart_data_format is 'binary', the data go in a companion file of typed arrays.
+    """
+
+    extension = 'json'
+    product = 'chart data files'
+
+    def render_plot(self, timespan, plotname, plotgen_ts, data_file):
+        """Gather the data for a plot, then save it.
+
+        Returns:
+            bool: True if a data file was saved.
+        """
+        plot_dict = self.image_dict[timespan][plotname]
+        plot_options = self.leaf_cache.accumulate(plot_dict)
+
+        x_domain, timeinc = get_x_domain(plotgen_ts, plot_options)
+        have_data, lines = self.gen_lines(plotgen_ts, plot_options, plot_dict, x_domain)
+
+        # Nothing to do if skip_if_empty was truthy, and the plot contains no data
+        if not have_data:
+            return False
+
+        data_format = plot_options.get('chart_data_format', 'json').lower()
+        if data_format not in ('json', 'binary'):
+            log.error("Unknown chart data format '%s'. Using 'json'", data_format)
+            data_format = 'json'
+        # By default, keep enough points for up to four per horizontal pixel
+        max_points = to_int(plot_options.get('chart_max_points')) \
+                     or 4 * to_int(plot_options.get('image_width', 300))
+
+        color_list = [weeplot.utilities.tobgr(v) for v in weeutil.weeutil.option_as_list(
+            plot_options.get('chart_line_colors', ['0xff0000', '0x00ff00', '0x0000ff']))]
+        fill_color_list = [weeplot.utilities.tobgr(v) for v in weeutil.weeutil.option_as_list(
+            plot_options.get('chart_fill_colors', color_list))]
+
+        chart = {
+            'name': plotname,
+            'generated': int(plotgen_ts),
+            'x_domain': [x_domain.start, x_domain.stop],
+            'x_interval': timeinc,
+            'yscale': weeutil.weeutil.convertToFloat(
+                plot_options.get('yscale', ['None', 'None', 'None'])),
+            'unit_label': lines[-1][2] if lines else None,
+            'bottom_label': get_bottom_label(plotgen_ts, plot_options),
+            'lines': [],
+        }
+        # Each array to be saved, along with its typecode
+        arrays = []
+
+        for iline, (line_name, line, unit_label) in enumerate(lines):
+            color = color_list[iline % len(color_list)] if line.color is None else line.color
+            fill_color = fill_color_list[iline % len(fill_color_list)] \
+                if line.fill_color is None else line.fill_color
+            maxdx = None
+            if line.line_gap_fraction is not None:
+                maxdx = line.line_gap_fraction * (x_domain.stop - x_domain.start)
+
+            line_data = {
+                'name': line_name,
+                'label': line.label,
+                'plot_type': line.plot_type,
+                'unit_label': unit_label,
+                'color': weeplot.genplot.int2rgbstr(color),
+                'fill_color': weeplot.genplot.int2rgbstr(fill_color),
+                'width': line.width,
+                'line_type': line.line_type,
+                'marker_type': line.marker_type,
+                'marker_size': line.marker_size,
+                'line_gap': maxdx,
+            }
+
+            x, y = line.x, line.y
+            if line.plot_type == 'line' and len(x) > max_points:
+                x, y = weeplot.utilities.minmax_downsample(x, y, max(max_points // 4, 1),
+                                                           (x_domain.start, x_domain.stop),
+                                                           maxdx)
+            series = [('x', 'd', x)]
+            if line.plot_type == 'vector':
+                line_data['vector_rotate'] = line.vector_rotate
+                series += [('u', 'f', [None if v is None else v.real for v in y]),
+                           ('v', 'f', [None if v is None else v.imag for v in y])]
+            else:
+                series += [('y', 'f', y)]
+            if line.bar_width is not None:
+                series += [('bar_width', 'f', line.bar_width)]
+
+            for key, typecode, values in series:
+                if data_format == 'binary':
+                    line_data[key] = {'type': _TYPE_NAMES[typecode], 'length': len(values)}
+                    arrays.append((line_data[key], typecode, values))
+                else:
+                    line_data[key] = list(values)
+
+            chart['lines'].append(line_data)
+
+        try:
+            os.makedirs(os.path.dirname(data_file))
+        except OSError:
+            pass
+
+        try:
+            if data_format == 'binary':
+                bin_file = os.path.splitext(data_file)[0] + '.bin'
+                chart['data_file'] = os.path.basename(bin_file)
+                _save_file(bin_file, _encode_arrays(arrays))
+            _save_file(data_file,
+                       json.dumps(chart, separators=(',', ':'), allow_nan=False).encode('utf-8'))
+        except (IOError, ValueError) as e:
+            log.error("Unable to save to file '%s' %s:", data_file, e)
+            return False
+        return True
+
+
+# The names by which a browser knows the typed arrays
+_TYPE_NAMES = {'d': 'Float64Array', 'f': 'Float32Array'}
+
+
+def _encode_arrays(arrays):
+    """Pack arrays into a block of little-endian bytes. Nulls become NaN.
+
+    Args:
+        arrays (list[tuple]): A list of 3-way tuples (meta, typecode, values). The byte offset of
+            each array is saved in meta['offset']. Offsets are aligned, so the block can be
+            viewed directly as typed arrays.
+
+    Returns:
+        bytes: The packed arrays.
+    """
+    nan = float('nan')
+    data = bytearray()
+    for meta, typecode, values in arrays:
+        arr = array.array(typecode, (nan if v is None else v for v in values))
+        if sys.byteorder != 'little':
+            arr.byteswap()
+        data.extend(b'\0' * (-len(data) % arr.itemsize))
+        meta['offset'] = len(data)
+        data.extend(arr.tobytes())
+    return bytes(data)
+
+
+def _save_file(path, data):
+    """Save data under a temporary name, then move it into place, so a web server never sees a
+    partially written file."""
+    tmp_file = '%s.%d.tmp' % (path, os.getpid())
+    try:
+        with open(tmp_file, 'wb') as fd:
+            fd.write(data)
+        os.replace(tmp_file, path)
+    except IOError:
+        try:
+            os.remove(tmp_file)
+        except OSError:
+            pass
+        raise
+
+
+def _downsample(line_options, x, y, x_domain, line_gap_fraction, pixel_grid=None):
+    """Thin out the points of a line, if option 'downsample' asks for it.
+
+    Args:
+        line_options (dict): The options of the line.
+        x (list[float]): The x coordinates of the line.
+        y (list[float|None]): The y coordinates of the line.
+        x_domain (TimeSpan): The time domain of the plot.
+        line_gap_fraction (float|None): The gap in x that breaks the line, as a fraction of the
+            domain.
+        pixel_grid (tuple|None): A 3-way tuple (x0, dx, ncolumns) with the pixel columns of the
+            plot. If None, the columns are assumed to span the domain and the image width.
+
+    Returns:
+        tuple: A 3-way tuple (x, y, line_gap_fraction). If the line was thinned out, any breaks
+            are marked by nulls in y, and line_gap_fraction is returned as None.
+    """
+    method = line_options.get('downsample', 'none').lower()
+    if method in ('', 'none'):
+        return x, y, line_gap_fraction
+    if method not in ('minmax', 'lttb'):
+        log.error("Unknown downsample method '%s'. Ignored", method)
+        return x, y, line_gap_fraction
+
+    if pixel_grid:
+        x0, dx, pixels = pixel_grid
+        x_range = (x0, x0 + pixels * dx)
+    else:
+        # The width of the image in pixels, as it is drawn, before it is reduced by anti-aliasing
+        pixels = to_int(line_options.get('image_width', 300)) \
+                 * to_int(line_options.get('anti_alias', 1))
+        x_range = (x_domain.start, x_domain.stop)
+    maxdx = None
+    if line_gap_fraction is not None:
+        maxdx = line_gap_fraction * (x_domain.stop - x_domain.start)
+
+    if method == 'minmax':
+        # Keeping the extremes of each pixel column draws exactly the same line, but only if
+        # the line is one pixel wide. Wider lines are drawn as polygons, whose edges depend on
+        # the points in between. For them, use narrower buckets.
+        width = (to_int(line_options.get('width'))
+                 or max(to_int(v) for v in weeutil.weeutil.option_as_list(
+                    line_options.get('chart_line_width', 1)))) \
+                * to_int(line_options.get('anti_alias', 1))
+        if width > 1:
+            pixels *= 4 * width
+        # Min/max keeps up to four points per bucket
+        if len(x) <= 4 * pixels:
+            return x, y, line_gap_fraction
+        x, y = weeplot.utilities.minmax_downsample(x, y, pixels, x_range, maxdx)
+    elif len(x) > 2 * pixels:
+        # LTTB keeps two points per pixel column
+        x, y = weeplot.utilities.lttb_downsample(x, y, 2 * pixels, x_range, maxdx)
+    else:
+        return x, y, line_gap_fraction
+    return x, y, None
+
+
+def get_x_domain(plotgen_ts, plot_options):
+    """Calculate the time domain of a plot.
+
+    Args:
+        plotgen_ts (float): A timestamp for which the plot will be valid.
+        plot_options (dict): A dictionary of plot options.
+
+    Returns:
+        tuple: A 2-way tuple (x_domain, timeinc). The first is a TimeSpan with nice beginning and
+            ending times, the second the interval between tick marks.
+    """
+    time_length = weeutil.weeutil.nominal_spans(plot_options.get('time_length', 86400))
+    # Calculate a suitable min, max time for the requested time.
+    minstamp, maxstamp, timeinc = weeplot.utilities.scaletime(plotgen_ts - time_length,
+                                                              plotgen_ts)
+    x_domain = TimeSpan(minstamp, maxstamp)
+
+    # Override the x interval if the user has given an explicit interval:
+    timeinc_user = to_int(weeutil.weeutil.nominal_spans(plot_options.get('x_interval')))
+    if timeinc_user is not None:
+        timeinc = timeinc_user
+    return x_domain, timeinc
+
+
+def get_bottom_label(plotgen_ts, plot_options):
+    """Format the time of a plot, for use as its bottom label."""
+    bottom_label_format = plot_options.get('bottom_label_format', '%m/%d/%y %H:%M')
+    return time.strftime(bottom_label_format, time.localtime(plotgen_ts))
+
+
+# The generator used by a worker process, and the engine holding its xtypes services
+_worker_generator = None
+_worker_engine = None
+
+
+def _init_worker(generator_class, config_dict, skin_dict, gen_ts, first_run, stn_info, record,
+                 log_label):
+    """Set up a worker process. It gets its own generator, with its own database connections.
+    Because the worker starts afresh, it loads the user extensions and the services in
+    'xtype_services' again, so that the same types are available as in the parent."""
+    global _worker_generator, _worker_engine
+    import weeutil.startup
+    import weewx.engine
+
+    if log_label:
+        weeutil.logger.setup(log_label, config_dict)
+    if 'WEEWX_ROOT' in config_dict:
+        weeutil.startup.initialize(config_dict)
+
+    # Load only the xtypes services. The rest of the engine's services have no business in a
+    # worker.
+    if 'Engine' in config_dict:
+        engine_dict = deep_copy(config_dict)
+        services = engine_dict['Engine']['Services']
+        for service_group in list(services):
+            if service_group != 'xtype_services':
+                del services[service_group]
+        _worker_engine = weewx.engine.DummyEngine(engine_dict)
+
+    _worker_generator = generator_class(config_dict, skin_dict, gen_ts, first_run, stn_info,
+                                        record)
+    _worker_generator.setup()
+
+
+def _render_in_worker(task):
+    return _worker_generator.render_plot(*task)
 
 
 def _skip_this_plot(time_ts, plot_options, img_file):
@@ -45,7 +45,15 @@ database manager to open, there is a convenience function for doing so:
 This will return a database manager of the proper type for the specified data binding.
 
 Because opening a database and creating a manager can be expensive, the module also provides
-a caching utility, DBBinder.
+a caching utility, DBBinder. Readers that come back every report cycle can also borrow their
+managers from a ManagerPool, which keeps them open between uses.
+
+Many consumers repeatedly read the last few hours of the archive. A binding can ask that these
+recent records be held in memory, in an instance of RecentRecords, which is shared by all managers
+bound to the same table. See the binding options 'cache_hours' and 'cache_max_records'.
+
+A binding can also ask that aggregates over closed periods be saved in the database, in an
+instance of AggregateSnapshots. See the binding option 'aggregate_snapshots'.
 
 Example:
 
@@ -55,18 +63,26 @@ Example:
         print(row)
 
 """
+import array
+import bisect
+import contextlib
 import datetime
+import itertools
+import json
 import logging
 import os.path
 import sys
+import threading
 import time
+import uuid
 
 import weedb
+import weedb.colstore
 import weeutil.config
 import weeutil.weeutil
 import weewx.accum
 import weewx.xtypes
-from weeutil.weeutil import timestamp_to_string, to_int, TimeSpan
+from weeutil.weeutil import timestamp_to_string, to_bool, to_int, to_float, TimeSpan
 from weewx.units import GenWithConvert
 
 log = logging.getLogger(__name__)
@@ -76,6 +92,22 @@ class IntervalError(ValueError):
     """Raised when a bad value of 'interval' is encountered."""
 
 
+# Scans over more than this many seconds of the archive are streamed from the database
+STREAM_SPAN = 31 * 24 * 3600
+# Number of rows to fetch at a time, when streaming
+STREAM_BATCH_SIZE = 1000
+
+
+def is_long_scan(startstamp, stopstamp):
+    """Return True if a scan of the archive from startstamp to stopstamp could return enough
+    records that it should be streamed from the database. A value of None means unbounded."""
+    if startstamp is None:
+        return True
+    if stopstamp is None:
+        stopstamp = time.time()
+    return stopstamp - startstamp > STREAM_SPAN
+
+
 # ==============================================================================
 #                         class Manager
 # ==============================================================================
@@ -97,6 +129,12 @@ class Manager:
         last_timestamp (int): The timestamp of the last record in the table.
         std_unit_system (int): The unit system used by the database table.
         sqlkeys (list[str]): A list of the SQL keys that the database table supports.
+        recent (RecentRecords|None): An optional in-memory window of the most recent records.
+            Queries that fall entirely within it are answered without hitting the database.
+        snapshots (AggregateSnapshots|None): An optional store of aggregates over closed
+            periods. The manager throws out the snapshots of any period whose data it changes.
+        deferred_records (list[dict]): Records held back by defer_records(), waiting to be
+            added to the database.
     """
 
     def __init__(self, connection, table_name='archive', schema=None):
@@ -115,11 +153,15 @@ class Manager:
                 schema has been supplied.
         """
 
+        self.deferred_records = []
+        self._deferred_options = {}
         self.connection = connection
         self.table_name = table_name
         self.first_timestamp = None
         self.last_timestamp = None
         self.std_unit_system = None
+        self.recent = None
+        self.snapshots = None
 
         # Now get the SQL types.
         try:
@@ -136,6 +178,7 @@ class Manager:
             self._initialize_database(schema)
             # Try again:
             self.sqlkeys = self.connection.columnsOf(self.table_name)
+        self._schema_version = self.connection.schema_version()
 
         # Set up cached data. Make sure to call my version, not any subclass's version. This is
         # because the subclass has not been initialized yet.
@@ -255,6 +298,18 @@ class Manager:
         return [obs_type for obs_type in self.sqlkeys
                 if obs_type not in ['dateTime', 'usUnits', 'interval']]
 
+    @property
+    def connection(self):
+        """The connection to the database. Any records held back by defer_records() are added
+        first, so whoever uses the connection sees them."""
+        if self.deferred_records:
+            self.flush_deferred()
+        return self._connection
+
+    @connection.setter
+    def connection(self, connection):
+        self._connection = connection
+
     def close(self):
         self.connection.close()
         self.sqlkeys = None
@@ -306,6 +361,23 @@ class Manager:
     def _sync(self):
         Manager._create_sync(self)
 
+    def refresh(self):
+        """Bring the cached information about the database up to date. Use this when a manager
+        has been sitting idle while others may have written to the database.
+
+        If the database can tell that its schema has not changed, only the first and last
+        timestamps, and the unit system, are read again. Otherwise, everything is.
+        """
+        schema_version = self.connection.schema_version()
+        if schema_version is None or schema_version != self._schema_version:
+            self.sqlkeys = self.connection.columnsOf(self.table_name)
+            self._sync()
+            self._schema_version = schema_version
+        else:
+            Manager._create_sync(self)
+        if self.snapshots is not None:
+            self.snapshots.reload()
+
     def lastGoodStamp(self):
         """Retrieves the epoch time of the last good archive record.
 
@@ -380,6 +452,9 @@ class Manager:
             int: The number of successful insertions.
         """
 
+        # Anything held back goes in first, so the records stay in order.
+        self.flush_deferred()
+
         # Determine if record_obj is just a single dictionary instance. If so, wrap it in
         # something iterable (a list):
         record_list = [record_obj] if isinstance(record_obj, dict) else record_obj
@@ -387,6 +462,12 @@ class Manager:
         min_ts = float('inf')  # A "big number"
         max_ts = 0
         N = 0
+        # Records that made it into the database, to be passed on to the window of recent records.
+        added = [] if self.recent is not None else None
+        # The range of records that went in before the end of the existing data. They may fall
+        # within periods that have snapshots.
+        prior_last_ts = self.last_timestamp
+        min_old_ts = max_old_ts = None
         with weedb.Transaction(self.connection) as cursor:
 
             for record in record_list:
@@ -399,18 +480,37 @@ class Manager:
                     # Then add the record to the archives:
                     self._addSingleRecord(record, cursor, log_success, log_failure, update)
 
+                    if added is not None:
+                        if len(added) < self.recent.max_records:
+                            added.append(record)
+                        else:
+                            # Too many to hold. It is cheaper to reload the window later.
+                            added = None
+
                     N += 1
                     if progress_fn and N % 1000 == 0:
                         progress_fn(record['dateTime'], N)
 
                     min_ts = min(min_ts, record['dateTime'])
                     max_ts = max(max_ts, record['dateTime'])
+                    if prior_last_ts is not None and record['dateTime'] <= prior_last_ts:
+                        if min_old_ts is None:
+                            min_old_ts = max_old_ts = record['dateTime']
+                        else:
+                            min_old_ts = min(min_old_ts, record['dateTime'])
+                            max_old_ts = max(max_old_ts, record['dateTime'])
                 except (weedb.IntegrityError, weedb.OperationalError) as e:
                     if log_failure:
                         log.error("Unable to add record %s to database '%s': %s",
                                   timestamp_to_string(record['dateTime']),
                                   self.database_name, e)
 
+            if min_old_ts is not None:
+                self.invalidate_snapshots(min_old_ts, max_old_ts, cursor)
+
+            # Write out anything that was held back while adding the records
+            self._flush_pending(cursor)
+
         # Update the cached timestamps. This has to sit outside the transaction context,
         # in case an exception occurs.
         self.first_timestamp = min_ts if self.first_timestamp is None else min(min_ts,
@@ -418,8 +518,44 @@ class Manager:
         self.last_timestamp = max_ts if self.last_timestamp is None else max(max_ts,
                                                                              self.last_timestamp)
 
+        # Now that the transaction has been committed, bring the window of recent records up to
+        # date.
+        if self.recent is not None:
+            if added is None:
+                self.recent.reset()
+            elif added:
+                self.recent.add_records(added, self)
+
         return N
 
+    def defer_records(self, record_obj, log_success=True, log_failure=True):
+        """Hold back records, to be added to the database later by flush_deferred(), all in one
+        transaction. Until then, they are added as soon as anything uses the connection to the
+        database, or the window of recent records, so that any query sees them.
+
+        Args:
+            record_obj (typing.Iterable[dict] | dict): Either a data record, or an iterable that
+                can return data records.
+            log_success (bool): Set to True to have successful insertions logged.
+            log_failure (bool): Set to True to have unsuccessful insertions logged
+        """
+        if isinstance(record_obj, dict):
+            self.deferred_records.append(record_obj)
+        else:
+            self.deferred_records.extend(record_obj)
+        self._deferred_options = {'log_success': log_success, 'log_failure': log_failure}
+
+    def flush_deferred(self):
+        """Add any records held back by defer_records() to the database.
+
+        Returns:
+            int: The number of successful insertions.
+        """
+        if not self.deferred_records:
+            return 0
+        records, self.deferred_records = self.deferred_records, []
+        return self.addRecord(records, **self._deferred_options)
+
     def _addSingleRecord(self, record, cursor, log_success=True, log_failure=True, update=False):
         """Internal function for adding a single record to the main archive table."""
 
@@ -478,6 +614,10 @@ class Manager:
     def _updateHiLo(self, accumulator, cursor):
         pass
 
+    def _flush_pending(self, cursor):
+        """Called at the end of addRecord(), inside its transaction, to write anything that was
+        held back while adding the records."""
+
     def genBatchRows(self, startstamp=None, stopstamp=None):
         """Generator function that yields raw rows from the archive database with timestamps within
         an interval.
@@ -490,6 +630,8 @@ class Manager:
 
         Yields:
             list: Each iteration yields a single data row as a list.
+
+        Long scans are streamed from the database server, rather than buffered in memory.
         """
         _sql = f"SELECT * FROM {self.table_name}"
         conditions = []
@@ -505,7 +647,7 @@ class Manager:
         _sql += " ORDER BY dateTime ASC"
 
         # Return the generator itself
-        return self.genSql(_sql, _sqlargs)
+        return self.genSql(_sql, _sqlargs, stream=is_long_scan(startstamp, stopstamp))
 
     def genBatchRecords(self, startstamp=None, stopstamp=None):
         """Generator function that yields records with timestamps within an interval.
@@ -521,6 +663,13 @@ class Manager:
                 value is the observation value.
         """
 
+        # If the interval falls within the window of recent records, there is no need to hit
+        # the database.
+        records = self.get_recent_records(startstamp, stopstamp)
+        if records is not None:
+            yield from records
+            return
+
         last_time = 0
         for row in self.genBatchRows(startstamp, stopstamp):
             record = dict(zip(self.sqlkeys, row))
@@ -531,6 +680,111 @@ class Manager:
             last_time = record['dateTime']
             yield record
 
+    def get_columns(self, obs_types, timespan=None, include_start=False, typecode='d',
+                    chunk_size=10000):
+        """Get the values of some observation types within an interval, organized by column.
+
+        This is much cheaper than building a dictionary for every record, if many records are
+        involved. Typed arrays also support the buffer protocol, so they can be handed to NumPy
+        without copying (e.g., numpy.frombuffer(columns['outTemp'])).
+
+        Args:
+            obs_types (list[str]): The observation types to be retrieved. They must all be in the
+                archive table.
+            timespan (weeutil.weeutil.TimeSpan|tuple|None): The interval. The start is exclusive,
+                unless include_start is True, and the end inclusive. If 'None', then all records.
+            include_start (bool): True to include a record with the timestamp of the start of
+                the interval.
+            typecode (str|None): The typecode of the returned arrays. Because NULL values are
+                returned as NaN, it should be a floating point type ('d' or 'f'). If 'None', plain
+                lists are returned, holding the values exactly as they came from the database,
+                with None for NULL.
+            chunk_size (int): The number of rows to fetch from the database at a time.
+
+        Returns:
+            dict: Keys are 'dateTime', plus the observation types. Values are the columns, in
+                time order.
+
+        Raises:
+            weedb.NoColumnError: If an observation type is not in the archive table.
+        """
+        columns = None
+        for chunk in self.gen_columns(obs_types, timespan, include_start, typecode, chunk_size):
+            if columns is None:
+                columns = chunk
+            else:
+                for key in columns:
+                    columns[key].extend(chunk[key])
+        if columns is None:
+            columns = Manager._make_columns(self._column_keys(obs_types), [], typecode)
+        return columns
+
+    def gen_columns(self, obs_types, timespan=None, include_start=False, typecode='d',
+                    chunk_size=10000):
+        """Generator function that yields the values of some observation types within an
+        interval, organized by column, a chunk at a time.
+
+        This allows very long intervals to be processed in bounded memory. The arguments are the
+        same as for get_columns().
+
+        Yields:
+            dict: Keys are 'dateTime', plus the observation types. Values are the columns for up
+                to chunk_size rows.
+        """
+        keys = self._column_keys(obs_types)
+        startstamp, stopstamp = timespan if timespan is not None else (None, None)
+
+        # If the interval falls within the window of recent records, there is no need to hit
+        # the database.
+        records = self.get_recent_records(startstamp, stopstamp, include_start) \
+            if all(key in self.sqlkeys for key in keys) else None
+        if records is not None:
+            rows = [tuple(record[key] for key in keys) for record in records]
+            for i in range(0, len(rows), chunk_size):
+                yield Manager._make_columns(keys, rows[i:i + chunk_size], typecode)
+        else:
+            yield from self._gen_stored_columns(keys, startstamp, stopstamp, include_start,
+                                                typecode, chunk_size)
+
+    def _gen_stored_columns(self, keys, startstamp, stopstamp, include_start, typecode,
+                            chunk_size):
+        """Generator function that yields columns out of the database, a chunk at a time."""
+        sql = "SELECT %s FROM %s" % (', '.join(keys), self.table_name)
+        conditions = []
+        sqlargs = []
+        if startstamp is not None:
+            conditions.append("dateTime >= ?" if include_start else "dateTime > ?")
+            sqlargs.append(startstamp)
+        if stopstamp is not None:
+            conditions.append("dateTime <= ?")
+            sqlargs.append(stopstamp)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY dateTime ASC"
+        rows = self.genSql(sql, sqlargs, stream=is_long_scan(startstamp, stopstamp))
+
+        # Run the generator to exhaustion, so the cursor gets closed.
+        while True:
+            chunk = list(itertools.islice(rows, chunk_size))
+            if not chunk:
+                break
+            yield Manager._make_columns(keys, chunk, typecode)
+
+    @staticmethod
+    def _column_keys(obs_types):
+        """Return the keys of the columns to be retrieved: dateTime, then the observation types."""
+        return list(dict.fromkeys(['dateTime'] + list(obs_types)))
+
+    @staticmethod
+    def _make_columns(keys, rows, typecode):
+        """Transpose a list of rows into columns."""
+        columns = list(zip(*rows)) if rows else [()] * len(keys)
+        if typecode is None:
+            return {key: list(column) for key, column in zip(keys, columns)}
+        nan = float('nan')
+        return {key: array.array(typecode, (nan if v is None else v for v in column))
+                for key, column in zip(keys, columns)}
+
     def getRecord(self, timestamp, max_delta=None):
         """Get a single archive record with a given epoch time stamp.
 
@@ -543,6 +797,15 @@ class Manager:
             dict|None: a record dictionary or None if the record does not exist.
         """
 
+        # First try the window of recent records. Ties are resolved in favor of the earlier
+        # record.
+        records = self.get_recent_records(timestamp - (max_delta or 0),
+                                          timestamp + (max_delta or 0),
+                                          include_start=True)
+        if records is not None:
+            return min(records, key=lambda r: (abs(r['dateTime'] - timestamp), r['dateTime'])) \
+                if records else None
+
         with self.connection.cursor() as _cursor:
 
             if max_delta:
@@ -557,6 +820,19 @@ class Manager:
             _row = _cursor.fetchone()
             return dict(zip(self.sqlkeys, _row)) if _row else None
 
+    def archive_in_table(self, timespan):
+        """Check whether the archive table holds all the records of an interval, so they can be
+        aggregated with SQL against the table.
+
+        Args:
+            timespan (weeutil.weeutil.TimeSpan|tuple): The interval.
+
+        Returns:
+            bool: True, unless the manager keeps some of the records of the interval somewhere
+                else. In that case, use get_columns() or genBatchRecords() instead.
+        """
+        return True
+
     def updateValue(self, timestamp, obs_type, new_value):
         """Update (replace) a single value in the database.
 
@@ -568,6 +844,73 @@ class Manager:
 
         self.connection.execute("UPDATE %s SET %s=? WHERE dateTime=?" %
                                 (self.table_name, obs_type), (new_value, timestamp))
+        if self.recent is not None:
+            self.recent.update_value(timestamp, obs_type, new_value)
+        self.invalidate_snapshots(timestamp, timestamp)
+
+    def purge_records(self, stopstamp):
+        """Delete all records earlier than a time from the archive table. Anything built from
+        them, such as the daily summaries, is left alone.
+
+        Args:
+            stopstamp (int): Records with a timestamp before this time are deleted.
+
+        Returns:
+            int: The number of records deleted.
+        """
+        if self.first_timestamp is None or self.first_timestamp >= stopstamp:
+            return 0
+        first_ts = self.first_timestamp
+        with weedb.Transaction(self.connection) as cursor:
+            N = self.getSql("SELECT COUNT(*) FROM %s WHERE dateTime < ?" % self.table_name,
+                            (stopstamp,), cursor)[0]
+            cursor.execute("DELETE FROM %s WHERE dateTime < ?" % self.table_name, (stopstamp,))
+            self.invalidate_snapshots(first_ts, stopstamp, cursor)
+        if self.recent is not None:
+            self.recent.reset()
+        Manager._create_sync(self)
+        return N
+
+    def invalidate_snapshots(self, startstamp=None, stopstamp=None, cursor=None):
+        """Throw out the snapshots of all periods whose data includes a time within an interval.
+        Call this after changing data in the archive, or in the daily summaries, by some means
+        other than addRecord() or updateValue().
+
+        Args:
+            startstamp (int|float|None): Inclusive start of the interval. None to throw out all
+                snapshots.
+            stopstamp (int|float|None): Inclusive end of the interval. None to throw out all
+                snapshots.
+            cursor (weedb.Cursor|None): An optional cursor, to make this part of its transaction.
+        """
+        if self.snapshots is not None:
+            try:
+                self.snapshots.invalidate(startstamp, stopstamp, cursor)
+            except weedb.DatabaseError as e:
+                log.error("Unable to invalidate snapshots in database '%s': %s",
+                          self.database_name, e)
+
+    def get_recent_records(self, startstamp, stopstamp, include_start=False):
+        """Retrieve records from the in-memory window of recent records.
+
+        Args:
+            startstamp (int|float|None): Start of the interval in epoch time. It is exclusive,
+                unless include_start is True.
+            stopstamp (int|float|None): Inclusive end of the interval in epoch time. If 'None',
+                then end at the last record.
+            include_start (bool): True to include a record at time startstamp.
+
+        Returns:
+            list[dict]|None: A list of records, ordered by time, or None if the manager does not
+                have a window of recent records, or the interval does not fall within it. In that
+                case, the caller should go to the database.
+        """
+        if self.recent is None or startstamp is None:
+            return None
+        self.flush_deferred()
+        if not self.recent.primed:
+            self.recent.prime(self)
+        return self.recent.get_records(startstamp, stopstamp, include_start)
 
     def getSql(self, sql, sqlargs=(), cursor=None):
         """Executes an arbitrary SQL statement on the database. The result will be a single row.
@@ -589,21 +932,34 @@ class Manager:
             if cursor is None:
                 _cursor.close()
 
-    def genSql(self, sql, sqlargs=()):
+    def genSql(self, sql, sqlargs=(), stream=False):
         """Generator function that executes an arbitrary SQL statement on
         the database, returning a result set.
 
         Args:
             sql (str): The SQL statement
             sqlargs (tuple): A tuple containing the arguments for the SQL statement.
+            stream (bool): True if the result set could be large. It will be fetched from the
+                database a batch at a time, rather than all at once. With some databases, the
+                statement then sees only committed data.
 
         Yields:
             list: A row in the result set.
         """
 
-        with self.connection.cursor() as _cursor:
-            for _row in _cursor.execute(sql, sqlargs):
-                yield _row
+        if not stream:
+            with self.connection.cursor() as _cursor:
+                for _row in _cursor.execute(sql, sqlargs):
+                    yield _row
+            return
+
+        with self.connection.stream_cursor() as _cursor:
+            _cursor.execute(sql, sqlargs)
+            while True:
+                _rows = _cursor.fetchmany(STREAM_BATCH_SIZE)
+                if not _rows:
+                    break
+                yield from _rows
 
     def getAggregate(self, timespan, obs_type,
                      aggregate_type, **option_dict):
@@ -628,6 +984,7 @@ class Manager:
         """
         with weedb.Transaction(self.connection) as cursor:
             self._add_column(column_name, column_type, cursor)
+        self._schema_changed()
 
     def _add_column(self, column_name, column_type, cursor):
         """Add a column to the main archive table"""
@@ -642,6 +999,7 @@ class Manager:
         """
         with weedb.Transaction(self.connection) as cursor:
             self._rename_column(old_column_name, new_column_name, cursor)
+        self._schema_changed()
 
     def _rename_column(self, old_column_name, new_column_name, cursor):
         """Rename a column in the main archive table."""
@@ -655,11 +1013,19 @@ class Manager:
         """
         with weedb.Transaction(self.connection) as cursor:
             self._drop_columns(column_names, cursor)
+        self._schema_changed()
 
     def _drop_columns(self, column_names, cursor):
         """Drop a column in the main archive table"""
         cursor.drop_columns(self.table_name, column_names)
 
+    def _schema_changed(self):
+        """The schema has changed. Make the window of recent records reload itself the next
+        time it is used, and throw out any snapshots."""
+        if self.recent is not None:
+            self.recent.reset()
+        self.invalidate_snapshots()
+
     def _check_unit_system(self, unit_system):
         """Check to make sure a unit system is the same as what's already in use in the database.
         """
@@ -676,6 +1042,397 @@ class Manager:
             self.std_unit_system = unit_system
 
 
+# ===============================================================================
+#                    Class RecentRecords
+# ===============================================================================
+
+class RecentRecords:
+    """A thread-safe, in-memory window holding the most recent records of an archive table.
+
+    The window covers all times after the timestamp 'start'. Every record in the table with a later
+    timestamp is held in memory, so a query that starts at or after 'start' can be answered
+    without going to the database. The window is kept up to date by Manager.addRecord() and
+    Manager.updateValue(). Like the cached first and last timestamps of a Manager, it will not
+    know about records added to the table by another process.
+
+    A single instance is shared by all managers bound to the same table, so the main thread can
+    keep it up to date, while the report and RESTful threads read from it. Use the class method
+    get_shared() to get it. The shared window is as large as the largest that has been asked for.
+
+    Records are stored as tuples, in the order given by the SQL keys, to keep memory usage down.
+
+    Attributes:
+        span (float): How far back the window should reach, in seconds.
+        max_records (int): The maximum number of records to be held. If exceeded, the oldest
+            records are dropped, even if they are within the span.
+        start (float|None): The window holds all records with timestamps greater than this.
+            None if the window has not been loaded yet.
+    """
+
+    # The shared instances, keyed by database and table:
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, hours=24, max_records=2000):
+        self.span = hours * 3600
+        self.max_records = max_records
+        self.start = None
+        self.sqlkeys = None
+        self.timestamps = []
+        self.rows = []
+        self.lock = threading.Lock()
+
+    @classmethod
+    def get_shared(cls, database_dict, table_name, hours=24, max_records=2000):
+        """Return the window for a table, creating it if necessary.
+
+        If the window already exists, but is smaller than asked for, it is made larger.
+
+        Args:
+            database_dict (dict): The database dictionary of the database holding the table.
+            table_name (str): The name of the archive table.
+            hours (float): How many hours of records to hold.
+            max_records (int): The maximum number of records to hold.
+
+        Returns:
+            RecentRecords: The shared window, or a private window if the database is held in
+                memory, and so is unique to a connection.
+        """
+        if database_dict.get('database_name') == ':memory:':
+            return cls(hours, max_records)
+        key = (tuple(sorted((k, str(v)) for k, v in database_dict.items())), table_name)
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(hours, max_records)
+            else:
+                cls._shared[key].widen(hours, max_records)
+            return cls._shared[key]
+
+    def widen(self, hours, max_records):
+        """Make sure the window holds at least this many hours, and this many records. If it has
+        to be made larger, it is reloaded the next time it is used."""
+        with self.lock:
+            span = max(self.span, hours * 3600)
+            max_records = max(self.max_records, max_records)
+            if span == self.span and max_records == self.max_records:
+                return
+            self.span = span
+            self.max_records = max_records
+            # Records older than the old window were not kept, so load it again
+            self.start = None
+            self.sqlkeys = None
+            self.timestamps = []
+            self.rows = []
+
+    @property
+    def primed(self):
+        """bool: True if the window has been loaded."""
+        return self.start is not None
+
+    def reset(self):
+        """Empty the window. It will be reloaded from the database the next time it is used."""
+        with self.lock:
+            self.start = None
+            self.sqlkeys = None
+            self.timestamps = []
+            self.rows = []
+
+    def prime(self, manager):
+        """Load the window from the database.
+
+        Args:
+            manager (Manager): A manager bound to the table.
+        """
+        with self.lock:
+            # Another thread may have beaten us to it.
+            if self.start is None:
+                self._prime(manager)
+
+    def _prime(self, manager):
+        self.sqlkeys = list(manager.sqlkeys)
+        last_ts = manager.lastGoodStamp()
+        if last_ts is None:
+            # An empty table. Everything that comes later will be in the window.
+            self.start = 0
+            self.timestamps = []
+            self.rows = []
+        else:
+            self.start = last_ts - self.span
+            self.rows = [tuple(row) for row in manager.genBatchRows(self.start, None)]
+            i_dt = self.sqlkeys.index('dateTime')
+            self.timestamps = [row[i_dt] for row in self.rows]
+        self._trim()
+        log.debug("Loaded %d recent records from table '%s' in database '%s'",
+                  len(self.rows), manager.table_name, manager.database_name)
+
+    def add_records(self, records, manager):
+        """Add records that have been committed to the database.
+
+        Args:
+            records (list[dict]): The records that have been added. If a record has the same
+                timestamp as one already in the window, it is updated with the new values.
+            manager (Manager): The manager that added them. It is used if the window has to be
+                loaded.
+        """
+        with self.lock:
+            if self.start is None:
+                # Not loaded yet. Loading it will pick up the new records.
+                self._prime(manager)
+                return
+            for record in records:
+                ts = record['dateTime']
+                if ts <= self.start:
+                    continue
+                i = bisect.bisect_left(self.timestamps, ts)
+                if i < len(self.timestamps) and self.timestamps[i] == ts:
+                    # The record was updated. Only the values in the record were changed.
+                    new_record = dict(zip(self.sqlkeys, self.rows[i]))
+                    new_record.update((k, record[k]) for k in record if k in new_record)
+                    self.rows[i] = tuple(new_record[k] for k in self.sqlkeys)
+                else:
+                    self.timestamps.insert(i, ts)
+                    self.rows.insert(i, tuple(record.get(k) for k in self.sqlkeys))
+            self._trim()
+
+    def update_value(self, timestamp, obs_type, new_value):
+        """Update a single value held in the window."""
+        with self.lock:
+            if self.start is None or obs_type not in self.sqlkeys:
+                return
+            i = bisect.bisect_left(self.timestamps, timestamp)
+            if i < len(self.timestamps) and self.timestamps[i] == timestamp:
+                row = list(self.rows[i])
+                row[self.sqlkeys.index(obs_type)] = new_value
+                self.rows[i] = tuple(row)
+
+    def get_records(self, startstamp, stopstamp=None, include_start=False):
+        """Return the records within an interval.
+
+        Args:
+            startstamp (int|float): Start of the interval. Exclusive unless include_start is True.
+            stopstamp (int|float|None): Inclusive end of the interval. None for no end.
+            include_start (bool): True if a record at startstamp should be included.
+
+        Returns:
+            list[dict]|None: The records, in time order, or None if the window does not cover
+                the interval.
+        """
+        with self.lock:
+            if self.start is None or startstamp < self.start \
+                    or (include_start and startstamp == self.start):
+                return None
+            if include_start:
+                lo = bisect.bisect_left(self.timestamps, startstamp)
+            else:
+                lo = bisect.bisect_right(self.timestamps, startstamp)
+            if stopstamp is None:
+                hi = len(self.timestamps)
+            else:
+                hi = bisect.bisect_right(self.timestamps, stopstamp)
+            return [dict(zip(self.sqlkeys, row)) for row in self.rows[lo:hi]]
+
+    def _trim(self):
+        """Drop records that have fallen out of the window, or that exceed the maximum number of
+        records."""
+        if self.timestamps:
+            self.start = max(self.start, self.timestamps[-1] - self.span)
+        n = bisect.bisect_right(self.timestamps, self.start)
+        excess = len(self.timestamps) - n - self.max_records
+        if excess > 0:
+            n += excess
+            self.start = self.timestamps[n - 1]
+        if n:
+            del self.timestamps[:n]
+            del self.rows[:n]
+
+
+# ===============================================================================
+#                    Class AggregateSnapshots
+# ===============================================================================
+
+class AggregateSnapshots:
+    """A persistent store of aggregates over closed periods, such as past months and years.
+
+    Once no more data can arrive for a period, its aggregates will not change, so there is no need
+    to calculate them again every report cycle. The results are saved in table
+    '<table_name>_snapshot' of the same database as the archive, so every process using the
+    database sees the same snapshots, and throws them out when the data they were calculated from
+    changes. See Manager.invalidate_snapshots().
+
+    Each snapshot is identified by the start and stop of its period, and by a tag, which the
+    caller uses to identify what was calculated. Values are saved as JSON. The snapshots of a
+    period are read from the database the first time the period is asked for. Once the table
+    holds more than max_snapshots, those of the periods that ended the longest ago are thrown
+    out.
+
+    The table also holds a row with a 'generation', which changes every time snapshots are
+    invalidated. A snapshot is only saved if the generation has not changed since the store
+    started reading the table. Otherwise, it may have been calculated from data that has since
+    changed.
+
+    The table is created by the first attempt to save a snapshot. That value is not saved, because
+    without the table, nothing would have recorded a change to the data before it. If the
+    database is read-only, there are simply no snapshots.
+
+    Attributes:
+        connection (weedb.Connection): The connection to the database.
+        table (str): The name of the table holding the snapshots.
+    """
+
+    # Tag of the row holding the generation
+    GENERATION = '_generation'
+
+    # Snapshots to keep in the table
+    max_snapshots = 10000
+
+    # How often to check the number of snapshots, in snapshots saved
+    prune_interval = 100
+
+    def __init__(self, manager):
+        self.connection = manager.connection
+        self.table = '%s_snapshot' % manager.table_name
+        # The snapshots of the periods that have been read, keyed by (start, stop), then by tag.
+        # None if nothing has been read since the last reload.
+        self._periods = None
+        self._generation = None
+        # Whether the table exists. None if not known.
+        self._exists = None
+        self._saved = 0
+
+    def reload(self):
+        """Forget the snapshots that have been read. They will be read from the database again
+        when next needed."""
+        self._periods = None
+        self._exists = None
+
+    def get(self, startstamp, stopstamp, tag):
+        """Return a saved value, or None if there is none."""
+        return self._get_period(startstamp, stopstamp).get(tag)
+
+    def put(self, startstamp, stopstamp, tag, value):
+        """Save a value. It must be something that can be expressed in JSON."""
+        values = self._get_period(startstamp, stopstamp)
+        try:
+            text = json.dumps(value)
+        except (TypeError, ValueError):
+            return
+        try:
+            if not self._exists:
+                if self.table not in self.connection.tables():
+                    with weedb.Transaction(self.connection) as cursor:
+                        self._create_table(cursor)
+                # Start over with what is in the database.
+                self.reload()
+                return
+            with weedb.Transaction(self.connection) as cursor:
+                cursor.execute("REPLACE INTO %s (start, stop, tag, value) VALUES (?, ?, ?, ?)"
+                               % self.table, (startstamp, stopstamp, tag, text))
+                if self._read_generation(cursor) != self._generation:
+                    # Snapshots were invalidated after we started. The value may be stale.
+                    raise weewx.ViolatedPrecondition("Snapshots are out of date")
+                self._saved += 1
+                if self._saved % AggregateSnapshots.prune_interval == 0:
+                    self._prune(cursor)
+        except weewx.ViolatedPrecondition:
+            # Start over with what is in the database.
+            self.reload()
+            return
+        except weedb.DatabaseError as e:
+            # Perhaps the database is read-only. Not fatal. The value will just be calculated
+            # again next time.
+            log.debug("Unable to save snapshot in table '%s': %s", self.table, e)
+            return
+        values[tag] = value
+
+    def invalidate(self, startstamp=None, stopstamp=None, cursor=None):
+        """Throw out the snapshots of all periods that include a time within an interval.
+
+        Args:
+            startstamp (int|float|None): Inclusive start of the interval. None to throw out
+                everything.
+            stopstamp (int|float|None): Inclusive end of the interval. None to throw out
+                everything.
+            cursor (weedb.Cursor|None): If given, use this cursor, so the change becomes part of
+                its transaction. Otherwise, use a transaction of our own.
+        """
+        if cursor is None:
+            with weedb.Transaction(self.connection) as _cursor:
+                self.invalidate(startstamp, stopstamp, _cursor)
+            return
+        # Another process may have created the table since we last looked.
+        if self.table not in self.connection.tables():
+            return
+        generation = uuid.uuid4().hex
+        if startstamp is None or stopstamp is None:
+            cursor.execute("DELETE FROM %s WHERE stop > 0" % self.table)
+        else:
+            # A period holds the records with timestamps greater than its start, up to and
+            # including its stop.
+            cursor.execute("DELETE FROM %s WHERE start < ? AND stop >= ? AND stop > 0"
+                           % self.table, (stopstamp, startstamp))
+        cursor.execute("UPDATE %s SET value = ? WHERE start = 0 AND stop = 0 AND tag = ?"
+                       % self.table, (generation, AggregateSnapshots.GENERATION))
+        if self._periods is not None and self._exists:
+            if startstamp is None or stopstamp is None:
+                self._periods = {}
+            else:
+                self._periods = {key: values for key, values in self._periods.items()
+                                 if not (key[0] < stopstamp and key[1] >= startstamp)}
+            self._generation = generation
+
+    def _get_period(self, startstamp, stopstamp):
+        """Return the snapshots of a period, as a dictionary keyed by tag."""
+        if self._periods is None:
+            self._start()
+        key = (startstamp, stopstamp)
+        if key not in self._periods:
+            values = {}
+            if self._exists:
+                with self.connection.cursor() as cursor:
+                    for tag, text in cursor.execute("SELECT tag, value FROM %s "
+                                                    "WHERE start = ? AND stop = ?"
+                                                    % self.table, key):
+                        values[tag] = json.loads(text)
+            self._periods[key] = values
+        return self._periods[key]
+
+    def _start(self):
+        """Start reading the table afresh."""
+        self._periods = {}
+        self._generation = None
+        self._exists = self.table in self.connection.tables()
+        if self._exists:
+            with self.connection.cursor() as cursor:
+                self._generation = self._read_generation(cursor)
+
+    def _create_table(self, cursor):
+        cursor.execute("CREATE TABLE %s (start INTEGER NOT NULL, stop INTEGER NOT NULL, "
+                       "tag VARCHAR(200) NOT NULL, value TEXT, "
+                       "PRIMARY KEY (start, stop, tag))" % self.table)
+        cursor.execute("INSERT INTO %s (start, stop, tag, value) VALUES (0, 0, ?, ?)"
+                       % self.table, (AggregateSnapshots.GENERATION, uuid.uuid4().hex))
+        log.info("Created table '%s' in database '%s'",
+                 self.table, self.connection.database_name)
+
+    def _prune(self, cursor):
+        """Throw out the snapshots of the periods that ended the longest ago, beyond
+        max_snapshots."""
+        cursor.execute("SELECT stop FROM %s WHERE stop > 0 ORDER BY stop DESC LIMIT 1 OFFSET ?"
+                       % self.table, (AggregateSnapshots.max_snapshots,))
+        row = cursor.fetchone()
+        if row is not None:
+            cursor.execute("DELETE FROM %s WHERE stop > 0 AND stop <= ?" % self.table, (row[0],))
+            if self._periods is not None:
+                self._periods = {key: values for key, values in self._periods.items()
+                                 if key[1] > row[0]}
+
+    def _read_generation(self, cursor):
+        cursor.execute("SELECT value FROM %s WHERE start = 0 AND stop = 0 AND tag = ?"
+                       % self.table, (AggregateSnapshots.GENERATION,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+
 def reconfig(old_db_dict, new_db_dict, new_unit_system=None, new_schema=None, dry_run=False):
     """Copy over an old archive to a new one, using an optionally new unit system and schema.
 
@@ -710,20 +1467,30 @@ class DBBinder:
     results.
     """
 
-    def __init__(self, config_dict):
+    def __init__(self, config_dict, pool=None):
         """ Initialize a DBBinder object.
 
         Args:
             config_dict (dict): The configuration dictionary.
+            pool (ManagerPool|None): If given, managers that are only going to be read are
+                borrowed from this pool, and given back when the binder is closed, rather than
+                being opened and closed every time.
         """
 
         self.config_dict = config_dict
         self.default_binding_dict = {}
         self.manager_cache = {}
+        self.pool = pool
+        # The manager dictionaries of the managers borrowed from the pool, keyed by binding
+        self.borrowed = {}
 
     def close(self):
         for data_binding in list(self.manager_cache.keys()):
-            self.manager_cache[data_binding].close()
+            if data_binding in self.borrowed:
+                self.pool.put_manager(self.borrowed.pop(data_binding),
+                                      self.manager_cache[data_binding])
+            else:
+                self.manager_cache[data_binding].close()
             del self.manager_cache[data_binding]
 
     def __enter__(self):
@@ -756,7 +1523,11 @@ class DBBinder:
             manager_dict = get_manager_dict_from_config(self.config_dict,
                                                         data_binding,
                                                         default_binding_dict=defaults)
-            self.manager_cache[data_binding] = open_manager(manager_dict, initialize)
+            if self.pool is not None and not initialize:
+                self.manager_cache[data_binding] = self.pool.get_manager(manager_dict)
+                self.borrowed[data_binding] = manager_dict
+            else:
+                self.manager_cache[data_binding] = open_manager(manager_dict, initialize)
 
         return self.manager_cache[data_binding]
 
@@ -774,6 +1545,130 @@ class DBBinder:
         return db_lookup
 
 
+# ===============================================================================
+#                    Class ManagerPool
+# ===============================================================================
+
+class ManagerPool:
+    """A pool of open managers, for readers such as the report generators.
+
+    Opening a manager means connecting to the database, then reading its schema and metadata.
+    Rather than do that every report cycle, readers borrow a manager from the pool, then give it
+    back when they are done. A manager is lent to only one reader at a time, so concurrent
+    readers each get a connection of their own. Idle managers hold no locks. SQLite readers only
+    stop blocking the writer if the database is in WAL mode, which the pool does not change, but
+    logs once if it is not.
+
+    Before a manager is lent out again, it is refreshed, so it sees any records and schema
+    changes made in the meantime. See Manager.refresh().
+
+    Managers from the pool should not be used to write to the database.
+    """
+
+    def __init__(self, max_idle=4):
+        """Initialize a ManagerPool.
+
+        Args:
+            max_idle (int): The maximum number of idle managers to hold for each binding. Any
+                more than that are closed when they are given back.
+        """
+        self.max_idle = max_idle
+        self.lock = threading.Lock()
+        # Idle managers, keyed by the manager dictionary they were opened with
+        self.idle = {}
+        # SQLite databases whose journal mode has been checked
+        self.checked = set()
+
+    def get_manager(self, manager_dict):
+        """Borrow a manager.
+
+        Args:
+            manager_dict (dict): A manager dictionary, as returned by
+                get_manager_dict_from_config().
+
+        Returns:
+            Manager: An open manager. Give it back with put_manager() when done.
+        """
+        key = ManagerPool._key(manager_dict)
+        while True:
+            with self.lock:
+                managers = self.idle.get(key)
+                if not managers:
+                    break
+                manager = managers.pop()
+            try:
+                manager.refresh()
+                return manager
+            except weedb.DatabaseError as e:
+                # Perhaps the server went away. Throw this one out and try again.
+                log.debug("Discarding pooled manager for database '%s': %s",
+                          manager_dict['database_dict'].get('database_name'), e)
+                ManagerPool._close(manager)
+        manager = open_manager(manager_dict, pooled=True)
+        self._check_journal_mode(manager)
+        return manager
+
+    def put_manager(self, manager_dict, manager):
+        """Give back a manager borrowed with get_manager()."""
+        key = ManagerPool._key(manager_dict)
+        with self.lock:
+            managers = self.idle.setdefault(key, [])
+            if len(managers) < self.max_idle:
+                managers.append(manager)
+                return
+        ManagerPool._close(manager)
+
+    def close(self):
+        """Close all idle managers."""
+        with self.lock:
+            idle, self.idle = self.idle, {}
+        for managers in idle.values():
+            for manager in managers:
+                ManagerPool._close(manager)
+
+    def _check_journal_mode(self, manager):
+        """Log if a SQLite database is not in WAL mode, as its readers then block its writer."""
+        connection = manager.connection
+        if connection.dbtype != 'sqlite' or connection.database_name in self.checked:
+            return
+        self.checked.add(connection.database_name)
+        journal_mode = connection.get_variable('journal_mode')
+        if journal_mode and journal_mode[1].lower() != 'wal':
+            log.info("Database '%s' is in journal mode '%s'. Reports reading it will hold up "
+                     "writing it. Consider 'PRAGMA journal_mode=WAL'.",
+                     connection.database_name, journal_mode[1])
+
+    @staticmethod
+    def _key(manager_dict):
+        # The schema is only needed to initialize a database, which pooled managers never do.
+        return tuple(sorted((k, str(v)) for k, v in manager_dict.items() if k != 'schema'))
+
+    @staticmethod
+    def _close(manager):
+        try:
+            manager.close()
+        except weedb.DatabaseError:
+            pass
+
+
+# The pool used by the report generators
+manager_pool = ManagerPool()
+
+
+def _reset_after_fork():
+    """A forked process inherits the shared caches and their locks as they were at the moment of
+    the fork, perhaps locked by a thread that does not exist in the child. It also inherits the
+    connections in the pool, which belong to the parent. Start the child with a clean slate."""
+    RecentRecords._shared = {}
+    RecentRecords._shared_lock = threading.Lock()
+    manager_pool.idle = {}
+    manager_pool.lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
 # ===============================================================================
 #                                 Utilities
 # ===============================================================================
@@ -875,6 +1770,11 @@ def get_manager_dict_from_config(config_dict, data_binding,
         database = manager_dict.pop('database')
         manager_dict['database_dict'] = get_database_dict_from_config(config_dict, database)
 
+    # A relative path to a column store is relative to WEEWX_ROOT
+    if manager_dict.get('column_root'):
+        manager_dict['column_root'] = os.path.join(config_dict.get('WEEWX_ROOT', ''),
+                                                   manager_dict['column_root'])
+
     # The schema may be specified as a string, in which case we resolve the python object to which
     # it refers. Or it may be specified as a dict with field_name=sql_type pairs.
     schema_name = manager_dict.get('schema')
@@ -910,15 +1810,35 @@ def get_manager_dict(bindings_dict, databases_dict, data_binding,
                                         default_binding_dict)
 
 
-def open_manager(manager_dict, initialize=False):
+def open_manager(manager_dict, initialize=False, pooled=False):
     manager_cls = weeutil.weeutil.get_object(manager_dict['manager'])
+    database_dict = manager_dict['database_dict']
+    if pooled and database_dict.get('driver') == 'weedb.sqlite':
+        # A pooled manager may be used by a different thread every time it is borrowed
+        database_dict = dict(database_dict, check_same_thread=False)
     if initialize:
-        return manager_cls.open_with_create(manager_dict['database_dict'],
-                                            manager_dict['table_name'],
-                                            manager_dict['schema'])
+        manager = manager_cls.open_with_create(database_dict,
+                                               manager_dict['table_name'],
+                                               manager_dict['schema'])
     else:
-        return manager_cls.open(manager_dict['database_dict'],
-                                manager_dict['table_name'])
+        manager = manager_cls.open(database_dict,
+                                   manager_dict['table_name'])
+    # The column store may live somewhere other than its default location
+    if isinstance(manager, ColumnStoreManager):
+        if manager_dict.get('column_root'):
+            manager.set_column_root(manager_dict['column_root'])
+        manager.offload_months = to_int(manager_dict.get('offload_months', 0))
+    # If requested, attach the store of snapshots of closed periods
+    if to_bool(manager_dict.get('aggregate_snapshots', False)):
+        manager.snapshots = AggregateSnapshots(manager)
+    # If requested, attach the window of recent records for this table
+    cache_hours = to_float(manager_dict.get('cache_hours', 0))
+    if cache_hours:
+        manager.recent = RecentRecords.get_shared(
+            manager_dict['database_dict'], manager_dict['table_name'],
+            hours=cache_hours,
+            max_records=to_int(manager_dict.get('cache_max_records', 2000)))
+    return manager
 
 
 def open_manager_with_config(config_dict, data_binding,
@@ -1056,6 +1976,11 @@ class DaySummaryManager(Manager):
         # Initialize my superclass:
         super().__init__(connection, table_name, schema)
 
+        # While adding a collection of records, the daily summary being updated is held here,
+        # as a tuple (day accumulator, lastUpdate), rather than written after every record.
+        self._batching = False
+        self._pending_day = None
+
         # Has the database been initialized with the daily summaries?
         if '%s_day__metadata' % self.table_name not in self.connection.tables():
             # Database has not been initialized. Initialize it:
@@ -1163,6 +2088,20 @@ class DaySummaryManager(Manager):
         for column_name in column_names:
             cursor.drop_table(f"{self.table_name}_day_{column_name}")
 
+    def addRecord(self, record_obj, *args, **kwargs):
+        """Specialized version that, when given a collection of records, writes the daily
+        summary of each day once, rather than after every record."""
+        self.flush_deferred()
+        if isinstance(record_obj, dict):
+            return super().addRecord(record_obj, *args, **kwargs)
+
+        self._batching = True
+        try:
+            return super().addRecord(record_obj, *args, **kwargs)
+        finally:
+            self._batching = False
+            self._pending_day = None
+
     def _addSingleRecord(self, record, cursor, log_success=True, log_failure=True, update=False):
         """Specialized version that updates the daily summaries, as well as the main archive
         table.
@@ -1185,9 +2124,9 @@ class DaySummaryManager(Manager):
             return
 
         # Now add to the daily summary for the appropriate day:
-        _day_summary = self._get_day_summary(_sod_ts, cursor)
+        _day_summary = self._get_pending_day_summary(_sod_ts, cursor)
         _day_summary.addRecord(record, weight=_weight)
-        self._set_day_summary(_day_summary, record['dateTime'], cursor)
+        self._put_day_summary(_day_summary, record['dateTime'], cursor)
         if log_success:
             log.info("Added record %s to daily summary in '%s'",
                      timestamp_to_string(record['dateTime']),
@@ -1200,11 +2139,34 @@ class DaySummaryManager(Manager):
         _sod_ts = weeutil.weeutil.startOfArchiveDay(accumulator.timespan.stop)
 
         # Retrieve the daily summaries seen so far:
-        _stats_dict = self._get_day_summary(_sod_ts, cursor)
+        _stats_dict = self._get_pending_day_summary(_sod_ts, cursor)
         # Update them with the contents of the accumulator:
         _stats_dict.updateHiLo(accumulator)
         # Then save the results:
-        self._set_day_summary(_stats_dict, accumulator.timespan.stop, cursor)
+        self._put_day_summary(_stats_dict, accumulator.timespan.stop, cursor)
+
+    def _get_pending_day_summary(self, sod_ts, cursor):
+        """Like _get_day_summary(), except that a daily summary held back by addRecord() is
+        used, if it is for the same day. If it is for another day, it is written out first."""
+        if self._pending_day is not None:
+            if self._pending_day[0].timespan.start == sod_ts:
+                return self._pending_day[0]
+            self._flush_pending(cursor)
+        return self._get_day_summary(sod_ts, cursor)
+
+    def _put_day_summary(self, day_accum, lastUpdate, cursor):
+        """Write a daily summary, or hold it back if a collection of records is being added."""
+        if self._batching:
+            self._pending_day = (day_accum, lastUpdate)
+        else:
+            self._set_day_summary(day_accum, lastUpdate, cursor)
+
+    def _flush_pending(self, cursor):
+        super()._flush_pending(cursor)
+        if self._pending_day is not None:
+            day_accum, lastUpdate = self._pending_day
+            self._pending_day = None
+            self._set_day_summary(day_accum, lastUpdate, cursor)
 
     def _get_backfill_range(self, last_daily_ts, start_d, stop_d, key_set):
         """
@@ -1321,6 +2283,7 @@ class DaySummaryManager(Manager):
             day_accum = None
 
             with weedb.Transaction(self.connection) as cursor:
+                self.invalidate_snapshots(start_batch_ts, stop_batch_ts, cursor)
                 for rec in self.genBatchRecords(start_batch_ts, stop_batch_ts):
                     # Manage day accumulators. Start a new one if necessary.
                     if not day_accum or not day_accum.timespan.includesArchiveTime(rec['dateTime']):
@@ -1376,6 +2339,7 @@ class DaySummaryManager(Manager):
                 for _table_name in _all_tables:
                     if _table_name.startswith('%s_day_' % self.table_name):
                         _cursor.execute("DROP TABLE %s" % _table_name)
+                self.invalidate_snapshots(cursor=_cursor)
 
             self.daykeys = None
         except weedb.OperationalError as e:
@@ -1438,6 +2402,9 @@ class DaySummaryManager(Manager):
             self._do_tranche(mark_d, end_of_tranche_d, weight_fn, progress_fn)
             mark_d = end_of_tranche_d
 
+        self.invalidate_snapshots(time.mktime(first_d.timetuple()),
+                                  time.mktime(last_d.timetuple()))
+
     def _do_tranche(self, start_d, last_d, weight_fn=None, progress_fn=None):
         """Reweight a tranche of daily summaries.
 
@@ -1684,6 +2651,471 @@ class DaySummaryManager(Manager):
                 _cursor.close()
 
 
+
+# ===============================================================================
+#                        Class ColumnStoreManager
+#
+#     Keeps a copy of the archive table in compressed column files, one file per observation
+#     type per month, and uses it for range scans.
+# ===============================================================================
+
+class ColumnStoreManager(DaySummaryManager):
+    """A DaySummaryManager that keeps the archive table in a column store.
+
+    The archive table is copied into a weedb.colstore.ColumnStore, which holds one compressed
+    file per observation type per month. Range scans, that is, get_columns(), gen_columns(),
+    genBatchRows() and genBatchRecords(), are served out of the column store. They only have to
+    decompress the months and types that were asked for, rather than read every column of every
+    row. The daily summaries stay in the SQL database.
+
+    By default, the SQL archive table keeps all its records, and the column store is a copy. It
+    is checked against the database the first time it is used in a process. Months that do not
+    match are rebuilt from the database, so it is safe to delete the column store at any time.
+
+    If offload_months is set, the archive table keeps only the current month, plus that many
+    months before it. Older months are moved to the column store, which then holds the only copy
+    of them, and which must not be deleted. Lookups of single records, and aggregates over
+    intervals that reach back that far, are served out of the column store as well. See
+    archive_in_table().
+
+    Any process that opens the binding may add records, for example weewxd, and 'weectl import'.
+    A process holds the lock of the column store from before it commits records to the database
+    until the column store has been updated, so other processes see both change together. If a
+    process dies in between, the next one to take the lock finds the update unfinished, and
+    checks the column store against the database again.
+
+    For a sqlite database, the column store goes in a directory next to the database file, with
+    extension '.columns'. Use binding option 'column_root' to put it somewhere else, or to use a
+    column store with MySQL.
+    """
+
+    # Records held in memory during addRecord(). Beyond this, months are rebuilt from the
+    # database instead.
+    max_pending = 10000
+
+    # Errors that mean the column store cannot be used. A value of a type it cannot hold raises
+    # TypeError, a damaged file may raise ValueError.
+    store_errors = (OSError, TypeError, ValueError, weedb.colstore.DamagedMonthError)
+
+    def __init__(self, connection, table_name='archive', schema=None):
+        # The superclass looks for the first timestamp before there is a column store
+        self.column_store = None
+        # Months before the current one to keep in the archive table. Zero to keep them all.
+        self.offload_months = 0
+        super().__init__(connection, table_name, schema)
+        # Rows added during the current call to addRecord(), months that will have to be
+        # rebuilt, and the start of the first month that has not been offloaded.
+        self._pending = None
+        self._dirty = None
+        self._offloaded_until = 0
+        file_path = getattr(connection, 'file_path', None)
+        self.set_column_root(file_path + '.columns'
+                             if file_path and file_path != ':memory:' else None)
+
+    def set_column_root(self, column_root):
+        """Set the directory holding the column store.
+
+        Args:
+            column_root (str|None): The directory. The column store for the table will be in a
+                subdirectory with the name of the table. If None, no column store is used.
+        """
+        if column_root:
+            self.column_store = weedb.colstore.ColumnStore.get_shared(
+                os.path.join(column_root, self.table_name))
+        else:
+            self.column_store = None
+        # The column store may hold earlier records than the archive table
+        self.first_timestamp = self.firstGoodStamp()
+
+    def firstGoodStamp(self):
+        """Specialized version that includes months that have been offloaded to the column
+        store."""
+        first_ts = super().firstGoodStamp()
+        if self.column_store is None:
+            return first_ts
+        try:
+            boundary = self.column_store.offloaded_until()
+            if boundary:
+                for columns in self.column_store.read(['dateTime'], None, boundary - 1):
+                    stored_ts = columns['dateTime'][0]
+                    return stored_ts if first_ts is None else min(stored_ts, first_ts)
+        except self.store_errors as e:
+            self._column_store_failed(e)
+        return first_ts
+
+    def archive_in_table(self, timespan):
+        """Return False if the interval reaches back into the months that have been offloaded
+        to the column store."""
+        if self.column_store is None:
+            return True
+        try:
+            return timespan[0] >= self.column_store.offloaded_until()
+        except self.store_errors as e:
+            # Cannot tell. Use the column store, which will report the problem.
+            self._column_store_failed(e)
+            return False
+
+    def getRecord(self, timestamp, max_delta=None):
+        """Specialized version that also looks in months that have been offloaded to the column
+        store."""
+        timespan = (timestamp - (max_delta or 0), timestamp + (max_delta or 0))
+        if self.archive_in_table(timespan):
+            return super().getRecord(timestamp, max_delta)
+        columns = self.get_columns(self.sqlkeys, timespan, include_start=True, typecode=None)
+        records = [dict(zip(columns, row)) for row in zip(*columns.values())]
+        # As in the superclass, ties are resolved in favor of the earlier record
+        return min(records, key=lambda r: (abs(r['dateTime'] - timestamp), r['dateTime'])) \
+            if records else None
+
+    def addRecord(self, record_obj, *args, **kwargs):
+        """Commit records to the archive, then add them to the column store."""
+        if self.column_store is None:
+            return super().addRecord(record_obj, *args, **kwargs)
+
+        with self._store_update():
+            self._pending, self._dirty = [], set()
+            try:
+                try:
+                    self._offloaded_until = self.column_store.offloaded_until()
+                except self.store_errors as e:
+                    self._column_store_failed(e)
+                N = super().addRecord(record_obj, *args, **kwargs)
+                self._flush_columns()
+                self._offload()
+            finally:
+                self._pending, self._dirty = None, None
+        return N
+
+    def _addSingleRecord(self, record, cursor, log_success=True, log_failure=True, update=False):
+        if self._pending is not None and not update \
+                and record['dateTime'] is not None \
+                and record['dateTime'] < self._offloaded_until \
+                and self._in_column_store(record['dateTime']):
+            # The archive table no longer has the record to collide with.
+            raise weedb.IntegrityError("Record %s has been offloaded to the column store"
+                                       % timestamp_to_string(record['dateTime']))
+        super()._addSingleRecord(record, cursor, log_success, log_failure, update)
+        # The record made it into the database. Remember it, so it can be added to the column
+        # store after the transaction has been committed.
+        if self._pending is not None:
+            if update or len(self._pending) >= ColumnStoreManager.max_pending:
+                self._dirty.add(weedb.colstore.month_of(record['dateTime']))
+            else:
+                self._pending.append(tuple(record.get(key) for key in self.sqlkeys))
+
+    def _in_column_store(self, timestamp):
+        """Return True if the column store has a record with a timestamp."""
+        try:
+            return any(self.column_store.read(['dateTime'], timestamp, timestamp,
+                                              include_start=True))
+        except self.store_errors as e:
+            self._column_store_failed(e)
+            return False
+
+    def updateValue(self, timestamp, obs_type, new_value):
+        if self.column_store is None:
+            return super().updateValue(timestamp, obs_type, new_value)
+        with self._store_update():
+            super().updateValue(timestamp, obs_type, new_value)
+            try:
+                month = weedb.colstore.month_of(timestamp)
+                if timestamp < self.column_store.offloaded_until():
+                    # The column store holds the only copy of the record
+                    i_dt, i_obs = self.sqlkeys.index('dateTime'), self.sqlkeys.index(obs_type)
+                    rows = self.column_store.read_rows(month, self.sqlkeys)
+                    rows = [row[:i_obs] + (new_value,) + row[i_obs + 1:]
+                            if row[i_dt] == timestamp else row for row in rows]
+                    self.column_store.write_month(month, self.sqlkeys, rows)
+                else:
+                    self._rebuild_month(month)
+            except self.store_errors as e:
+                self._column_store_failed(e)
+
+    def genBatchRows(self, startstamp=None, stopstamp=None):
+        if self.column_store is None:
+            return super().genBatchRows(startstamp, stopstamp)
+        return self._gen_column_rows(startstamp, stopstamp)
+
+    def _gen_column_rows(self, startstamp, stopstamp):
+        for columns in self._gen_stored_columns(self.sqlkeys, startstamp, stopstamp, False,
+                                                None, 10000):
+            yield from zip(*columns.values())
+
+    def _gen_stored_columns(self, keys, startstamp, stopstamp, include_start, typecode,
+                            chunk_size):
+        """Generator function that yields columns out of the column store, a chunk at a time.
+        If the column store cannot be used, the database is used instead, unless some of the
+        records are only in the column store."""
+        if self.column_store is not None and all(key in self.sqlkeys for key in keys):
+            try:
+                self._sync_columns()
+            except self.store_errors as e:
+                self._column_store_failed(e)
+                if not self.archive_in_table((startstamp or 0, stopstamp)):
+                    raise weedb.OperationalError(e)
+            else:
+                try:
+                    for columns in self.column_store.read(keys, startstamp, stopstamp,
+                                                          include_start):
+                        for i in range(0, len(columns['dateTime']), chunk_size):
+                            yield {key: _convert_column(column[i:i + chunk_size], typecode)
+                                   for key, column in columns.items()}
+                except (OSError, KeyError, weedb.colstore.DamagedMonthError) as e:
+                    # Too late to fall back to the database. Make sure the store gets
+                    # checked the next time around.
+                    self._column_store_failed(e)
+                    raise weedb.OperationalError(e)
+                return
+        yield from super()._gen_stored_columns(keys, startstamp, stopstamp, include_start,
+                                               typecode, chunk_size)
+
+    def purge_records(self, stopstamp):
+        if self.column_store is None:
+            return super().purge_records(stopstamp)
+        with self._store_update():
+            first_ts = self.first_timestamp
+            N = super().purge_records(stopstamp)
+            if first_ts is not None and first_ts < stopstamp:
+                try:
+                    store = self.column_store
+                    boundary = store.offloaded_until()
+                    for month in weedb.colstore.gen_months(first_ts, stopstamp):
+                        if weedb.colstore.month_span(month)[0] >= boundary:
+                            self._rebuild_month(month)
+                            continue
+                        # The column store holds the only copy of the month
+                        rows = store.read_rows(month, self.sqlkeys)
+                        i_dt = self.sqlkeys.index('dateTime')
+                        keep = [row for row in rows if row[i_dt] >= stopstamp]
+                        N += len(rows) - len(keep)
+                        if keep:
+                            store.write_month(month, self.sqlkeys, keep)
+                        else:
+                            store.remove_month(month)
+                except self.store_errors as e:
+                    self._column_store_failed(e)
+                Manager._create_sync(self)
+        return N
+
+    def add_column(self, column_name, column_type="REAL"):
+        if self.column_store is None:
+            return super().add_column(column_name, column_type)
+        with self._store_update():
+            super().add_column(column_name, column_type)
+            self._change_columns(self.column_store.add_column, column_name)
+
+    def rename_column(self, old_column_name, new_column_name):
+        if self.column_store is None:
+            return super().rename_column(old_column_name, new_column_name)
+        with self._store_update():
+            super().rename_column(old_column_name, new_column_name)
+            self._change_columns(self.column_store.rename_column, old_column_name,
+                                 new_column_name)
+
+    def drop_columns(self, column_names):
+        if self.column_store is None:
+            return super().drop_columns(column_names)
+        with self._store_update():
+            super().drop_columns(column_names)
+            for column_name in column_names:
+                self._change_columns(self.column_store.drop_column, column_name)
+
+    def _change_columns(self, fn, *args):
+        """Make the same change to the columns of the column store as was made to the archive
+        table."""
+        try:
+            fn(*args)
+        except self.store_errors as e:
+            self._column_store_failed(e)
+
+    def _schema_changed(self):
+        super()._schema_changed()
+        if self.column_store is not None:
+            self.sqlkeys = self.connection.columnsOf(self.table_name)
+
+    @contextlib.contextmanager
+    def _store_update(self):
+        """Context manager to be used around a change to the database, and the matching change
+        to the column store. It holds the lock of the column store throughout. If anything goes
+        wrong, the update is left unfinished, and the column store gets checked the next time
+        it is used, by this or any other process."""
+        # Anything held back is a change of its own.
+        self.flush_deferred()
+        store = self.column_store
+        try:
+            store.lock.acquire()
+        except OSError as e:
+            # Do not let a broken column store get in the way of the database.
+            self._column_store_failed(e)
+            yield
+            return
+        try:
+            # Bring the column store up to date, before changing anything.
+            try:
+                self._sync_columns()
+                store.begin_update()
+            except self.store_errors as e:
+                self._column_store_failed(e)
+            yield
+            if store.synced:
+                store.end_update()
+        finally:
+            store.lock.release()
+
+    def _sync_columns(self):
+        """Make sure the column store matches the database, rebuilding any months that do not.
+        Records that have turned up in the database for months that have been offloaded are
+        moved to the column store."""
+        store = self.column_store
+        with store.lock:
+            if store.synced and not store.update_interrupted():
+                return
+            boundary = store.offloaded_until()
+            # Ask the database, rather than use the cached first and last timestamps. Another
+            # process may have changed it.
+            first_ts, last_ts = self.getSql("SELECT MIN(dateTime), MAX(dateTime) FROM %s"
+                                            % self.table_name)
+            if first_ts is None:
+                months = set()
+            else:
+                months = set(weedb.colstore.gen_months(first_ts, last_ts))
+            for month in store.months():
+                if weedb.colstore.month_span(month)[0] < boundary:
+                    # Offloaded. Make sure it has all the columns, even if only as NULLs.
+                    info = store.info(month)
+                    for key in self.sqlkeys:
+                        if key not in info[2]:
+                            store.add_column(key, [month])
+                elif month not in months:
+                    store.remove_month(month)
+            N = 0
+            for month in sorted(months):
+                start, stop = weedb.colstore.month_span(month)
+                if start < boundary:
+                    self._rebuild_month(month)
+                    continue
+                count, last = self.getSql("SELECT COUNT(*), MAX(dateTime) FROM %s "
+                                          "WHERE dateTime >= ? AND dateTime < ?"
+                                          % self.table_name, (start, stop))
+                try:
+                    info = store.info(month)
+                except weedb.colstore.DamagedMonthError as e:
+                    log.info("Rebuilding damaged month: %s", e)
+                    info = None
+                if not count:
+                    if info is not None:
+                        store.remove_month(month)
+                elif info != (count, last, set(self.sqlkeys)):
+                    self._rebuild_month(month)
+                    N += 1
+            store.synced = True
+            store.end_update()
+            if N:
+                log.info("Rebuilt %d month(s) of column store %s", N, store.root)
+
+    def _flush_columns(self):
+        """Add the records held in self._pending to the column store."""
+        store = self.column_store
+        try:
+            boundary = store.offloaded_until()
+            i_dt = self.sqlkeys.index('dateTime')
+            by_month = {}
+            for row in sorted(self._pending, key=lambda r: r[i_dt]):
+                by_month.setdefault(weedb.colstore.month_of(row[i_dt]), []).append(row)
+            with store.lock:
+                for month, rows in by_month.items():
+                    if month in self._dirty:
+                        continue
+                    info = store.info(month)
+                    if weedb.colstore.month_span(month)[0] < boundary:
+                        # Has to be moved out of the database
+                        self._dirty.add(month)
+                    elif info is None:
+                        store.write_month(month, self.sqlkeys, rows)
+                    elif info[2] == set(self.sqlkeys) \
+                            and (info[1] is None or rows[0][i_dt] > info[1]):
+                        store.append(month, self.sqlkeys, rows)
+                    else:
+                        self._dirty.add(month)
+                for month in sorted(self._dirty):
+                    self._rebuild_month(month)
+        except self.store_errors as e:
+            self._column_store_failed(e)
+
+    def _offload(self):
+        """Move the months before the last offload_months months out of the archive table, and
+        into the column store."""
+        store = self.column_store
+        if not self.offload_months or not store.synced or self.last_timestamp is None:
+            return
+        month = weedb.colstore.month_of(self.last_timestamp)
+        for _ in range(self.offload_months):
+            month = weedb.colstore.month_of(weedb.colstore.month_span(month)[0] - 1)
+        boundary = weedb.colstore.month_span(month)[0]
+        try:
+            if boundary <= store.offloaded_until():
+                return
+            first_ts = self.getSql("SELECT MIN(dateTime) FROM %s" % self.table_name)[0]
+            # Mark the months first. The column store already has them. If this process dies
+            # before they are out of the database, the next one to check the column store
+            # finishes the job.
+            store.set_offloaded_until(boundary)
+            if first_ts is not None and first_ts < boundary:
+                months = list(weedb.colstore.gen_months(first_ts, boundary - 1))
+                for month in months:
+                    self._rebuild_month(month)
+                log.info("Moved %d month(s) of table '%s' to column store %s",
+                         len(months), self.table_name, store.root)
+        except self.store_errors as e:
+            self._column_store_failed(e)
+
+    def _rebuild_month(self, month):
+        """Rebuild a month of the column store from the database. If the month has been
+        offloaded, the records the column store has are kept, and any for the month in the
+        database are moved over. The database wins if both have the same record."""
+        start, stop = weedb.colstore.month_span(month)
+        rows = [tuple(row) for row in
+                self.genSql("SELECT %s FROM %s WHERE dateTime >= ? AND dateTime < ? "
+                            "ORDER BY dateTime ASC" % (', '.join(self.sqlkeys), self.table_name),
+                            (start, stop))]
+        store = self.column_store
+        if start < store.offloaded_until():
+            if rows:
+                i_dt = self.sqlkeys.index('dateTime')
+                merged = {row[i_dt]: row for row in store.read_rows(month, self.sqlkeys)}
+                merged.update((row[i_dt], row) for row in rows)
+                store.write_month(month, self.sqlkeys, [merged[ts] for ts in sorted(merged)])
+                # Only now that the column store has them, take them out of the database
+                with weedb.Transaction(self.connection) as cursor:
+                    cursor.execute("DELETE FROM %s WHERE dateTime >= ? AND dateTime < ?"
+                                   % self.table_name, (start, stop))
+        elif rows:
+            store.write_month(month, self.sqlkeys, rows)
+        else:
+            store.remove_month(month)
+
+    def _column_store_failed(self, e):
+        log.error("Column store %s failed: %s", self.column_store.root, e)
+        # Check it again before using it.
+        self.column_store.synced = False
+
+
+def _convert_column(column, typecode):
+    """Convert a column read from a column store to the requested type."""
+    if isinstance(column, list):
+        if typecode is None:
+            return column
+        nan = float('nan')
+        return array.array(typecode, (nan if v is None else v for v in column))
+    if typecode is None:
+        if column.typecode == 'd':
+            return [None if v != v else v for v in column]
+        return column.tolist()
+    if column.typecode == typecode:
+        return column
+    return array.array(typecode, column)
+
+
 if __name__ == '__main__':
     import doctest
 
@@ -0,0 +1,356 @@
+#
+#    Copyright (c) 2026 Tom Keffer <tkeffer@gmail.com>
+#
+#    See the file LICENSE.txt for your full rights.
+#
+"""Publish LOOP packets and archive records to local subscribers.
+
+Service StdPublisher listens on a UNIX domain socket, or on a TCP port. Anybody who connects gets
+every LOOP packet and archive record from then on, one line of JSON per message:
+
+    {"type":"loop","data":{"dateTime":1700000000,"usUnits":1,"outTemp":50.2}}
+
+The engine thread only hands a copy of the packet to a publisher thread. The publisher thread
+serializes each message once, no matter how many subscribers there are, then writes it to every
+subscriber without blocking. Messages waiting for the publisher thread are held in a bounded
+queue. If the publisher thread falls that far behind, the oldest are dropped, and counted. Each
+subscriber has its own, bounded, buffer. If a subscriber does not keep up, and its buffer fills
+up, messages are dropped according to the drop policy:
+
+    oldest      Drop the oldest message in the buffer (the default)
+    newest      Drop the new message
+    disconnect  Disconnect the subscriber
+
+Anything sent by a subscriber is ignored. To read the feed, use function subscribe(), or any tool
+that can read lines from a socket, such as 'nc -U /path/to/socket'.
+"""
+
+import collections
+import json
+import logging
+import os
+import os.path
+import selectors
+import socket
+import stat
+import threading
+
+import weewx
+import weewx.engine
+from weeutil.weeutil import to_bool, to_int
+
+log = logging.getLogger(__name__)
+
+DROP_POLICIES = ('oldest', 'newest', 'disconnect')
+
+
+class Subscriber:
+    """A connection to a subscriber, with its buffer of messages waiting to be sent."""
+
+    def __init__(self, sock, name):
+        self.sock = sock
+        self.name = name
+        self.buffer = collections.deque()
+        # What is left of the message being sent
+        self.out = None
+        self.sent = 0
+        self.dropped = 0
+        self.max_depth = 0
+
+    def push(self, message, max_buffer, drop_policy):
+        """Add a message to the buffer.
+
+        Returns:
+            bool: False if the subscriber should be disconnected.
+        """
+        if len(self.buffer) >= max_buffer:
+            if drop_policy == 'disconnect':
+                return False
+            if not self.dropped:
+                log.warning("Subscriber %s is not keeping up. Dropping messages.", self.name)
+            self.dropped += 1
+            if drop_policy == 'newest':
+                return True
+            self.buffer.popleft()
+        self.buffer.append(message)
+        self.max_depth = max(self.max_depth, len(self.buffer))
+        return True
+
+    def flush(self):
+        """Send as much as the socket will take, without blocking.
+
+        Returns:
+            bool: True if everything has been sent.
+
+        Raises:
+            OSError: If the connection has failed.
+        """
+        while True:
+            if not self.out:
+                if not self.buffer:
+                    return True
+                self.out = memoryview(self.buffer.popleft())
+            try:
+                n = self.sock.send(self.out)
+            except BlockingIOError:
+                return False
+            self.out = self.out[n:]
+            if not self.out:
+                self.sent += 1
+
+    def stats(self):
+        return {'name': self.name, 'sent': self.sent, 'dropped': self.dropped,
+                'depth': len(self.buffer), 'max_depth': self.max_depth}
+
+
+class Publisher(threading.Thread):
+    """Thread that accepts subscribers, and fans out messages to them."""
+
+    def __init__(self, address, max_buffer=100, drop_policy='oldest'):
+        """Initialize an instance of Publisher.
+
+        Args:
+            address (str|tuple): The path of a UNIX domain socket, or a tuple (host, port) for a
+                TCP socket. A port of zero picks a free port.
+            max_buffer (int): How many messages to hold for a subscriber that is not keeping up.
+            drop_policy (str): What to do when the buffer of a subscriber is full. One of
+                'oldest', 'newest', or 'disconnect'.
+        """
+        super().__init__(name='Publisher')
+        self.daemon = True
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError("Unknown drop policy '%s'" % drop_policy)
+        self.max_buffer = max_buffer
+        self.drop_policy = drop_policy
+        self.subscribers = {}
+        # Messages from the engine, waiting to be published
+        self.pending = collections.deque(maxlen=max_buffer)
+        # How many have been published, and how many of them were dropped before the publisher
+        # thread got to them. Only changed by publish().
+        self.published = 0
+        self.dropped = 0
+        self.stopping = False
+
+        if isinstance(address, str):
+            # Get rid of any socket left over from a previous run, but nothing else
+            if os.path.lexists(address):
+                if not stat.S_ISSOCK(os.lstat(address).st_mode):
+                    raise ValueError("'%s' exists, and is not a socket" % address)
+                os.unlink(address)
+            self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.unix_path = address
+        else:
+            self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.unix_path = None
+        self.listener.bind(address)
+        self.listener.listen()
+        self.listener.setblocking(False)
+        self.address = self.listener.getsockname()
+
+        # Used by other threads to wake up the publisher
+        self.wake_r, self.wake_w = socket.socketpair()
+        self.wake_r.setblocking(False)
+        self.wake_w.setblocking(False)
+
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.listener, selectors.EVENT_READ)
+        self.selector.register(self.wake_r, selectors.EVENT_READ)
+
+    def publish(self, msg_type, data):
+        """Queue up a message for the subscribers. Safe to call from any thread, and never
+        blocks. If too many messages are waiting for the publisher thread, the oldest is
+        dropped."""
+        if len(self.pending) >= self.max_buffer:
+            if not self.dropped:
+                log.warning("Publisher is not keeping up. Dropping messages.")
+            self.dropped += 1
+        self.published += 1
+        self.pending.append((msg_type, dict(data)))
+        self._wake()
+
+    def stop(self):
+        """Stop the thread, and disconnect everybody."""
+        self.stopping = True
+        self._wake()
+        self.join(20.0)
+        if self.is_alive():
+            log.error("Unable to shut down %s thread", self.name)
+        if self.dropped:
+            log.warning("Publisher dropped %d of %d messages before they could be sent",
+                        self.dropped, self.published)
+
+    def stats(self):
+        """Return the statistics of the publisher.
+
+        Returns:
+            dict: Key 'published' is the number of messages published, and 'dropped' how many of
+                them were dropped before the publisher thread got to them. Key 'subscribers' is a
+                list of dictionaries, one for each subscriber, with the number of messages sent,
+                and dropped, and the current and maximum depth of its buffer.
+        """
+        return {'published': self.published, 'dropped': self.dropped,
+                'subscribers': [subscriber.stats()
+                                for subscriber in list(self.subscribers.values())]}
+
+    def _wake(self):
+        try:
+            self.wake_w.send(b'\0')
+        except (BlockingIOError, OSError):
+            # It is already awake, or it has gone away
+            pass
+
+    def run(self):
+        try:
+            while not self.stopping:
+                for key, mask in self.selector.select():
+                    if key.fileobj is self.listener:
+                        self._accept()
+                    elif key.fileobj is self.wake_r:
+                        self._drain_wake()
+                    else:
+                        self._service(key.data, mask)
+                self._fan_out()
+        except Exception as e:
+            log.error("Publisher thread exiting: %s", e)
+        finally:
+            for subscriber in list(self.subscribers.values()):
+                self._disconnect(subscriber)
+            self.selector.close()
+            self.listener.close()
+            self.wake_r.close()
+            self.wake_w.close()
+            if self.unix_path:
+                try:
+                    os.unlink(self.unix_path)
+                except OSError:
+                    pass
+
+    def _accept(self):
+        try:
+            sock, peer = self.listener.accept()
+        except BlockingIOError:
+            return
+        sock.setblocking(False)
+        subscriber = Subscriber(sock, peer or 'fd %d' % sock.fileno())
+        self.subscribers[sock] = subscriber
+        self.selector.register(sock, selectors.EVENT_READ, subscriber)
+        log.info("New subscriber %s", subscriber.name)
+
+    def _drain_wake(self):
+        try:
+            while self.wake_r.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def _service(self, subscriber, mask):
+        try:
+            if mask & selectors.EVENT_READ:
+                if not subscriber.sock.recv(4096):
+                    # The subscriber has hung up
+                    self._disconnect(subscriber)
+                    return
+            if mask & selectors.EVENT_WRITE and subscriber.flush():
+                self.selector.modify(subscriber.sock, selectors.EVENT_READ, subscriber)
+        except BlockingIOError:
+            pass
+        except OSError:
+            self._disconnect(subscriber)
+
+    def _fan_out(self):
+        """Serialize any pending messages, and send them to the subscribers."""
+        while self.pending:
+            msg_type, data = self.pending.popleft()
+            if not self.subscribers:
+                continue
+            message = json.dumps({'type': msg_type, 'data': data}, separators=(',', ':'),
+                                 default=str).encode('utf-8') + b'\n'
+            for subscriber in list(self.subscribers.values()):
+                if not subscriber.push(message, self.max_buffer, self.drop_policy):
+                    log.warning("Subscriber %s is not keeping up. Disconnecting.",
+                                subscriber.name)
+                    self._disconnect(subscriber)
+        for subscriber in list(self.subscribers.values()):
+            if subscriber.out or subscriber.buffer:
+                try:
+                    if not subscriber.flush():
+                        self.selector.modify(subscriber.sock,
+                                             selectors.EVENT_READ | selectors.EVENT_WRITE,
+                                             subscriber)
+                except OSError:
+                    self._disconnect(subscriber)
+
+    def _disconnect(self, subscriber):
+        if self.subscribers.pop(subscriber.sock, None) is None:
+            return
+        try:
+            self.selector.unregister(subscriber.sock)
+        except (KeyError, ValueError):
+            pass
+        subscriber.sock.close()
+        log.info("Subscriber %s disconnected. Sent %d messages, dropped %d, "
+                 "buffer depth max %d", subscriber.name, subscriber.sent, subscriber.dropped,
+                 subscriber.max_depth)
+
+
+def subscribe(address, timeout=None):
+    """Generator function that connects to a publisher, then yields the messages it sends.
+
+    Args:
+        address (str|tuple): The path of a UNIX domain socket, or a tuple (host, port).
+        timeout (float|None): How long to wait for a message, before socket.timeout is raised.
+            Default is to wait forever.
+
+    Yields:
+        tuple: A 2-way tuple (message type, data), where the type is 'loop' or 'archive', and
+            the data is the packet or record.
+    """
+    family = socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+    with socket.socket(family, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(address)
+        with sock.makefile('rb') as fd:
+            for line in fd:
+                message = json.loads(line)
+                yield message['type'], message['data']
+
+
+class StdPublisher(weewx.engine.StdService):
+    """Service that publishes LOOP packets and archive records to local subscribers."""
+
+    def __init__(self, engine, config_dict):
+        super().__init__(engine, config_dict)
+
+        pub_dict = config_dict.get('StdPublisher', {})
+        if pub_dict.get('unix_socket'):
+            address = os.path.join(config_dict.get('WEEWX_ROOT', ''), pub_dict['unix_socket'])
+        else:
+            address = (pub_dict.get('host', 'localhost'), to_int(pub_dict.get('port', 8765)))
+        try:
+            self.publisher = Publisher(address,
+                                       max_buffer=to_int(pub_dict.get('max_buffer', 100)),
+                                       drop_policy=pub_dict.get('drop_policy', 'oldest').lower())
+        except (OSError, ValueError) as e:
+            log.error("Unable to start publisher on %s: %s", address, e)
+            log.error("****  Publisher not started")
+            self.publisher = None
+            return
+        self.publisher.start()
+        log.info("Publishing on %s", self.publisher.address)
+
+        if to_bool(pub_dict.get('publish_loop', True)):
+            self.bind(weewx.NEW_LOOP_PACKET, self.new_loop_packet)
+        if to_bool(pub_dict.get('publish_archive', True)):
+            self.bind(weewx.NEW_ARCHIVE_RECORD, self.new_archive_record)
+
+    def new_loop_packet(self, event):
+        self.publisher.publish('loop', event.packet)
+
+    def new_archive_record(self, event):
+        self.publisher.publish('archive', event.record)
+
+    def shutDown(self):
+        if self.publisher:
+            self.publisher.stop()
+            self.publisher = None
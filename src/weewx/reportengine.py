@@ -7,7 +7,7 @@
 
 # System imports:
 import datetime
-import ftplib
+import hashlib
 import locale
 import logging
 import os
@@ -21,6 +21,7 @@ from pathlib import Path
 import configobj
 
 # WeeWX imports:
+import weedb.profile
 import weeutil.config
 import weeutil.logger
 import weeutil.weeutil
@@ -142,6 +143,9 @@ class StdReportEngine(threading.Thread):
         self.record = record
         self.gen_ts = gen_ts
         self.first_run = first_run
+        # If SQL profiling is on, this holds the statistics of each report that was run. Key is
+        # the report name, value is an instance of weedb.profile.Stats.
+        self.sql_stats = {}
 
     def run(self, reports=None):
         """This is where the actual work gets done.
@@ -180,7 +184,7 @@ class StdReportEngine(threading.Thread):
 
             # Fetch and build the skin_dict:
             try:
-                skin_dict = build_skin_dict(self.config_dict, report)
+                skin_dict = skin_cache.get(self.config_dict, report)
             except SyntaxError as e:
                 log.error("Syntax error: %s", e)
                 log.error("   ****       Report ignored")
@@ -222,7 +226,8 @@ class StdReportEngine(threading.Thread):
             # statements to work.
             # 2. Set the locale to 'lang'. If 'lang' was not specified, set it to the user's
             # default locale.
-            with set_cwd(skin_dir) as cwd, set_locale(skin_dict.get('lang', '')) as loc:
+            with set_cwd(skin_dir) as cwd, set_locale(skin_dict.get('lang', '')) as loc, \
+                    weedb.profile.collect() as report_stats:
                 log.debug("Running generators for report '%s' in directory '%s' with locale '%s'",
                           report, cwd, loc)
 
@@ -268,6 +273,25 @@ class StdReportEngine(threading.Thread):
                 else:
                     log.debug("No generators specified for report '%s'", report)
 
+            if weedb.profile.is_enabled():
+                self.sql_stats[report] = report_stats
+                log.info("Report '%s' ran %d SQL queries in %.3f seconds, returning %d rows",
+                         report, *report_stats.totals())
+
+        if weedb.profile.is_enabled() and self.sql_stats:
+            log_sql_summary(self.sql_stats.values())
+
+
+def log_sql_summary(stats_list, limit=10):
+    """Log the SQL statements of a report cycle that took the most time."""
+    cycle_stats = weedb.profile.Stats()
+    for stats in stats_list:
+        cycle_stats.merge(stats)
+    log.info("Report cycle ran %d SQL queries in %.3f seconds, returning %d rows",
+             *cycle_stats.totals())
+    for line in cycle_stats.format(limit=limit, width=200):
+        log.info("  %s", line)
+
 
 def build_skin_dict(config_dict, report):
     """Find and build the skin_dict for the given report"""
@@ -356,6 +380,110 @@ def build_skin_dict(config_dict, report):
     return skin_dict
 
 
+class SkinCache:
+    """Holds the skin dictionary of each report, so the skin configuration and language files
+    need not be read and merged again every report cycle.
+
+    A skin dictionary is built again if the configuration dictionary is a different object, if
+    the options it was built from have been changed in place, or if any of the files it was built
+    from have changed. The cached copy is never handed out, so generators are free to modify what
+    they get.
+    """
+
+    def __init__(self):
+        # Key is the report name. Value is a 4-way tuple (config_dict, digest, sources, skin_dict)
+        self.skins = {}
+
+    def get(self, config_dict, report):
+        """Return a copy of the skin dictionary for a report, building it if necessary.
+
+        Args:
+            config_dict (dict): The configuration dictionary.
+            report (str): The name of the report.
+
+        Returns:
+            configobj.ConfigObj: The skin dictionary.
+        """
+        digest = get_config_digest(config_dict, report)
+        sources = get_skin_sources(config_dict, report)
+        try:
+            cached_config, cached_digest, cached_sources, skin_dict = self.skins[report]
+        except KeyError:
+            pass
+        else:
+            if cached_config is config_dict and cached_digest == digest \
+                    and cached_sources == sources:
+                return weeutil.config.deep_copy(skin_dict)
+        skin_dict = build_skin_dict(config_dict, report)
+        # Hold on to the configuration dictionary, so it cannot be replaced by a new one with
+        # the same id.
+        self.skins[report] = (config_dict, digest, sources, skin_dict)
+        return weeutil.config.deep_copy(skin_dict)
+
+    def clear(self):
+        self.skins.clear()
+
+
+skin_cache = SkinCache()
+
+
+def get_config_digest(config_dict, report):
+    """Return a digest of the options in the configuration dictionary that the skin dictionary
+    of a report is built from.
+
+    These are the global log_success and log_failure, the scalars of [StdReport], its [[Defaults]]
+    section, and the section of the report itself.
+    """
+    std_report = config_dict['StdReport']
+    options = (
+        config_dict.get('WEEWX_ROOT'),
+        config_dict.get('log_success'),
+        config_dict.get('log_failure'),
+        [(scalar, std_report[scalar]) for scalar in std_report.scalars],
+        std_report['Defaults'].dict() if 'Defaults' in std_report else None,
+        std_report[report].dict() if report in std_report else None,
+    )
+    return hashlib.sha1(repr(options).encode('utf-8')).hexdigest()
+
+
+def get_skin_sources(config_dict, report):
+    """Return the files that the skin dictionary of a report is built from, along with their
+    modification times.
+
+    These are the skin configuration file, and the files in the language directory, including any
+    language extensions. Directories are included as well, so adding a file will be noticed.
+
+    Returns:
+        tuple: A tuple of 2-way tuples (path, mtime). The mtime is None if the path does not
+            exist.
+    """
+    skin_dir = os.path.join(config_dict['WEEWX_ROOT'],
+                            config_dict['StdReport']['SKIN_ROOT'],
+                            config_dict['StdReport'][report].get('skin', ''))
+    paths = [os.path.join(skin_dir, 'skin.conf')]
+    lang_dirs = [os.path.join(skin_dir, 'lang')]
+    while lang_dirs:
+        lang_dir = lang_dirs.pop()
+        paths.append(lang_dir)
+        try:
+            with os.scandir(lang_dir) as it:
+                for entry in it:
+                    if entry.is_dir() and entry.name.startswith('lang'):
+                        lang_dirs.append(entry.path)
+                    elif entry.name.endswith('.conf'):
+                        paths.append(entry.path)
+        except OSError:
+            pass
+
+    sources = []
+    for path in sorted(paths):
+        try:
+            sources.append((path, os.stat(path).st_mtime_ns))
+        except OSError:
+            sources.append((path, None))
+    return tuple(sources)
+
+
 def merge_unit_system(report_units_base, skin_dict):
     """
     Given a unit system, merge its unit groups into a configuration dictionary
@@ -476,7 +604,11 @@ class ReportGenerator:
         self.first_run = first_run
         self.stn_info = stn_info
         self.record = record
-        self.db_binder = weewx.manager.DBBinder(self.config_dict)
+        # Unless told otherwise, borrow database managers from the process-wide pool, rather than
+        # opening them anew every report cycle.
+        pool_managers = to_bool(self.config_dict.get('StdReport', {}).get('pool_managers', True))
+        self.db_binder = weewx.manager.DBBinder(
+            self.config_dict, pool=weewx.manager.manager_pool if pool_managers else None)
 
     def start(self):
         self.run()
@@ -498,6 +630,7 @@ class FtpGenerator(ReportGenerator):
     This will ftp everything in the public_html subdirectory to a webserver."""
 
     def run(self):
+        import ftplib
         import weeutil.ftpupload
 
         # determine how much logging is desired
@@ -0,0 +1,448 @@
+#
+#    Copyright (c) 2026 Tom Keffer <tkeffer@gmail.com>
+#
+#    See the file LICENSE.txt for your full rights.
+#
+"""Host the RESTful uploaders on a single asyncio event loop.
+
+Normally, each posting object in weewx.restx runs in a thread of its own, and spends nearly all
+its time waiting, either for a record, or for a retry. If option 'runtime' in [StdRESTful] is set
+to 'asyncio', they are all hosted by one event loop, running in one thread, instead:
+
+ - Each uploader keeps its own queue and its own retry policy, and processes its records one at a
+   time, in order. Waits, such as between retries, are done with asyncio.sleep(), so they do not
+   tie up a thread.
+ - HTTP requests are done with a small asyncio HTTP/1.1 client. No more than 'max_concurrent'
+   requests are in flight at any time.
+ - Uploaders that use the same database share a single database manager. It is used by a
+   single worker thread, where prepare_request() is called, so database queries do not hold up
+   the event loop.
+ - The event loop is woken when a record is put in the queue of an uploader, so the queues are
+   never polled.
+
+The uploaders do not have to be rewritten. The runtime calls the same methods that
+RESTThread.run_loop() does: skip_this_post(), prepare_request() (and so get_record(),
+format_url(), get_request(), get_post_body()), check_response(), handle_code(),
+handle_exception(), and post_failed(). If an uploader overrides post_request(), it gets called in
+a small pool of worker threads. So does the default version, if the request has to go through a
+proxy. An uploader that overrides run(), run_loop(), process_record(), or post_with_retries()
+is doing something the runtime cannot know about, so it gets a thread of its own, as before.
+"""
+
+import asyncio
+import concurrent.futures
+import email.parser
+import http.client
+import io
+import logging
+import queue
+import socket
+import ssl
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+
+import weewx
+import weewx.manager
+import weewx.restx
+
+log = logging.getLogger(__name__)
+
+# How many redirects to follow
+MAX_REDIRECTS = 5
+
+_runtime = None
+_runtime_lock = threading.Lock()
+
+
+def get_runtime(max_concurrent=4):
+    """Return the shared runtime, creating it if necessary."""
+    global _runtime
+    with _runtime_lock:
+        if _runtime is None or _runtime.stopped:
+            _runtime = UploadRuntime(max_concurrent)
+        return _runtime
+
+
+class UploadRuntime:
+    """An asyncio event loop, running in a thread of its own, that hosts posting objects of type
+    weewx.restx.RESTThread.
+
+    The thread is started when the first posting object is added, and ends once the last one has
+    finished.
+    """
+
+    # If a posting object overrides any of these, it cannot be hosted.
+    unsupported = ('run', 'run_loop', 'process_record', 'post_with_retries')
+
+    def __init__(self, max_concurrent=4):
+        self.max_concurrent = max(1, max_concurrent)
+        self.loop = asyncio.new_event_loop()
+        self.executor = concurrent.futures.ThreadPoolExecutor(self.max_concurrent)
+        # The thread that uses the database managers
+        self.db_executor = concurrent.futures.ThreadPoolExecutor(1)
+        self.thread = threading.Thread(target=self._run, name='UploadRuntime', daemon=True)
+        self.lock = threading.Lock()
+        # Created in the event loop
+        self.semaphore = None
+        # Database managers, shared by the posting objects. Only used in self.db_executor.
+        self.managers = {}
+        # Key is a posting object, value is an asyncio.Event, set when a record is put in its
+        # queue. Only used in the event loop.
+        self.wakeups = {}
+        # Key is a posting object, value is the concurrent.futures.Future of its task.
+        self.tasks = {}
+        self.stopped = False
+
+    def can_host(self, uploader):
+        """Return True if a posting object can be hosted."""
+        cls = type(uploader)
+        return all(getattr(cls, name) is getattr(weewx.restx.RESTThread, name)
+                   for name in UploadRuntime.unsupported)
+
+    def add(self, uploader):
+        """Start hosting a posting object.
+
+        Returns:
+            bool: False if the posting object cannot be hosted, and needs a thread of its own.
+        """
+        if not self.can_host(uploader):
+            return False
+        with self.lock:
+            if self.stopped:
+                return False
+            if not self.thread.is_alive():
+                self.thread.start()
+            self._watch(uploader)
+            self.tasks[uploader] = asyncio.run_coroutine_threadsafe(self._host(uploader),
+                                                                    self.loop)
+        log.debug("%s: Hosted by the upload runtime", uploader.protocol_name)
+        return True
+
+    def _watch(self, uploader):
+        """Arrange for the event loop to be woken whenever a record is put in the queue of a
+        posting object."""
+        put = uploader.queue.put
+
+        def put_and_wake(item, block=True, timeout=None):
+            put(item, block, timeout)
+            try:
+                self.loop.call_soon_threadsafe(self._wake, uploader)
+            except RuntimeError:
+                # The event loop has closed
+                pass
+
+        uploader.queue.put = put_and_wake
+
+    def _wake(self, uploader):
+        wakeup = self.wakeups.get(uploader)
+        if wakeup is not None:
+            wakeup.set()
+
+    def is_running(self, uploader):
+        """Return True if a posting object is still being hosted."""
+        future = self.tasks.get(uploader)
+        return future is not None and not future.done()
+
+    def wait(self, uploader, timeout=None):
+        """Wait for a posting object to finish. If it has not finished by the timeout, it is
+        cancelled."""
+        future = self.tasks.get(uploader)
+        if future is None:
+            return
+        try:
+            future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+        except (Exception, concurrent.futures.CancelledError):
+            # Any problem has already been logged
+            pass
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_forever()
+        finally:
+            self.db_executor.submit(self._close_managers).result()
+            self.db_executor.shutdown(wait=False)
+            self.executor.shutdown(wait=False)
+            self.loop.close()
+
+    def _close_managers(self):
+        for manager in self.managers.values():
+            try:
+                manager.close()
+            except Exception:
+                pass
+        self.managers = {}
+
+    async def _host(self, uploader):
+        """Runs one posting object. The equivalent of RESTThread.run_loop()."""
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.max_concurrent)
+        try:
+            dbmanager = await self.loop.run_in_executor(self.db_executor, self._get_manager,
+                                                        uploader)
+            while True:
+                record = await self._next_record(uploader)
+                if record is None:
+                    return
+                if uploader.skip_this_post(record['dateTime']):
+                    continue
+                try:
+                    request, data = await self.loop.run_in_executor(
+                        self.db_executor, uploader.prepare_request, record, dbmanager)
+                    await self._post_with_retries(uploader, request, data)
+                except Exception as e:
+                    # This will raise the exception again, if the uploader should terminate
+                    wait = uploader.post_failed(e, record)
+                    if wait:
+                        await asyncio.sleep(wait)
+                else:
+                    uploader.post_succeeded(record)
+        finally:
+            # Put the queue back the way it was
+            vars(uploader.queue).pop('put', None)
+            self.wakeups.pop(uploader, None)
+            with self.lock:
+                self.tasks.pop(uploader, None)
+                if not self.tasks:
+                    # Let the task finish, then stop
+                    self.stopped = True
+                    self.loop.call_soon(self.loop.stop)
+
+    def _get_manager(self, uploader):
+        """Return a database manager for a posting object, shared with any others that use the
+        same database. Runs in self.db_executor."""
+        manager_dict = uploader.manager_dict
+        if manager_dict is None:
+            return None
+        key = (repr(sorted(manager_dict['database_dict'].items())),
+               manager_dict.get('table_name'))
+        if key not in self.managers:
+            try:
+                self.managers[key] = weewx.manager.open_manager(manager_dict)
+            except Exception as e:
+                log.error("%s: Unable to open database: %s", uploader.protocol_name, e)
+                raise
+        return self.managers[key]
+
+    async def _next_record(self, uploader):
+        """Wait for the next record in the queue of a posting object. Trims the queue down to
+        its maximum backlog. Returns None if the posting object should stop."""
+        wakeup = self.wakeups.setdefault(uploader, asyncio.Event())
+        while True:
+            # Clear it first, so a record put in the queue from now on sets it again
+            wakeup.clear()
+            try:
+                record = uploader.queue.get_nowait()
+            except queue.Empty:
+                await wakeup.wait()
+                continue
+            if record is None or uploader.queue.qsize() <= uploader.max_backlog:
+                return record
+
+    async def _post_with_retries(self, uploader, request, data):
+        """The equivalent of RESTThread.post_with_retries()."""
+        if uploader.delay_post:
+            log.debug("%s: Delaying post by %d seconds", uploader.protocol_name,
+                      uploader.delay_post)
+            await asyncio.sleep(uploader.delay_post)
+
+        for count in range(uploader.max_tries):
+            try:
+                if count:
+                    await asyncio.sleep(uploader.retry_wait)
+                response = await self._post_request(uploader, request, data)
+                if 200 <= response.code <= 299:
+                    uploader.check_response(response)
+                    return
+                uploader.handle_code(response.code, count + 1)
+            except (urllib.error.URLError, socket.error, http.client.HTTPException) as e:
+                uploader.handle_exception(e, count + 1)
+        raise weewx.restx.FailedPost("Failed upload after %d tries" % uploader.max_tries)
+
+    async def _post_request(self, uploader, request, data):
+        async with self.semaphore:
+            if type(uploader).post_request is not weewx.restx.RESTThread.post_request \
+                    or _uses_proxy(request):
+                return await self.loop.run_in_executor(self.executor, _blocking_post,
+                                                       uploader, request, data)
+            if weewx.debug >= 2:
+                log.debug("%s url: '%s'", uploader.protocol_name, request.get_full_url())
+            return await fetch(request, data, uploader.timeout)
+
+
+class Response(io.BytesIO):
+    """An HTTP response that has been read in full. It offers the parts of the interface of the
+    object returned by urllib.request.urlopen() that the uploaders use."""
+
+    def __init__(self, url, code, reason, headers, body):
+        super().__init__(body)
+        self.url = url
+        self.code = self.status = code
+        self.reason = self.msg = reason
+        self.headers = headers
+
+    def getcode(self):
+        return self.code
+
+    def geturl(self):
+        return self.url
+
+    def info(self):
+        return self.headers
+
+
+async def fetch(request, data=None, timeout=10):
+    """Do an HTTP request, with asyncio.
+
+    Args:
+        request (urllib.request.Request): The request.
+        data (bytes|str|None): The body of a POST. If None, the data of the request is used.
+        timeout (float): How long to wait for the whole exchange, in seconds.
+
+    Returns:
+        Response: The response.
+
+    Raises:
+        urllib.error.HTTPError: If the server returns an error code.
+        OSError, http.client.HTTPException: If the exchange fails.
+    """
+    try:
+        return await asyncio.wait_for(_fetch(request, data), timeout)
+    except asyncio.TimeoutError:
+        raise socket.timeout("timed out")
+
+
+async def _fetch(request, data):
+    if data is None:
+        data = request.data
+    if data is not None and not isinstance(data, bytes):
+        data = data.encode('utf-8')
+    method = getattr(request, 'method', None) or ('POST' if data is not None else 'GET')
+    url = request.full_url
+    headers = dict(request.header_items())
+    for _ in range(MAX_REDIRECTS + 1):
+        code, reason, response_headers, body = await _exchange(method, url, headers, data)
+        location = response_headers.get('Location')
+        if code in (301, 302, 303, 307, 308) and location:
+            url = urllib.parse.urljoin(url, location)
+            if code not in (307, 308):
+                method, data = 'GET', None
+                headers.pop('Content-type', None)
+            continue
+        break
+    if code >= 300:
+        raise urllib.error.HTTPError(url, code, reason, response_headers, io.BytesIO(body))
+    return Response(url, code, reason, response_headers, body)
+
+
+async def _exchange(method, url, headers, data):
+    """Do a single HTTP/1.1 exchange, on a new connection.
+
+    Returns:
+        tuple: A 4-way tuple (code, reason, headers, body).
+    """
+    parts = urllib.parse.urlsplit(url)
+    if parts.scheme not in ('http', 'https'):
+        raise urllib.error.URLError("unknown url type: %s" % parts.scheme)
+    secure = parts.scheme == 'https'
+    host = parts.hostname
+    port = parts.port or (443 if secure else 80)
+    path = parts.path or '/'
+    if parts.query:
+        path += '?' + parts.query
+
+    reader, writer = await asyncio.open_connection(
+        host, port,
+        ssl=ssl.create_default_context() if secure else None,
+        server_hostname=host if secure else None)
+    try:
+        lines = ['%s %s HTTP/1.1' % (method, path),
+                 'Host: %s' % parts.netloc.rpartition('@')[2]]
+        send_headers = {key.capitalize(): value for key, value in headers.items()}
+        if data is not None:
+            send_headers.setdefault('Content-type', 'application/x-www-form-urlencoded')
+            send_headers['Content-length'] = str(len(data))
+        send_headers['Connection'] = 'close'
+        lines.extend('%s: %s' % item for item in send_headers.items())
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + (data or b''))
+        await writer.drain()
+
+        try:
+            # Skip any interim responses, such as '100 Continue'
+            while True:
+                code, reason = _parse_status(await reader.readline())
+                response_headers = await _read_headers(reader)
+                if code >= 200:
+                    break
+            if method == 'HEAD' or code in (204, 304):
+                body = b''
+            elif response_headers.get('Transfer-Encoding', '').lower() == 'chunked':
+                body = await _read_chunked(reader)
+            elif response_headers.get('Content-Length') is not None:
+                body = await reader.readexactly(int(response_headers['Content-Length']))
+            else:
+                body = await reader.read()
+        except asyncio.IncompleteReadError as e:
+            raise http.client.IncompleteRead(e.partial)
+        except ValueError as e:
+            raise http.client.HTTPException("Bad response: %s" % e)
+    finally:
+        writer.close()
+    return code, reason, response_headers, body
+
+
+def _parse_status(line):
+    if not line:
+        raise http.client.RemoteDisconnected("Remote end closed connection without response")
+    try:
+        version, code, *reason = line.decode('latin-1').strip().split(' ', 2)
+        code = int(code)
+    except ValueError:
+        raise http.client.BadStatusLine(repr(line))
+    if not version.startswith('HTTP/'):
+        raise http.client.BadStatusLine(repr(line))
+    return code, reason[0] if reason else ''
+
+
+async def _read_headers(reader):
+    lines = []
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        lines.append(line)
+    return email.parser.BytesParser(_class=http.client.HTTPMessage).parsebytes(b''.join(lines))
+
+
+async def _read_chunked(reader):
+    chunks = []
+    while True:
+        size = int((await reader.readline()).split(b';')[0].strip(), 16)
+        if not size:
+            # Skip any trailers
+            await _read_headers(reader)
+            return b''.join(chunks)
+        chunks.append(await reader.readexactly(size))
+        await reader.readline()
+
+
+def _uses_proxy(request):
+    """Return True if a request has to go through a proxy."""
+    proxies = urllib.request.getproxies()
+    return request.type in proxies and not urllib.request.proxy_bypass(request.host)
+
+
+def _blocking_post(uploader, request, data):
+    """Post a request with the uploader's own post_request(), then read the response in full.
+    Runs in a worker thread."""
+    response = uploader.post_request(request, data)
+    try:
+        body = response.read()
+    finally:
+        response.close()
+    return Response(response.geturl(), response.code, getattr(response, 'reason', ''),
+                    getattr(response, 'headers', None), body)
@@ -78,6 +78,11 @@ In some cases, you might also have to implement the following:
    protocol, you may need to override this function. See the CWOP version,
    CWOPThread.process_record(), for an example that uses sockets.
 
+If option 'runtime' in [StdRESTful] is set to 'asyncio', posting objects that
+do not override process_record(), or how it is called, are not given a thread
+of their own. Instead, they are hosted by a single asyncio event loop. See
+module weewx.restasync.
+
 See the file restful.md in the "tests" subdirectory for known behaviors
 of various RESTful services.
 
@@ -90,6 +95,7 @@ import platform
 import queue
 import random
 import re
+import select
 import socket
 import ssl
 import sys
@@ -140,6 +146,32 @@ class StdRESTful(weewx.engine.StdService):
     
     Offers a few common bits of functionality."""
 
+    # Whether to skip the archive records of a batched catch-up, and post only the last one.
+    # Set to False in a subclass that must see every record.
+    coalesce_catchup = True
+
+    def __init__(self, engine, config_dict):
+        super().__init__(engine, config_dict)
+        # Decide where the posting objects will run. This is the same for all services.
+        rest_dict = config_dict.get('StdRESTful', {})
+        if rest_dict.get('runtime', 'threads').lower() == 'asyncio':
+            import weewx.restasync
+            RESTThread.runtime = weewx.restasync.get_runtime(
+                to_int(rest_dict.get('max_concurrent', 4)))
+        else:
+            RESTThread.runtime = None
+
+    def bind(self, event_type, callback):
+        """Bind the specified event to a callback. If requested, archive records from a batched
+        catch-up never make it to the callback."""
+        if event_type == weewx.NEW_ARCHIVE_RECORD and self.coalesce_catchup:
+            def skip_catchup(event):
+                if not getattr(event, 'catchup', False):
+                    callback(event)
+            super().bind(event_type, skip_catchup)
+        else:
+            super().bind(event_type, callback)
+
     def shutDown(self):
         """Shut down any threads"""
         if hasattr(self, 'loop_queue') and hasattr(self, 'loop_thread'):
@@ -170,6 +202,12 @@ class RESTThread(threading.Thread):
     
     Offers a few bits of common functionality."""
 
+    # If set to an instance of weewx.restasync.UploadRuntime, then start() hands the posting
+    # object over to it, instead of starting a thread.
+    runtime = None
+    # The runtime hosting this posting object, if any
+    _hosted_by = None
+
     def __init__(self,
                  q,
                  protocol_name,
@@ -293,10 +331,7 @@ class RESTThread(threading.Thread):
                 # 60 min". Presumably, this is exclusive of the archive record
                 # 60 minutes before, so the SQL statement is exclusive on the
                 # left, inclusive on the right.
-                _result = dbmanager.getSql(
-                    "SELECT SUM(rain), MIN(usUnits), MAX(usUnits) FROM %s "
-                    "WHERE dateTime>? AND dateTime<=?"
-                    % dbmanager.table_name, (_time_ts - 3600.0, _time_ts))
+                _result = self._sum_rain(dbmanager, _time_ts - 3600.0, _time_ts)
                 if _result is not None and _result[0] is not None:
                     if not _result[1] == _result[2] == record['usUnits']:
                         raise ValueError(
@@ -308,10 +343,7 @@ class RESTThread(threading.Thread):
 
             if 'rain24' not in _datadict:
                 # Similar issue, except for last 24 hours:
-                _result = dbmanager.getSql(
-                    "SELECT SUM(rain), MIN(usUnits), MAX(usUnits) FROM %s "
-                    "WHERE dateTime>? AND dateTime<=?"
-                    % dbmanager.table_name, (_time_ts - 24 * 3600.0, _time_ts))
+                _result = self._sum_rain(dbmanager, _time_ts - 24 * 3600.0, _time_ts)
                 if _result is not None and _result[0] is not None:
                     if not _result[1] == _result[2] == record['usUnits']:
                         raise ValueError(
@@ -327,10 +359,7 @@ class RESTThread(threading.Thread):
                 # (instead of the previous day). But, it's their site,
                 # so we'll do it their way.  That means the SELECT statement
                 # is inclusive on both time ends:
-                _result = dbmanager.getSql(
-                    "SELECT SUM(rain), MIN(usUnits), MAX(usUnits) FROM %s "
-                    "WHERE dateTime>=? AND dateTime<=?"
-                    % dbmanager.table_name, (_sod_ts, _time_ts))
+                _result = self._sum_rain(dbmanager, _sod_ts, _time_ts, include_start=True)
                 if _result is not None and _result[0] is not None:
                     if not _result[1] == _result[2] == record['usUnits']:
                         raise ValueError(
@@ -345,6 +374,57 @@ class RESTThread(threading.Thread):
 
         return _datadict
 
+    @staticmethod
+    def _sum_rain(dbmanager, startstamp, stopstamp, include_start=False):
+        """Sum the rain over a period.
+
+        The window of recent records is used if the database manager has one that covers the
+        period. Otherwise, the database is queried.
+
+        Args:
+            dbmanager (weewx.manager.Manager): The database manager to use.
+            startstamp (float): The start of the period. Exclusive, unless include_start is True.
+            stopstamp (float): The end of the period. Inclusive.
+            include_start (bool): True to include a record with timestamp startstamp.
+
+        Returns:
+            tuple|None: A 3-way tuple (sum of rain, minimum usUnits, maximum usUnits), in the
+                same form as the equivalent SQL query.
+        """
+        records = dbmanager.get_recent_records(startstamp, stopstamp,
+                                               include_start=include_start) \
+            if 'rain' in dbmanager.sqlkeys else None
+        if records is None:
+            return dbmanager.getSql(
+                "SELECT SUM(rain), MIN(usUnits), MAX(usUnits) FROM %s "
+                "WHERE dateTime%s? AND dateTime<=?"
+                % (dbmanager.table_name, '>=' if include_start else '>'),
+                (startstamp, stopstamp))
+        rain = [r['rain'] for r in records if r.get('rain') is not None]
+        units = [r['usUnits'] for r in records]
+        return (sum(rain) if rain else None,
+                min(units) if units else None,
+                max(units) if units else None)
+
+    def start(self):
+        """Start the thread, unless it can be hosted by the shared runtime."""
+        runtime = RESTThread.runtime
+        if runtime is not None and runtime.add(self):
+            self._hosted_by = runtime
+        else:
+            super().start()
+
+    def is_alive(self):
+        if self._hosted_by is not None:
+            return self._hosted_by.is_running(self)
+        return super().is_alive()
+
+    def join(self, timeout=None):
+        if self._hosted_by is not None:
+            self._hosted_by.wait(self, timeout)
+        else:
+            super().join(timeout)
+
     def run(self):
         """If there is a database specified, open the database, then call
         run_loop() with the database.  If no database is specified, simply
@@ -382,43 +462,66 @@ class RESTThread(threading.Thread):
                 # Process the record, using whatever method the specializing
                 # class provides
                 self.process_record(_record, dbmanager)
-            except AbortedPost as e:
-                if self.log_success:
-                    _time_str = timestamp_to_string(_record['dateTime'])
-                    log.info("%s: Skipped record %s: %s", self.protocol_name, _time_str, e)
-            except BadLogin:
-                if self.retry_login:
-                    log.error("%s: Bad login; waiting %s minutes then retrying",
-                              self.protocol_name, self.retry_login / 60.0)
-                    time.sleep(self.retry_login)
-                else:
-                    log.error("%s: Bad login; no retry specified. Terminating", self.protocol_name)
-                    raise
-            except FailedPost as e:
-                if self.log_failure:
-                    _time_str = timestamp_to_string(_record['dateTime'])
-                    log.error("%s: Failed to publish record %s: %s"
-                              % (self.protocol_name, _time_str, e))
-            except ssl.SSLError as e:
-                if self.retry_ssl:
-                    log.error("%s: SSL error (%s); waiting %s minutes then retrying",
-                              self.protocol_name, e, self.retry_ssl / 60.0)
-                    time.sleep(self.retry_ssl)
-                else:
-                    log.error("%s: SSL error (%s); no retry specified. Terminating",
-                              self.protocol_name, e)
-                    raise
             except Exception as e:
-                # Some unknown exception occurred. This is probably a serious
-                # problem. Exit.
-                log.error("%s: Unexpected exception of type %s", self.protocol_name, type(e))
-                weeutil.logger.log_traceback(log.error, '*** ')
-                log.critical("%s: Thread terminating. Reason: %s", self.protocol_name, e)
-                raise
+                # This will raise the exception again, if the thread should terminate
+                _wait = self.post_failed(e, _record)
+                if _wait:
+                    time.sleep(_wait)
             else:
-                if self.log_success:
-                    _time_str = timestamp_to_string(_record['dateTime'])
-                    log.info("%s: Published record %s" % (self.protocol_name, _time_str))
+                self.post_succeeded(_record)
+
+    def post_failed(self, e, record):
+        """Deal with an exception raised while processing a record. Call from within the
+        exception handler.
+
+        Args:
+            e (Exception): The exception.
+            record (dict): The record that was being processed.
+
+        Returns:
+            float: How long to wait, in seconds, before processing the next record.
+
+        Raises:
+            Exception: The exception is raised again if there is no point in going on.
+        """
+        if isinstance(e, AbortedPost):
+            if self.log_success:
+                _time_str = timestamp_to_string(record['dateTime'])
+                log.info("%s: Skipped record %s: %s", self.protocol_name, _time_str, e)
+        elif isinstance(e, BadLogin):
+            if self.retry_login:
+                log.error("%s: Bad login; waiting %s minutes then retrying",
+                          self.protocol_name, self.retry_login / 60.0)
+                return self.retry_login
+            log.error("%s: Bad login; no retry specified. Terminating", self.protocol_name)
+            raise e
+        elif isinstance(e, FailedPost):
+            if self.log_failure:
+                _time_str = timestamp_to_string(record['dateTime'])
+                log.error("%s: Failed to publish record %s: %s"
+                          % (self.protocol_name, _time_str, e))
+        elif isinstance(e, ssl.SSLError):
+            if self.retry_ssl:
+                log.error("%s: SSL error (%s); waiting %s minutes then retrying",
+                          self.protocol_name, e, self.retry_ssl / 60.0)
+                return self.retry_ssl
+            log.error("%s: SSL error (%s); no retry specified. Terminating",
+                      self.protocol_name, e)
+            raise e
+        else:
+            # Some unknown exception occurred. This is probably a serious
+            # problem. Exit.
+            log.error("%s: Unexpected exception of type %s", self.protocol_name, type(e))
+            weeutil.logger.log_traceback(log.error, '*** ')
+            log.critical("%s: Thread terminating. Reason: %s", self.protocol_name, e)
+            raise e
+        return 0
+
+    def post_succeeded(self, record):
+        """Called after a record has been published."""
+        if self.log_success:
+            _time_str = timestamp_to_string(record['dateTime'])
+            log.info("%s: Published record %s" % (self.protocol_name, _time_str))
 
     def process_record(self, record, dbmanager):
         """Default version of process_record.
@@ -426,6 +529,20 @@ class RESTThread(threading.Thread):
         This version uses HTTP GETs to do the post, which should work for many
         protocols, but it can always be replaced by a specializing class."""
 
+        _request, data = self.prepare_request(record, dbmanager)
+        # ... then, finally, post it
+        self.post_with_retries(_request, data)
+
+    def prepare_request(self, record, dbmanager):
+        """Get everything ready for posting a record.
+
+        Returns:
+            tuple: A 2-way tuple (request, data), where request is an urllib.request.Request,
+                and data is the body of the POST, or None for a GET.
+
+        Raises:
+            AbortedPost: If the record should not be posted.
+        """
         # Get the full record by querying the database ...
         _full_record = self.get_record(record, dbmanager)
         # ... check it ...
@@ -445,9 +562,7 @@ class RESTThread(threading.Thread):
         # ... check to see if this is just a drill...            
         if self.skip_upload:
             raise AbortedPost("Skip post")
-
-        # ... then, finally, post it
-        self.post_with_retries(_request, data)
+        return _request, data
 
     def get_request(self, url):
         """Get a request object. This can be overridden to add any special headers."""
@@ -1200,7 +1315,8 @@ class CWOPThread(RESTThread):
                  server_list=StdCWOP.default_servers,
                  post_interval=600, max_backlog=sys.maxsize, stale=600,
                  log_success=True, log_failure=True,
-                 timeout=10, max_tries=3, retry_wait=5, skip_upload=False):
+                 timeout=10, max_tries=3, retry_wait=5, skip_upload=False,
+                 persistent=False, keepalive=120):
 
         """
         Initializer for the CWOPThread class.
@@ -1221,6 +1337,12 @@ class CWOPThread(RESTThread):
           server_list: A list of strings holding the CWOP server name and
           port. Default is ['cwop.aprs.net:14580', 'cwop.aprs.net:23']
 
+          persistent: If True, keep the connection to the server open between
+          posts, rather than connecting for every post. Default is False.
+
+          keepalive: How long a persistent connection can go quiet, in seconds,
+          before a keepalive line is sent. Default is 120.
+
         Parameters customized for this class:
           
           post_interval: How long to wait between posts.
@@ -1250,6 +1372,19 @@ class CWOPThread(RESTThread):
         self.latitude = to_float(latitude)
         self.longitude = to_float(longitude)
         self.station_type = station_type
+        if to_bool(persistent):
+            self.session = get_aprs_session(self.server_list, self.get_login_string(),
+                                            timeout=self.timeout,
+                                            keepalive=to_int(keepalive))
+        else:
+            self.session = None
+
+    def run(self):
+        try:
+            super().run()
+        finally:
+            if self.session:
+                self.session.release()
 
     def process_record(self, record, dbmanager):
         """Process a record in accordance with the CWOP protocol."""
@@ -1264,7 +1399,10 @@ class CWOPThread(RESTThread):
         if self.skip_upload:
             raise AbortedPost("Skip post")
         # ... then post them:
-        self.send_packet(_login, _tnc_packet)
+        if self.session:
+            self.session.send(_tnc_packet, self.max_tries)
+        else:
+            self.send_packet(_login, _tnc_packet)
 
     def get_login_string(self):
         _login = "user %s pass %s vers weewx %s\r\n" % (
@@ -1425,6 +1563,186 @@ class CWOPThread(RESTThread):
                 return
 
 
+# Shared APRS-IS sessions. Key is a tuple (server list, login string).
+_aprs_sessions = {}
+_aprs_sessions_lock = threading.Lock()
+
+
+def get_aprs_session(server_list, login, timeout=10, keepalive=120):
+    """Return an APRS-IS session for a server list and login, creating it if necessary. Posting
+    objects that log in the same way share the same session. Call release() on the session when
+    done with it."""
+    key = (tuple(server_list), login)
+    with _aprs_sessions_lock:
+        session = _aprs_sessions.get(key)
+        if session is None:
+            session = _aprs_sessions[key] = APRSSession(server_list, login, timeout, keepalive)
+        session.users += 1
+        return session
+
+
+class APRSSession:
+    """A persistent connection to an APRS-IS server, such as those used by CWOP.
+
+    The connection is made when the first packet is sent. If a server cannot be reached, the
+    next one in the list is tried, round-robin. If none of them can be reached, there is a wait
+    before trying again, which doubles with every failure, up to max_backoff seconds.
+
+    While connected, a thread reads, and ignores, whatever the server sends. This notices when the
+    server hangs up. If nothing has been heard for keepalive seconds, the thread sends a comment
+    line, so the connection does not look idle.
+    """
+
+    max_backoff = 600
+
+    def __init__(self, server_list, login, timeout=10, keepalive=120):
+        """Initialize an instance of APRSSession.
+
+        Args:
+            server_list (list[str]): Servers to try, in the form 'host:port'.
+            login (str): The login line, ending in '\r\n'.
+            timeout (float): How long to wait for a connection, or a send, in seconds.
+            keepalive (float): How long the connection can go quiet before a keepalive line is
+                sent, in seconds.
+        """
+        self.servers = []
+        for _serv_addr_str in server_list:
+            try:
+                _server, _port_str = _serv_addr_str.split(":")
+                self.servers.append((_server, int(_port_str)))
+            except ValueError:
+                log.error("CWOP: Bad server address: '%s'; ignored", _serv_addr_str)
+        self.login = login
+        self.timeout = timeout
+        self.keepalive = keepalive
+        self.users = 0
+        self.sock = None
+        # Index of the server to try first
+        self.index = 0
+        self.backoff = 0
+        self.next_attempt = 0
+        self.lock = threading.RLock()
+
+    def send(self, tnc_packet, max_tries=3):
+        """Send a TNC packet, connecting first, if necessary.
+
+        Raises:
+            FailedPost: If the packet could not be sent.
+        """
+        with self.lock:
+            for _count in range(max_tries):
+                try:
+                    sock = self._connection()
+                    sock.sendall(tnc_packet.encode('ascii'))
+                    return
+                except ConnectError as e:
+                    log.debug("CWOP: Attempt %d. Connection error: %s", _count + 1, e)
+                    # There is no point in going around again, until the backoff has expired.
+                    break
+                except OSError as e:
+                    log.debug("CWOP: Attempt %d. Socket send error: %s", _count + 1, e)
+                    self._close(sock)
+        raise FailedPost("Unable to send packet through APRS-IS session")
+
+    def release(self):
+        """Stop using the session. The last user closes it."""
+        with _aprs_sessions_lock:
+            self.users -= 1
+            if self.users > 0:
+                return
+            for key, session in list(_aprs_sessions.items()):
+                if session is self:
+                    del _aprs_sessions[key]
+        with self.lock:
+            self._close(self.sock)
+
+    def _connection(self):
+        """Return the socket of the session, connecting if necessary."""
+        if self.sock:
+            return self.sock
+        now = time.time()
+        if now < self.next_attempt:
+            raise ConnectError("Waiting %d seconds before reconnecting"
+                               % (self.next_attempt - now))
+        for _ in range(len(self.servers)):
+            server, port = self.servers[self.index]
+            try:
+                self.sock = self._login(server, port)
+            except OSError as e:
+                log.debug("CWOP: Unable to connect to %s:%d: %s", server, port, e)
+                self.index = (self.index + 1) % len(self.servers)
+                continue
+            log.debug("CWOP: Connected to server %s:%d", server, port)
+            self.backoff = 0
+            threading.Thread(target=self._read, args=(self.sock,), name='APRS-IS',
+                             daemon=True).start()
+            return self.sock
+        self.backoff = min(max(2 * self.backoff, 5), self.max_backoff)
+        self.next_attempt = now + self.backoff
+        raise ConnectError("Tried %d servers" % len(self.servers))
+
+    def _login(self, server, port):
+        """Connect to a server, then log in."""
+        sock = socket.create_connection((server, port), self.timeout)
+        try:
+            sock.sendall(self.login.encode('ascii'))
+            # Wait for the server to acknowledge the login. It may send a banner first.
+            response = b''
+            while b'logresp' not in response:
+                data = sock.recv(1024)
+                if not data:
+                    raise ConnectError("Connection closed during login")
+                response += data
+            if weewx.debug >= 2:
+                log.debug("CWOP: Response to login: '%s'",
+                          response.decode('ascii', 'replace').strip())
+        except socket.timeout:
+            # Some servers do not acknowledge. Carry on.
+            pass
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def _read(self, sock):
+        """Read from the connection until it closes. Sends a keepalive if it goes quiet.
+
+        The socket is shared with send(), so its timeout is left alone. Instead, select() waits
+        for something to read, for up to keepalive seconds."""
+        try:
+            while True:
+                readable, _, _ = select.select([sock], [], [], self.keepalive)
+                if readable:
+                    if not sock.recv(4096):
+                        log.debug("CWOP: Connection closed by server")
+                        break
+                else:
+                    with self.lock:
+                        if sock is not self.sock:
+                            break
+                        sock.sendall(b'#keepalive\r\n')
+        except (OSError, ValueError) as e:
+            # A ValueError means the socket has been closed under us
+            log.debug("CWOP: Connection lost: %s", e)
+        with self.lock:
+            self._close(sock)
+
+    def _close(self, sock):
+        if sock is None:
+            return
+        if sock is self.sock:
+            self.sock = None
+        try:
+            # This also wakes up the reading thread
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        try:
+            sock.close()
+        except OSError:
+            pass
+
+
 # ==============================================================================
 #                    Station Registry
 # ==============================================================================
@@ -0,0 +1,38 @@
+#
+#    Copyright (c) 2026 Tom Keffer <tkeffer@gmail.com>
+#
+#    See the file LICENSE.txt for your rights.
+#
+"""A narrow schema, for storing LOOP packets."""
+
+# =============================================================================
+# This schema is used by the service weewx.engine.StdLoopArchive. LOOP packets arrive every few
+# seconds, so the table holds only the types that are worth keeping at that rate. Like other WeeWX
+# schemas, it is used only for initialization --- afterwards, the schema is obtained dynamically
+# from the database. Add or remove types before the database is created.
+#
+# Field 'interval' is the time since the previous packet, in minutes. Unlike the archive schemas,
+# it is REAL, because packets usually come more often than once a minute.
+# =============================================================================
+# NB: This schema is specified using the WeeWX V4 "new-style" schema.
+# =============================================================================
+table = [('dateTime',             'INTEGER NOT NULL PRIMARY KEY'),
+         ('usUnits',              'INTEGER NOT NULL'),
+         ('interval',             'REAL NOT NULL'),
+         ('barometer',            'REAL'),
+         ('outTemp',              'REAL'),
+         ('rain',                 'REAL'),
+         ('rainRate',             'REAL'),
+         ('windDir',              'REAL'),
+         ('windGust',             'REAL'),
+         ('windGustDir',          'REAL'),
+         ('windSpeed',            'REAL'),
+         ]
+
+day_summaries = [(e[0], 'scalar') for e in table
+                 if e[0] not in ('dateTime', 'usUnits', 'interval')] + [('wind', 'VECTOR')]
+
+schema = {
+    'table': table,
+    'day_summaries' : day_summaries
+}
@@ -5,6 +5,7 @@
 #
 """Classes for implementing the weewx tag 'code' codes."""
 
+import hashlib
 import time
 import weeutil.weeutil
 import weewx.units
@@ -54,6 +55,9 @@ class TimeBinder:
         self.formatter = formatter or weewx.units.Formatter()
         self.converter = converter or weewx.units.Converter()
         self.option_dict = option_dict
+        # Aggregates fetched from the database are saved here, and shared by all the timespans
+        # created by this binder.
+        self.option_dict.setdefault('aggregate_cache', {})
 
     # What follows is the list of time period attributes:
 
@@ -279,6 +283,10 @@ class TimespanBinder:
         used. [Optional. If not given, the default Converter will be used.]
 
         option_dict: Other options which can be used to customize calculations. [Optional.]
+        If it does not include a dictionary under key 'aggregate_cache', one will be added. It
+        holds aggregates that have been fetched from the database, so that asking for several
+        aggregates of the same type, such as $day.outTemp.max and $day.outTemp.min, takes only
+        one query.
         """
 
         self.timespan = timespan
@@ -288,13 +296,25 @@ class TimespanBinder:
         self.formatter = formatter or weewx.units.Formatter()
         self.converter = converter or weewx.units.Converter()
         self.option_dict = option_dict
+        self.option_dict.setdefault('aggregate_cache', {})
 
     # Iterate over all records in the time period:
     def records(self):
         manager = self.db_lookup(self.data_binding)
-        for record in manager.genBatchRecords(self.timespan.start, self.timespan.stop):
-            yield CurrentObj(self.db_lookup, self.data_binding, record['dateTime'], self.formatter,
-                             self.converter, record=record)
+        # Fetch the records a chunk at a time, by column, then assemble each record only as it
+        # is needed.
+        last_time = 0
+        for columns in manager.gen_columns(manager.sqlkeys, self.timespan, typecode=None):
+            keys = list(columns)
+            for row in zip(*columns.values()):
+                record = dict(zip(keys, row))
+                # As in Manager.genBatchRecords(), skip any duplicate or out of order rows, which
+                # a bug in sqlite can return when all the tables are in one file.
+                if record['dateTime'] <= last_time:
+                    continue
+                last_time = record['dateTime']
+                yield CurrentObj(self.db_lookup, self.data_binding, record['dateTime'],
+                                 self.formatter, self.converter, record=record)
 
     # Iterate over custom span
     def spans(self, context='day', interval=10800):
@@ -510,6 +530,14 @@ class ObservationBinder:
     def has_data(self):
         """Check to see if there is any non-null data in the aggregation interval"""
         db_manager = self.db_lookup(self.data_binding)
+        snapshots = get_snapshots(db_manager, self.timespan)
+        if snapshots is not None:
+            tag = snapshot_tag(self.obs_type, 'has_data', self.option_dict)
+            val = snapshots.get(self.timespan.start, self.timespan.stop, tag)
+            if val is None:
+                val = weewx.xtypes.has_data(self.obs_type, self.timespan, db_manager)
+                snapshots.put(self.timespan.start, self.timespan.stop, tag, val)
+            return val
         val = weewx.xtypes.has_data(self.obs_type, self.timespan, db_manager)
         return val
 
@@ -622,6 +650,14 @@ class AggTypeBinder:
         except weewx.UnknownBinding:
             # Don't recognize the binding.
             raise AttributeError(self.data_binding)
+        # If this is a closed period, the result may have been saved by an earlier report.
+        snapshots = get_snapshots(db_manager, self.timespan)
+        if snapshots is not None:
+            tag = snapshot_tag(self.obs_type, self.aggregate_type, self.option_dict)
+            saved = snapshots.get(self.timespan.start, self.timespan.stop, tag)
+            if saved is not None:
+                return weewx.units.ValueHelper(ValueTuple(*saved), self.context, self.formatter,
+                                               self.converter)
         try:
             # If we cannot perform the aggregation, we will get an UnknownType or
             # UnknownAggregation error. Be prepared to catch it.
@@ -631,6 +667,8 @@ class AggTypeBinder:
         except (weewx.UnknownType, weewx.UnknownAggregation):
             # Signal Cheetah that we don't know how to do this by raising an AttributeError.
             raise AttributeError(self.obs_type)
+        if snapshots is not None:
+            snapshots.put(self.timespan.start, self.timespan.stop, tag, list(result))
         return weewx.units.ValueHelper(result, self.context, self.formatter, self.converter)
 
     def __getattr__(self, attr):
@@ -644,6 +682,39 @@ class AggTypeBinder:
         return getattr(vh, attr)
 
 
+def get_snapshots(db_manager, timespan):
+    """Return the store of snapshots of a database manager, but only if it has one, and if the
+    timespan is a closed period. That is, one that is made up of whole days, all of which are
+    already in the database.
+
+    Returns:
+        weewx.manager.AggregateSnapshots|None: The store, or None if snapshots are not to be used.
+    """
+    snapshots = getattr(db_manager, 'snapshots', None)
+    if snapshots is None or db_manager.last_timestamp is None \
+            or timespan.stop > db_manager.last_timestamp:
+        return None
+    if not (weeutil.weeutil.isStartOfDay(timespan.start)
+            and weeutil.weeutil.isStartOfDay(timespan.stop)):
+        return None
+    return snapshots
+
+
+def snapshot_tag(obs_type, aggregate_type, option_dict):
+    """Return the tag used to identify a snapshot of an aggregate.
+
+    Besides the observation and aggregation types, the tag includes a digest of the options used
+    to calculate the aggregate, such as the value used by 'max_ge', or the base temperature used
+    by 'heatdeg', which comes from the [Units] section of the skin.
+    """
+    options = {k: v for k, v in option_dict.items() if k not in ('aggregate_cache', 'skin_dict')}
+    skin_dict = option_dict.get('skin_dict')
+    if skin_dict:
+        options['Units'] = skin_dict.get('Units')
+    digest = hashlib.sha1(repr(sorted(options.items())).encode('utf-8')).hexdigest()[:16]
+    return '%s.%s.%s' % (obs_type, aggregate_type, digest)
+
+
 # ===============================================================================
 #                             Class RecordBinder
 # ===============================================================================
@@ -0,0 +1,457 @@
+#
+#    Copyright (c) 2026 Tom Keffer <tkeffer@gmail.com>
+#
+#    See the file LICENSE.txt for your full rights.
+#
+"""Benchmarks for the archive and report hot paths.
+
+A synthetic archive is generated with the simulator, then the time taken by the key entry points
+is measured:
+
+  - Manager.addRecord(), both in bulk, and one record at a time, the way weewxd does it;
+  - DaySummaryManager.backfill_day_summary();
+  - xtypes.get_series() and xtypes.get_aggregate(), over spans from a day to a year;
+  - a full run of the report engine, for the Seasons and Standard skins;
+  - ImageGenerator.gen_images() for the Seasons skin;
+  - an import of a CSV file, as done by 'weectl import';
+  - the time spent importing modules when starting weectl and weewxd, as measured by
+    'python -X importtime'.
+
+The results are written out as JSON, so they can be compared between releases. Run it from the
+root of the repository, either through the makefile:
+
+    make benchmark BENCH_OPTS="--years 2"
+
+or directly:
+
+    PYTHONPATH="src:src/weewx/tests" python3 src/weewx/tests/benchmark.py --output bench.json
+
+Use --only to run a subset of the benchmarks.
+"""
+
+import argparse
+import contextlib
+import datetime
+import importlib.util
+import io
+import json
+import logging
+import os
+import os.path
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import configobj
+
+import weedb
+import weeimport.weeimport
+import weeutil.config
+import weeutil.logger
+import weeutil.weeutil
+import weewx
+import weewx.drivers.simulator
+import weewx.engine
+import weewx.manager
+import weewx.reportengine
+import weewx.station
+import weewx.xtypes
+import weewx_data
+
+log = logging.getLogger(__name__)
+
+# The names of the benchmarks, in the order they are run.
+ALL_BENCHMARKS = ['addRecord', 'backfill', 'series', 'aggregate', 'reports', 'images', 'import',
+                  'startup']
+
+# Benchmarks that do not need the archive
+NO_ARCHIVE = {'startup'}
+
+# Command lines used by the startup benchmark. The first element is the module to run as a
+# program.
+STARTUP_COMMANDS = {
+    'weectl.version': ['weectl', '--version'],
+    'weectl.report_help': ['weectl', 'report', '--help'],
+    'weewxd.version': ['weewxd', '--version'],
+}
+
+# Spans used by the series and aggregate benchmarks, in days
+SPANS = {'day': 1, 'week': 7, 'month': 31, 'year': 365}
+
+# Fields written to, and read back from, the CSV file used by the import benchmark
+CSV_FIELDS = ['dateTime', 'barometer', 'outTemp', 'outHumidity', 'windSpeed', 'windDir',
+              'windGust', 'windGustDir', 'rain']
+
+
+def gen_records(start_ts, stop_ts, interval=300):
+    """Generate archive records using the simulator.
+
+    Args:
+        start_ts (int): The records start one interval after this time.
+        stop_ts (int): The last record will be at or before this time.
+        interval (int): The archive interval in seconds.
+
+    Yields:
+        dict: Archive records.
+    """
+    station = weewx.drivers.simulator.Simulator(start_time=start_ts, loop_interval=interval,
+                                                mode='generator')
+    for packet in station.genLoopPackets():
+        if packet['dateTime'] > stop_ts:
+            break
+        packet['interval'] = interval // 60
+        yield packet
+
+
+def import_time(*args):
+    """Run Python with option '-X importtime', and measure the time spent importing modules.
+
+    Args:
+        args (str): The command line arguments for Python, such as the path to a program, and
+            its arguments. See function program().
+
+    Returns:
+        tuple: A 2-way tuple (total, modules). The total is the time spent in imports, in
+            seconds. Modules is a dictionary, with key the name of each module imported, and
+            value the time spent importing it, including its own imports, in seconds.
+    """
+    # The program has to find the same modules as we do
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    result = subprocess.run([sys.executable, '-X', 'importtime'] + list(args),
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                            universal_newlines=True, env=env)
+    total = 0
+    modules = {}
+    for line in result.stderr.splitlines():
+        # Lines look like 'import time:       343 |       1211 |   weeutil.config'
+        if not line.startswith('import time:') or '[us]' in line:
+            continue
+        _self, cumulative, name = line[len('import time:'):].split('|')
+        cumulative = int(cumulative) / 1.0e6
+        modules[name.strip()] = cumulative
+        # Nested imports are indented by two more spaces per level
+        if not name[1:].startswith(' '):
+            total += cumulative
+    return total, modules
+
+
+def program(module, *args):
+    """Return the command line arguments for Python that run a module as a program."""
+    return [importlib.util.find_spec(module).origin] + list(args)
+
+
+class Benchmark:
+    """Runs the benchmarks, and holds their results."""
+
+    def __init__(self, workdir, years=1.0, interval=300, repeat=3, import_days=30):
+        self.workdir = workdir
+        self.interval = interval
+        self.repeat = repeat
+        self.import_days = import_days
+
+        # The archive ends at the most recent midnight. It starts an integral number of days
+        # earlier.
+        self.stop_ts = int(time.mktime(datetime.date.today().timetuple()))
+        self.start_ts = self.stop_ts - int(years * 365) * 86400
+
+        self.config_dict = self.make_config()
+        self.manager_dict = weewx.manager.get_manager_dict_from_config(self.config_dict,
+                                                                       'wx_binding')
+        self.results = {}
+
+    def make_config(self):
+        """Make a configuration dictionary out of the standard template, with everything
+        pointing into the working directory."""
+        weewx_data_dir = os.path.dirname(weewx_data.__file__)
+        config_dict = configobj.ConfigObj(os.path.join(weewx_data_dir, 'weewx.conf'),
+                                          encoding='utf-8', interpolation=False,
+                                          file_error=True)
+        config_dict['WEEWX_ROOT'] = self.workdir
+        config_dict['config_path'] = os.path.join(self.workdir, 'weewx.conf')
+        config_dict['log_success'] = False
+        config_dict['Station']['station_type'] = 'Simulator'
+        config_dict['DatabaseTypes']['SQLite']['SQLITE_ROOT'] = self.workdir
+        config_dict['StdArchive']['archive_interval'] = self.interval
+        config_dict['StdReport']['SKIN_ROOT'] = os.path.join(weewx_data_dir, 'skins')
+        config_dict['StdReport']['HTML_ROOT'] = os.path.join(self.workdir, 'public_html')
+        config_dict['StdReport']['log_success'] = False
+        # Log to a file in the working directory
+        config_dict['Logging'] = {
+            'root': {'handlers': ['bench']},
+            'handlers': {'bench': {'level': 'DEBUG',
+                                   'formatter': 'standard',
+                                   'class': 'logging.FileHandler',
+                                   'filename': os.path.join(self.workdir, 'bench.log')}}}
+        # A database for the import benchmark
+        config_dict['Databases']['import_sqlite'] = {'database_name': 'import.sdb',
+                                                     'database_type': 'SQLite'}
+        return config_dict
+
+    def run(self, names=None):
+        """Run the benchmarks.
+
+        Args:
+            names (list[str]|None): The benchmarks to run. Default is all of them. The archive is
+                always built first, unless it already exists.
+        """
+        names = names or ALL_BENCHMARKS
+        if 'addRecord' in names \
+                or (set(names) - NO_ARCHIVE
+                    and not os.path.exists(os.path.join(self.workdir, 'weewx.sdb'))):
+            self.bench_add_record()
+        for name in names:
+            if name == 'addRecord':
+                continue
+            getattr(self, 'bench_' + name)()
+
+    def timeit(self, name, fn, repeat=None, **extra):
+        """Time a function, saving the results under a name.
+
+        Args:
+            name (str): The name of the result.
+            fn (function): The function to be timed. It takes no arguments.
+            repeat (int|None): How many times to call it. Default is self.repeat.
+            extra (dict): Anything else to be saved with the result.
+
+        Returns:
+            The return value of the last call to fn.
+        """
+        times = []
+        for _ in range(repeat or self.repeat):
+            t0 = time.perf_counter()
+            retval = fn()
+            times.append(time.perf_counter() - t0)
+        self.results[name] = dict(extra,
+                                  seconds=times,
+                                  min=min(times),
+                                  median=statistics.median(times))
+        print("%-40s %10.4f s" % (name, min(times)), file=sys.stderr)
+        return retval
+
+    def bench_add_record(self):
+        """Build the archive in bulk, then add a day's worth of records one at a time."""
+        with contextlib.suppress(weedb.DatabaseError):
+            weewx.manager.drop_database(self.manager_dict)
+        # Hold back the last day, to be added one at a time.
+        last_day = self.stop_ts - 86400
+        with weewx.manager.open_manager(self.manager_dict, initialize=True) as manager:
+            N = (last_day - self.start_ts) // self.interval
+            self.timeit('addRecord.bulk',
+                        lambda: manager.addRecord(gen_records(self.start_ts, last_day,
+                                                              self.interval),
+                                                  log_success=False),
+                        repeat=1, records=N)
+
+            records = list(gen_records(last_day, self.stop_ts, self.interval))
+            t0 = time.perf_counter()
+            for record in records:
+                manager.addRecord(record, log_success=False)
+            elapsed = time.perf_counter() - t0
+            self.results['addRecord.single'] = {'seconds': [elapsed],
+                                                'min': elapsed,
+                                                'median': elapsed,
+                                                'records': len(records),
+                                                'per_record': elapsed / len(records)}
+            print("%-40s %10.4f s" % ('addRecord.single', elapsed), file=sys.stderr)
+
+    def bench_backfill(self):
+        """Drop, then rebuild, the daily summaries."""
+        with weewx.manager.open_manager(self.manager_dict) as manager:
+            manager.drop_daily()
+        with weewx.manager.open_manager(self.manager_dict, initialize=True) as manager:
+            self.timeit('backfill_day_summary',
+                        lambda: manager.backfill_day_summary(progress_fn=None),
+                        repeat=1)
+
+    def bench_series(self):
+        """Time series, with and without aggregation, over various spans."""
+        with weewx.manager.open_manager(self.manager_dict) as manager:
+            for span_name, days in SPANS.items():
+                span = weeutil.weeutil.TimeSpan(self.stop_ts - days * 86400, self.stop_ts)
+                self.timeit('get_series.outTemp.%s' % span_name,
+                            lambda: weewx.xtypes.get_series('outTemp', span, manager))
+                self.timeit('get_series.windvec.%s' % span_name,
+                            lambda: weewx.xtypes.get_series('windvec', span, manager))
+                interval = 3600 if days <= 7 else 86400
+                self.timeit('get_series.outTemp.avg.%s' % span_name,
+                            lambda: weewx.xtypes.get_series('outTemp', span, manager,
+                                                            'avg', interval))
+
+    def bench_aggregate(self):
+        """Time aggregates over various spans."""
+        with weewx.manager.open_manager(self.manager_dict) as manager:
+            for span_name, days in SPANS.items():
+                span = weeutil.weeutil.TimeSpan(self.stop_ts - days * 86400, self.stop_ts)
+                for obs_type, agg_type in (('outTemp', 'avg'), ('outTemp', 'max'),
+                                           ('rain', 'sum'), ('wind', 'vecavg')):
+                    self.timeit('get_aggregate.%s.%s.%s' % (obs_type, agg_type, span_name),
+                                lambda: weewx.xtypes.get_aggregate(obs_type, span, agg_type,
+                                                                   manager))
+
+    def bench_reports(self):
+        """Time a full run of the report engine, for each of the Seasons and Standard skins."""
+        for report in ('SeasonsReport', 'StandardReport'):
+            self.timeit('report.%s' % report, lambda: self.run_report(report), repeat=1)
+
+    def bench_images(self):
+        """Time just the image generator of the Seasons skin, first one image at a time, then
+        with a worker process per CPU."""
+        self.timeit('gen_images.SeasonsReport',
+                    lambda: self.run_report('SeasonsReport',
+                                            ['weewx.imagegenerator.ImageGenerator']),
+                    repeat=1)
+        self.timeit('gen_images.SeasonsReport.workers',
+                    lambda: self.run_report('SeasonsReport',
+                                            ['weewx.imagegenerator.ImageGenerator'],
+                                            image_workers=os.cpu_count()),
+                    repeat=1)
+
+    def run_report(self, report, generator_list=None, image_workers=0):
+        """Run a single report, the same way 'weectl report run' does."""
+        config_dict = weeutil.config.deep_copy(self.config_dict)
+        config_dict['StdReport'][report]['enable'] = True
+        if generator_list:
+            config_dict['StdReport'][report]['Generators'] = {'generator_list': generator_list}
+        if image_workers:
+            config_dict['StdReport'][report].setdefault('ImageGenerator', {})
+            config_dict['StdReport'][report]['ImageGenerator']['workers'] = image_workers
+        # Start with an empty HTML directory, so everything gets generated.
+        shutil.rmtree(config_dict['StdReport']['HTML_ROOT'], ignore_errors=True)
+        # The engine loads the services, which sets up the xtypes.
+        engine = weewx.engine.DummyEngine(config_dict)
+        try:
+            stn_info = weewx.station.StationInfo(**config_dict['Station'])
+            with weewx.manager.open_manager(self.manager_dict) as manager:
+                record = manager.getRecord(self.stop_ts)
+            t = weewx.reportengine.StdReportEngine(config_dict, stn_info, record=record,
+                                                   gen_ts=self.stop_ts)
+            t.run([report])
+        finally:
+            engine.shutDown()
+
+    def bench_import(self):
+        """Time an import of a CSV file into a fresh database, as done by 'weectl import'."""
+        csv_path = os.path.join(self.workdir, 'import.csv')
+        start_ts = self.stop_ts - self.import_days * 86400
+        N = 0
+        with open(csv_path, 'w') as fd:
+            fd.write(','.join(CSV_FIELDS) + '\n')
+            for record in gen_records(start_ts, self.stop_ts, self.interval):
+                fd.write(','.join(str(record[k]) for k in CSV_FIELDS) + '\n')
+                N += 1
+
+        import_config_path = os.path.join(self.workdir, 'csv.conf')
+        import_config = configobj.ConfigObj(indent_type='    ')
+        import_config.filename = import_config_path
+        import_config['source'] = 'CSV'
+        import_config['CSV'] = {
+            'file': csv_path,
+            'interval': 'derive',
+            'qc': True,
+            'calc_missing': True,
+            'FieldMap': {
+                'dateTime': {'source_field': 'dateTime', 'unit': 'unix_epoch'},
+                'barometer': {'source_field': 'barometer', 'unit': 'inHg'},
+                'outTemp': {'source_field': 'outTemp', 'unit': 'degree_F'},
+                'outHumidity': {'source_field': 'outHumidity', 'unit': 'percent'},
+                'windSpeed': {'source_field': 'windSpeed', 'unit': 'mile_per_hour'},
+                'windDir': {'source_field': 'windDir', 'unit': 'degree_compass'},
+                'windGust': {'source_field': 'windGust', 'unit': 'mile_per_hour'},
+                'windGustDir': {'source_field': 'windGustDir', 'unit': 'degree_compass'},
+                'rain': {'source_field': 'rain', 'unit': 'inch'},
+            }
+        }
+        import_config.write()
+
+        config_dict = weeutil.config.deep_copy(self.config_dict)
+        config_dict['DataBindings']['wx_binding']['database'] = 'import_sqlite'
+        manager_dict = weewx.manager.get_manager_dict_from_config(config_dict, 'wx_binding')
+
+        def do_import():
+            with contextlib.suppress(weedb.DatabaseError):
+                weewx.manager.drop_database(manager_dict)
+            # The importer is chatty. Keep it quiet.
+            with contextlib.redirect_stdout(io.StringIO()):
+                source = weeimport.weeimport.Source.source_factory(
+                    config_dict['config_path'], config_dict, import_config_path,
+                    dry_run=False, update=False, verbose=False, no_prompt=True,
+                    suppress_warning=True, date=None, from_datetime=None, to_datetime=None)
+                source.run()
+
+        self.timeit('weectl_import.csv', do_import, repeat=1, records=N)
+
+    def bench_startup(self):
+        """Time spent importing modules when starting up weectl and weewxd. For each command,
+        the fastest of the runs is saved, along with the number of modules imported."""
+        for name, command in STARTUP_COMMANDS.items():
+            runs = [import_time(*program(*command)) for _ in range(self.repeat)]
+            times = [total for total, _ in runs]
+            self.results['startup.' + name] = {'seconds': times,
+                                               'min': min(times),
+                                               'median': statistics.median(times),
+                                               'modules': len(runs[0][1])}
+            print("%-40s %10.4f s" % ('startup.' + name, min(times)), file=sys.stderr)
+
+    def as_dict(self):
+        """Return the results, along with information about the run."""
+        return {
+            'weewx_version': weewx.__version__,
+            'python_version': platform.python_version(),
+            'platform': platform.platform(),
+            'time': int(time.time()),
+            'parameters': {
+                'start': self.start_ts,
+                'stop': self.stop_ts,
+                'interval': self.interval,
+                'repeat': self.repeat,
+                'import_days': self.import_days,
+            },
+            'results': self.results,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the WeeWX archive and report "
+                                                 "hot paths.")
+    parser.add_argument('--years', type=float, default=1.0,
+                        help="Years of synthetic data in the archive. Default is 1.")
+    parser.add_argument('--interval', type=int, default=300,
+                        help="Archive interval in seconds. Default is 300.")
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="How many times to repeat the faster benchmarks. Default is 3.")
+    parser.add_argument('--import-days', type=int, default=30,
+                        help="Days of data in the import benchmark. Default is 30.")
+    parser.add_argument('--only', action='append', choices=ALL_BENCHMARKS,
+                        help="Run only this benchmark. Can be given more than once.")
+    parser.add_argument('--workdir',
+                        help="Directory for the archive and reports. It will be reused, if it "
+                             "exists. Default is a temporary directory.")
+    parser.add_argument('--output',
+                        help="Where to write the results as JSON. Default is stdout.")
+    options = parser.parse_args()
+
+    workdir = options.workdir or tempfile.mkdtemp(prefix='weewx-bench-')
+    os.makedirs(workdir, exist_ok=True)
+    bench = Benchmark(workdir, years=options.years, interval=options.interval,
+                      repeat=options.repeat, import_days=options.import_days)
+    weeutil.logger.setup('weebench', bench.config_dict)
+    try:
+        bench.run(options.only)
+    finally:
+        if not options.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    results = json.dumps(bench.as_dict(), indent=2)
+    if options.output:
+        with open(options.output, 'w') as fd:
+            fd.write(results + '\n')
+    else:
+        print(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -176,6 +176,37 @@ def test_AggregateDaily(config_dict):
         assert vecdir_wind_vt[0] == pytest.approx(88.77, abs=0.01)
 
 
+def test_prefetch(config_dict):
+    """Aggregates taken from the prefetch query should match those from individual queries."""
+    spans = [TimeSpan(time.mktime((2010, 3, 1, 0, 0, 0, 0, 0, -1)),
+                      time.mktime((2010, 4, 1, 0, 0, 0, 0, 0, -1))),
+             TimeSpan(time.mktime((2010, 5, 1, 0, 0, 0, 0, 0, -1)),
+                      time.mktime((2010, 6, 1, 0, 0, 0, 0, 0, -1))),
+             # No data at all in this one
+             TimeSpan(time.mktime((2000, 1, 1, 0, 0, 0, 0, 0, -1)),
+                      time.mktime((2000, 1, 2, 0, 0, 0, 0, 0, -1)))]
+    obs_types = ['outTemp', 'inTemp', 'rain', 'wind']
+    cache = {}
+    with weewx.manager.open_manager_with_config(config_dict, 'wx_binding') as db_manager:
+        for span in spans:
+            for obs_type in obs_types:
+                for aggregate_type in weewx.xtypes.DailySummaries.prefetch_columns:
+                    expected = weewx.xtypes.DailySummaries.get_aggregate(obs_type, span,
+                                                                         aggregate_type,
+                                                                         db_manager)
+                    actual = weewx.xtypes.DailySummaries.get_aggregate(obs_type, span,
+                                                                       aggregate_type,
+                                                                       db_manager,
+                                                                       aggregate_cache=cache)
+                    if expected[0] is None:
+                        assert actual == expected
+                    else:
+                        assert actual[0] == pytest.approx(expected[0])
+                        assert actual[1:] == expected[1:]
+    # One query for each observation type and span
+    assert len(cache) == len(spans) * len(obs_types)
+
+
 def test_get_aggregate_heatcool(config_dict):
     with weewx.manager.open_manager_with_config(config_dict, 'wx_binding') as db_manager:
         month_start_tt = (2010, 3, 1, 0, 0, 0, 0, 0, -1)
@@ -165,3 +165,27 @@ def test_moon_phases():
                            moon_phases = ['pitch black'] + weeutil.Moon.moon_phases[1:],
                            formatter=default_formatter)
     assert test_override.moon_phase == 'pitch black'
+
+
+def test_event_cache(tmp_path):
+    weewx.almanac.event_cache.clear()
+    almanac = Almanac(SPRING_TIMESTAMP, LATITUDE, LONGITUDE, formatter=default_formatter)
+    sunrise = almanac.sun.rise.raw
+    assert len(weewx.almanac.event_cache.daily) == 1
+    # Later in the same day, the sunrise is not calculated again...
+    assert almanac(almanac_time=SPRING_TIMESTAMP + 3600).sun.rise.raw == sunrise
+    assert len(weewx.almanac.event_cache.daily) == 1
+    # ... but it is for a different horizon
+    assert almanac(horizon=-6).sun.rise.raw != sunrise
+    assert len(weewx.almanac.event_cache.daily) == 2
+
+    # Save the events, then load them into a new cache
+    cache = weewx.almanac.EventCache(keep_days=100000)
+    cache.load(str(tmp_path / 'almanac.json'))
+    cache.daily = dict(weewx.almanac.event_cache.daily)
+    cache.dirty = True
+    cache.save()
+    new_cache = weewx.almanac.EventCache()
+    new_cache.load(str(tmp_path / 'almanac.json'))
+    assert new_cache.daily == cache.daily
+    weewx.almanac.event_cache.clear()
@@ -99,3 +99,82 @@ class TestHelpers:
         assert weewx.cheetahgenerator.JSONHelpers.to_int(-1.2345) == -1
         assert weewx.cheetahgenerator.JSONHelpers.to_int(None) is None
 
+
+
+class CountingExtension(weewx.cheetahgenerator.SearchList):
+    """A search list extension that counts how often its extension list is built."""
+
+    def __init__(self, generator, reuse=None):
+        super().__init__(generator)
+        if reuse is not None:
+            self.reuse = reuse
+        self.calls = []
+
+    def get_extension_list(self, timespan, db_lookup):
+        self.calls.append((timespan.start, timespan.stop))
+        return [{'calls': len(self.calls)}]
+
+
+class TestExtensionCache:
+    "Test reusing the extension lists of search list extensions"
+
+    def setup_method(self):
+        self.generator = weewx.cheetahgenerator.CheetahGenerator({}, {}, None, False, None)
+        self.db_lookup = self.generator.db_binder.bind_default('wx_binding')
+
+    def teardown_method(self):
+        self.generator.teardown()
+        self.generator.finalize()
+
+    def get_list(self, obj, timespan, binding='wx_binding'):
+        return self.generator._get_extension_list(obj, timespan, self.db_lookup, binding)
+
+    def test_report(self):
+        obj = CountingExtension(self.generator, reuse='report')
+        first = self.get_list(obj, weeutil.weeutil.TimeSpan(0, 100))
+        assert self.get_list(obj, weeutil.weeutil.TimeSpan(100, 200)) is first
+        assert self.get_list(obj, weeutil.weeutil.TimeSpan(0, 100), 'other') is first
+        assert len(obj.calls) == 1
+        # It is forgotten at the end of the report
+        self.generator.teardown()
+        assert self.get_list(obj, weeutil.weeutil.TimeSpan(0, 100)) is not first
+        assert len(obj.calls) == 2
+
+    def test_timespan(self):
+        obj = CountingExtension(self.generator, reuse='timespan')
+        first = self.get_list(obj, weeutil.weeutil.TimeSpan(0, 100))
+        assert self.get_list(obj, weeutil.weeutil.TimeSpan(0, 100)) is first
+        assert len(obj.calls) == 1
+        # A different timespan, or a different default binding, needs a new list
+        assert self.get_list(obj, weeutil.weeutil.TimeSpan(0, 200)) is not first
+        assert self.get_list(obj, weeutil.weeutil.TimeSpan(0, 100), 'other') is not first
+        assert len(obj.calls) == 3
+        assert self.get_list(obj, weeutil.weeutil.TimeSpan(0, 100), 'other') \
+               is self.get_list(obj, weeutil.weeutil.TimeSpan(0, 100), 'other')
+        assert len(obj.calls) == 3
+
+    def test_eviction(self):
+        obj = CountingExtension(self.generator, reuse='timespan')
+        report_obj = CountingExtension(self.generator, reuse='report')
+        self.get_list(report_obj, weeutil.weeutil.TimeSpan(0, 100))
+        max_spans = weewx.cheetahgenerator.CheetahGenerator.max_cached_timespans
+        for start in range(max_spans + 1):
+            self.get_list(obj, weeutil.weeutil.TimeSpan(start, start + 100))
+        assert len(self.generator.extension_cache) == max_spans + 1
+        # The oldest timespan has been forgotten, the others are still there
+        self.get_list(obj, weeutil.weeutil.TimeSpan(max_spans, max_spans + 100))
+        assert len(obj.calls) == max_spans + 1
+        self.get_list(obj, weeutil.weeutil.TimeSpan(0, 100))
+        assert len(obj.calls) == max_spans + 2
+        # The report-wide list is never evicted
+        self.get_list(report_obj, weeutil.weeutil.TimeSpan(0, 100))
+        assert len(report_obj.calls) == 1
+
+    def test_no_reuse(self):
+        obj = CountingExtension(self.generator)
+        self.generator.search_list_objs.append(obj)
+        for file_name in ('a.html', 'b.html', 'c.html'):
+            self.generator._getSearchList('utf8', weeutil.weeutil.TimeSpan(0, 100), 'wx_binding',
+                                          'ToDate', file_name)
+        assert len(obj.calls) == 3
+        assert self.generator.extension_cache == {}
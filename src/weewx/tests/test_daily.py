@@ -377,3 +377,23 @@ def test_heatcool(config_dict):
 
     assert str(tagStats.year().heatdeg.sum) == "5125.1°F-day"
     assert str(tagStats.year().cooldeg.sum) == "1026.5°F-day"
+
+
+class DuplicatingManager:
+    """Just enough of a manager to return columns with a duplicate and an out of order row."""
+
+    sqlkeys = ['dateTime', 'usUnits', 'interval', 'outTemp']
+
+    def gen_columns(self, obs_types, timespan=None, include_start=False, typecode='d'):
+        yield {'dateTime': [100, 200, 200], 'usUnits': [1, 1, 1], 'interval': [5, 5, 5],
+               'outTemp': [10.0, 11.0, 11.0]}
+        yield {'dateTime': [150, 300], 'usUnits': [1, 1], 'interval': [5, 5],
+               'outTemp': [99.0, 12.0]}
+
+
+def test_records_guard():
+    tsb = weewx.tags.TimespanBinder(weeutil.weeutil.TimeSpan(0, 300),
+                                    lambda binding=None: DuplicatingManager(),
+                                    formatter=default_formatter)
+    assert [record.dateTime.raw for record in tsb.records()] == [100, 200, 300]
+    assert [record.outTemp.raw for record in tsb.records()] == [10.0, 11.0, 12.0]
@@ -6,8 +6,11 @@
 """Test the accumulators by using the simulator wx station"""
 
 import logging
+import math
 import os.path
+import queue
 import sys
+import threading
 import time
 
 import configobj
@@ -18,6 +21,7 @@ import weeutil.weeutil
 import weewx.drivers.simulator
 import weewx.engine
 import weewx.manager
+import weewx.xtypes
 from weeutil.weeutil import to_int
 
 weewx.debug = 1
@@ -80,6 +84,197 @@ def test_archive_data():
                 assert obs_avg[obs_type] == pytest.approx(record[obs_type])
 
 
+class FakeConsole:
+    """A driver whose LOOP packets are fed to it through a queue. None ends the packet loop, an
+    exception is raised."""
+
+    def __init__(self):
+        self.feed = queue.Queue()
+
+    def genLoopPackets(self):
+        while True:
+            item = self.feed.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield {'dateTime': item, 'usUnits': weewx.US}
+
+
+def test_loop_reader():
+    console = FakeConsole()
+    reader = weewx.engine.LoopReader(console, 3)
+    reader.start()
+    packets = reader.genLoopPackets()
+    console.feed.put(1)
+    packet, read_ts = next(packets)
+    assert packet['dateTime'] == 1
+    assert read_ts == pytest.approx(time.time(), abs=5)
+
+    # Fill the queue past its limit, while nobody is consuming. The oldest packets get dropped.
+    for ts in range(2, 8):
+        console.feed.put(ts)
+    console.feed.put(weewx.WeeWxIOError("fake error"))
+    reader.thread.join(5)
+    assert [packet['dateTime'] for packet, _ in reader.packets] == [5, 6, 7]
+    assert reader.dropped == 3
+    assert reader.max_depth == 3
+
+    # The packets already read come out first, then the driver's exception
+    assert [next(packets)[0]['dateTime'] for _ in range(3)] == [5, 6, 7]
+    with pytest.raises(weewx.WeeWxIOError):
+        next(packets)
+    reader.stop()
+    assert reader.dropped == 0
+
+
+def test_loop_reader_stop():
+    console = FakeConsole()
+    reader = weewx.engine.LoopReader(console, 10)
+    reader.start()
+    for ts in range(1, 4):
+        console.feed.put(ts)
+    packets = reader.genLoopPackets()
+    assert next(packets)[0]['dateTime'] == 1
+    # The reader stops after the driver returns its next packet
+    stopper = threading.Thread(target=reader.stop)
+    stopper.start()
+    assert reader.stopping.wait(5)
+    console.feed.put(4)
+    stopper.join(5)
+    assert reader.thread is None
+
+    # What was left in the queue is seen the next time around
+    reader.start()
+    console.feed.put(None)
+    assert [packet['dateTime'] for packet, _ in reader.genLoopPackets()] == [2, 3, 4]
+    reader.stop()
+
+
+def test_loop_reader_slow_stop(monkeypatch, caplog):
+    """A driver that is slow to return a packet is waited for, not treated as an error."""
+    monkeypatch.setattr(weewx.engine.LoopReader, 'stop_timeout', 0.1)
+    console = FakeConsole()
+    reader = weewx.engine.LoopReader(console, 10)
+    reader.start()
+    stopper = threading.Thread(target=reader.stop)
+    stopper.start()
+    assert reader.stopping.wait(5)
+    time.sleep(0.5)
+    assert stopper.is_alive()
+    console.feed.put(1)
+    stopper.join(5)
+    assert not stopper.is_alive()
+    assert reader.thread is None
+    assert "still waiting for the driver" in caplog.text
+
+
+class FakeEngine:
+    """Just enough of an engine to run a service"""
+
+    def __init__(self, config_dict):
+        self.callbacks = {}
+        self.db_binder = weewx.manager.DBBinder(config_dict)
+
+    def bind(self, event_type, callback):
+        self.callbacks.setdefault(event_type, []).append(callback)
+
+    def dispatchEvent(self, event):
+        for callback in self.callbacks.get(event.event_type, []):
+            callback(event)
+
+
+def test_loop_archive(tmp_path):
+    loop_config = configobj.ConfigObj({
+        'WEEWX_ROOT': str(tmp_path),
+        'StdLoopArchive': {'write_interval': 60, 'max_age': 3600, 'purge_interval': 600},
+        'DataBindings': {'loop_binding': {}},
+        'Databases': {'loop_sqlite': {'database_name': 'loop.sdb',
+                                      'SQLITE_ROOT': str(tmp_path),
+                                      'driver': 'weedb.sqlite'}}})
+    engine = FakeEngine(loop_config)
+    service = weewx.engine.StdLoopArchive(engine, loop_config)
+    engine.dispatchEvent(weewx.Event(weewx.STARTUP))
+
+    start_ts = 1700000000
+    for i in range(3600):
+        # Two packets every two seconds. The second one should be ignored.
+        packet = {'dateTime': start_ts + 2 * (i // 2), 'usUnits': weewx.US,
+                  'outTemp': 50.0 + i % 2, 'windSpeed': float(i % 20), 'inTemp': 70.0}
+        engine.dispatchEvent(weewx.Event(weewx.NEW_LOOP_PACKET, packet=packet))
+    db_manager = engine.db_binder.get_manager('loop_binding')
+    # Packets are written a minute at a time
+    assert start_ts + 3598 - 60 <= db_manager.last_timestamp < start_ts + 3598
+    service.shutDown()
+    assert db_manager.last_timestamp == start_ts + 3598
+    assert db_manager.table_name == 'loop'
+    assert 'inTemp' not in db_manager.sqlkeys
+    assert db_manager.getSql("SELECT COUNT(*), MAX(outTemp) FROM loop") == (1800, 50.0)
+    record = db_manager.getRecord(start_ts + 10)
+    assert record['interval'] == pytest.approx(2 / 60.0)
+
+    # The packets can be used like any other data
+    timespan = weeutil.weeutil.TimeSpan(start_ts, start_ts + 3600)
+    start_vec, stop_vec, data_vec = weewx.xtypes.get_series('windSpeed', timespan, db_manager,
+                                                            'max', 600)
+    assert len(data_vec[0]) == 6
+    assert max(data_vec[0]) == 18.0
+
+    # An hour later, the first packets are purged, but the daily summary remembers them
+    engine.dispatchEvent(weewx.Event(weewx.NEW_LOOP_PACKET,
+                                     packet={'dateTime': start_ts + 3600 + 1800,
+                                             'usUnits': weewx.US, 'outTemp': 40.0}))
+    service.shutDown()
+    assert db_manager.first_timestamp == start_ts + 1800
+    day_span = weeutil.weeutil.archiveDaySpan(start_ts)
+    assert weewx.xtypes.DailySummaries.get_aggregate('outTemp', day_span, 'count',
+                                                     db_manager)[0] == 1801
+    engine.db_binder.close()
+
+
+def run_catchup(tmp_path, batch_size, records):
+    """Run a hardware catch-up of some records through an engine that calculates ET. Return the
+    values of ET that end up in the database."""
+    catchup_config = configobj.ConfigObj({
+        'WEEWX_ROOT': str(tmp_path),
+        'Station': {'station_type': 'Simulator', 'latitude': 45.686, 'longitude': -121.566,
+                    'altitude': [100, 'meter']},
+        'StdArchive': {'archive_interval': 600, 'catchup_batch_size': batch_size},
+        'StdWXCalculate': {'Calculations': {'ET': 'software'}},
+        'DataBindings': {'wx_binding': {'database': 'archive_sqlite',
+                                        'manager': 'weewx.manager.DaySummaryManager',
+                                        'schema': 'schemas.wview_extended.schema'}},
+        'Databases': {'archive_sqlite': {'database_name': 'catchup%d.sdb' % batch_size,
+                                         'SQLITE_ROOT': str(tmp_path),
+                                         'driver': 'weedb.sqlite'}},
+        'Engine': {'Services': {'xtype_services': ['weewx.wxxtypes.StdWXXTypes'],
+                                'process_services': ['weewx.wxservices.StdWXCalculate'],
+                                'archive_services': ['weewx.engine.StdArchive']}}})
+    engine = weewx.engine.DummyEngine(catchup_config)
+    try:
+        archive = next(svc for svc in engine.service_obj
+                       if isinstance(svc, weewx.engine.StdArchive))
+        db_manager = engine.db_binder.get_manager('wx_binding', initialize=True)
+        archive._catchup(lambda lastgood_ts: (dict(record) for record in records))
+        return db_manager.getSql("SELECT COUNT(*) FROM archive")[0], \
+            [row[0] for row in db_manager.genSql("SELECT ET FROM archive ORDER BY dateTime")]
+    finally:
+        engine.shutDown()
+
+
+def test_batched_catchup(tmp_path):
+    start_ts = 1700000400
+    records = [{'dateTime': start_ts + i * 600, 'usUnits': weewx.US, 'interval': 10,
+                'outTemp': 50.0 + 10.0 * math.sin(i / 24.0), 'outHumidity': 60.0 + i % 20,
+                'radiation': 400.0 + 300.0 * math.sin(i / 12.0), 'windSpeed': 2.0 + i % 5}
+               for i in range(200)]
+    count, et = run_catchup(tmp_path, 0, records)
+    assert count == len(records)
+    assert sum(1 for v in et if v is not None) > len(records) / 2
+    # When the records are written in batches, ET still sees the records before it
+    assert run_catchup(tmp_path, 50, records) == (count, et)
+
+
 def _get_first_last(config_dict):
     """Get the first and last archive record timestamps."""
     run_length = to_int(config_dict['Stopper']['run_length'])
@@ -17,15 +17,20 @@ It also tests the V4.3 and v4.4 patches.
 """
 import datetime
 import logging
+import math
 import os
+import threading
 import time
 import pytest
 
 import gen_fake_data
 import weewx.schemas.wview_small
 import weedb
+import weedb.colstore
 import weeutil.logger
+import weeutil.weeutil
 import weewx.manager
+import weewx.xtypes
 
 log = logging.getLogger(__name__)
 
@@ -151,6 +156,298 @@ class TestMySQLWeights(CommonWeightTests):
         self.db_manager = setup_database(db_dict_mysql)
 
 
+class TestColumns:
+    """Test retrieving data by column"""
+
+    def setup_method(self):
+        self.db_manager = setup_database(db_dict_sqlite)
+
+    def teardown_method(self):
+        self.db_manager.close()
+
+    def test_get_columns(self):
+        span = weeutil.weeutil.TimeSpan(mid_ts, mid_ts + 24 * 3600)
+        records = list(self.db_manager.genBatchRecords(*span))
+        columns = self.db_manager.get_columns(['outTemp', 'rain'], span)
+        assert list(columns) == ['dateTime', 'outTemp', 'rain']
+        assert columns['outTemp'].typecode == 'd'
+        assert list(columns['dateTime']) == [r['dateTime'] for r in records]
+        assert list(columns['outTemp']) == pytest.approx([r['outTemp'] for r in records])
+
+        # The start of the interval can be included
+        columns = self.db_manager.get_columns(['outTemp'], span, include_start=True)
+        assert columns['dateTime'][0] == mid_ts
+
+    def test_nulls(self):
+        self.db_manager.updateValue(mid_ts, 'outTemp', None)
+        span = (mid_ts - interval_secs, mid_ts)
+        columns = self.db_manager.get_columns(['outTemp'], span)
+        assert math.isnan(columns['outTemp'][0])
+        columns = self.db_manager.get_columns(['outTemp'], span, typecode=None)
+        assert columns == {'dateTime': [mid_ts], 'outTemp': [None]}
+
+    def test_chunks(self):
+        chunks = list(self.db_manager.gen_columns(['outTemp'], chunk_size=50))
+        assert all(len(chunk['outTemp']) == 50 for chunk in chunks[:-1])
+        total = sum(len(chunk['dateTime']) for chunk in chunks)
+        assert total == self.db_manager.getSql("SELECT COUNT(*) FROM archive")[0]
+
+    def test_stream(self, monkeypatch):
+        # A long scan is fetched a batch at a time, a short one is not.
+        connection = self.db_manager.connection
+        stream_cursor = connection.stream_cursor
+        streamed = []
+
+        def counting_cursor():
+            streamed.append(True)
+            return stream_cursor()
+
+        monkeypatch.setattr(connection, 'stream_cursor', counting_cursor)
+        columns = self.db_manager.get_columns(['outTemp'], (mid_ts, mid_ts + 3600))
+        assert len(columns['dateTime']) == 1
+        assert not streamed
+        columns = self.db_manager.get_columns(['outTemp'])
+        assert len(columns['dateTime']) == self.db_manager.getSql("SELECT COUNT(*) FROM archive")[0]
+        assert streamed
+
+    def test_empty(self):
+        columns = self.db_manager.get_columns(['outTemp'], (stop_ts, stop_ts + 3600))
+        assert len(columns['dateTime']) == len(columns['outTemp']) == 0
+
+    def test_bad_column(self):
+        with pytest.raises(weedb.NoColumnError):
+            self.db_manager.get_columns(['foo'])
+
+
+class TestColumnStoreManager:
+    """Test the manager that keeps the archive in a column store"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.db_dict = {'driver': 'weedb.sqlite',
+                        'SQLITE_ROOT': str(tmp_path),
+                        'database_name': 'columns.sdb'}
+        # Start with a database built the ordinary way
+        setup_database(self.db_dict).close()
+        self.db_manager = weewx.manager.ColumnStoreManager.open(self.db_dict)
+        self.sql_manager = weewx.manager.DaySummaryManager.open(self.db_dict)
+        yield
+        self.db_manager.close()
+        self.sql_manager.close()
+        weedb.colstore.ColumnStore._shared.clear()
+
+    def check_same(self):
+        assert list(self.db_manager.genBatchRecords()) == list(self.sql_manager.genBatchRecords())
+        span = (mid_ts - 2 * 86400, mid_ts + 3600)
+        assert self.db_manager.get_columns(['outTemp', 'rain'], span, typecode=None) \
+               == self.sql_manager.get_columns(['outTemp', 'rain'], span, typecode=None)
+
+    def test_build(self):
+        """The column store should be built on first use, and match the database"""
+        self.check_same()
+        store = self.db_manager.column_store
+        assert store.root == os.path.join(self.db_dict['SQLITE_ROOT'], 'columns.sdb.columns',
+                                          'archive')
+        assert store.months() == ['2020-10', '2020-11']
+
+    def test_add_update(self):
+        self.check_same()
+        records = list(gen_fake_data.gen_fake_records(stop_ts + interval_secs,
+                                                      stop_ts + 48 * interval_secs,
+                                                      interval=interval_secs))
+        for record in records:
+            self.db_manager.addRecord(record)
+        self.db_manager.updateValue(mid_ts, 'outTemp', 123.0)
+        self.check_same()
+        assert self.db_manager.getRecord(mid_ts)['outTemp'] == 123.0
+
+    def test_purge(self):
+        self.check_same()
+        N = self.db_manager.purge_records(mid_ts)
+        assert N == (mid_ts - start_ts) // interval_secs
+        assert self.db_manager.first_timestamp == mid_ts
+        assert self.db_manager.column_store.months() == ['2020-11']
+        self.sql_manager.refresh()
+        self.check_same()
+        assert self.db_manager.purge_records(mid_ts) == 0
+
+    def test_interrupted(self):
+        """If another process died between changing the database and the column store, the
+        column store should be checked again"""
+        self.check_same()
+        store = self.db_manager.column_store
+        records = list(gen_fake_data.gen_fake_records(stop_ts + interval_secs,
+                                                      stop_ts + 48 * interval_secs,
+                                                      interval=interval_secs))
+        with store.lock:
+            store.begin_update()
+            self.sql_manager.addRecord(records)
+        self.check_same()
+        assert not store.update_interrupted()
+
+    def test_rebuild(self):
+        """A missing or damaged column store should be rebuilt"""
+        self.check_same()
+        store = self.db_manager.column_store
+        store.remove_month('2020-11')
+        with open(os.path.join(store.root, '2020-10', 'outTemp.col'), 'ab') as fd:
+            fd.write(b'junk')
+        store._info.clear()
+        store.synced = False
+        self.check_same()
+
+    def test_types(self):
+        """Columns that are not REAL should come back as they went in"""
+        self.db_manager.add_column('station', 'TEXT')
+        self.db_manager.add_column('strikes', 'INTEGER')
+        records = list(gen_fake_data.gen_fake_records(stop_ts + interval_secs,
+                                                      stop_ts + 4 * interval_secs,
+                                                      interval=interval_secs))
+        for i, record in enumerate(records):
+            record['station'] = 'abc'
+            record['strikes'] = i
+        self.db_manager.addRecord(records)
+        self.sql_manager.refresh()
+        self.check_same()
+        columns = self.db_manager.get_columns(['station', 'strikes'], typecode=None)
+        assert columns['station'][-5:] == [None, 'abc', 'abc', 'abc', 'abc']
+        assert columns['strikes'][-5:] == [None, 0, 1, 2, 3]
+        assert self.db_manager.column_store.synced
+
+        # A value the column store cannot hold should not stop the record from being added
+        record = dict(records[-1], dateTime=records[-1]['dateTime'] + interval_secs,
+                      station=b'abc')
+        assert self.db_manager.addRecord(record) == 1
+        assert not self.db_manager.column_store.synced
+        self.check_same()
+
+    def test_change_columns(self, monkeypatch):
+        """Changing the columns of the archive table should not rebuild the column store"""
+        self.check_same()
+        rebuilt = []
+        monkeypatch.setattr(self.db_manager, '_rebuild_month', rebuilt.append)
+        self.db_manager.add_column('extraTemp1')
+        self.db_manager.rename_column('outTemp', 'extraTemp2')
+        self.db_manager.drop_columns(['rain'])
+        self.sql_manager.refresh()
+        self.db_manager.column_store.synced = False
+        assert list(self.db_manager.genBatchRecords()) == list(self.sql_manager.genBatchRecords())
+        assert rebuilt == []
+
+    def test_offload(self):
+        """Months offloaded to the column store should leave the archive table, and still be
+        seen through the manager"""
+        plain = setup_database(dict(self.db_dict, database_name='plain.sdb'))
+        dec_ts = int(time.mktime(datetime.date(2020, 12, 2).timetuple()))
+        records = list(gen_fake_data.gen_fake_records(dec_ts, dec_ts + 24 * interval_secs,
+                                                      interval=interval_secs))
+        plain.addRecord(records)
+        self.db_manager.offload_months = 1
+        self.db_manager.addRecord(records)
+
+        # October is only in the column store now
+        boundary = weedb.colstore.month_span('2020-11')[0]
+        assert self.db_manager.column_store.offloaded_until() == boundary
+        assert self.db_manager.getSql("SELECT MIN(dateTime) FROM archive")[0] >= boundary
+        assert self.db_manager.getSql("SELECT COUNT(*) FROM archive")[0] \
+               < plain.getSql("SELECT COUNT(*) FROM archive")[0]
+
+        def check_same(manager):
+            assert manager.first_timestamp == plain.first_timestamp == start_ts
+            assert list(manager.genBatchRecords()) == list(plain.genBatchRecords())
+            for ts, max_delta in ((start_ts + interval_secs, None), (start_ts - 10, 100)):
+                assert manager.getRecord(ts, max_delta) == plain.getRecord(ts, max_delta)
+            span = weeutil.weeutil.TimeSpan(start_ts - 1800, mid_ts + 86400)
+            for obs_type, xtype in (('outTemp', weewx.xtypes.ArchiveTable),
+                                    ('wind', weewx.xtypes.ArchiveTable),
+                                    ('windvec', weewx.xtypes.WindVec)):
+                aggregate_types = xtype.valid_aggregate_types \
+                    if xtype is weewx.xtypes.ArchiveTable \
+                    else ['avg', 'sum'] + list(xtype.agg_sql_dict)
+                for aggregate_type in aggregate_types:
+                    if obs_type == 'outTemp' and aggregate_type in ('vecdir', 'vecavg') \
+                            or obs_type == 'wind' and aggregate_type == 'gustdir':
+                        continue
+                    expected = xtype.get_aggregate(obs_type, span, aggregate_type, plain)
+                    result = xtype.get_aggregate(obs_type, span, aggregate_type, manager)
+                    assert result[1:] == expected[1:]
+                    assert result[0] == pytest.approx(expected[0]), \
+                        "%s %s" % (obs_type, aggregate_type)
+
+        check_same(self.db_manager)
+        with weewx.manager.ColumnStoreManager.open(self.db_dict) as manager:
+            check_same(manager)
+
+        # An offloaded record cannot be added again, but it can be changed
+        assert self.db_manager.addRecord(plain.getRecord(start_ts + interval_secs)) == 0
+        self.db_manager.updateValue(start_ts + interval_secs, 'outTemp', 123.0)
+        plain.updateValue(start_ts + interval_secs, 'outTemp', 123.0)
+        # A record that turns up late goes to the column store
+        record = dict(plain.getRecord(start_ts + interval_secs), dateTime=start_ts - 1800)
+        plain.addRecord(record)
+        self.db_manager.addRecord(record)
+        assert self.db_manager.getSql("SELECT MIN(dateTime) FROM archive")[0] >= boundary
+        plain.first_timestamp = start_ts
+        self.db_manager.first_timestamp = start_ts
+        check_same(self.db_manager)
+
+        # Purging reaches into the column store, too
+        assert self.db_manager.purge_records(mid_ts) == plain.purge_records(mid_ts)
+        assert self.db_manager.first_timestamp == plain.first_timestamp
+        assert list(self.db_manager.genBatchRecords()) == list(plain.genBatchRecords())
+        plain.close()
+
+
+class TestBatchedDaySummaries:
+    """Adding a collection of records should give the same daily summaries as adding them one
+    at a time"""
+
+    def test_same_summaries(self, tmp_path):
+        db_dicts = [{'driver': 'weedb.sqlite',
+                     'SQLITE_ROOT': str(tmp_path),
+                     'database_name': name} for name in ('single.sdb', 'batch.sdb')]
+        records = list(gen_fake_data.gen_fake_records(start_ts, stop_ts,
+                                                      interval=interval_secs))
+        with weewx.manager.DaySummaryManager.open_with_create(db_dicts[0],
+                                                              schema=schema) as single, \
+                weewx.manager.DaySummaryManager.open_with_create(db_dicts[1],
+                                                                 schema=schema) as batch:
+            for record in records:
+                single.addRecord(record)
+            batch.addRecord(records)
+            # The held back summary must not leak into the next, single, record
+            extra = next(gen_fake_data.gen_fake_records(stop_ts + interval_secs,
+                                                        stop_ts + interval_secs,
+                                                        interval=interval_secs))
+            single.addRecord(dict(extra))
+            batch.addRecord(dict(extra))
+
+            for obs_type in ('outTemp', 'windSpeed', 'rain'):
+                table = 'archive_day_%s' % obs_type
+                sql = "SELECT * FROM %s ORDER BY dateTime" % table
+                assert list(single.connection.cursor().execute(sql)) \
+                       == list(batch.connection.cursor().execute(sql))
+            assert single.getSql("SELECT COUNT(*) FROM archive_day_outTemp")[0] == 14
+
+    def test_deferred(self, tmp_path):
+        db_dict = {'driver': 'weedb.sqlite', 'SQLITE_ROOT': str(tmp_path),
+                   'database_name': 'deferred.sdb'}
+        records = list(gen_fake_data.gen_fake_records(start_ts, mid_ts, interval=interval_secs))
+        with weewx.manager.DaySummaryManager.open_with_create(db_dict, schema=schema) as manager:
+            manager.defer_records(records[:10])
+            manager.defer_records(records[10])
+            assert len(manager.deferred_records) == 11
+            # Anything that uses the database sees the records held back
+            assert manager.getSql("SELECT COUNT(*) FROM archive")[0] == 11
+            assert not manager.deferred_records
+            manager.defer_records(records[11:])
+            assert manager.flush_deferred() == len(records) - 11
+            assert manager.lastGoodStamp() == records[-1]['dateTime']
+            # The daily summaries got all of them
+            assert manager.getSql("SELECT SUM(count) FROM archive_day_outTemp")[0] \
+                   == manager.getSql("SELECT COUNT(outTemp) FROM archive")[0]
+
+
 def setup_database(db_dict):
     """Set up a database by using addRecord()"""
     try:
@@ -166,3 +463,293 @@ def setup_database(db_dict):
                                                         day_phase_offset=0.0))
 
     return db_manager
+
+
+class TestRecentRecords:
+    """Test the in-memory window of recent records"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.manager_dict = {
+            'database_dict': {'driver': 'weedb.sqlite',
+                              'SQLITE_ROOT': str(tmp_path),
+                              'database_name': 'recent.sdb'},
+            'table_name': 'archive',
+            'manager': 'weewx.manager.DaySummaryManager',
+            'schema': schema,
+            'cache_hours': 24,
+        }
+        # Populate the database, without a window
+        db_dict = dict(self.manager_dict, cache_hours=0)
+        with weewx.manager.open_manager(db_dict, initialize=True) as db_manager:
+            db_manager.addRecord(gen_fake_data.gen_fake_records(start_ts, stop_ts,
+                                                                interval=interval_secs))
+        weewx.manager.RecentRecords._shared.clear()
+        yield
+        weewx.manager.RecentRecords._shared.clear()
+
+    def test_same_results(self):
+        """Queries answered by the window should match those answered by the database"""
+        with weewx.manager.open_manager(self.manager_dict) as cached, \
+                weewx.manager.open_manager(dict(self.manager_dict, cache_hours=0)) as uncached:
+            assert cached.recent is not None
+            assert uncached.recent is None
+
+            # Within the window
+            span = (stop_ts - 6 * interval_secs, stop_ts)
+            assert list(cached.genBatchRecords(*span)) == list(uncached.genBatchRecords(*span))
+            assert cached.get_recent_records(*span) is not None
+            for ts in (stop_ts - 3 * interval_secs, stop_ts - 3 * interval_secs + 100):
+                assert cached.getRecord(ts, max_delta=600) == uncached.getRecord(ts, max_delta=600)
+            assert cached.getRecord(stop_ts - 100) is None
+
+            # Outside the window. The database should be used.
+            assert cached.get_recent_records(mid_ts, stop_ts) is None
+            assert list(cached.genBatchRecords(mid_ts, stop_ts)) \
+                   == list(uncached.genBatchRecords(mid_ts, stop_ts))
+
+    def test_shared(self):
+        """Managers bound to the same table share the window, and see new data"""
+        with weewx.manager.open_manager(self.manager_dict) as writer, \
+                weewx.manager.open_manager(self.manager_dict) as reader:
+            assert writer.recent is reader.recent
+            # Prime the window
+            assert reader.get_recent_records(stop_ts - 3600, None) is not None
+
+            new_record = next(gen_fake_data.gen_fake_records(stop_ts + interval_secs,
+                                                             stop_ts + interval_secs,
+                                                             interval=interval_secs))
+            writer.addRecord(new_record)
+            assert reader.getRecord(stop_ts + interval_secs)['outTemp'] == new_record['outTemp']
+
+            writer.updateValue(stop_ts + interval_secs, 'outTemp', -10.0)
+            assert reader.getRecord(stop_ts + interval_secs)['outTemp'] == -10.0
+
+            # The window should have moved forward
+            assert reader.recent.start == stop_ts + interval_secs - 24 * 3600
+
+    def test_max_records(self):
+        """The window should be shortened to honor the maximum number of records"""
+        with weewx.manager.open_manager(dict(self.manager_dict,
+                                             cache_max_records=5)) as db_manager:
+            assert db_manager.get_recent_records(stop_ts - 5 * interval_secs, None) is not None
+            assert len(db_manager.recent.rows) == 5
+            # Reaching further back than that requires the database
+            assert db_manager.get_recent_records(stop_ts - 6 * interval_secs, None) is None
+            assert len(list(db_manager.genBatchRecords(stop_ts - 6 * interval_secs))) == 6
+
+
+    def test_widen(self):
+        """A shared window grows to the largest size asked for"""
+        small = dict(self.manager_dict, cache_hours=1, cache_max_records=5)
+        large = dict(self.manager_dict, cache_hours=3, cache_max_records=10)
+        with weewx.manager.open_manager(small) as first:
+            assert first.get_recent_records(stop_ts - interval_secs, None) is not None
+            with weewx.manager.open_manager(large) as second:
+                assert second.recent is first.recent
+                assert second.recent.span == 3 * 3600
+                assert second.recent.max_records == 10
+                # It is reloaded to cover the larger span
+                assert second.get_recent_records(stop_ts - 3 * interval_secs, None) is not None
+            # Asking for less does not shrink it
+            with weewx.manager.open_manager(small) as third:
+                assert third.recent.span == 3 * 3600
+                assert third.recent.max_records == 10
+                assert third.get_recent_records(stop_ts - 3 * interval_secs, None) is not None
+
+
+class TestAggregateSnapshots:
+    """Test the store of aggregates over closed periods"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.manager_dict = {
+            'database_dict': {'driver': 'weedb.sqlite',
+                              'SQLITE_ROOT': str(tmp_path),
+                              'database_name': 'snapshots.sdb'},
+            'table_name': 'archive',
+            'manager': 'weewx.manager.DaySummaryManager',
+            'schema': schema,
+            'aggregate_snapshots': True,
+        }
+        with weewx.manager.open_manager(self.manager_dict, initialize=True) as db_manager:
+            db_manager.addRecord(gen_fake_data.gen_fake_records(start_ts, stop_ts,
+                                                                interval=interval_secs))
+            # The first value saved creates the table
+            db_manager.snapshots.put(start_ts, mid_ts, 'tag', None)
+
+    def test_create(self):
+        """The table should not be created until something is saved"""
+        with weewx.manager.open_manager(self.manager_dict) as db_manager:
+            with weedb.Transaction(db_manager.connection) as cursor:
+                cursor.drop_table('archive_snapshot')
+        with weewx.manager.open_manager(self.manager_dict) as db_manager:
+            assert db_manager.snapshots.get(start_ts, mid_ts, 'tag') is None
+            db_manager.invalidate_snapshots(start_ts, mid_ts)
+            assert 'archive_snapshot' not in db_manager.connection.tables()
+            # Nothing would have recorded a change made before the table existed
+            db_manager.snapshots.put(start_ts, mid_ts, 'tag', 1.0)
+            assert 'archive_snapshot' in db_manager.connection.tables()
+            assert db_manager.snapshots.get(start_ts, mid_ts, 'tag') is None
+            db_manager.snapshots.put(start_ts, mid_ts, 'tag', 1.0)
+            assert db_manager.snapshots.get(start_ts, mid_ts, 'tag') == 1.0
+
+    def test_by_period(self):
+        """Only the periods asked for should be read"""
+        day = 86400
+        with weewx.manager.open_manager(self.manager_dict) as db_manager:
+            for i in range(5):
+                db_manager.snapshots.put(mid_ts + i * day, mid_ts + (i + 1) * day, 'tag', i)
+        with weewx.manager.open_manager(self.manager_dict) as db_manager:
+            assert db_manager.snapshots.get(mid_ts + day, mid_ts + 2 * day, 'tag') == 1
+            assert list(db_manager.snapshots._periods) == [(mid_ts + day, mid_ts + 2 * day)]
+
+    def test_prune(self, monkeypatch):
+        """The table should not hold more than max_snapshots"""
+        monkeypatch.setattr(weewx.manager.AggregateSnapshots, 'max_snapshots', 3)
+        monkeypatch.setattr(weewx.manager.AggregateSnapshots, 'prune_interval', 2)
+        day = 86400
+        with weewx.manager.open_manager(self.manager_dict) as db_manager:
+            for i in range(10):
+                db_manager.snapshots.put(mid_ts + i * day, mid_ts + (i + 1) * day, 'tag', i)
+            assert db_manager.getSql("SELECT COUNT(*) FROM archive_snapshot "
+                                     "WHERE stop > 0")[0] <= 3
+            assert db_manager.snapshots.get(mid_ts + 9 * day, mid_ts + 10 * day, 'tag') == 9
+            assert db_manager.snapshots.get(mid_ts, mid_ts + day, 'tag') is None
+
+    def test_persist(self):
+        """Snapshots should survive the manager, and be seen by other managers"""
+        with weewx.manager.open_manager(self.manager_dict) as db_manager:
+            assert db_manager.snapshots.get(start_ts, mid_ts, 'tag') is None
+            db_manager.snapshots.put(start_ts, mid_ts, 'tag', [1.5, 'degree_F', None])
+            assert db_manager.snapshots.get(start_ts, mid_ts, 'tag') == [1.5, 'degree_F', None]
+        with weewx.manager.open_manager(self.manager_dict) as db_manager:
+            assert db_manager.snapshots.get(start_ts, mid_ts, 'tag') == [1.5, 'degree_F', None]
+        with weewx.manager.open_manager(dict(self.manager_dict,
+                                             aggregate_snapshots=False)) as db_manager:
+            assert db_manager.snapshots is None
+
+    def test_invalidate(self):
+        """Changing data in a period should throw out its snapshots, and only its snapshots"""
+        with weewx.manager.open_manager(self.manager_dict) as db_manager:
+            day = 86400
+            db_manager.snapshots.put(mid_ts - day, mid_ts, 'day1', True)
+            db_manager.snapshots.put(mid_ts, mid_ts + day, 'day2', True)
+            db_manager.snapshots.put(mid_ts + day, mid_ts + 2 * day, 'day3', True)
+
+            # Adding new data after the end of the archive should not affect anything
+            db_manager.addRecord(next(gen_fake_data.gen_fake_records(
+                stop_ts + interval_secs, stop_ts + interval_secs, interval=interval_secs)))
+            assert db_manager.snapshots.get(mid_ts - day, mid_ts, 'day1')
+
+            # Updating a record in the second day should throw out its snapshot
+            db_manager.updateValue(mid_ts + interval_secs, 'outTemp', 100.0)
+            assert db_manager.snapshots.get(mid_ts, mid_ts + day, 'day2') is None
+            assert db_manager.snapshots.get(mid_ts - day, mid_ts, 'day1')
+            assert db_manager.snapshots.get(mid_ts + day, mid_ts + 2 * day, 'day3')
+
+            # So should adding a record that falls within a period. A record at midnight belongs
+            # to the day before.
+            with weedb.Transaction(db_manager.connection) as cursor:
+                cursor.execute("DELETE FROM archive WHERE dateTime = ?", (mid_ts + day,))
+            record = db_manager.getRecord(mid_ts + day - interval_secs)
+            record['dateTime'] = mid_ts + day
+            db_manager.addRecord(record)
+            assert db_manager.snapshots.get(mid_ts + day, mid_ts + 2 * day, 'day3')
+
+        # Another manager should see the same thing
+        with weewx.manager.open_manager(self.manager_dict) as db_manager:
+            assert db_manager.snapshots.get(mid_ts - day, mid_ts, 'day1')
+            assert db_manager.snapshots.get(mid_ts, mid_ts + day, 'day2') is None
+            assert db_manager.snapshots.get(mid_ts + day, mid_ts + 2 * day, 'day3')
+
+            # Rebuilding the daily summaries should throw out everything
+            db_manager.drop_daily()
+            assert db_manager.snapshots.get(mid_ts - day, mid_ts, 'day1') is None
+
+    def test_stale(self):
+        """A value calculated before the data changed should not be saved"""
+        with weewx.manager.open_manager(self.manager_dict) as reader, \
+                weewx.manager.open_manager(self.manager_dict) as writer:
+            # Make sure the reader has loaded its snapshots
+            assert reader.snapshots.get(start_ts, mid_ts, 'tag') is None
+            writer.updateValue(mid_ts - interval_secs, 'outTemp', 100.0)
+            reader.snapshots.put(start_ts, mid_ts, 'tag', 1.0)
+            assert reader.snapshots.get(start_ts, mid_ts, 'tag') is None
+            # Now that it has caught up, it should be able to save values
+            reader.snapshots.put(start_ts, mid_ts, 'tag', 1.0)
+            assert reader.snapshots.get(start_ts, mid_ts, 'tag') == 1.0
+
+
+class TestManagerPool:
+    """Test the pool of managers used by readers"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.manager_dict = {
+            'database_dict': {'driver': 'weedb.sqlite',
+                              'SQLITE_ROOT': str(tmp_path),
+                              'database_name': 'pool.sdb'},
+            'table_name': 'archive',
+            'manager': 'weewx.manager.DaySummaryManager',
+            'schema': schema,
+        }
+        with weewx.manager.open_manager(self.manager_dict, initialize=True) as db_manager:
+            db_manager.addRecord(gen_fake_data.gen_fake_records(start_ts, stop_ts,
+                                                                interval=interval_secs))
+        self.pool = weewx.manager.ManagerPool(max_idle=2)
+        yield
+        self.pool.close()
+
+    def test_reuse(self):
+        """Managers are lent to one reader at a time, and reused once given back"""
+        first = self.pool.get_manager(self.manager_dict)
+        second = self.pool.get_manager(self.manager_dict)
+        assert first is not second
+        self.pool.put_manager(self.manager_dict, first)
+        self.pool.put_manager(self.manager_dict, second)
+        assert self.pool.get_manager(self.manager_dict) in (first, second)
+
+    def test_refresh(self):
+        """A manager from the pool should see changes made while it was idle"""
+        reader = self.pool.get_manager(self.manager_dict)
+        assert reader.last_timestamp == stop_ts
+        self.pool.put_manager(self.manager_dict, reader)
+
+        with weewx.manager.open_manager(self.manager_dict) as writer:
+            writer.addRecord(next(gen_fake_data.gen_fake_records(
+                stop_ts + interval_secs, stop_ts + interval_secs, interval=interval_secs)))
+            writer.add_column('extraTemp1')
+
+        # Borrow it from another thread. This also checks that the connection can be used by a
+        # thread other than the one that opened it.
+        results = []
+        thread = threading.Thread(target=lambda: results.append(
+            self.pool.get_manager(self.manager_dict)))
+        thread.start()
+        thread.join()
+        assert results[0] is reader
+        assert reader.last_timestamp == stop_ts + interval_secs
+        assert 'extraTemp1' in reader.sqlkeys
+        assert 'extraTemp1' in reader.daykeys
+        assert reader.getRecord(stop_ts + interval_secs) is not None
+
+    def test_journal_mode(self, caplog):
+        """The pool says once if the database is not in WAL mode, and does not change it"""
+        with caplog.at_level(logging.INFO, logger='weewx.manager'):
+            first = self.pool.get_manager(self.manager_dict)
+            self.pool.get_manager(self.manager_dict)
+        assert caplog.text.count("journal mode 'delete'") == 1
+        assert first.connection.get_variable('journal_mode')[1].lower() == 'delete'
+
+    def test_binder(self):
+        """A DBBinder with a pool should give its managers back when closed"""
+        config_dict = {'WEEWX_ROOT': '/',
+                       'DataBindings': {'wx_binding': {'database': 'pool_sqlite',
+                                                       'manager': self.manager_dict['manager']}},
+                       'Databases': {'pool_sqlite': self.manager_dict['database_dict']}}
+        with weewx.manager.DBBinder(config_dict, pool=self.pool) as db_binder:
+            db_manager = db_binder.get_manager('wx_binding')
+        assert db_manager.connection is not None
+        with weewx.manager.DBBinder(config_dict, pool=self.pool) as db_binder:
+            assert db_binder.get_manager('wx_binding') is db_manager
@@ -0,0 +1,166 @@
+#
+#    Copyright (c) 2026 Tom Keffer <tkeffer@gmail.com>
+#
+#    See the file LICENSE.txt for your full rights.
+#
+"""Test the local publisher of LOOP packets and archive records"""
+
+import os.path
+import socket
+import threading
+import time
+
+import pytest
+
+import weewx
+import weewx.pubsub
+
+
+def wait_for(condition, timeout=5.0):
+    """Wait for a condition to become true"""
+    stop = time.time() + timeout
+    while not condition():
+        if time.time() > stop:
+            raise AssertionError("Timed out")
+        time.sleep(0.01)
+
+
+def make_packet(ts, size=0):
+    packet = {'dateTime': ts, 'usUnits': weewx.US, 'outTemp': 50.5, 'windSpeed': None}
+    if size:
+        packet['junk'] = 'x' * size
+    return packet
+
+
+@pytest.fixture
+def publisher(request):
+    pub = weewx.pubsub.Publisher(('localhost', 0), **getattr(request, 'param', {}))
+    pub.start()
+    yield pub
+    pub.stop()
+
+
+def test_fan_out(publisher):
+    feeds = [weewx.pubsub.subscribe(publisher.address, timeout=5) for _ in range(2)]
+    results = [[], []]
+
+    def read(i):
+        for message in feeds[i]:
+            results[i].append(message)
+            if len(results[i]) == 3:
+                break
+
+    threads = [threading.Thread(target=read, args=(i,)) for i in range(2)]
+    for t in threads:
+        t.start()
+    wait_for(lambda: len(publisher.stats()['subscribers']) == 2)
+
+    publisher.publish('loop', make_packet(1))
+    publisher.publish('loop', make_packet(2))
+    publisher.publish('archive', make_packet(3))
+    for t in threads:
+        t.join(5)
+    for result in results:
+        assert result == [('loop', make_packet(1)), ('loop', make_packet(2)),
+                          ('archive', make_packet(3))]
+    wait_for(lambda: all(stats['sent'] == 3 for stats in publisher.stats()['subscribers']))
+
+
+def slow_subscriber(publisher):
+    """Connect a subscriber that does not read anything"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    sock.connect(publisher.address)
+    wait_for(lambda: len(publisher.stats()['subscribers']) == 1)
+    return sock
+
+
+@pytest.mark.parametrize('publisher', [{'max_buffer': 5}], indirect=True)
+def test_drop_oldest(publisher):
+    sock = slow_subscriber(publisher)
+    for ts in range(200):
+        publisher.publish('loop', make_packet(ts, 100000))
+        time.sleep(0.001)
+    wait_for(lambda: publisher.stats()['subscribers'][0]['dropped'] > 0)
+    stats = publisher.stats()['subscribers'][0]
+    assert stats['max_depth'] <= 5
+    # The subscriber is still connected, and gets the latest packet last
+    with sock.makefile('rb') as fd:
+        while True:
+            line = fd.readline()
+            if b'"dateTime":199,' in line:
+                break
+    sock.close()
+
+
+@pytest.mark.parametrize('publisher', [{'max_buffer': 5, 'drop_policy': 'disconnect'}],
+                         indirect=True)
+def test_disconnect(publisher):
+    sock = slow_subscriber(publisher)
+    for ts in range(200):
+        publisher.publish('loop', make_packet(ts, 100000))
+        time.sleep(0.001)
+    wait_for(lambda: not publisher.stats()['subscribers'])
+    sock.close()
+
+
+def test_pending_overflow():
+    """Messages that overflow the queue for the publisher thread are counted"""
+    pub = weewx.pubsub.Publisher(('localhost', 0), max_buffer=5)
+    # The thread has not been started, so nothing is taken from the queue
+    for ts in range(8):
+        pub.publish('loop', make_packet(ts))
+    stats = pub.stats()
+    assert stats['published'] == 8
+    assert stats['dropped'] == 3
+    assert stats['subscribers'] == []
+    assert [data['dateTime'] for _, data in pub.pending] == [3, 4, 5, 6, 7]
+    pub.start()
+    pub.stop()
+
+
+def test_bad_policy():
+    with pytest.raises(ValueError):
+        weewx.pubsub.Publisher(('localhost', 0), drop_policy='foo')
+
+
+def test_not_a_socket(tmp_path):
+    path = tmp_path / 'weewx.conf'
+    path.write_text('keep me')
+    with pytest.raises(ValueError):
+        weewx.pubsub.Publisher(str(path))
+    assert path.read_text() == 'keep me'
+
+
+class FakeEngine:
+    def __init__(self):
+        self.callbacks = {}
+
+    def bind(self, event_type, callback):
+        self.callbacks.setdefault(event_type, []).append(callback)
+
+    def dispatchEvent(self, event):
+        for callback in self.callbacks.get(event.event_type, []):
+            callback(event)
+
+
+def test_service(tmp_path):
+    config_dict = {'WEEWX_ROOT': str(tmp_path),
+                   'StdPublisher': {'unix_socket': 'weewx.sock', 'publish_archive': 'false'}}
+    engine = FakeEngine()
+    service = weewx.pubsub.StdPublisher(engine, config_dict)
+    path = os.path.join(str(tmp_path), 'weewx.sock')
+    try:
+        feed = weewx.pubsub.subscribe(path, timeout=5)
+        received = []
+        reader = threading.Thread(target=lambda: received.append(next(feed)))
+        reader.start()
+        wait_for(lambda: len(service.publisher.stats()['subscribers']) == 1)
+        engine.dispatchEvent(weewx.Event(weewx.NEW_ARCHIVE_RECORD, record=make_packet(1)))
+        engine.dispatchEvent(weewx.Event(weewx.NEW_LOOP_PACKET, packet=make_packet(2)))
+        reader.join(5)
+        assert received == [('loop', make_packet(2))]
+        feed.close()
+    finally:
+        service.shutDown()
+    assert not os.path.exists(path)
@@ -14,6 +14,7 @@ import weeutil.config
 import weeutil.logger
 import weeutil.weeutil
 import weewx
+import weewx.reportengine
 from weewx.reportengine import build_skin_dict
 
 log = logging.getLogger(__name__)
@@ -196,3 +197,54 @@ def test_global_override_log_specs(config_dict):
     config_dict['log_success'] = False
     skin_dict = build_skin_dict(config_dict, 'SeasonsReport')
     assert not skin_dict['log_success']
+
+
+def test_skin_cache(config_dict, tmp_path):
+    # Make a copy of the Seasons skin, so it can be changed
+    skin_dir = tmp_path / 'Seasons'
+    skin_dir.mkdir()
+    (skin_dir / 'skin.conf').write_text((Path(SKIN_DIR) / 'Seasons' / 'skin.conf').read_text())
+    config_dict['StdReport']['SKIN_ROOT'] = str(tmp_path)
+
+    cache = weewx.reportengine.SkinCache()
+    skin_dict = cache.get(config_dict, 'SeasonsReport')
+    assert skin_dict == build_skin_dict(config_dict, 'SeasonsReport')
+    # Changing what the cache returned should not change what it holds
+    skin_dict['Units']['Groups']['group_pressure'] = 'mbar'
+    cached = cache.skins['SeasonsReport'][3]
+    assert cache.get(config_dict, 'SeasonsReport')['Units']['Groups']['group_pressure'] == 'inHg'
+    assert cache.skins['SeasonsReport'][3] is cached
+
+    # Adding a language file means the skin dictionary must be built again
+    (skin_dir / 'lang').mkdir()
+    assert cache.get(config_dict, 'SeasonsReport') == build_skin_dict(config_dict,
+                                                                      'SeasonsReport')
+    assert cache.skins['SeasonsReport'][3] is not cached
+
+    # As does a new configuration dictionary
+    cached = cache.skins['SeasonsReport'][3]
+    cache.get(weeutil.config.deep_copy(config_dict), 'SeasonsReport')
+    assert cache.skins['SeasonsReport'][3] is not cached
+
+
+def test_skin_cache_options(config_dict):
+    cache = weewx.reportengine.SkinCache()
+    cache.get(config_dict, 'SeasonsReport')
+    cached = cache.skins['SeasonsReport'][3]
+    assert cache.get(config_dict, 'SeasonsReport') == cached
+    assert cache.skins['SeasonsReport'][3] is cached
+
+    # Changing [[Defaults]] in place means the skin dictionary must be built again
+    config_dict['StdReport']['Defaults'].update(
+        {'Units': {'Groups': {'group_pressure': 'mbar'}}})
+    skin_dict = cache.get(config_dict, 'SeasonsReport')
+    assert skin_dict['Units']['Groups']['group_pressure'] == 'mbar'
+    assert cache.skins['SeasonsReport'][3] is not cached
+
+    # As does changing the section of the report
+    cached = cache.skins['SeasonsReport'][3]
+    config_dict['StdReport']['SeasonsReport'].update(
+        {'Units': {'Groups': {'group_pressure': 'hPa'}}})
+    skin_dict = cache.get(config_dict, 'SeasonsReport')
+    assert skin_dict['Units']['Groups']['group_pressure'] == 'hPa'
+    assert cache.skins['SeasonsReport'][3] is not cached
@@ -0,0 +1,198 @@
+#
+#    Copyright (c) 2026 Tom Keffer <tkeffer@gmail.com>
+#
+#    See the file LICENSE.txt for your full rights.
+#
+"""Test hosting RESTful uploaders on the asyncio runtime"""
+
+import http.server
+import json
+import queue
+import threading
+import time
+
+import pytest
+
+import weewx
+import weewx.restasync
+import weewx.restx
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    """Remembers every request, then answers with the body 'ok', or an error code."""
+
+    def do_GET(self):
+        self.answer(None)
+
+    def do_POST(self):
+        self.answer(self.rfile.read(int(self.headers['Content-Length'])))
+
+    def answer(self, body):
+        self.server.requests.append((self.command, self.path, body))
+        if self.path.startswith('/redirect'):
+            self.send_response(302)
+            self.send_header('Location', '/ok')
+            self.end_headers()
+            return
+        code = self.server.codes.pop(0) if self.server.codes else 200
+        self.send_response(code)
+        self.send_header('Content-Type', 'text/plain')
+        if self.path.startswith('/chunked'):
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            self.wfile.write(b'2\r\nok\r\n0\r\n\r\n')
+        else:
+            self.send_header('Content-Length', '2')
+            self.end_headers()
+            self.wfile.write(b'ok')
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = http.server.HTTPServer(('localhost', 0), Handler)
+    httpd.requests = []
+    httpd.codes = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.url = 'http://localhost:%d' % httpd.server_address[1]
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def runtime():
+    weewx.restx.RESTThread.runtime = weewx.restasync.get_runtime(2)
+    yield weewx.restx.RESTThread.runtime
+    weewx.restx.RESTThread.runtime = None
+
+
+class EchoThread(weewx.restx.RESTThread):
+    """Posts the record as JSON, and remembers the responses."""
+
+    def __init__(self, q, url, **kwargs):
+        super().__init__(q, 'Test-Echo', max_tries=2, retry_wait=0, **kwargs)
+        self.url = url
+        self.responses = []
+        self.path = '/post'
+
+    def format_url(self, record):
+        return '%s%s?ts=%d' % (self.url, self.path, record['dateTime'])
+
+    def get_post_body(self, record):
+        return json.dumps(record), 'application/json'
+
+    def check_response(self, response):
+        self.responses.append((response.code, response.read()))
+
+
+class OwnThread(EchoThread):
+    """Overrides process_record(), so it cannot be hosted."""
+
+    def process_record(self, record, dbmanager):
+        super().process_record(record, dbmanager)
+
+
+def make_record(ts):
+    return {'dateTime': ts, 'usUnits': weewx.US, 'interval': 5, 'outTemp': 20.0}
+
+
+def wait_for(condition, timeout=5.0):
+    stop = time.time() + timeout
+    while not condition():
+        if time.time() > stop:
+            raise AssertionError("Timed out")
+        time.sleep(0.01)
+
+
+def test_hosted(server, runtime):
+    q = queue.Queue()
+    uploaders = [EchoThread(q, server.url)]
+    uploaders.append(EchoThread(queue.Queue(), server.url))
+    uploaders[1].path = '/chunked'
+    for uploader in uploaders:
+        uploader.start()
+        assert uploader.is_alive()
+        # No thread of its own
+        assert uploader.ident is None
+    q.put(make_record(1))
+    q.put(make_record(2))
+    uploaders[1].queue.put(make_record(3))
+    wait_for(lambda: len(server.requests) == 3)
+    wait_for(lambda: len(uploaders[0].responses) == 2 and uploaders[1].responses)
+    assert uploaders[0].responses == [(200, b'ok'), (200, b'ok')]
+    assert uploaders[1].responses == [(200, b'ok')]
+    posts = sorted(server.requests, key=lambda r: r[1])
+    assert [(method, path) for method, path, _ in posts] \
+           == [('POST', '/chunked?ts=3'), ('POST', '/post?ts=1'), ('POST', '/post?ts=2')]
+    assert json.loads(posts[1][2]) == make_record(1)
+
+    for uploader in uploaders:
+        weewx.restx.StdRESTful.shutDown_thread(uploader.queue, uploader)
+        assert not uploader.is_alive()
+    # The runtime stops after the last uploader
+    assert runtime.stopped
+    runtime.thread.join(5)
+    assert not runtime.thread.is_alive()
+
+
+class ThreadNameThread(EchoThread):
+    """Remembers the thread that prepares each request."""
+
+    def __init__(self, q, url, **kwargs):
+        super().__init__(q, url, **kwargs)
+        self.threads = []
+
+    def prepare_request(self, record, dbmanager):
+        self.threads.append(threading.current_thread().name)
+        return super().prepare_request(record, dbmanager)
+
+
+def test_wakeup(server, runtime):
+    """Records are picked up as soon as they are queued, and requests are prepared off the
+    event loop."""
+    uploader = ThreadNameThread(queue.Queue(), server.url)
+    uploader.start()
+    start = time.time()
+    for ts in range(1, 11):
+        uploader.queue.put(make_record(ts))
+        wait_for(lambda: len(uploader.responses) == ts)
+    # Polling the queue every quarter of a second would take more than a second
+    assert time.time() - start < 1.0
+    assert len(uploader.threads) == 10
+    assert 'UploadRuntime' not in uploader.threads
+    weewx.restx.StdRESTful.shutDown_thread(uploader.queue, uploader)
+    assert not uploader.is_alive()
+    # The queue is left as it was
+    assert 'put' not in vars(uploader.queue)
+
+
+def test_retry_and_redirect(server, runtime):
+    uploader = EchoThread(queue.Queue(), server.url)
+    uploader.start()
+    # First try fails, second one succeeds
+    server.codes = [500]
+    uploader.queue.put(make_record(1))
+    wait_for(lambda: len(uploader.responses) == 1)
+    assert len(server.requests) == 2
+    # Redirects are followed
+    uploader.path = '/redirect'
+    uploader.queue.put(make_record(2))
+    wait_for(lambda: len(uploader.responses) == 2)
+    assert [path for _, path, _ in server.requests[2:]] == ['/redirect?ts=2', '/ok']
+    weewx.restx.StdRESTful.shutDown_thread(uploader.queue, uploader)
+    assert not uploader.is_alive()
+
+
+def test_fallback(server, runtime):
+    uploader = OwnThread(queue.Queue(), server.url)
+    uploader.start()
+    # This one gets a real thread
+    assert uploader.ident is not None
+    uploader.queue.put(make_record(1))
+    wait_for(lambda: len(uploader.responses) == 1)
+    weewx.restx.StdRESTful.shutDown_thread(uploader.queue, uploader)
+    assert not uploader.is_alive()
@@ -8,6 +8,9 @@
 import http.client
 import os
 import queue
+import socket
+import socketserver
+import threading
 import time
 import urllib.parse
 from unittest import mock
@@ -256,3 +259,133 @@ class TestAmbient:
             url += "&indoortempf=70.0"
         matcher = MatchRequest(url, 'weewx/%s' % weewx.__version__)
         return matcher
+
+
+class FakeAPRSServer(socketserver.ThreadingTCPServer):
+    """A fake APRS-IS server. It acknowledges logins, and remembers every line it gets."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(('localhost', 0), FakeAPRSHandler)
+        self.lines = []
+        self.connections = []
+        self.address = 'localhost:%d' % self.server_address[1]
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def kick(self):
+        """Hang up on everybody"""
+        for sock in self.connections:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def stop(self):
+        self.shutdown()
+        self.kick()
+        self.server_close()
+
+
+class FakeAPRSHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        self.server.connections.append(self.request)
+        self.wfile.write(b'# fake aprs server\r\n')
+        for line in self.rfile:
+            self.server.lines.append(line.decode('ascii').strip())
+            if line.startswith(b'user '):
+                self.wfile.write(b'# logresp CW1234 unverified, server FAKE\r\n')
+
+
+class TestCWOPSession:
+    """Test posting to CWOP over a persistent APRS-IS session"""
+
+    @pytest.fixture(autouse=True)
+    def setup_method(self):
+        self.server = FakeAPRSServer()
+        # A port where nobody is listening
+        with socket.socket() as sock:
+            sock.bind(('localhost', 0))
+            self.dead_address = 'localhost:%d' % sock.getsockname()[1]
+        yield
+        self.server.stop()
+
+    def get_thread(self, **kwargs):
+        return weewx.restx.CWOPThread(queue.Queue(), None, 'CW1234', '-1', 45.0, -122.0,
+                                      'Simulator', persistent=True, **kwargs)
+
+    def wait_for_lines(self, n):
+        stop = time.time() + 5
+        while len(self.server.lines) < n:
+            assert time.time() < stop, "Timed out"
+            time.sleep(0.01)
+
+    def test_persistent(self):
+        obj = self.get_thread(server_list=[self.dead_address, self.server.address])
+        try:
+            obj.process_record(get_record(), None)
+            obj.process_record(get_record(), None)
+            self.wait_for_lines(3)
+            # One connection, one login, then both packets
+            assert len(self.server.connections) == 1
+            assert self.server.lines[0].startswith('user CW1234 pass -1 vers weewx')
+            assert self.server.lines[1] == self.server.lines[2]
+            assert self.server.lines[1].startswith('CW1234>APWEE5,TCPIP*:@220700z')
+
+            # If the server hangs up, the next post reconnects
+            self.server.kick()
+            while obj.session.sock is not None:
+                time.sleep(0.01)
+            obj.process_record(get_record(), None)
+            self.wait_for_lines(5)
+            assert len(self.server.connections) == 2
+        finally:
+            obj.session.release()
+        assert obj.session.sock is None
+
+    def test_shared(self):
+        obj1 = self.get_thread(server_list=[self.server.address])
+        obj2 = self.get_thread(server_list=[self.server.address])
+        assert obj1.session is obj2.session
+        obj1.session.release()
+        obj2.process_record(get_record(), None)
+        self.wait_for_lines(2)
+        obj2.session.release()
+        # Once everybody is done with it, a new session is started
+        obj3 = self.get_thread(server_list=[self.server.address])
+        assert obj3.session is not obj2.session
+        obj3.session.release()
+
+    def test_keepalive(self):
+        session = weewx.restx.APRSSession([self.server.address], 'user CW1234 pass -1\r\n',
+                                          timeout=7, keepalive=0.2)
+        session.users = 1
+        try:
+            session.send('first\r\n')
+            self.wait_for_lines(3)
+            assert self.server.lines[1:3] == ['first', '#keepalive']
+            # The reader leaves the timeout used by send() alone
+            assert session.sock.gettimeout() == 7
+            session.send('second\r\n')
+            stop = time.time() + 5
+            while 'second' not in self.server.lines:
+                assert time.time() < stop, "Timed out"
+                time.sleep(0.01)
+        finally:
+            session.release()
+        assert session.sock is None
+
+    def test_backoff(self):
+        obj = self.get_thread(server_list=[self.dead_address])
+        try:
+            with pytest.raises(weewx.restx.FailedPost):
+                obj.process_record(get_record(), None)
+            assert obj.session.backoff == 5
+            # While backing off, no attempt is made to connect
+            with mock.patch('weewx.restx.socket.create_connection') as mock_connect:
+                with pytest.raises(weewx.restx.FailedPost):
+                    obj.process_record(get_record(), None)
+                mock_connect.assert_not_called()
+        finally:
+            obj.session.release()
@@ -0,0 +1,41 @@
+#
+#    Copyright (c) 2026 Tom Keffer <tkeffer@gmail.com>
+#
+#    See the file LICENSE.txt for your full rights.
+#
+"""Test that weectl and weewxd start up without importing more than they need"""
+
+import pytest
+
+import benchmark
+
+# Modules that pull in large parts of the stack. Starting up should not need any of them.
+HEAVY = ['Cheetah', 'PIL', 'weeplot', 'weeimport', 'weecfg.extension', 'weecfg.update_config',
+         'weectllib.station_actions', 'weewx.engine', 'weewx.reportengine', 'weewx.restx']
+
+# Importing all the heavy modules at once. The budgets are relative to this.
+REFERENCE = ['-c', 'import ' + ', '.join(m for m in HEAVY if m not in ('Cheetah', 'PIL'))]
+
+
+def fastest(args, repeat=3):
+    """Return the results of the run of import_time() with the smallest total."""
+    return min((benchmark.import_time(*args) for _ in range(repeat)), key=lambda r: r[0])
+
+
+@pytest.fixture(scope='module')
+def reference():
+    return fastest(REFERENCE)[0]
+
+
+@pytest.mark.parametrize('command, allowed, budget', [
+    (['weectl', '--version'], [], 0.4),
+    (['weectl', 'report', '--help'], [], 0.8),
+    (['weectl', 'station', '--help'], [], 0.8),
+    (['weewxd', '--version'], ['weewx.engine'], 0.8),
+])
+def test_startup(reference, command, allowed, budget):
+    total, modules = fastest(benchmark.program(*command))
+    loaded = [name for name in modules
+              if (name in HEAVY or name.split('.')[0] in HEAVY) and name not in allowed]
+    assert not loaded
+    assert total < budget * reference
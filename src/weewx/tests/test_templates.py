@@ -16,6 +16,8 @@ import shutil
 import sys
 import time
 
+import pytest
+
 import parameters
 import weeutil.config
 import weeutil.logger
@@ -90,7 +92,27 @@ weewx.units.default_unit_format_dict["amp"] = "%.1f"
 weewx.units.default_unit_label_dict["amp"] = " A"
 
 
-def test_report_engine(config_dict):
+@pytest.mark.parametrize('aggregate_snapshots', [False, True])
+def test_report_engine(config_dict, aggregate_snapshots, monkeypatch):
+    if aggregate_snapshots:
+        # Use a copy, so nothing else sees the snapshots
+        config_dict = weeutil.config.deep_copy(config_dict)
+        config_dict['DataBindings']['wx_binding']['aggregate_snapshots'] = True
+        # Start with no snapshots, so they all get calculated and saved by the first run
+        with weewx.manager.open_manager_with_config(config_dict, 'wx_binding') as manager:
+            manager.snapshots.invalidate()
+        # Keep track of the snapshots that get used
+        hits = []
+        get = weewx.manager.AggregateSnapshots.get
+
+        def counting_get(self, startstamp, stopstamp, tag):
+            value = get(self, startstamp, stopstamp, tag)
+            if value is not None:
+                hits.append(tag)
+            return value
+
+        monkeypatch.setattr(weewx.manager.AggregateSnapshots, 'get', counting_get)
+
     # Set up logging:
     weeutil.logger.setup('weetest_templates', config_dict)
     # Remove the old directory:
@@ -128,7 +150,14 @@ def test_report_engine(config_dict):
     # Now run the engine again, but this time with a current record:
     with weewx.manager.open_manager_with_config(config_dict, 'wx_binding') as manager:
         record = manager.getRecord(testtime_ts)
+        if aggregate_snapshots:
+            # The first run should have saved some snapshots
+            assert manager.getSql("SELECT COUNT(*) FROM archive_snapshot WHERE stop > 0")[0]
+            del hits[:]
     run_engine(config_dict, stn_info, record, testtime_ts)
+    if aggregate_snapshots:
+        # The second run should have read them back, and still given the expected results
+        assert hits
 
 
 def run_engine(config_dict, stn_info, record, testtime_ts):
@@ -561,9 +561,17 @@ class RainRater(weewx.xtypes.XType):
         # Get all rain events since the window start from the database. Put it in
         # a 'try' block because the database may not have a 'rain' field.
         try:
-            for row in db_manager.genSql("SELECT dateTime, usUnits, rain FROM %s "
+            # Use the window of recent records, if the database manager has one that covers
+            # the period. Otherwise, go to the database.
+            records = db_manager.get_recent_records(start_ts, stop_ts) \
+                if 'rain' in db_manager.sqlkeys else None
+            if records is not None:
+                rows = [(r['dateTime'], r['usUnits'], r.get('rain')) for r in records]
+            else:
+                rows = db_manager.genSql("SELECT dateTime, usUnits, rain FROM %s "
                                          "WHERE dateTime>? AND dateTime<=?;"
-                                         % db_manager.table_name, (start_ts, stop_ts)):
+                                         % db_manager.table_name, (start_ts, stop_ts))
+            for row in rows:
                 # Unpack the row:
                 time_ts, unit_system, rain = row
                 # Skip the row if we already have it in rain_events
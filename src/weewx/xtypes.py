@@ -230,33 +230,25 @@ class ArchiveTable(XType):
 
         else:
 
-            # No aggregation
-            sql_str = "SELECT dateTime, %s, usUnits, interval FROM %s " \
-                      "WHERE dateTime > ? AND dateTime <= ?" % (obs_type, db_manager.table_name)
-
-            std_unit_system = None
-
-            # Hit the database. It's possible the type is not in the database, so be prepared
-            # to catch a NoColumnError:
+            # No aggregation. Fetch the data by column. It's possible the type is not in the
+            # database, so be prepared to catch a NoColumnError:
             try:
-                for record in db_manager.genSql(sql_str, (startstamp, stopstamp)):
-
-                    # Unpack the record
-                    timestamp, value, unit_system, interval = record
-
-                    if std_unit_system:
-                        if std_unit_system != unit_system:
-                            raise weewx.UnsupportedFeature("Unit type cannot change "
-                                                           "within an aggregation interval.")
-                    else:
-                        std_unit_system = unit_system
-                    start_vec.append(timestamp - interval * 60)
-                    stop_vec.append(timestamp)
-                    data_vec.append(value)
+                columns = db_manager.get_columns([obs_type, 'usUnits', 'interval'], timespan,
+                                                 typecode=None)
             except weedb.NoColumnError:
                 # The sql type doesn't exist. Convert to an UnknownType error
                 raise weewx.UnknownType(obs_type)
 
+            unit_systems = set(columns['usUnits'])
+            if len(unit_systems) > 1:
+                raise weewx.UnsupportedFeature("Unit type cannot change "
+                                               "within an aggregation interval.")
+            std_unit_system = unit_systems.pop() if unit_systems else None
+            start_vec = [timestamp - interval * 60
+                         for timestamp, interval in zip(columns['dateTime'], columns['interval'])]
+            stop_vec = columns['dateTime']
+            data_vec = columns[obs_type]
+
             unit, unit_group = weewx.units.getStandardUnitType(std_unit_system, obs_type,
                                                                aggregate_type)
 
@@ -318,6 +310,16 @@ class ArchiveTable(XType):
 
     valid_aggregate_types = set(['sum', 'count', 'avg', 'max', 'min']).union(agg_sql_dict.keys())
 
+    # Python equivalents of the simple aggregates, to be applied to a list of non-null values.
+    # They follow the SQL conventions for an empty list.
+    simple_agg_fns = {
+        'sum': lambda v: sum(v) if v else None,
+        'count': len,
+        'avg': lambda v: sum(v) / len(v) if v else None,
+        'max': lambda v: max(v) if v else None,
+        'min': lambda v: min(v) if v else None,
+    }
+
     simple_agg_sql = "SELECT %(aggregate_type)s(%(sql_type)s) FROM %(table_name)s " \
                      "WHERE dateTime > %(start)s AND dateTime <= %(stop)s " \
                      "AND %(sql_type)s IS NOT NULL"
@@ -343,10 +345,14 @@ class ArchiveTable(XType):
         if aggregate_type not in ArchiveTable.valid_aggregate_types:
             raise weewx.UnknownAggregation(aggregate_type)
 
+        # Some managers keep older records out of the archive table. Aggregates over them have
+        # to be calculated from their columns.
+        in_table = db_manager.archive_in_table(timespan)
+
         # For older versions of sqlite, we need to do these calculations the hard way:
         if obs_type == 'wind' \
                 and aggregate_type in ('vecdir', 'vecavg') \
-                and not db_manager.connection.has_math:
+                and (not in_table or not db_manager.connection.has_math):
             return ArchiveTable.get_wind_aggregate_long(obs_type,
                                                         timespan,
                                                         aggregate_type,
@@ -357,6 +363,17 @@ class ArchiveTable(XType):
         else:
             sql_type = obs_type
 
+        # The simple aggregates can be calculated from the window of recent records, if the
+        # timespan falls within it.
+        if aggregate_type in ArchiveTable.simple_agg_fns and sql_type in db_manager.sqlkeys:
+            records = db_manager.get_recent_records(timespan.start, timespan.stop)
+            if records is not None:
+                values = [r[sql_type] for r in records if r[sql_type] is not None]
+                value = ArchiveTable.simple_agg_fns[aggregate_type](values)
+                u, g = weewx.units.getStandardUnitType(db_manager.std_unit_system, obs_type,
+                                                       aggregate_type)
+                return weewx.units.ValueTuple(value, u, g)
+
         interpolate_dict = {
             'aggregate_type': aggregate_type,
             'sql_type': sql_type,
@@ -369,7 +386,11 @@ class ArchiveTable(XType):
                                                     ArchiveTable.simple_agg_sql) % interpolate_dict
 
         try:
-            row = db_manager.getSql(select_stmt)
+            if in_table:
+                row = db_manager.getSql(select_stmt)
+            else:
+                row = ArchiveTable.get_aggregate_row(sql_type, timespan, aggregate_type,
+                                                     db_manager)
         except weedb.NoColumnError:
             raise weewx.UnknownType(aggregate_type)
 
@@ -407,6 +428,50 @@ class ArchiveTable(XType):
         # Form the ValueTuple and return it:
         return weewx.units.ValueTuple(value, u, g)
 
+    @staticmethod
+    def get_aggregate_row(sql_type, timespan, aggregate_type, db_manager):
+        """Calculate the row that the SQL statement for an aggregate would return, from the
+        columns of the archive. Used for intervals that are not all in the archive table. Not
+        for 'vecdir' or 'vecavg'."""
+        include_start = aggregate_type in ('diff', 'tderiv')
+        keys = ['windGust', 'windGustDir'] if aggregate_type == 'gustdir' else [sql_type]
+        columns = db_manager.get_columns(keys, timespan, include_start=include_start,
+                                         typecode=None)
+        timestamps = columns['dateTime']
+        if aggregate_type == 'gustdir':
+            gusts = [(gust, -i) for i, gust in enumerate(columns['windGust']) if gust is not None]
+            if gusts:
+                return columns['windGustDir'][-max(gusts)[1]],
+            return (columns['windGustDir'][0],) if timestamps else None
+        values = columns[sql_type]
+        if aggregate_type in ('diff', 'tderiv'):
+            # From the first record at or after the start, to the last one at or before the stop
+            if not timestamps or values[0] is None or values[-1] is None:
+                return None,
+            if aggregate_type == 'diff':
+                return values[-1] - values[0],
+            dt = timestamps[-1] - timestamps[0]
+            return ((values[-1] - values[0]) / dt if dt else None),
+        # Everything else ignores NULLs
+        found = [(ts, v) for ts, v in zip(timestamps, values) if v is not None]
+        if aggregate_type in ArchiveTable.simple_agg_fns:
+            return ArchiveTable.simple_agg_fns[aggregate_type]([v for _, v in found]),
+        if not found:
+            # These queries return no row at all
+            return (None,) if aggregate_type in ('firsttime', 'lasttime') else None
+        if aggregate_type in ('first', 'firsttime'):
+            ts, v = found[0]
+        elif aggregate_type in ('last', 'lasttime'):
+            ts, v = found[-1]
+        elif aggregate_type == 'maxtime':
+            ts, v = max(found, key=lambda x: x[1])
+        elif aggregate_type == 'mintime':
+            ts, v = min(found, key=lambda x: x[1])
+        else:
+            assert aggregate_type == 'not_null'
+            return 1,
+        return (ts,) if aggregate_type.endswith('time') else (v,)
+
     @staticmethod
     def get_wind_aggregate_long(obs_type, timespan, aggregate_type, db_manager):
         """Calculate the math algorithm for vecdir and vecavg in Python. Suitable for
@@ -420,18 +485,24 @@ class ArchiveTable(XType):
         if obs_type != 'wind':
             raise weewx.UnknownType(obs_type)
 
-        sql_stmt = "SELECT interval, windSpeed, windDir " \
-                   "FROM %(table_name)s " \
-                   "WHERE dateTime > %(start)s AND dateTime <= %(stop)s;" \
-                   % {
-                       'table_name': db_manager.table_name,
-                       'start': timespan.start,
-                       'stop': timespan.stop
-                   }
+        if db_manager.archive_in_table(timespan):
+            sql_stmt = "SELECT interval, windSpeed, windDir " \
+                       "FROM %(table_name)s " \
+                       "WHERE dateTime > %(start)s AND dateTime <= %(stop)s;" \
+                       % {
+                           'table_name': db_manager.table_name,
+                           'start': timespan.start,
+                           'stop': timespan.stop
+                       }
+            rows = db_manager.genSql(sql_stmt)
+        else:
+            columns = db_manager.get_columns(['interval', 'windSpeed', 'windDir'], timespan,
+                                             typecode=None)
+            rows = zip(columns['interval'], columns['windSpeed'], columns['windDir'])
         xsum = 0.0
         ysum = 0.0
         sumtime = 0.0
-        for row in db_manager.genSql(sql_stmt):
+        for row in rows:
             if row[1] is not None:
                 sumtime += row[0]
                 if row[2] is not None:
@@ -539,6 +610,40 @@ class DailySummaries(XType):
                   "WHERE dateTime >= %(start)s AND dateTime < %(stop)s",
     }
 
+    # A single query that calculates many of the simple aggregates at once. Templates usually ask
+    # for several aggregates of the same type over the same timespan, so it is cheaper to get them
+    # all the first time one is asked for.
+    prefetch_sql = "SELECT MIN(min), MAX(max), MAX(min), MIN(max), AVG(min), AVG(max), " \
+                   "MAX(sum), MIN(sum), SUM(sum), SUM(count), SUM(wsum), SUM(sumtime), " \
+                   "MAX(count>0), " \
+                   "(SELECT mintime FROM %(table_name)s_day_%(obs_key)s " \
+                   "WHERE dateTime >= %(start)s AND dateTime < %(stop)s " \
+                   "AND mintime IS NOT NULL ORDER BY min ASC, mintime ASC LIMIT 1), " \
+                   "(SELECT maxtime FROM %(table_name)s_day_%(obs_key)s " \
+                   "WHERE dateTime >= %(start)s AND dateTime < %(stop)s " \
+                   "AND maxtime IS NOT NULL ORDER BY max DESC, maxtime ASC LIMIT 1) " \
+                   "FROM %(table_name)s_day_%(obs_key)s " \
+                   "WHERE dateTime >= %(start)s AND dateTime < %(stop)s"
+
+    # For each aggregate that can be prefetched, the columns of the prefetch query it uses. They
+    # are in the same order as the columns of the equivalent query in agg_sql_dict.
+    prefetch_columns = {
+        'min': (0,),
+        'max': (1,),
+        'maxmin': (2,),
+        'minmax': (3,),
+        'meanmin': (4,),
+        'meanmax': (5,),
+        'maxsum': (6,),
+        'minsum': (7,),
+        'sum': (8,),
+        'count': (9,),
+        'avg': (10, 11),
+        'not_null': (12,),
+        'mintime': (13,),
+        'maxtime': (14,),
+    }
+
     @staticmethod
     def get_aggregate(obs_type, timespan, aggregate_type, db_manager, **option_dict):
         """Returns an aggregation of a statistical type for a given time period,
@@ -554,7 +659,8 @@ class DailySummaries(XType):
     
         db_manager: An instance of weewx.manager.Manager or subclass.
     
-        option_dict: Not used in this version.
+        option_dict: If it includes key 'aggregate_cache', its value is a dictionary used to hold
+        the results of prefetch queries. Other keys are not used in this version.
     
         returns: A ValueTuple containing the result."""
 
@@ -596,8 +702,15 @@ class DailySummaries(XType):
             'table_name': db_manager.table_name
         }
 
-        # Run the query against the database:
-        row = db_manager.getSql(DailySummaries.agg_sql_dict[aggregate_type] % inter_dict)
+        cache = option_dict.get('aggregate_cache')
+        if cache is not None and aggregate_type in DailySummaries.prefetch_columns:
+            # Get all the simple aggregates at once, then pick out the ones we need.
+            row = DailySummaries.get_prefetched(inter_dict, db_manager, cache)
+            if row:
+                row = tuple(row[i] for i in DailySummaries.prefetch_columns[aggregate_type])
+        else:
+            # Run the query against the database:
+            row = db_manager.getSql(DailySummaries.agg_sql_dict[aggregate_type] % inter_dict)
 
         # Each aggregation type requires a slightly different calculation.
         if not row or None in row:
@@ -642,6 +755,25 @@ class DailySummaries(XType):
         # Form the ValueTuple and return it:
         return weewx.units.ValueTuple(value, t, g)
 
+    @staticmethod
+    def get_prefetched(inter_dict, db_manager, cache):
+        """Return the row of the prefetch query for an observation type and timespan, running the
+        query only if it is not already in the cache.
+
+        Args:
+            inter_dict (dict): The interpolation dictionary used by the aggregation queries.
+            db_manager (weewx.manager.Manager): The database manager to be used.
+            cache (dict): Holds the rows that have already been fetched.
+
+        Returns:
+            tuple|None: The row returned by the query.
+        """
+        key = (db_manager.database_name, inter_dict['table_name'], inter_dict['obs_key'],
+               inter_dict['start'], inter_dict['stop'])
+        if key not in cache:
+            cache[key] = db_manager.getSql(DailySummaries.prefetch_sql % inter_dict)
+        return cache[key]
+
     # These are SQL statements used for calculating series from the daily summaries.
     # They include "group_def", which will be replaced with a database-specific GROUP BY clause
     common = {
@@ -1026,26 +1158,19 @@ class WindVec(XType):
         else:
             # No aggregation desired. However, we have will have to assemble the wind vector from
             # its flattened types. This SQL select string will select the proper wind types
-            sql_str = 'SELECT dateTime, %s, %s, usUnits, interval FROM %s ' \
-                      'WHERE dateTime >= ? AND dateTime <= ?' \
-                      % (WindVec.windvec_types[obs_type][0], WindVec.windvec_types[obs_type][1],
-                         db_manager.table_name)
-            std_unit_system = None
-
-            for record in db_manager.genSql(sql_str, timespan):
-                ts, magnitude, direction, unit_system, interval = record
-                if std_unit_system:
-                    if std_unit_system != unit_system:
-                        raise weewx.UnsupportedFeature(
-                            "Unit type cannot change within a time interval.")
-                else:
-                    std_unit_system = unit_system
-
-                value = weeutil.weeutil.to_complex(magnitude, direction)
-
-                start_vec.append(ts - interval * 60)
-                stop_vec.append(ts)
-                data_vec.append(value)
+            mag_type, dir_type = WindVec.windvec_types[obs_type]
+            columns = db_manager.get_columns([mag_type, dir_type, 'usUnits', 'interval'],
+                                             timespan, include_start=True, typecode=None)
+            unit_systems = set(columns['usUnits'])
+            if len(unit_systems) > 1:
+                raise weewx.UnsupportedFeature("Unit type cannot change within a time interval.")
+            std_unit_system = unit_systems.pop() if unit_systems else None
+
+            start_vec = [ts - interval * 60
+                         for ts, interval in zip(columns['dateTime'], columns['interval'])]
+            stop_vec = columns['dateTime']
+            data_vec = [weeutil.weeutil.to_complex(magnitude, direction)
+                        for magnitude, direction in zip(columns[mag_type], columns[dir_type])]
 
             unit, unit_group = weewx.units.getStandardUnitType(std_unit_system, obs_type,
                                                                aggregate_type)
@@ -1093,12 +1218,20 @@ class WindVec(XType):
             'table_name': db_manager.table_name
         }
 
+        # Some managers keep older records out of the archive table. Aggregates over them have
+        # to be calculated from their columns.
+        in_table = db_manager.archive_in_table(timespan)
+
         if aggregate_type in WindVec.agg_sql_dict:
             # For these types (e.g., first, last, etc.), we can do the aggregation in a SELECT
             # statement.
             select_stmt = WindVec.agg_sql_dict[aggregate_type] % interpolation_dict
             try:
-                row = db_manager.getSql(select_stmt)
+                if in_table:
+                    row = db_manager.getSql(select_stmt)
+                else:
+                    row = WindVec.get_aggregate_row(obs_type, timespan, aggregate_type,
+                                                    db_manager)
             except weedb.NoColumnError as e:
                 raise weewx.UnknownType(e)
 
@@ -1121,9 +1254,13 @@ class WindVec(XType):
             std_unit_system = None
             xsum = ysum = 0.0
             count = 0
-            select_stmt = WindVec.complex_sql_wind % interpolation_dict
+            if in_table:
+                select_stmt = WindVec.complex_sql_wind % interpolation_dict
+                rows = db_manager.genSql(select_stmt, timespan)
+            else:
+                rows = WindVec.gen_rows(obs_type, timespan, db_manager)
 
-            for rec in db_manager.genSql(select_stmt, timespan):
+            for rec in rows:
 
                 # Unpack the record
                 mag, direction, unit_system = rec
@@ -1169,6 +1306,37 @@ class WindVec(XType):
         return weewx.units.ValueTuple(value, t, g)
 
 
+    @staticmethod
+    def gen_rows(obs_type, timespan, db_manager):
+        """Yield the magnitude, direction, and unit system of each record in an interval, from
+        the columns of the archive."""
+        mag_type, dir_type = WindVec.windvec_types[obs_type]
+        columns = db_manager.get_columns([mag_type, dir_type, 'usUnits'], timespan,
+                                         typecode=None)
+        return zip(columns[mag_type], columns[dir_type], columns['usUnits'])
+
+    @staticmethod
+    def get_aggregate_row(obs_type, timespan, aggregate_type, db_manager):
+        """Calculate the row that the SQL statement for an aggregate would return, from the
+        columns of the archive. Used for intervals that are not all in the archive table."""
+        rows = [row for row in WindVec.gen_rows(obs_type, timespan, db_manager)
+                if row[0] is not None]
+        if aggregate_type == 'count':
+            return len(rows), rows[-1][2] if rows else None
+        if not rows:
+            return None
+        if aggregate_type == 'not_null':
+            return 1, rows[0][2]
+        if aggregate_type == 'first':
+            return rows[0]
+        if aggregate_type == 'last':
+            return rows[-1]
+        if aggregate_type == 'min':
+            return min(rows, key=lambda row: row[0])
+        assert aggregate_type == 'max'
+        return max(rows, key=lambda row: row[0])
+
+
 class WindVecDaily(XType):
     """Extension for calculating the average windvec, using the  daily summaries."""
 
@@ -186,6 +186,8 @@ def main():
         except Terminate:
             log.info("Terminating weewx version %s", weewx.__version__)
             weeutil.logger.log_traceback(log.debug, "    ****  ")
+            # The signal will not give the logging thread a chance to catch up
+            weeutil.logger.shutdown()
             signal.signal(signal.SIGTERM, signal.SIG_DFL)
             os.kill(0, signal.SIGTERM)
 